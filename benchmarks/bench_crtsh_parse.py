@@ -0,0 +1,107 @@
+"""Benchmarks parsing a large crt.sh response: json.loads vs. streamed extraction.
+
+Builds a synthetic crt.sh document of --records certificate records and
+extracts the subdomains of each record's 'name_value' twice: once the old way,
+by loading the whole body and decoding it with json.loads, and once by feeding
+it in --chunk byte chunks through core.json_stream.JsonFieldExtractor, as the
+ct and anubis modules now do. Reports wall time and peak traced memory.
+
+Usage:
+    python benchmarks/bench_crtsh_parse.py [--records 200000] [--chunk 65536]
+"""
+import argparse
+import json
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Callable, Iterator, Set, Tuple
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from core.json_stream import JsonFieldExtractor  # noqa: E402
+
+TARGET = "example.com"
+
+
+def make_document(records: int) -> bytes:
+    """Returns a crt.sh-shaped JSON array with `records` certificates."""
+    entries = [
+        {
+            "issuer_ca_id": 16418,
+            "issuer_name": "C=US, O=Let's Encrypt, CN=R3",
+            "common_name": f"h{i}.{TARGET}",
+            "name_value": f"h{i}.{TARGET}\nwww.h{i}.{TARGET}",
+            "id": 5000000000 + i,
+            "entry_timestamp": "2024-01-01T00:00:00.000",
+            "not_before": "2024-01-01T00:00:00",
+            "not_after": "2024-04-01T00:00:00",
+            "serial_number": f"{i:040x}",
+        }
+        for i in range(records)
+    ]
+    return json.dumps(entries).encode()
+
+
+def names_from(name_value: str, found: Set[str]) -> None:
+    for domain in name_value.split("\n"):
+        domain = domain.strip().lower()
+        if domain.startswith("*."):
+            domain = domain[2:]
+        if domain.endswith(TARGET) and domain != TARGET:
+            found.add(domain)
+
+
+def body_chunks(document: bytes, size: int) -> Iterator[bytes]:
+    """Yields the body as aiohttp's iter_chunked would deliver it."""
+    for i in range(0, len(document), size):
+        yield document[i:i + size]
+
+
+def full_parse(document: bytes, chunk: int) -> Set[str]:
+    # The response is read into memory whole, then decoded in full
+    body = b"".join(body_chunks(document, chunk))
+    found: Set[str] = set()
+    for entry in json.loads(body):
+        names_from(entry.get("name_value", ""), found)
+    return found
+
+
+def streamed(document: bytes, chunk: int) -> Set[str]:
+    extractor = JsonFieldExtractor("name_value")
+    found: Set[str] = set()
+    for part in body_chunks(document, chunk):
+        for name_value in extractor.feed(part):
+            names_from(name_value, found)
+    return found
+
+
+def measure(
+    parse: Callable[[bytes, int], Set[str]], document: bytes, chunk: int
+) -> Tuple[float, int, int]:
+    """Returns (seconds, peak traced bytes, subdomains found)."""
+    tracemalloc.start()
+    start = time.perf_counter()
+    found = parse(document, chunk)
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak, len(found)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--records", type=int, default=200000, help="Certificates in the document")
+    parser.add_argument("--chunk", type=int, default=64 * 1024, help="Bytes per network chunk")
+    args = parser.parse_args()
+
+    document = make_document(args.records)
+    print(f"document: {len(document) / 1e6:.1f} MB, {args.records} records")
+    print(f"{'parser':>10} {'seconds':>8} {'peak MB':>8} {'names':>8}")
+    for label, parse in (("json.loads", full_parse), ("streamed", streamed)):
+        elapsed, peak, found = measure(parse, document, args.chunk)
+        print(f"{label:>10} {elapsed:>8.2f} {peak / 1e6:>8.1f} {found:>8}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""Benchmarks SQLite write throughput and concurrent read latency.
+
+Compares the legacy access pattern (a fresh connection per call, rollback
+journal) against the pooled WAL configuration used by core.database.Database.
+
+Usage:
+    python benchmarks/bench_database.py [--inserts 2000] [--duration 3]
+"""
+import argparse
+import sqlite3
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterator
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from core.database import Database  # noqa: E402
+
+FINDING = [{"subdomain": f"host{i}.example.com", "source": "bench"} for i in range(20)]
+
+
+class LegacyDatabase(Database):
+    """Reproduces the pre-pooling behaviour: connect per call, default journal."""
+
+    def __init__(self, db_path: str):
+        super().__init__(db_path, {"journal_mode": "delete", "synchronous": "full", "mmap_size_mb": 0})
+
+    @contextmanager
+    def _write(self) -> Iterator[sqlite3.Connection]:
+        conn = self._get_connection()
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    @contextmanager
+    def _read(self) -> Iterator[sqlite3.Connection]:
+        conn = self._get_connection()
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+
+def bench_inserts(db: Database, count: int) -> float:
+    """Returns sequential store_result calls per second."""
+    start = time.perf_counter()
+    for i in range(count):
+        db.store_result("example.com", "subdomain/bench", "bench", "subdomain", FINDING, scan_id="bench")
+    return count / (time.perf_counter() - start)
+
+
+def bench_concurrent_reads(db: Database, duration: float) -> Dict[str, float]:
+    """Measures get_scan latency while another thread writes continuously."""
+    db.create_scan("bench", "example.com", "running")
+    stop = threading.Event()
+
+    def writer() -> None:
+        while not stop.is_set():
+            db.store_result("example.com", "subdomain/bench", "bench", "subdomain", FINDING, scan_id="bench")
+
+    thread = threading.Thread(target=writer)
+    thread.start()
+    latencies = []
+    deadline = time.perf_counter() + duration
+    try:
+        while time.perf_counter() < deadline:
+            t0 = time.perf_counter()
+            db.get_scan("bench")
+            latencies.append((time.perf_counter() - t0) * 1000)
+    finally:
+        stop.set()
+        thread.join()
+
+    latencies.sort()
+    return {
+        "reads": len(latencies),
+        "p50_ms": statistics.median(latencies),
+        "p95_ms": latencies[int(len(latencies) * 0.95) - 1],
+        "max_ms": latencies[-1],
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--inserts", type=int, default=2000, help="Number of inserts to time")
+    parser.add_argument("--duration", type=float, default=3.0, help="Seconds of concurrent reads")
+    args = parser.parse_args()
+
+    print(f"{'mode':<8} {'inserts/s':>10} {'reads':>8} {'p50 ms':>8} {'p95 ms':>8} {'max ms':>8}")
+    for label, factory in (("legacy", LegacyDatabase), ("pooled", Database)):
+        with tempfile.TemporaryDirectory() as tmp:
+            db = factory(str(Path(tmp) / "bench.db"))
+            rate = bench_inserts(db, args.inserts)
+            reads = bench_concurrent_reads(db, args.duration)
+            db.close()
+        print(
+            f"{label:<8} {rate:>10.0f} {reads['reads']:>8} {reads['p50_ms']:>8.3f} "
+            f"{reads['p95_ms']:>8.3f} {reads['max_ms']:>8.3f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
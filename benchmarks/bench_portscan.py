@@ -0,0 +1,94 @@
+"""Benchmarks TCP connect-scan throughput against local listeners.
+
+Compares the legacy probe (asyncio.open_connection behind the global 10 rps
+RateLimiter, as PortScanner used to do) against modules.portscan.engine.ConnectScanner.
+Ports without a listener are refused immediately, so the numbers measure probe
+overhead rather than network latency.
+
+Usage:
+    python benchmarks/bench_portscan.py [--ports 1-5000] [--listeners 20] [--legacy-probes 50]
+"""
+import argparse
+import asyncio
+import sys
+import time
+from pathlib import Path
+from typing import List, Tuple
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from core.rate_limiter import RateLimiter  # noqa: E402
+from modules.portscan.engine import ConnectScanner, parse_ports  # noqa: E402
+
+HOST = "127.0.0.1"
+
+
+async def start_listeners(count: int) -> Tuple[List[asyncio.AbstractServer], List[int]]:
+    """Starts listeners on ephemeral ports that close every connection at once."""
+
+    async def accept(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        writer.close()
+
+    servers = [await asyncio.start_server(accept, HOST, 0) for _ in range(count)]
+    return servers, [s.sockets[0].getsockname()[1] for s in servers]
+
+
+async def bench_legacy(ports: List[int], rate: float, concurrency: int) -> Tuple[float, int]:
+    """Returns (probes/s, open ports) for the stream-based, globally rate-limited probe."""
+    limiter = RateLimiter(rate)
+    semaphore = asyncio.Semaphore(concurrency)
+    found = 0
+
+    async def check_port(port: int) -> None:
+        nonlocal found
+        async with semaphore:
+            await limiter.acquire()
+            try:
+                _, writer = await asyncio.wait_for(asyncio.open_connection(HOST, port), 2)
+                writer.close()
+                await writer.wait_closed()
+                found += 1
+            except (asyncio.TimeoutError, OSError):
+                pass
+
+    start = time.perf_counter()
+    await asyncio.gather(*(check_port(p) for p in ports))
+    return len(ports) / (time.perf_counter() - start), found
+
+
+async def bench_engine(ports: List[int], concurrency: int, per_host: int) -> Tuple[float, int]:
+    """Returns (probes/s, open ports) for ConnectScanner."""
+    engine = ConnectScanner(concurrency=concurrency, per_host=per_host, timeout=2)
+    found = await engine.scan_host(HOST, ports)
+    return engine.rate, len(found)
+
+
+async def run(args: argparse.Namespace) -> None:
+    servers, listening = await start_listeners(args.listeners)
+    try:
+        ports = sorted(set(parse_ports(args.ports)) | set(listening))
+        legacy_ports = sorted(set(ports[: args.legacy_probes]) | set(listening[:5]))
+        print(f"{'mode':<8} {'probes':>8} {'open':>6} {'probes/s':>10}")
+        rate, found = await bench_legacy(legacy_ports, args.rate_limit, args.concurrency)
+        print(f"{'legacy':<8} {len(legacy_ports):>8} {found:>6} {rate:>10.0f}")
+        rate, found = await bench_engine(ports, args.concurrency, args.per_host)
+        print(f"{'engine':<8} {len(ports):>8} {found:>6} {rate:>10.0f}")
+    finally:
+        for server in servers:
+            server.close()
+            await server.wait_closed()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--ports", default="1-5000", help="Port specification to scan on 127.0.0.1")
+    parser.add_argument("--listeners", type=int, default=20, help="Open ports to start")
+    parser.add_argument("--legacy-probes", type=int, default=50, help="Ports probed in legacy mode")
+    parser.add_argument("--rate-limit", type=float, default=10, help="Global rate_limit used by legacy mode")
+    parser.add_argument("--concurrency", type=int, default=1000, help="Probes in flight")
+    parser.add_argument("--per-host", type=int, default=500, help="Engine probes in flight per host")
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
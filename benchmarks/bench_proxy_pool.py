@@ -0,0 +1,100 @@
+"""Benchmarks HTTP throughput through a proxy pool as the pool grows.
+
+Each stand-in proxy is a local asyncio server that answers proxied requests
+itself after --delay seconds, serving at most --egress requests at once (as a
+real proxy is bounded by its uplink). Requests to --hosts destination hosts are
+sent through core.http_client.HttpClient with a ProxyManager pool of each size
+in --sizes, so the numbers show how throughput scales with the number of egress
+points when a single proxy is the bottleneck.
+
+Usage:
+    python benchmarks/bench_proxy_pool.py [--requests 2000] [--hosts 200] [--sizes 1,2,4,8]
+"""
+import argparse
+import asyncio
+import sys
+import time
+from pathlib import Path
+from typing import List
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from core.http_client import HttpClient  # noqa: E402
+from core.proxy_manager import ProxyManager  # noqa: E402
+
+HOST = "127.0.0.1"
+
+
+async def start_proxy(delay: float, egress: int) -> asyncio.AbstractServer:
+    """Starts a stand-in proxy answering at most `egress` requests at once."""
+    uplink = asyncio.Semaphore(egress)
+
+    async def handle(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            while await reader.readuntil(b"\r\n\r\n"):
+                async with uplink:
+                    await asyncio.sleep(delay)
+                writer.write(b"HTTP/1.1 200 OK\r\nContent-Length: 2\r\n\r\nok")
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    return await asyncio.start_server(handle, HOST, 0)
+
+
+async def bench(size: int, args: argparse.Namespace) -> float:
+    """Returns requests/s through a pool of `size` stand-in proxies."""
+    servers: List[asyncio.AbstractServer] = [
+        await start_proxy(args.delay, args.egress) for _ in range(size)
+    ]
+    urls = [f"http://{HOST}:{s.sockets[0].getsockname()[1]}" for s in servers]
+    manager = ProxyManager(
+        {"pool": {"proxies": urls, "strategy": args.strategy, "health_url": ""}}
+    )
+    client = HttpClient(proxy_manager=manager, limit_per_host=0)
+    semaphore = asyncio.Semaphore(args.concurrency)
+
+    async def fetch(host: str) -> None:
+        async with semaphore:
+            session = client.session(host=host)
+            async with session.get(f"http://{host}/", proxy=manager.get_proxy_url(host)) as r:
+                await r.read()
+
+    start = time.perf_counter()
+    await asyncio.gather(*(fetch(f"h{i % args.hosts}.test") for i in range(args.requests)))
+    elapsed = time.perf_counter() - start
+    await client.close()
+    for server in servers:
+        server.close()
+        await server.wait_closed()
+    return args.requests / elapsed
+
+
+async def run(args: argparse.Namespace) -> None:
+    ceiling = args.egress / args.delay
+    print(f"{'proxies':>7} {'req/s':>9} {'ideal':>9} {'speedup':>8}")
+    baseline = None
+    for size in (int(s) for s in args.sizes.split(",")):
+        rate = await bench(size, args)
+        baseline = baseline or rate
+        print(f"{size:>7} {rate:>9.0f} {ceiling * size:>9.0f} {rate / baseline:>7.2f}x")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=2000, help="Requests per run")
+    parser.add_argument("--hosts", type=int, default=200, help="Distinct destination hosts")
+    parser.add_argument("--sizes", default="1,2,4,8", help="Pool sizes to measure")
+    parser.add_argument("--delay", type=float, default=0.01, help="Seconds per proxied request")
+    parser.add_argument("--egress", type=int, default=10, help="Requests one proxy serves at once")
+    parser.add_argument("--concurrency", type=int, default=200, help="Requests in flight")
+    parser.add_argument(
+        "--strategy", default="round_robin", choices=("round_robin", "least_loaded")
+    )
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""Benchmarks token-bucket overhead with many concurrent waiters.
+
+Compares the legacy limiter (an asyncio.Lock held across the refill sleep)
+against the reservation-based core.rate_limiter.RateLimiter. Each run starts
+--waiters coroutines that acquire one token at once from a bucket refilling at
+--rate tokens/s, and reports wall time, the per-acquire overhead beyond the
+ideal drain time, and the wait-time metrics of the new limiter.
+
+Usage:
+    python benchmarks/bench_rate_limiter.py [--waiters 10000] [--rate 100000] [--burst 100]
+"""
+import argparse
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from core.rate_limiter import RateLimiter  # noqa: E402
+
+
+class LegacyRateLimiter:
+    """Reproduces the previous limiter: one lock, held while sleeping, capacity == rate."""
+
+    def __init__(self, rate_per_second: float, burst: float):
+        self.rate = rate_per_second
+        self.capacity = burst
+        self.tokens = burst
+        self.last_update = time.monotonic()
+        self.lock = asyncio.Lock()
+
+    async def acquire(self) -> None:
+        async with self.lock:
+            while self.tokens < 1:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.last_update) * self.rate)
+                self.last_update = now
+                if self.tokens < 1:
+                    await asyncio.sleep((1 - self.tokens) / self.rate)
+            self.tokens -= 1
+
+
+async def bench(limiter, waiters: int) -> float:
+    """Returns seconds for `waiters` concurrent single-token acquires to complete."""
+    start = time.perf_counter()
+    await asyncio.gather(*(limiter.acquire() for _ in range(waiters)))
+    return time.perf_counter() - start
+
+
+async def run(args: argparse.Namespace) -> None:
+    ideal = max(0.0, (args.waiters - args.burst) / args.rate)
+    print(f"{'mode':<8} {'seconds':>8} {'ideal':>8} {'us/acquire':>11} {'mean wait ms':>13} {'max wait ms':>12}")
+    legacy = LegacyRateLimiter(args.rate, args.burst)
+    elapsed = await bench(legacy, args.waiters)
+    overhead = (elapsed - ideal) / args.waiters * 1e6
+    print(f"{'legacy':<8} {elapsed:>8.3f} {ideal:>8.3f} {overhead:>11.2f} {'-':>13} {'-':>12}")
+
+    limiter = RateLimiter(args.rate, args.burst)
+    elapsed = await bench(limiter, args.waiters)
+    overhead = (elapsed - ideal) / args.waiters * 1e6
+    print(
+        f"{'reserve':<8} {elapsed:>8.3f} {ideal:>8.3f} {overhead:>11.2f} "
+        f"{limiter.mean_wait * 1000:>13.2f} {limiter.max_wait * 1000:>12.2f}"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--waiters", type=int, default=10000, help="Concurrent acquires")
+    parser.add_argument("--rate", type=float, default=100000, help="Tokens per second")
+    parser.add_argument("--burst", type=float, default=100, help="Bucket capacity")
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+"""Benchmarks screenshot throughput: a warm BrowserPool vs. a browser and context per batch/URL.
+
+--pages small local pages (served by an aiohttp server on 127.0.0.1) are
+captured the way the old capturer did (one browser launched for
+the batch, a new context created and torn down for every URL), then a
+BrowserPool with 1, 2, ... --browsers processes of --contexts pages each,
+whose contexts are reset and reused between URLs. Screenshots per minute are
+reported for each; the pool's rate should grow with the number of browsers
+until the CPU is saturated. Needs Playwright's Chromium (`playwright install
+chromium`).
+
+Usage:
+    python benchmarks/bench_screenshots.py [--pages 200] [--browsers 4] [--contexts 4]
+"""
+import argparse
+import asyncio
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from aiohttp import web
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from core.browser_pool import DEFAULT_CONTEXT_OPTIONS, LAUNCH_ARGS, BrowserPool  # noqa: E402
+
+try:
+    from playwright.async_api import async_playwright
+except ImportError:
+    async_playwright = None
+
+
+async def serve() -> web.AppRunner:
+    async def page(request):
+        n = request.match_info["n"]
+        rows = "".join(f"<tr><td>row {i}</td><td>{n}</td></tr>" for i in range(50))
+        html = f"<html><head><title>Service {n}</title></head><body><table>{rows}</table></body>"
+        return web.Response(
+            text=html, content_type="text/html", headers={"Set-Cookie": f"session={n}"}
+        )
+
+    app = web.Application()
+    app.router.add_get("/{n}", page)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    await web.TCPSite(runner, "127.0.0.1", 0).start()
+    return runner
+
+
+async def per_url_contexts(urls, out: Path, concurrency: int) -> float:
+    """The capturer before the pool: one launch per batch, one context per URL."""
+    semaphore = asyncio.Semaphore(concurrency)
+    start = time.perf_counter()
+    async with async_playwright() as playwright:
+        browser = await playwright.chromium.launch(headless=True, args=LAUNCH_ARGS)
+
+        async def shoot(i, url):
+            async with semaphore:
+                context = await browser.new_context(**DEFAULT_CONTEXT_OPTIONS)
+                try:
+                    page = await context.new_page()
+                    await page.goto(url, wait_until="load")
+                    await page.screenshot(path=str(out / f"old{i}.png"))
+                finally:
+                    await context.close()
+
+        await asyncio.gather(*(shoot(i, url) for i, url in enumerate(urls)))
+        await browser.close()
+    return time.perf_counter() - start
+
+
+async def pooled(urls, out: Path, browsers: int, contexts: int) -> float:
+    pool = BrowserPool(browsers=browsers, contexts_per_browser=contexts)
+
+    async def shoot(i, url):
+        async with pool.page() as page:
+            await page.goto(url, wait_until="load")
+            await page.screenshot(path=str(out / f"pool{i}.png"))
+
+    start = time.perf_counter()
+    try:
+        await asyncio.gather(*(shoot(i, url) for i, url in enumerate(urls)))
+    finally:
+        await pool.close()
+    return time.perf_counter() - start
+
+
+async def run(args) -> None:
+    if async_playwright is None:
+        sys.exit("Playwright is not installed")
+    runner = await serve()
+    port = runner.addresses[0][1]
+    urls = [f"http://127.0.0.1:{port}/{n}" for n in range(args.pages)]
+    try:
+        with tempfile.TemporaryDirectory() as out:
+            try:
+                elapsed = await per_url_contexts(urls, Path(out), args.contexts)
+            except Exception as e:
+                sys.exit(f"Chromium could not be launched ({e.__class__.__name__})")
+            print(f"{'setup':>28} {'screenshots/min':>16}")
+            print(f"{'context per URL, 1 browser':>28} {len(urls) / elapsed * 60:>16,.0f}")
+            for browsers in range(1, args.browsers + 1):
+                elapsed = await pooled(urls, Path(out), browsers, args.contexts)
+                label = f"pool, {browsers} browser{'s' if browsers > 1 else ''}"
+                print(f"{label:>28} {len(urls) / elapsed * 60:>16,.0f}")
+    finally:
+        await runner.cleanup()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--pages", type=int, default=200, help="Pages captured per setup")
+    parser.add_argument("--browsers", type=int, default=4, help="Largest pool measured")
+    parser.add_argument("--contexts", type=int, default=4, help="Pages in flight per browser")
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
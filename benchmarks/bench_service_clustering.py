@@ -0,0 +1,123 @@
+"""Benchmarks service clustering: SimHash fingerprinting and the banded LSH index.
+
+A synthetic estate of --services web pages is generated from --templates page
+templates (default pages, parked domains, login portals), each copy with its
+own hostname, CSRF token and a few random words changed, plus --unique one-off
+pages. Every page is fingerprinted with modules.http.similarity and clustered
+with ServiceClusterer and with a brute-force comparison against every cluster
+representative. Fingerprints per second, clustering time, the number of
+clusters (the screenshots left to take) and cluster purity are reported.
+
+Usage:
+    python benchmarks/bench_service_clustering.py [--services 5000] [--templates 20]
+        [--unique 500] [--distance 6]
+"""
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from modules.http.similarity import ServiceClusterer, body_features, simhash  # noqa: E402
+
+WORDS = (
+    "account access admin portal welcome sign login password user support contact service "
+    "domain sale price default page server installed working configuration documentation "
+    "copyright rights reserved dashboard status online secure private network internal"
+).split()
+
+
+def make_template(rng: random.Random) -> List[str]:
+    """Returns a page skeleton: a list of paragraphs of random words."""
+    return [
+        " ".join(rng.choices(WORDS, k=rng.randrange(8, 30))) for _ in range(rng.randrange(4, 15))
+    ]
+
+
+def render(paragraphs: List[str], host: str, token: str, rng: random.Random, edits: int) -> str:
+    paragraphs = list(paragraphs)
+    for _ in range(edits):
+        i = rng.randrange(len(paragraphs))
+        words = paragraphs[i].split()
+        words[rng.randrange(len(words))] = rng.choice(WORDS)
+        paragraphs[i] = " ".join(words)
+    body = "".join(f"<div class='p'><p>{p}</p></div>" for p in paragraphs)
+    return (
+        f"<html><head><title>{host}</title><script>var csrf='{token}'</script></head>"
+        f"<body><h1>{host}</h1><input type=hidden value='{token}'>{body}</body></html>"
+    )
+
+
+def make_estate(args) -> List[Tuple[str, str, str]]:
+    """Returns (host, html, name of the template the page was made from)."""
+    rng = random.Random(1)
+    templates = [make_template(rng) for _ in range(args.templates)]
+    estate = []
+    for i in range(args.services):
+        host = f"h{i}.example.com"
+        token = "%032x" % rng.getrandbits(128)
+        if i < args.unique:
+            estate.append((host, render(make_template(rng), host, token, rng, 0), f"one-off {i}"))
+        else:
+            t = rng.randrange(len(templates))
+            estate.append(
+                (host, render(templates[t], host, token, rng, rng.randrange(3)), f"template {t}")
+            )
+    rng.shuffle(estate)
+    return estate
+
+
+def brute_force(fingerprints: List[Optional[int]], distance: int) -> List[int]:
+    leaders: List[Tuple[int, int]] = []
+    assignment = []
+    for i, fingerprint in enumerate(fingerprints):
+        for leader, other in leaders:
+            if fingerprint is not None and (fingerprint ^ other).bit_count() <= distance:
+                assignment.append(leader)
+                break
+        else:
+            leaders.append((i, fingerprint or 0))
+            assignment.append(i)
+    return assignment
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--services", type=int, default=5000)
+    parser.add_argument("--templates", type=int, default=20)
+    parser.add_argument("--unique", type=int, default=500, help="One-off pages among the services")
+    parser.add_argument("--distance", type=int, default=6, help="cluster_distance")
+    args = parser.parse_args()
+
+    estate = make_estate(args)
+    start = time.perf_counter()
+    fingerprints = [simhash(body_features(html, host)) for host, html, _ in estate]
+    elapsed = time.perf_counter() - start
+    print(f"{len(estate)} services: {len(estate) / elapsed:,.0f} fingerprints/s")
+
+    clusterer = ServiceClusterer(args.distance)
+    start = time.perf_counter()
+    clusters = [clusterer.add(str(i), fp) for i, fp in enumerate(fingerprints)]
+    lsh = time.perf_counter() - start
+    start = time.perf_counter()
+    expected = brute_force(fingerprints, args.distance)
+    brute = time.perf_counter() - start
+    print(f"LSH index:   {lsh * 1000:8.1f} ms, {len(clusterer)} clusters")
+    print(f"brute force: {brute * 1000:8.1f} ms, {len(set(expected))} clusters")
+    print(f"assignments identical: {[int(c) for c in clusters] == expected}")
+
+    # A cluster is pure when all its members come from the same template
+    members = {}
+    for (_, _, template), cluster in zip(estate, clusters):
+        members.setdefault(cluster, set()).add(template)
+    impure = sum(len(sources) > 1 for sources in members.values())
+    ideal = len({template for _, _, template in estate})
+    print(f"impure clusters: {impure}; ideal cluster count: {ideal}")
+    print(f"screenshots saved: {1 - len(clusterer) / len(estate):.0%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,158 @@
+"""Benchmarks technology fingerprinting: combined literal scan vs. one regex per signature.
+
+Responses are synthetic landing pages (headers, cookies, meta and script tags,
+then a body of --body-kb KB) that each embed a few known technologies. The
+signatures are the bundled set, or --fingerprints (a Wappalyzer technologies
+file or source directory), plus --synthetic generated signatures so the count
+can approach that of the full Wappalyzer database (~3,500). Each response is
+matched with modules.http.tech.TechMatcher and with a naive loop that runs
+every body and script pattern of every signature. Responses per minute are
+reported, and both must detect the same technologies.
+
+Usage:
+    python benchmarks/bench_tech_fingerprint.py [--responses 500] [--synthetic 3000]
+        [--body-kb 64] [--fingerprints PATH]
+"""
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Set, Tuple
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from modules.http.tech import Pattern, TechMatcher, load_signatures  # noqa: E402
+
+Response = Tuple[List[Tuple[str, str]], Dict[str, str], str]
+
+
+def add_synthetic(database: Dict[str, Any], count: int) -> None:
+    """Adds generated signatures shaped like real ones (a library path, an HTML marker)."""
+    for i in range(count):
+        database["technologies"][f"Synthetic {i}"] = {
+            "cats": [19],
+            "scriptSrc": rf"/lib{i}(?:\.min)?\.js(?:\?ver=([\d.]+))?\;version:\1",
+            "html": rf"<div[^>]+data-widget{i}=",
+            "headers": {f"X-Synthetic-{i}": ""},
+        }
+
+
+def make_response(rng: random.Random, i: int, synthetic: int, body_kb: int) -> Response:
+    """Returns (headers, cookies, html) for one page using a few known technologies."""
+    libs = rng.sample(range(synthetic), min(3, synthetic))
+    headers = [
+        ("Server", rng.choice(["nginx/1.25.3", "Apache/2.4.58 (Ubuntu)", "cloudflare"])),
+        ("Content-Type", "text/html; charset=utf-8"),
+        ("X-Powered-By", rng.choice(["PHP/8.2.1", "Express", "ASP.NET"])),
+    ]
+    cookies = {rng.choice(["PHPSESSID", "JSESSIONID", "csrftoken"]): "x"}
+    head = [
+        '<meta charset="utf-8">',
+        f'<meta name="generator" content="WordPress 6.{i % 5}">',
+        '<script src="/wp-includes/js/jquery/jquery-3.7.1.min.js"></script>',
+        *(f'<script src="/static/lib{n}.min.js?ver=1.{n}"></script>' for n in libs),
+        *(f'<link rel="preload" href="/static/{i}-{n}.css" as="style">' for n in range(15)),
+    ]
+    row = '<div class="row"><span class="cell">lorem ipsum dolor sit amet</span></div>\n'
+    body = row * (body_kb * 1024 // len(row))
+    if libs:
+        body += f'<div class="w" data-widget{libs[0]}="on"></div>'
+    return headers, cookies, f"<html><head>{''.join(head)}</head><body>{body}</body></html>"
+
+
+class NaiveMatcher:
+    """Runs every pattern of every signature against each response."""
+
+    def __init__(self, database: Dict[str, Any]):
+        self.headers: List[Tuple[str, str, Pattern]] = []
+        self.cookies: List[Tuple[str, str, Pattern]] = []
+        self.html: List[Tuple[str, Pattern]] = []
+        self.scripts: List[Tuple[str, Pattern]] = []
+        for name, signature in database["technologies"].items():
+            for key, source in (signature.get("headers") or {}).items():
+                self.headers.append((name, key.lower(), Pattern(source)))
+            for key, source in (signature.get("cookies") or {}).items():
+                self.cookies.append((name, key.lower(), Pattern(source)))
+            for field, target in (("html", self.html), ("scriptSrc", self.scripts)):
+                sources = signature.get(field) or []
+                for source in [sources] if isinstance(sources, str) else sources:
+                    target.append((name, Pattern(source)))
+
+    def match(self, headers, cookies, html) -> Set[str]:
+        found = set()
+        values = {key.lower(): value for key, value in headers}
+        names = {key.lower(): value for key, value in cookies.items()}
+        for name, key, pattern in self.headers:
+            if key in values and pattern.search(values[key]) is not None:
+                found.add(name)
+        for name, key, pattern in self.cookies:
+            if key in names and pattern.search(names[key]) is not None:
+                found.add(name)
+        for name, pattern in self.html:
+            if pattern.search(html) is not None:
+                found.add(name)
+        sources = _sources(html)
+        for name, pattern in self.scripts:
+            if any(pattern.search(source) is not None for source in sources):
+                found.add(name)
+        return found
+
+
+def _sources(html: str) -> List[str]:
+    from modules.http.tech import _TAG, _attributes
+
+    return [
+        attrs["src"]
+        for tag in _TAG.finditer(html)
+        if tag.group(1).lower() == "script"
+        for attrs in [_attributes(tag.group(2))]
+        if "src" in attrs
+    ]
+
+
+def measure(match: Callable[[Response], Set[str]], responses: List[Response]):
+    start = time.perf_counter()
+    results = [match(response) for response in responses]
+    elapsed = time.perf_counter() - start
+    return results, len(responses) / elapsed * 60
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--responses", type=int, default=500, help="Responses matched")
+    parser.add_argument("--synthetic", type=int, default=3000, help="Generated signatures added")
+    parser.add_argument("--body-kb", type=int, default=64, help="Body size of each response")
+    parser.add_argument("--fingerprints", help="Wappalyzer technologies file or directory")
+    args = parser.parse_args()
+
+    database = load_signatures(args.fingerprints)
+    add_synthetic(database, args.synthetic)
+    start = time.perf_counter()
+    matcher = TechMatcher(database)
+    compiled = time.perf_counter() - start
+    naive = NaiveMatcher(database)
+    rng = random.Random(1)
+    responses = [
+        make_response(rng, i, args.synthetic, args.body_kb) for i in range(args.responses)
+    ]
+    print(
+        f"{len(database['technologies'])} signatures (compiled in {compiled:.2f}s), "
+        f"{len(responses)} responses of ~{args.body_kb} KB"
+    )
+
+    combined, rate = measure(
+        lambda r: {tech["name"] for tech in matcher.match(r[0], r[1], r[2])}, responses
+    )
+    print(f"{'matcher':>10} {'responses/min':>14}")
+    print(f"{'combined':>10} {rate:>14,.0f}")
+    slow = responses[: max(1, len(responses) // 10)]  # the naive loop is much slower
+    baseline, rate = measure(lambda r: naive.match(*r), slow)
+    print(f"{'naive':>10} {rate:>14,.0f}")
+    # The combined matcher also adds implied technologies
+    missed = sum(bool(b - a) for a, b in zip(combined, baseline))
+    print(f"responses where the combined matcher missed a detection: {missed}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""Benchmarks page-title extraction: BeautifulSoup DOM vs. streaming head parsing.
+
+Pages come from --corpus (a directory of saved .html files) or, without one,
+from a generated corpus of --pages pages shaped like real landing pages:
+a head of meta, link and inline script tags, then a large body. Each page is
+processed the way HttpDetector used to do it (up to 128 KB decoded and parsed
+with BeautifulSoup + lxml) and the way it does now (16 KB network chunks fed
+to modules.http.head.HeadExtractor until </head>). Titles per second and the
+bytes each approach consumes are reported. Both must agree on every title.
+
+Usage:
+    python benchmarks/bench_title_extraction.py [--corpus DIR] [--pages 500]
+"""
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+from typing import Callable, List, Optional, Tuple
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from modules.http.head import HeadExtractor  # noqa: E402
+
+LIMIT = 128 * 1024
+CHUNK = 16 * 1024
+
+
+def make_page(rng: random.Random, i: int) -> bytes:
+    """Returns one synthetic landing page of roughly 50-300 KB."""
+    head = [
+        '<meta charset="utf-8">',
+        '<meta name="viewport" content="width=device-width, initial-scale=1">',
+        *(f'<link rel="preload" href="/static/{i}-{n}.css" as="style">' for n in range(20)),
+        f"<script>window.__STATE__ = {{\"id\": {i}, \"items\": [{','.join(['1'] * 400)}]}};</script>",
+        f"<title>Site {i} &ndash; Dashboard</title>",
+        '<meta name="generator" content="Hugo 0.120">',
+        f'<link rel="canonical" href="https://h{i}.example.com/">',
+    ]
+    row = '<div class="row"><span class="cell">lorem ipsum dolor</span></div>\n'
+    body = row * rng.randrange(800, 4500)
+    return f"<!DOCTYPE html><html><head>{''.join(head)}</head><body>{body}</body></html>".encode()
+
+
+def load_corpus(directory: Optional[str], pages: int) -> List[bytes]:
+    if directory:
+        return [p.read_bytes() for p in sorted(Path(directory).glob("*.htm*"))]
+    rng = random.Random(1)
+    return [make_page(rng, i) for i in range(pages)]
+
+
+def soup_title(page: bytes) -> Tuple[Optional[str], int]:
+    from bs4 import BeautifulSoup
+
+    body = page[:LIMIT]
+    soup = BeautifulSoup(body.decode("utf-8", errors="ignore"), "lxml")
+    title = soup.title.string.strip() if soup.title and soup.title.string else None
+    return (" ".join(title.split()) if title else None), len(body)
+
+
+def streamed_title(page: bytes) -> Tuple[Optional[str], int]:
+    head = HeadExtractor(max_bytes=LIMIT)
+    for i in range(0, len(page), CHUNK):
+        if head.feed(page[i:i + CHUNK]):
+            break
+    return head.title, head.bytes_read
+
+
+def measure(extract: Callable[[bytes], Tuple[Optional[str], int]], corpus: List[bytes]):
+    start = time.perf_counter()
+    results = [extract(page) for page in corpus]
+    elapsed = time.perf_counter() - start
+    return results, len(corpus) / elapsed, sum(n for _, n in results) / len(corpus)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--corpus", help="Directory of saved .html pages")
+    parser.add_argument("--pages", type=int, default=500, help="Generated pages without --corpus")
+    args = parser.parse_args()
+
+    corpus = load_corpus(args.corpus, args.pages)
+    size = sum(map(len, corpus)) / len(corpus) / 1024
+    print(f"{len(corpus)} pages, {size:.0f} KB on average")
+    print(f"{'extractor':>14} {'titles/s':>9} {'KB read':>8}")
+    streamed, rate, read = measure(streamed_title, corpus)
+    print(f"{'HeadExtractor':>14} {rate:>9.0f} {read / 1024:>8.1f}")
+    try:
+        souped, rate, read = measure(soup_title, corpus)
+    except ImportError:
+        print("BeautifulSoup/lxml not installed; skipping the DOM baseline")
+        return
+    print(f"{'BeautifulSoup':>14} {rate:>9.0f} {read / 1024:>8.1f}")
+    mismatches = sum(a[0] != b[0] for a, b in zip(streamed, souped))
+    print(f"title mismatches: {mismatches}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,378 @@
+import asyncio
+import logging
+import os
+import time
+import uuid
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Tuple
+
+try:
+    from playwright.async_api import async_playwright
+except ImportError:
+    async_playwright = None
+
+logger = logging.getLogger(__name__)
+
+# Launches one browser process with the given command-line arguments
+Launcher = Callable[[List[str]], Awaitable[Any]]
+
+LAUNCH_ARGS = ["--disable-blink-features=AutomationControlled", "--no-sandbox"]
+
+DEFAULT_CONTEXT_OPTIONS: Dict[str, Any] = {
+    "viewport": {"width": 1280, "height": 720},
+    "ignore_https_errors": True,
+    "user_agent": (
+        "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
+        "(KHTML, like Gecko) Chrome/122.0.0.0 Safari/537.36"
+    ),
+    "extra_http_headers": {"Accept-Language": "en-US,en;q=0.9"},
+    "java_script_enabled": True,
+}
+
+# Run on the page before it leaves the origin it was leased for
+_CLEAR_STORAGE = "() => { try { localStorage.clear(); sessionStorage.clear(); } catch (e) {} }"
+
+
+def process_tree_rss(marker: str) -> Optional[int]:
+    """Measures the resident memory of a browser and every process it spawned.
+
+    The browser is the process whose command line contains `marker`; renderer,
+    GPU and utility processes are found by walking the parent links in /proc.
+
+    Args:
+        marker: A command-line argument unique to the browser process.
+
+    Returns:
+        Resident set size in bytes, or None where /proc is unavailable or the
+        process is gone.
+    """
+    try:
+        pids = [int(name) for name in os.listdir("/proc") if name.isdigit()]
+    except OSError:
+        return None
+    page_size = os.sysconf("SC_PAGE_SIZE")
+    needle = marker.encode()
+    children: Dict[int, List[int]] = {}
+    resident: Dict[int, int] = {}
+    root = None
+    for pid in pids:
+        try:
+            with open(f"/proc/{pid}/stat", "rb") as f:
+                # The command name may contain spaces and parentheses; fields follow the last ')'
+                fields = f.read().rsplit(b")", 1)[1].split()
+            with open(f"/proc/{pid}/statm", "rb") as f:
+                resident[pid] = int(f.read().split()[1]) * page_size
+            if root is None:
+                with open(f"/proc/{pid}/cmdline", "rb") as f:
+                    if needle in f.read():
+                        root = pid
+        except (OSError, IndexError, ValueError):
+            continue
+        children.setdefault(int(fields[1]), []).append(pid)
+    if root is None:
+        return None
+    total, stack = 0, [root]
+    while stack:
+        pid = stack.pop()
+        total += resident.get(pid, 0)
+        stack.extend(children.get(pid, ()))
+    return total
+
+
+class _Browser:
+    """One browser process of the pool and the warm contexts it keeps."""
+
+    def __init__(self) -> None:
+        self.marker = f"--recon-browser-pool={uuid.uuid4().hex}"
+        self.browser: Any = None
+        self.lock = asyncio.Lock()
+        self.idle: List[Tuple[Any, Any, int]] = []  # (context, page, times used)
+        self.active = 0
+        self.pages = 0
+        self.retired = False
+        self.checked = time.monotonic()
+
+
+class BrowserPool:
+    """Long-lived pool of headless browsers shared by every scan (or by the web process).
+
+    Keeps up to `browsers` browser processes running, each serving up to
+    `contexts_per_browser` pages at a time. A page is leased together with its
+    own browser context; when the lease ends, the page's storage, cookies and
+    permissions are cleared, extra tabs are closed and it is navigated to
+    about:blank, and the context is kept warm for the next lease instead of
+    being torn down. Leases go to the least busy browser, so capture throughput
+    grows with the number of processes.
+
+    A browser is replaced after serving `max_pages_per_browser` pages, when its
+    process tree grows past `max_memory_mb`, when it disconnects, or when a
+    health probe every `health_interval` seconds gets no answer. Pages already
+    leased from a retired browser finish before it is closed.
+
+    Browsers are launched lazily on first use, so the pool may be constructed
+    outside the event loop that later uses it.
+
+    Attributes:
+        browsers: Number of browser processes.
+        contexts_per_browser: Pages leased from one browser at a time.
+        max_pages_per_browser: Pages a browser serves before it is restarted (0 = never).
+        max_uses_per_context: Leases of one context before a fresh one replaces it.
+        max_memory_mb: Memory of a browser's process tree that triggers a restart
+            (0 = unchecked; measured on Linux only).
+        health_interval: Seconds between health checks of one browser.
+        context_options: Keyword arguments for every new browser context.
+        restarts: Browsers replaced since the pool was created.
+    """
+
+    def __init__(
+        self,
+        browsers: int = 2,
+        contexts_per_browser: int = 4,
+        max_pages_per_browser: int = 500,
+        max_uses_per_context: int = 50,
+        max_memory_mb: int = 1024,
+        health_interval: float = 30,
+        context_options: Optional[Dict[str, Any]] = None,
+        launcher: Optional[Launcher] = None,
+    ):
+        """Initializes the pool without launching any browser.
+
+        Args:
+            browsers: Number of browser processes.
+            contexts_per_browser: Pages leased from one browser at a time.
+            max_pages_per_browser: Pages a browser serves before it is restarted (0 = never).
+            max_uses_per_context: Leases of one context before it is replaced.
+            max_memory_mb: Resident memory of a browser and its child processes, in MB,
+                above which it is restarted (0 = unchecked).
+            health_interval: Seconds between health checks of one browser.
+            context_options: Options for new browser contexts (see DEFAULT_CONTEXT_OPTIONS).
+            launcher: Coroutine function launching a browser from its arguments.
+                Defaults to headless Chromium through Playwright.
+        """
+        self.browsers = max(1, browsers)
+        self.contexts_per_browser = max(1, contexts_per_browser)
+        self.max_pages_per_browser = max_pages_per_browser
+        self.max_uses_per_context = max_uses_per_context
+        self.max_memory_mb = max_memory_mb
+        self.health_interval = health_interval
+        self.context_options = {**DEFAULT_CONTEXT_OPTIONS, **(context_options or {})}
+        self.restarts = 0
+        self._launcher = launcher
+        self._playwright: Any = None
+        self._playwright_lock: Optional[asyncio.Lock] = None
+        self._slots: List[Optional[_Browser]] = [None] * self.browsers
+        self._retiring: List[_Browser] = []
+        self._semaphore: Optional[asyncio.Semaphore] = None
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any]) -> "BrowserPool":
+        """Builds a pool from the 'browser_pool' configuration section."""
+        return cls(
+            browsers=config.get("browsers", 2),
+            contexts_per_browser=config.get("contexts_per_browser", 4),
+            max_pages_per_browser=config.get("max_pages_per_browser", 500),
+            max_uses_per_context=config.get("max_uses_per_context", 50),
+            max_memory_mb=config.get("max_memory_mb", 1024),
+            health_interval=config.get("health_interval", 30),
+            context_options=config.get("context_options"),
+        )
+
+    @property
+    def available(self) -> bool:
+        """Whether browsers can be launched (Playwright is installed or a launcher was given)."""
+        return self._launcher is not None or async_playwright is not None
+
+    @property
+    def capacity(self) -> int:
+        """Pages that can be leased at the same time."""
+        return self.browsers * self.contexts_per_browser
+
+    def stats(self) -> Dict[str, int]:
+        """Returns the number of running browsers, leased pages, warm contexts and restarts."""
+        running = [b for b in self._slots if b is not None and b.browser is not None]
+        return {
+            "browsers": len(running),
+            "leased": sum(b.active for b in running),
+            "warm": sum(len(b.idle) for b in running),
+            "restarts": self.restarts,
+        }
+
+    @asynccontextmanager
+    async def page(self) -> AsyncIterator[Any]:
+        """Leases a warm page, launching or restarting a browser if needed.
+
+        The page belongs to the pool: callers must not close it or its context.
+        Its default timeouts are whatever the previous lease set. A page whose
+        lease ends in an exception is discarded with its context.
+
+        Yields:
+            A Playwright Page in its own browser context, at about:blank.
+        """
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.capacity)
+        async with self._semaphore:
+            instance = self._pick()
+            instance.active += 1
+            await self._reap()
+            try:
+                context, page, uses = await self._acquire(instance)
+            except BaseException:
+                instance.active -= 1
+                raise
+            healthy = False
+            try:
+                yield page
+                healthy = True
+            finally:
+                instance.active -= 1
+                instance.pages += 1
+                await self._release(instance, context, page, uses + 1, healthy)
+
+    def _pick(self) -> _Browser:
+        """Picks the least busy browser, replacing retired ones; never awaits."""
+        for index, instance in enumerate(self._slots):
+            if instance is not None and (
+                instance.retired
+                or (instance.browser is not None and not instance.browser.is_connected())
+            ):
+                self._retire(instance, "disconnected" if not instance.retired else None)
+                self._slots[index] = None
+        index = min(
+            range(self.browsers),
+            key=lambda i: self._slots[i].active if self._slots[i] else 0,
+        )
+        if self._slots[index] is None:
+            self._slots[index] = _Browser()
+        return self._slots[index]
+
+    async def _acquire(self, instance: _Browser) -> Tuple[Any, Any, int]:
+        async with instance.lock:
+            if instance.browser is None:
+                instance.browser = await self._launch(instance.marker)
+                instance.checked = time.monotonic()
+        if instance.idle:
+            return instance.idle.pop()
+        context = await instance.browser.new_context(**self.context_options)
+        try:
+            return context, await context.new_page(), 0
+        except BaseException:
+            await _quietly(context.close())
+            raise
+
+    async def _launch(self, marker: str) -> Any:
+        if self._launcher is not None:
+            browser = await self._launcher([*LAUNCH_ARGS, marker])
+        else:
+            if async_playwright is None:
+                raise RuntimeError("Playwright is not installed")
+            if self._playwright_lock is None:
+                self._playwright_lock = asyncio.Lock()
+            async with self._playwright_lock:
+                if self._playwright is None:
+                    self._playwright = await async_playwright().start()
+            browser = await self._playwright.chromium.launch(
+                headless=True, args=[*LAUNCH_ARGS, marker]
+            )
+        logger.info(f"[BROWSER] Launched browser ({self.stats()['browsers'] + 1} running)")
+        return browser
+
+    async def _release(
+        self, instance: _Browser, context: Any, page: Any, uses: int, healthy: bool
+    ) -> None:
+        if self.max_pages_per_browser and instance.pages >= self.max_pages_per_browser:
+            self._retire(instance, f"served {instance.pages} pages")
+        keep = (
+            healthy
+            and not instance.retired
+            and (not self.max_uses_per_context or uses < self.max_uses_per_context)
+        )
+        if keep:
+            try:
+                await asyncio.wait_for(self._reset(context, page), timeout=10)
+            except Exception as e:
+                logger.debug(f"[BROWSER] Discarding a context that failed to reset: {e}")
+                keep = False
+        if keep and time.monotonic() - instance.checked >= self.health_interval:
+            instance.checked = time.monotonic()
+            keep = await self._check(instance, page)
+        if keep and not instance.retired:
+            instance.idle.append((context, page, uses))
+        else:
+            await _quietly(context.close())
+        await self._reap()
+
+    async def _reset(self, context: Any, page: Any) -> None:
+        """Returns a page to a blank state: no other tabs, storage, cookies or permissions."""
+        for other in context.pages:
+            if other is not page:
+                await other.close()
+        try:
+            await page.evaluate(_CLEAR_STORAGE)
+        except Exception:
+            pass  # error pages and opaque origins have no storage to clear
+        await page.goto("about:blank")
+        await context.clear_cookies()
+        await context.clear_permissions()
+
+    async def _check(self, instance: _Browser, page: Any) -> bool:
+        """Probes a browser through one of its pages and measures its memory.
+
+        Returns:
+            False if the browser was retired.
+        """
+        try:
+            await asyncio.wait_for(page.evaluate("1 + 1"), timeout=5)
+        except Exception as e:
+            self._retire(instance, f"health check failed: {e or type(e).__name__}")
+            return False
+        if self.max_memory_mb:
+            rss = await asyncio.to_thread(process_tree_rss, instance.marker)
+            if rss is not None and rss > self.max_memory_mb * 1024 * 1024:
+                self._retire(instance, f"using {rss // (1024 * 1024)} MB")
+                return False
+        return True
+
+    def _retire(self, instance: _Browser, reason: Optional[str]) -> None:
+        """Stops leasing from a browser; it is closed once its pages are returned."""
+        if instance.retired:
+            return
+        instance.retired = True
+        self.restarts += 1
+        self._retiring.append(instance)
+        if reason:
+            logger.info(f"[BROWSER] Restarting a browser: {reason}")
+
+    async def _reap(self) -> None:
+        """Closes retired browsers that have no leased pages left."""
+        done = [b for b in self._retiring if b.active == 0]
+        self._retiring = [b for b in self._retiring if b.active]
+        for instance in done:
+            await self._close_browser(instance)
+
+    async def _close_browser(self, instance: _Browser) -> None:
+        for context, _, _ in instance.idle:
+            await _quietly(context.close())
+        instance.idle.clear()
+        if instance.browser is not None:
+            await _quietly(instance.browser.close())
+            instance.browser = None
+
+    async def close(self) -> None:
+        """Closes every browser. The pool can be used again afterwards."""
+        instances = [b for b in self._slots if b is not None] + self._retiring
+        self._slots = [None] * self.browsers
+        self._retiring = []
+        for instance in instances:
+            instance.retired = True
+            await self._close_browser(instance)
+        if self._playwright is not None:
+            await _quietly(self._playwright.stop())
+            self._playwright = None
+
+
+async def _quietly(awaitable: Awaitable[Any]) -> None:
+    """Awaits a cleanup call, ignoring errors from an already dead browser."""
+    try:
+        await awaitable
+    except Exception as e:
+        logger.debug(f"[BROWSER] Ignored cleanup error: {e}")
@@ -0,0 +1,166 @@
+import asyncio
+import logging
+from typing import Any, AsyncIterator, Dict, List, Set, Tuple
+
+from core.scheduler import HTTP_URLS, IPS, OPEN_PORTS, SUBDOMAINS
+
+logger = logging.getLogger(__name__)
+
+# Fields identifying a unique finding of each kind; duplicates are dropped on publish
+KEY_FIELDS: Dict[str, Tuple[str, ...]] = {
+    SUBDOMAINS: ("subdomain",),
+    IPS: ("ip", "host"),
+    OPEN_PORTS: ("ip", "port", "host"),
+    HTTP_URLS: ("url",),
+}
+
+# Where each kind is persisted, used when a module runs without a bus (standalone)
+DB_SOURCES: Dict[str, Tuple[str, str]] = {
+    SUBDOMAINS: ("subdomain", "subdomain"),
+    IPS: ("dns", "ip"),
+    OPEN_PORTS: ("portscan", "port"),
+    HTTP_URLS: ("http", "url"),
+}
+
+
+class _Channel:
+    """Append-only stream of findings for a single artifact kind."""
+
+    def __init__(self, closed: bool = False):
+        self.items: List[Dict[str, Any]] = []
+        self.seen: Set[Tuple[Any, ...]] = set()
+        self.producers = 0
+        self.closed = closed
+        self.event = asyncio.Event()
+
+    def wake(self) -> None:
+        """Releases every subscriber currently waiting for new items."""
+        self.event.set()
+        self.event = asyncio.Event()
+
+
+class FindingBus:
+    """In-process publish/subscribe bus carrying typed findings between modules.
+
+    Producers publish findings (subdomains, resolved IPs, open ports, live URLs) the
+    moment they are discovered, and consumers iterate over them asynchronously instead
+    of waiting for upstream modules to finish and re-reading their rows from SQLite.
+    Every subscriber receives the full history of a kind, so late subscribers miss
+    nothing. A kind's stream ends once all of its registered producers are done.
+
+    The database remains the durable sink; the bus only lives for one scan.
+    """
+
+    def __init__(self):
+        """Initializes an empty bus."""
+        self._channels: Dict[str, _Channel] = {}
+        self._sealed = False
+
+    def _channel(self, kind: str) -> _Channel:
+        channel = self._channels.get(kind)
+        if channel is None:
+            # After sealing, kinds nobody produces are born closed
+            channel = _Channel(closed=self._sealed)
+            self._channels[kind] = channel
+        return channel
+
+    def register_producer(self, kind: str) -> None:
+        """Declares one more producer for a kind; its stream stays open until it is done.
+
+        Args:
+            kind: The artifact kind (see core.scheduler).
+        """
+        self._channel(kind).producers += 1
+
+    def seal(self) -> None:
+        """Marks registration complete, closing every kind that has no producer."""
+        self._sealed = True
+        for channel in self._channels.values():
+            if channel.producers == 0 and not channel.closed:
+                channel.closed = True
+                channel.wake()
+
+    def producer_done(self, kind: str) -> None:
+        """Signals that one producer of a kind has finished.
+
+        Args:
+            kind: The artifact kind the producer published.
+        """
+        channel = self._channel(kind)
+        channel.producers = max(0, channel.producers - 1)
+        if channel.producers == 0 and not channel.closed:
+            channel.closed = True
+            channel.wake()
+            logger.debug(f"[BUS] Stream '{kind}' closed after {len(channel.items)} findings")
+
+    def publish(self, kind: str, item: Dict[str, Any]) -> bool:
+        """Publishes a finding to all current and future subscribers of its kind.
+
+        Args:
+            kind: The artifact kind.
+            item: The finding dictionary.
+
+        Returns:
+            True if the finding was new, False if it duplicated an earlier one.
+        """
+        channel = self._channel(kind)
+        fields = KEY_FIELDS.get(kind)
+        key = tuple(item.get(f) for f in fields) if fields else tuple(sorted(item.items()))
+        if key in channel.seen:
+            return False
+        channel.seen.add(key)
+        channel.items.append(item)
+        channel.wake()
+        return True
+
+    def is_closed(self, kind: str) -> bool:
+        """Checks whether a kind's stream has ended.
+
+        Args:
+            kind: The artifact kind.
+
+        Returns:
+            True if no further findings of this kind will be published.
+        """
+        return self._channel(kind).closed
+
+    async def wait_closed(self, kind: str) -> None:
+        """Waits until a kind's stream has ended.
+
+        Args:
+            kind: The artifact kind.
+        """
+        channel = self._channel(kind)
+        while not channel.closed:
+            await channel.event.wait()
+
+    def snapshot(self, kind: str) -> List[Dict[str, Any]]:
+        """Returns the findings published so far for a kind.
+
+        Args:
+            kind: The artifact kind.
+
+        Returns:
+            A copy of the finding list.
+        """
+        return list(self._channel(kind).items)
+
+    async def subscribe(self, kind: str) -> AsyncIterator[Dict[str, Any]]:
+        """Iterates over every finding of a kind, waiting for new ones until the stream ends.
+
+        Args:
+            kind: The artifact kind.
+
+        Yields:
+            Finding dictionaries in publication order.
+        """
+        channel = self._channel(kind)
+        index = 0
+        while True:
+            if index < len(channel.items):
+                yield channel.items[index]
+                index += 1
+            elif channel.closed:
+                return
+            else:
+                await channel.event.wait()
@@ -1,44 +1,241 @@
 import json
 import logging
 import sqlite3
+import threading
 import traceback
+from contextlib import contextmanager
 from datetime import datetime
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, Iterator, List, Optional, Tuple
 
 logger = logging.getLogger(__name__)
 
+# Connection tuning applied to every pooled connection (overridable via config)
+DEFAULT_SETTINGS: Dict[str, Any] = {
+    "journal_mode": "wal",
+    "synchronous": "normal",
+    "cache_size_kb": 65536,
+    "mmap_size_mb": 256,
+    "busy_timeout_ms": 5000,
+}
+
+# Bumped whenever a migration must run against existing databases
+SCHEMA_VERSION = 1
+
+# Typed entity tables. Each column is (name, SQL type, finding field); the 'keys'
+# columns form the natural key together with the target, so duplicate findings
+# collapse in the UNIQUE index on insert instead of in a post-scan pass.
+ENTITY_TABLES: Dict[str, Dict[str, List[Tuple[str, str, str]]]] = {
+    "subdomains": {
+        "keys": [("name", "TEXT", "subdomain")],
+        "columns": [("source", "TEXT", "source")],
+    },
+    "ips": {
+        "keys": [("ip", "TEXT", "ip")],
+        "columns": [],
+    },
+    "dns_records": {
+        "keys": [("name", "TEXT", "host"), ("ip", "TEXT", "ip")],
+        "columns": [],
+    },
+    "ports": {
+        "keys": [("ip", "TEXT", "ip"), ("port", "INTEGER", "port")],
+        "columns": [
+            ("state", "TEXT", "state"),
+            ("host", "TEXT", "host"),
+            ("service", "TEXT", "service"),
+            ("product", "TEXT", "product"),
+        ],
+    },
+    "http_services": {
+        "keys": [("url", "TEXT", "url")],
+        "columns": [("status", "INTEGER", "status"), ("title", "TEXT", "title"), ("server", "TEXT", "server")],
+    },
+    "technologies": {
+        "keys": [("url", "TEXT", "url"), ("name", "TEXT", "technology")],
+        "columns": [("version", "TEXT", "version"), ("categories", "TEXT", "categories")],
+    },
+    "screenshots": {
+        "keys": [("url", "TEXT", "url")],
+        "columns": [("path", "TEXT", "screenshot_path"), ("status", "TEXT", "status")],
+    },
+    "buckets": {
+        "keys": [("provider", "TEXT", "provider"), ("bucket", "TEXT", "bucket")],
+        "columns": [("url", "TEXT", "url"), ("status", "TEXT", "status")],
+    },
+    "github_hits": {
+        "keys": [("url", "TEXT", "url")],
+        "columns": [("repository", "TEXT", "repository"), ("path", "TEXT", "path"), ("query", "TEXT", "query")],
+    },
+    "enrichment": {
+        "keys": [("ip", "TEXT", "ip")],
+        "columns": [("org", "TEXT", "org"), ("os", "TEXT", "os")],
+    },
+}
+
+# Result types fan out into one or more entity tables; the first one is canonical
+# and keeps the complete finding in its 'data' column.
+RESULT_ENTITIES: Dict[str, Tuple[str, ...]] = {
+    "subdomain": ("subdomains",),
+    "dns": ("dns_records", "ips"),
+    "port": ("ports", "ips"),
+    "http": ("http_services",),
+    "tech": ("technologies",),
+    "screenshot": ("screenshots",),
+    "cloud_bucket": ("buckets",),
+    "github": ("github_hits",),
+    "enrichment": ("enrichment", "ips"),
+}
+
+
+def _entity_ddl(table: str) -> str:
+    """Builds the CREATE TABLE statement for an entity table."""
+    spec = ENTITY_TABLES[table]
+    keys = [f"{name} {sql_type} NOT NULL" for name, sql_type, _ in spec["keys"]]
+    cols = [f"{name} {sql_type}" for name, sql_type, _ in spec["columns"]]
+    unique = ", ".join(["target"] + [name for name, _, _ in spec["keys"]])
+    body = ",\n".join(
+        ["id INTEGER PRIMARY KEY AUTOINCREMENT", "target TEXT NOT NULL"]
+        + keys
+        + cols
+        + [
+            "scan_id TEXT",
+            "data TEXT NOT NULL",
+            "first_seen DATETIME DEFAULT CURRENT_TIMESTAMP",
+            "last_seen DATETIME DEFAULT CURRENT_TIMESTAMP",
+            f"UNIQUE({unique})",
+        ]
+    )
+    return f"CREATE TABLE IF NOT EXISTS {table} (\n{body}\n)"
+
+
+def _entity_upsert(table: str) -> str:
+    """Builds the INSERT ... ON CONFLICT statement for an entity table."""
+    spec = ENTITY_TABLES[table]
+    key_names = [name for name, _, _ in spec["keys"]]
+    col_names = [name for name, _, _ in spec["columns"]]
+    columns = ["target"] + key_names + col_names + ["scan_id", "data"]
+    updates = [f"{name} = COALESCE(excluded.{name}, {name})" for name in col_names]
+    updates += ["scan_id = excluded.scan_id", "data = excluded.data", "last_seen = CURRENT_TIMESTAMP"]
+    return (
+        f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))}) "
+        f"ON CONFLICT({', '.join(['target'] + key_names)}) DO UPDATE SET {', '.join(updates)}"
+    )
+
+
+_UPSERT_SQL = {table: _entity_upsert(table) for table in ENTITY_TABLES}
+
 
 class Database:
     """Handles all synchronous interactions with the SQLite database.
 
+    Keeps a single long-lived writer connection (serialized by a lock) and one
+    reader connection per thread. In WAL mode readers never block the writer, so
+    the web dashboard can query results while a scan is storing them.
+
     Attributes:
         db_path: The filesystem path to the SQLite database file.
+        settings: Effective connection tuning (journal mode, cache, mmap, etc.).
     """
 
-    def __init__(self, db_path: str = "recon.db"):
+    def __init__(self, db_path: str = "recon.db", settings: Optional[Dict[str, Any]] = None):
         """Initializes the Database instance and ensures the schema is ready.
 
         Args:
             db_path: Path to the database file. Defaults to "recon.db".
+            settings: Optional overrides for DEFAULT_SETTINGS.
         """
         self.db_path = db_path
+        self.settings = {**DEFAULT_SETTINGS, **(settings or {})}
+        self._write_lock = threading.RLock()
+        self._local = threading.local()
+        self._readers: List[sqlite3.Connection] = []
+        self._readers_lock = threading.Lock()
+        self._writer = self._get_connection()
         self._init_db()
 
+    @classmethod
+    def from_config(cls, config: Dict[str, Any]) -> "Database":
+        """Builds a Database from the 'database' section of the application config.
+
+        The section may be a plain path string or a mapping with a 'path' key plus
+        any connection settings.
+
+        Args:
+            config: The root application configuration.
+
+        Returns:
+            An initialized Database instance.
+        """
+        db_cfg = config.get("database", "recon.db")
+        if isinstance(db_cfg, str):
+            return cls(db_cfg)
+        settings = {k: v for k, v in db_cfg.items() if k != "path"}
+        return cls(db_cfg.get("path", "recon.db"), settings)
+
     def _get_connection(self) -> sqlite3.Connection:
-        """Creates and returns a new SQLite connection.
+        """Creates a new SQLite connection with the configured pragmas applied.
 
         Returns:
             A sqlite3.Connection object.
         """
-        return sqlite3.connect(self.db_path)
+        conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        conn.execute(f"PRAGMA busy_timeout = {int(self.settings['busy_timeout_ms'])}")
+        conn.execute(f"PRAGMA journal_mode = {self.settings['journal_mode']}")
+        conn.execute(f"PRAGMA synchronous = {self.settings['synchronous']}")
+        # Negative cache_size is interpreted by SQLite as KiB rather than pages
+        conn.execute(f"PRAGMA cache_size = {-int(self.settings['cache_size_kb'])}")
+        conn.execute(f"PRAGMA mmap_size = {int(self.settings['mmap_size_mb']) * 1024 * 1024}")
+        return conn
+
+    @contextmanager
+    def _write(self) -> Iterator[sqlite3.Connection]:
+        """Yields the shared writer connection inside a transaction.
+
+        Commits on success and rolls back on error. Writers are serialized.
+        """
+        with self._write_lock:
+            try:
+                yield self._writer
+                self._writer.commit()
+            except Exception:
+                self._writer.rollback()
+                raise
+
+    @contextmanager
+    def _read(self) -> Iterator[sqlite3.Connection]:
+        """Yields the calling thread's reader connection, opening it on first use."""
+        if self.db_path == ":memory:":
+            # In-memory databases are private to a connection; share the writer
+            with self._write_lock:
+                yield self._writer
+            return
+
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._get_connection()
+            self._local.conn = conn
+            with self._readers_lock:
+                self._readers.append(conn)
+        yield conn
+
+    def close(self) -> None:
+        """Closes the writer and every pooled reader connection."""
+        with self._readers_lock:
+            for conn in self._readers:
+                conn.close()
+            self._readers.clear()
+        self._local = threading.local()
+        with self._write_lock:
+            self._writer.close()
 
     def _init_db(self) -> None:
         """Initializes the database schema if tables do not exist.
 
-        Sets up 'results' and 'scans' tables and creates necessary indexes.
+        Sets up the 'results' log, the 'scans' table and the typed entity tables,
+        creates necessary indexes, and backfills entities from legacy rows once.
         """
         try:
-            with self._get_connection() as conn:
+            with self._write() as conn:
                 # Results table for module findings
                 conn.execute(
                     """
@@ -78,13 +275,93 @@ class Database:
                 conn.execute("CREATE INDEX IF NOT EXISTS idx_results_target ON results(target)")
                 conn.execute("CREATE INDEX IF NOT EXISTS idx_results_scan_id ON results(scan_id)")
                 conn.execute("CREATE INDEX IF NOT EXISTS idx_results_type ON results(type)")
-                conn.commit()
+
+                # Typed entity tables (one row per subdomain, port, URL, ...)
+                for table, spec in ENTITY_TABLES.items():
+                    conn.execute(_entity_ddl(table))
+                    # Columns added to an entity after its table was first created
+                    existing = {row[1] for row in conn.execute(f"PRAGMA table_info({table})")}
+                    for name, sql_type, _ in spec["columns"]:
+                        if name not in existing:
+                            conn.execute(f"ALTER TABLE {table} ADD COLUMN {name} {sql_type}")
+                    conn.execute(
+                        f"CREATE INDEX IF NOT EXISTS idx_{table}_scan_id ON {table}(scan_id)"
+                    )
+
+                version = conn.execute("PRAGMA user_version").fetchone()[0]
+                if version < SCHEMA_VERSION:
+                    self._backfill_entities(conn)
+                    conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
 
             logger.info(f"Database initialized and schema verified at {self.db_path}")
         except sqlite3.Error as e:
             logger.critical(f"Failed to initialize database at {self.db_path}: {e}")
             raise
 
+    def _backfill_entities(self, conn: sqlite3.Connection) -> None:
+        """Migrates findings stored as JSON blobs in 'results' into the entity tables.
+
+        Args:
+            conn: The writer connection (inside the schema transaction).
+        """
+        migrated = 0
+        for scan_id, target, r_type, data in conn.execute(
+            "SELECT scan_id, target, type, data FROM results ORDER BY id"
+        ).fetchall():
+            try:
+                migrated += self._upsert_entities(conn, target, r_type, json.loads(data), scan_id)
+            except (ValueError, TypeError):
+                continue
+        if migrated:
+            logger.info(f"[DB] Migrated {migrated} legacy findings into entity tables")
+
+    def _upsert_entities(
+        self,
+        conn: sqlite3.Connection,
+        target: str,
+        result_type: str,
+        data: Any,
+        scan_id: Optional[str],
+    ) -> int:
+        """Upserts each finding of a result into its typed entity table(s).
+
+        Args:
+            conn: An open writer connection.
+            target: The target domain or IP.
+            result_type: The category of the result.
+            data: A finding dictionary or list of them.
+            scan_id: Optional scan session identifier.
+
+        Returns:
+            The number of findings written to the canonical table.
+        """
+        tables = RESULT_ENTITIES.get(result_type)
+        if not tables:
+            return 0
+
+        items = data if isinstance(data, list) else [data]
+        written = 0
+        for idx, table in enumerate(tables):
+            spec = ENTITY_TABLES[table]
+            rows = []
+            for item in items:
+                if not isinstance(item, dict):
+                    continue
+                keys = [item.get(field) for _, _, field in spec["keys"]]
+                if any(k is None for k in keys):
+                    continue
+                cols = [item.get(field) for _, _, field in spec["columns"]]
+                cols = [c if c is None or isinstance(c, (str, int, float)) else json.dumps(c) for c in cols]
+                payload = item if idx == 0 else {
+                    field: item.get(field) for _, _, field in spec["keys"] + spec["columns"]
+                }
+                rows.append((target, *keys, *cols, scan_id, json.dumps(payload)))
+            if rows:
+                conn.executemany(_UPSERT_SQL[table], rows)
+                if idx == 0:
+                    written = len(rows)
+        return written
+
     def store_result(
         self,
         target: str,
@@ -109,17 +386,48 @@ class Database:
                 f"[DB] Storing {result_type} result | Target: {target} | Module: {module} | ScanID: {scan_id}"
             )
             serialized_data = json.dumps(data)
-            with self._get_connection() as conn:
+            with self._write() as conn:
                 conn.execute(
                     "INSERT INTO results (scan_id, target, module, source, type, data) VALUES (?, ?, ?, ?, ?, ?)",
                     (scan_id, target, module, source, result_type, serialized_data),
                 )
-                conn.commit()
+                self._upsert_entities(conn, target, result_type, data, scan_id)
             logger.debug(f"[DB] Successfully stored {result_type} result ({len(serialized_data)} bytes)")
         except sqlite3.Error as e:
             logger.error(f"Failed to store result in database: {e}")
             logger.debug(traceback.format_exc())
 
+    def store_results_batch(self, rows: List[Tuple[Any, ...]]) -> int:
+        """Stores many module results in a single transaction.
+
+        Args:
+            rows: Tuples of (scan_id, target, module, source, result_type, data)
+                where data is the unserialized finding payload.
+
+        Returns:
+            The number of rows written, or 0 if the batch failed.
+        """
+        if not rows:
+            return 0
+        try:
+            serialized = [
+                (scan_id, target, module, source, result_type, json.dumps(data))
+                for scan_id, target, module, source, result_type, data in rows
+            ]
+            with self._write() as conn:
+                conn.executemany(
+                    "INSERT INTO results (scan_id, target, module, source, type, data) VALUES (?, ?, ?, ?, ?, ?)",
+                    serialized,
+                )
+                for scan_id, target, _, _, result_type, data in rows:
+                    self._upsert_entities(conn, target, result_type, data, scan_id)
+            logger.debug(f"[DB] Committed batch of {len(serialized)} results")
+            return len(serialized)
+        except (sqlite3.Error, TypeError, ValueError) as e:
+            logger.error(f"Failed to store result batch in database: {e}")
+            logger.debug(traceback.format_exc())
+            return 0
+
     def get_results(
         self, target: str, module: Optional[str] = None, scan_id: Optional[str] = None
     ) -> List[Dict[str, Any]]:
@@ -151,87 +459,218 @@ class Database:
                 params.append(module)
 
             logger.debug(f"[DB] Executing result query for target: {target}")
-            with self._get_connection() as conn:
+            with self._read() as conn:
                 cursor = conn.execute(query, tuple(params))
                 for row in cursor:
-                    results.append(
-                        {
-                            "id": row[0],
-                            "target": row[1],
-                            "module": row[2],
-                            "source": row[3],
-                            "type": row[4],
-                            "data": json.loads(row[5]),
-                            "timestamp": row[6],
-                            "scan_id": row[7],
-                        }
-                    )
+                    results.append(self._row_to_result(row))
             logger.debug(f"[DB] Retrieved {len(results)} results")
         except sqlite3.Error as e:
             logger.error(f"Failed to retrieve results from database: {e}")
 
         return results
 
+    @staticmethod
+    def _row_to_result(row: Tuple[Any, ...]) -> Dict[str, Any]:
+        """Converts a 'results' row into its API dictionary form."""
+        return {
+            "id": row[0],
+            "target": row[1],
+            "module": row[2],
+            "source": row[3],
+            "type": row[4],
+            "data": json.loads(row[5]),
+            "timestamp": row[6],
+            "scan_id": row[7],
+        }
+
+    def get_results_page(
+        self,
+        target: Optional[str] = None,
+        scan_id: Optional[str] = None,
+        after_id: int = 0,
+        limit: int = 500,
+        result_type: Optional[str] = None,
+        module: Optional[str] = None,
+        source: Optional[str] = None,
+    ) -> List[Dict[str, Any]]:
+        """Retrieves one page of results using keyset (cursor) pagination.
+
+        Rows are ordered by id and the page starts strictly after 'after_id', so
+        each page is an index range scan regardless of how deep the cursor is.
+
+        Args:
+            target: Target filter (ignored when scan_id is given).
+            scan_id: Optional scan ID filter.
+            after_id: Return only rows with an id greater than this cursor.
+            limit: Maximum rows in the page.
+            result_type: Optional result type filter (e.g. 'subdomain').
+            module: Optional module filter ('subdomain' or 'subdomain/ct').
+            source: Optional source filter (e.g. 'crt.sh').
+
+        Returns:
+            A list of result dictionaries; fewer than 'limit' means the end was reached.
+        """
+        query = "SELECT id, target, module, source, type, data, timestamp, scan_id FROM results WHERE id > ?"
+        params: List[Any] = [after_id]
+        if scan_id:
+            query += " AND scan_id = ?"
+            params.append(scan_id)
+        elif target:
+            query += " AND target = ?"
+            params.append(target)
+        if result_type:
+            query += " AND type = ?"
+            params.append(result_type)
+        if module:
+            if "/" in module:
+                query += " AND module = ?"
+                params.append(module)
+            else:
+                query += " AND module LIKE ?"
+                params.append(f"{module}/%")
+        if source:
+            query += " AND source = ?"
+            params.append(source)
+        query += " ORDER BY id LIMIT ?"
+        params.append(limit)
+
+        try:
+            with self._read() as conn:
+                return [self._row_to_result(row) for row in conn.execute(query, tuple(params))]
+        except sqlite3.Error as e:
+            logger.error(f"Failed to retrieve results page from database: {e}")
+            return []
+
     def get_unique_subdomains(self, target: str) -> List[str]:
         """Returns a deduplicated and sorted list of unique subdomains for a target.
 
+        Served directly from the (target, name) unique index of the subdomains table.
+
         Args:
             target: The root domain to search for.
 
         Returns:
             A list of unique subdomain strings.
         """
-        results = self.get_results(target, module="subdomain")
-        subdomains = set()
-        for res in results:
-            data = res.get("data", [])
-            entries = data if isinstance(data, list) else [data]
-            for item in entries:
-                if isinstance(item, dict) and "subdomain" in item:
-                    subdomains.add(item["subdomain"])
-        return sorted(list(subdomains))
+        try:
+            with self._read() as conn:
+                rows = conn.execute(
+                    "SELECT name FROM subdomains WHERE target = ? ORDER BY name", (target,)
+                ).fetchall()
+            return [row[0] for row in rows]
+        except sqlite3.Error as e:
+            logger.error(f"Failed to retrieve unique subdomains: {e}")
+            return []
 
     def get_unique_results(
         self, target: str, result_type: str, key_fields: Optional[List[str]] = None
     ) -> List[Dict[str, Any]]:
         """Aggregates and deduplicates results by type across all sources.
 
+        Types backed by an entity table are already unique by their natural key
+        (e.g. URL for 'http', IP and port for 'port') and are read straight from it.
+
         Args:
             target: The target to filter by.
             result_type: The type of results to aggregate.
             key_fields: Optional list of fields to used for uniqueness calculation.
-                If omitted, the entire data object is used.
+                If omitted, the natural key (or, for untyped results, the entire
+                data object) is used.
 
         Returns:
             A list of unique findings.
         """
-        results = self.get_results(target)
+        tables = RESULT_ENTITIES.get(result_type)
+        if tables:
+            try:
+                with self._read() as conn:
+                    rows = conn.execute(
+                        f"SELECT data FROM {tables[0]} WHERE target = ? ORDER BY id", (target,)
+                    ).fetchall()
+                entries = [json.loads(row[0]) for row in rows]
+            except sqlite3.Error as e:
+                logger.error(f"Failed to retrieve unique {result_type} results: {e}")
+                return []
+        else:
+            entries = []
+            for res in self.get_results(target):
+                if res.get("type") != result_type:
+                    continue
+                data = res.get("data")
+                entries.extend(data if isinstance(data, list) else [data])
+
+        if tables and not key_fields:
+            return entries
+
         unique = []
         seen = set()
-
-        for res in results:
-            if res.get("type") != result_type:
+        for entry in entries:
+            if not isinstance(entry, dict):
                 continue
-            data = res.get("data")
-            entries = data if isinstance(data, list) else [data]
-            for entry in entries:
-                if not isinstance(entry, dict):
-                    continue
 
-                if key_fields:
-                    key = tuple(entry.get(field) for field in key_fields)
-                else:
-                    key = json.dumps(entry, sort_keys=True)
+            if key_fields:
+                key = tuple(entry.get(field) for field in key_fields)
+            else:
+                key = json.dumps(entry, sort_keys=True)
 
-                if key in seen:
-                    continue
-                seen.add(key)
-                unique.append(entry)
+            if key in seen:
+                continue
+            seen.add(key)
+            unique.append(entry)
 
         return unique
 
+    def count_entities(self, table: str, target: str, scan_id: Optional[str] = None) -> int:
+        """Counts unique entities of a typed table for a target.
+
+        Args:
+            table: One of the ENTITY_TABLES names (e.g. 'subdomains').
+            target: The target to filter by.
+            scan_id: Optional filter to entities last seen by this scan.
+
+        Returns:
+            The number of matching entities.
+        """
+        if table not in ENTITY_TABLES:
+            raise ValueError(f"Unknown entity table: {table}")
+        query = f"SELECT COUNT(*) FROM {table} WHERE target = ?"
+        params: List[Any] = [target]
+        if scan_id:
+            query += " AND scan_id = ?"
+            params.append(scan_id)
+        try:
+            with self._read() as conn:
+                return conn.execute(query, tuple(params)).fetchone()[0]
+        except sqlite3.Error as e:
+            logger.error(f"Failed to count {table}: {e}")
+            return 0
+
+    def get_result_counts(self, scan_id: str) -> Dict[str, int]:
+        """Counts stored result rows per type for a scan.
+
+        Args:
+            scan_id: The scan to summarize.
+
+        Returns:
+            A mapping of result type to row count.
+        """
+        try:
+            with self._read() as conn:
+                rows = conn.execute(
+                    "SELECT type, COUNT(*) FROM results WHERE scan_id = ? GROUP BY type",
+                    (scan_id,),
+                ).fetchall()
+            return {r_type: count for r_type, count in rows}
+        except sqlite3.Error as e:
+            logger.error(f"Failed to summarize scan {scan_id}: {e}")
+            return {}
+
     def deduplicate_results(self, target: str, result_type: Optional[str] = None) -> int:
-        """Physically removes duplicate rows from the database for a given target.
+        """Physically removes duplicate rows from the results log for a given target.
+
+        A row is a duplicate when an earlier row of the same scan has the same type,
+        module and payload. The comparison runs inside SQLite. Entity tables never
+        need this because their unique indexes reject duplicates on insert.
 
         Args:
             target: The target whose results should be cleaned.
@@ -241,28 +680,19 @@ class Database:
             The number of duplicate rows deleted.
         """
         try:
-            with self._get_connection() as conn:
-                if result_type:
-                    query = "SELECT id, type, data FROM results WHERE target = ? AND type = ?"
-                    rows = conn.execute(query, (target, result_type)).fetchall()
-                else:
-                    query = "SELECT id, type, data FROM results WHERE target = ?"
-                    rows = conn.execute(query, (target,)).fetchall()
-
-                seen = set()
-                to_delete = []
-
-                for row_id, r_type, data in rows:
-                    key = (r_type, data)
-                    if key in seen:
-                        to_delete.append((row_id,))
-                    else:
-                        seen.add(key)
-
-                if to_delete:
-                    conn.executemany("DELETE FROM results WHERE id = ?", to_delete)
-                    conn.commit()
-                return len(to_delete)
+            type_filter = " AND type = ?" if result_type else ""
+            params: Tuple[Any, ...] = (target, result_type) if result_type else (target,)
+            with self._write() as conn:
+                cursor = conn.execute(
+                    f"""
+                    DELETE FROM results WHERE target = ?{type_filter} AND id NOT IN (
+                        SELECT MIN(id) FROM results WHERE target = ?{type_filter}
+                        GROUP BY scan_id, type, module, data
+                    )
+                    """,
+                    params + params,
+                )
+                return cursor.rowcount
         except sqlite3.Error as e:
             logger.error(f"Failed to deduplicate database rows: {e}")
             return 0
@@ -277,12 +707,11 @@ class Database:
         """
         try:
             logger.info(f"[DB] Creating scan tracking entry | ID: {scan_id} | Target: {target}")
-            with self._get_connection() as conn:
+            with self._write() as conn:
                 conn.execute(
                     "INSERT OR REPLACE INTO scans (id, target, status, start_time) VALUES (?, ?, ?, ?)",
                     (scan_id, target, status, datetime.now()),
                 )
-                conn.commit()
         except sqlite3.Error as e:
             logger.error(f"Failed to create scan record: {e}")
 
@@ -295,7 +724,7 @@ class Database:
         """
         try:
             logger.debug(f"[DB] Updating scan status | ID: {scan_id} | Status: {status}")
-            with self._get_connection() as conn:
+            with self._write() as conn:
                 if status in ["completed", "failed", "stopped"]:
                     conn.execute(
                         "UPDATE scans SET status = ?, end_time = ? WHERE id = ?",
@@ -303,7 +732,6 @@ class Database:
                     )
                 else:
                     conn.execute("UPDATE scans SET status = ? WHERE id = ?", (status, scan_id))
-                conn.commit()
         except sqlite3.Error as e:
             logger.error(f"Failed to update scan status for {scan_id}: {e}")
             logger.debug(traceback.format_exc())
@@ -318,7 +746,7 @@ class Database:
             The scan record as a dictionary or None if not found.
         """
         try:
-            with self._get_connection() as conn:
+            with self._read() as conn:
                 row = conn.execute(
                     "SELECT id, target, status, start_time, end_time FROM scans WHERE id = ?",
                     (scan_id,),
@@ -346,7 +774,7 @@ class Database:
         """
         scans = []
         try:
-            with self._get_connection() as conn:
+            with self._read() as conn:
                 cursor = conn.execute(
                     "SELECT id, target, status, start_time, end_time FROM scans ORDER BY start_time DESC LIMIT ?",
                     (limit,),
@@ -366,12 +794,13 @@ class Database:
         return scans
 
     def clear_history(self) -> None:
-        """Wipes all data from both results and scans tables. Use with caution."""
+        """Wipes all results, scans and entity tables. Use with caution."""
         try:
-            with self._get_connection() as conn:
+            with self._write() as conn:
                 conn.execute("DELETE FROM results")
                 conn.execute("DELETE FROM scans")
-                conn.commit()
+                for table in ENTITY_TABLES:
+                    conn.execute(f"DELETE FROM {table}")
             logger.warning("All database history has been cleared.")
         except sqlite3.Error as e:
             logger.error(f"Failed to clear database history: {e}")
@@ -2,11 +2,18 @@ import asyncio
 import logging
 import sys
 import uuid
-from typing import Any, Callable, Dict, List, Optional
+from typing import Any, Awaitable, Callable, Dict, Optional, Set
 
+from core.browser_pool import BrowserPool
+from core.bus import FindingBus
 from core.config import load_config, setup_logging
 from core.database import Database
+from core.http_client import HttpClient
 from core.module_loader import ModuleLoader
+from core.resolver import Resolver
+from core.response_cache import ResponseCache
+from core.result_writer import ResultWriter
+from core.scheduler import DagScheduler, run_with_timeout
 
 # Ensure ProactorEventLoop is used on Windows for subprocess support (needed for Playwright)
 if sys.platform == "win32":
@@ -20,23 +27,90 @@ if sys.platform == "win32":
 
 logger = logging.getLogger(__name__)
 
+# Progress labels reported to the dashboard when the first module of a stage starts
+STAGE_LABELS = {
+    "subdomain": "Phase 1: Subdomains & Cloud",
+    "github": "Phase 1: Subdomains & Cloud",
+    "cloud_buckets": "Phase 1: Subdomains & Cloud",
+    "dns": "Phase 2: Resolution & Port Scanning",
+    "portscan": "Phase 2: Resolution & Port Scanning",
+    "shodan": "Phase 3: Service Enrichment",
+    "http": "Phase 4: HTTP Analysis",
+    "screenshot": "Phase 5: Visual Recon",
+}
+
+
+def _needs_proactor_thread() -> bool:
+    """Checks whether Playwright must be offloaded from a Windows selector loop.
+
+    Returns:
+        True on Windows when the running loop cannot spawn subprocesses.
+    """
+    if sys.platform != "win32":
+        return False
+    try:
+        loop = asyncio.get_event_loop()
+        return not isinstance(loop, asyncio.WindowsProactorEventLoopPolicy()._loop_factory)
+    except Exception:
+        return False
+
+
+async def _run_in_proactor_thread(coro_factory: Callable[[], Awaitable[Any]]) -> None:
+    """Runs a coroutine on a dedicated Proactor loop in a background thread.
+
+    Args:
+        coro_factory: Zero-argument callable returning the coroutine to execute.
+    """
+    import threading
+
+    logger.warning("[ENGINE] Detected Selector loop on Windows. Offloading to Proactor thread...")
+    errors = []
+
+    def run_threaded():
+        new_loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(new_loop)
+        try:
+            new_loop.run_until_complete(coro_factory())
+        except Exception as e:
+            errors.append(e)
+        finally:
+            new_loop.close()
+
+    t = threading.Thread(target=run_threaded)
+    t.start()
+    while t.is_alive():
+        await asyncio.sleep(1)
+    if errors:
+        raise errors[0]
+
 
 async def run_scan(
     target: str,
     config_path: Optional[str] = None,
     scan_id: Optional[str] = None,
     progress_callback: Optional[Callable[[Dict[str, Any]], Any]] = None,
+    http_client: Optional[HttpClient] = None,
+    browser_pool: Optional[BrowserPool] = None,
+    use_cache: bool = True,
+    refresh_cache: bool = False,
 ) -> None:
-    """Orchestrates the full multi-phase reconnaissance scan against a target.
+    """Orchestrates the full reconnaissance scan against a target.
 
     This function is the main entry point for the scan engine. It handles configuration
-    loading, infrastructure initialization, phase sequencing, and results summarization.
+    loading, infrastructure initialization, dependency-driven module scheduling, and
+    results summarization.
 
     Args:
         target: The domain or IP address to scan.
         config_path: Optional path to a custom YAML configuration file.
         scan_id: Optional unique identifier for the scan. If not provided, one will be generated.
         progress_callback: Optional async function called with status updates (JSON).
+        http_client: Optional long-lived HttpClient owned by the caller (e.g., the web
+            process), reused across scans. If omitted, one is created for this scan.
+        browser_pool: Optional long-lived BrowserPool owned by the caller, whose warm
+            browsers are reused across scans. If omitted, one is created for this scan.
+        use_cache: If False, passive sources neither read nor write the response cache.
+        refresh_cache: If True, cached responses are revalidated instead of served.
     """
     # 1. Configuration & Logging Setup
     config = load_config(config_path or "config/default.yaml")
@@ -57,168 +131,194 @@ async def run_scan(
         )
 
     # 2. Database Initialization
-    db_path = config.get("database", "recon.db")
-    db = Database(db_path)
+    db = Database.from_config(config)
 
     if not scan_id:
         scan_id = f"cli_{str(uuid.uuid4())[:8]}"
         logger.info(f"[ENGINE] Auto-generated scan ID: {scan_id}")
 
-    db.create_scan(scan_id, target, "running")
+    await asyncio.to_thread(db.create_scan, scan_id, target, "running")
+
+    # Findings are persisted by a write-behind thread so modules never block on disk
+    writer_cfg = config.get("result_writer", {})
+    writer = ResultWriter(
+        db,
+        batch_size=writer_cfg.get("batch_size", 500),
+        flush_interval=writer_cfg.get("flush_interval", 0.5),
+    )
 
     # 3. Infrastructure Setup (Rate Limiters, Proxies, etc.)
     from core.proxy_manager import ProxyManager
-    from core.rate_limiter import RateLimiter
+    from core.rate_limiter import RateLimiterRegistry
 
     rate_limit = config.get("rate_limit", 10)
-    limiter = RateLimiter(rate_limit)
-    proxy_manager = ProxyManager(config.get("proxy", {}))
+    # Separate buckets per provider, module and destination host under one global cap
+    limiter = RateLimiterRegistry.from_config(config)
+    # A caller-provided HTTP client brings its proxy manager, so sessions and
+    # per-request proxies agree on each host's proxy
+    owns_proxy_manager = getattr(http_client, "proxy", None) is None
+    if owns_proxy_manager:
+        proxy_manager = ProxyManager(config.get("proxy", {}))
+        proxy_manager.start()
+    else:
+        proxy_manager = http_client.proxy
     modules_config = config.get("modules", {})
     loader = ModuleLoader()
+    bus = FindingBus()
+    # One resolver per scan so every module shares its socket pool and cache
+    resolver = Resolver.from_config(config.get("dns", {}))
+    # Pooled keep-alive HTTP sessions, shared by every module
+    owns_http_client = http_client is None
+    if owns_http_client:
+        http_client = HttpClient.from_config(config.get("http_client", {}), proxy_manager)
+    # Headless browsers for screenshots, launched on first use
+    owns_browser_pool = browser_pool is None
+    if owns_browser_pool:
+        browser_pool = BrowserPool.from_config(config.get("browser_pool", {}))
+
+    # Recently fetched passive-source responses are reused instead of re-queried
+    cache_cfg = config.get("cache", {})
+    response_cache = None
+    if use_cache and cache_cfg.get("enabled", True):
+        response_cache = ResponseCache.from_config(cache_cfg, refresh=refresh_cache)
+
+    # 4. Module Execution Logic
+    module_timeout = config.get("module_timeout", 300)
+    announced_stages: Set[str] = set()
+
+    async def run_module_safe(m: Any) -> None:
+        """Runs a module with localized error handling and reporting."""
+        stage = STAGE_LABELS.get(m.module_type)
+        if stage and stage not in announced_stages:
+            announced_stages.add(stage)
+            logger.info(f"[ENGINE] Entering {stage}")
+            if progress_callback:
+                await progress_callback(
+                    {"type": "phase", "phase": stage, "modules": [m.module_type]}
+                )
 
-    # 4. Phase Execution Logic
-    async def execute_phase(label: str, module_types: List[str]) -> None:
-        """Executes a logical group of modules in parallel.
-
-        Args:
-            label: Human-readable name for the phase (e.g., "Phase 1: Discovery").
-            module_types: List of module categories to execute in this phase.
-        """
-        tasks = []
-        if progress_callback:
-            await progress_callback(
-                {"type": "phase", "phase": label, "modules": module_types}
-            )
-
-        for m_type in module_types:
-            # Prepare configuration subset for this module type
-            phase_modules = {
-                **modules_config,
-                "enabled": {
-                    m_type: modules_config.get("enabled", {}).get(m_type, [])
-                },
-            }
-            m_cfg = {
-                "modules": phase_modules,
-                "api_keys": config.get("api_keys", {}),
-                "rate_limit": rate_limit,
-                "proxy": config.get("proxy", {}),
-            }
-
-            loaded = await loader.load_enabled_modules(
-                m_cfg,
-                db,
-                scan_id=scan_id,
-                rate_limiter=limiter,
-                proxy_manager=proxy_manager,
-            )
-
-            async def run_module_safe(m: Any, inner_target: str) -> None:
-                """Runs a module with localized error handling and reporting."""
-                try:
-                    logger.debug(f"[ENGINE] Launching {m.module_type}/{m.name}")
-                    await m.run(inner_target)
-                    logger.debug(f"[ENGINE] Module {m.name} completed successfully")
-                    if progress_callback:
-                        await progress_callback(
-                            {"type": "module_end", "module": m.name, "status": "completed"}
-                        )
-                except Exception as e:
-                    import traceback
-                    logger.error(f"[ENGINE ERROR] Module {m.name} encountered a fault: {e}")
-                    logger.debug(f"Full traceback: {traceback.format_exc()}")
-                    if progress_callback:
-                        await progress_callback(
-                            {
-                                "type": "module_end",
-                                "module": m.name,
-                                "status": "failed",
-                                "error": str(e),
-                            }
-                        )
-                        await progress_callback(
-                            {"type": "error", "message": f"{m.name} failed: {str(e)}"}
-                        )
-
-            tasks.extend([run_module_safe(m, target) for m in loaded])
-
-        # Windows-specific Playwright loop fix (threaded fallback)
-        if label == "Phase 5: Visual Recon" and sys.platform == "win32":
-            try:
-                loop = asyncio.get_event_loop()
-                if not isinstance(
-                    loop, asyncio.WindowsProactorEventLoopPolicy()._loop_factory
-                ):
-                    logger.warning(
-                        "[ENGINE] Detected Selector loop on Windows. Offloading Phase 5 to Proactor thread..."
-                    )
-
-                    def run_phase_threaded():
-                        new_loop = asyncio.new_event_loop()
-                        asyncio.set_event_loop(new_loop)
-                        try:
-                            new_loop.run_until_complete(asyncio.gather(*tasks))
-                        finally:
-                            new_loop.close()
-
-                    import threading
-
-                    t = threading.Thread(target=run_phase_threaded)
-                    t.start()
-                    while t.is_alive():
-                        await asyncio.sleep(1)
-                    return
-            except Exception as e:
-                logger.error(f"[ENGINE ERROR] Phase 5 threaded fallback failed: {e}")
-
-        if tasks:
-            logger.info(f"[ENGINE] Running {label} with {len(tasks)} parallel tasks...")
+        try:
+            logger.debug(f"[ENGINE] Launching {m.module_type}/{m.name}")
+            if m.module_type == "screenshot" and _needs_proactor_thread():
+                # Windows-specific Playwright loop fix (threaded fallback). The bus is
+                # bound to this loop, so inputs must be complete before handing off.
+                for kind in m.consumes:
+                    await bus.wait_closed(kind)
+                # The shared pool's browsers belong to this loop; the module opens its own
+                m.browsers = None
+                await _run_in_proactor_thread(
+                    lambda: asyncio.wait_for(m.run(target), timeout=module_timeout)
+                )
+            else:
+                # A streaming module's timeout starts once its producers have finished
+                await run_with_timeout(
+                    m.run(target), module_timeout, scheduler.inputs_complete(m)
+                )
+            logger.debug(f"[ENGINE] Module {m.name} completed successfully")
             if progress_callback:
                 await progress_callback(
-                    {"type": "log", "message": f"{label}: Running {len(tasks)} modules..."}
+                    {"type": "module_end", "module": m.name, "status": "completed"}
                 )
+        except Exception as e:
+            import traceback
 
-            # Parallel execution with a global safety timeout (5 minutes per phase)
-            await asyncio.wait_for(asyncio.gather(*tasks), timeout=300)
+            if isinstance(e, asyncio.TimeoutError):
+                e = TimeoutError(f"exceeded module timeout of {module_timeout}s")
+            logger.error(f"[ENGINE ERROR] Module {m.name} encountered a fault: {e}")
+            logger.debug(f"Full traceback: {traceback.format_exc()}")
+            if progress_callback:
+                await progress_callback(
+                    {
+                        "type": "module_end",
+                        "module": m.name,
+                        "status": "failed",
+                        "error": str(e),
+                    }
+                )
+                await progress_callback(
+                    {"type": "error", "message": f"{m.name} failed: {str(e)}"}
+                )
+        finally:
+            # Close this module's output streams so streaming consumers can finish
+            for kind in m.produces:
+                bus.producer_done(kind)
+            await writer.flush()
 
     # 5. Pipeline Execution
     try:
-        # Sequentially initiate phases
-        await execute_phase("Phase 1: Subdomains & Cloud", ["subdomain", "github", "cloud_buckets"])
-        await execute_phase("Phase 2: Port Scanning", ["portscan"])
-        await execute_phase("Phase 3: Service Enrichment", ["shodan"])
-        await execute_phase("Phase 4: HTTP Analysis", ["http"])
-        await execute_phase("Phase 5: Visual Recon", ["screenshot"])
+        m_cfg = {
+            "modules": modules_config,
+            "api_keys": config.get("api_keys", {}),
+            "rate_limit": rate_limit,
+            "proxy": config.get("proxy", {}),
+            "scope": config.get("scope", {}),
+        }
+        loaded = await loader.load_enabled_modules(
+            m_cfg,
+            db,
+            scan_id=scan_id,
+            rate_limiter=limiter,
+            proxy_manager=proxy_manager,
+            bus=bus,
+            result_writer=writer,
+            resolver=resolver,
+            http_client=http_client,
+            response_cache=response_cache,
+            browser_pool=browser_pool,
+        )
+        for m in loaded:
+            for kind in m.produces:
+                bus.register_producer(kind)
+        bus.seal()
+
+        # Modules start as soon as their upstream producers finish
+        scheduler = DagScheduler(loaded, run_module_safe)
+        for m in loaded:
+            upstream = scheduler.upstream_of(m)
+            if upstream:
+                logger.debug(
+                    f"[ENGINE] {m.module_type}/{m.name} waits on: "
+                    + ", ".join(f"{u.module_type}/{u.name}" for u in upstream)
+                )
 
-        # 6. Post-Scan Cleanup & Summarization
-        deduped = db.deduplicate_results(target)
-        if deduped:
-            logger.info(f"[ENGINE] Purged {deduped} duplicate entries from database")
+        logger.info(f"[ENGINE] Running dependency graph with {len(loaded)} modules...")
+        if progress_callback:
+            await progress_callback(
+                {"type": "log", "message": f"Scheduling {len(loaded)} modules by dependency"}
+            )
+        await scheduler.run()
 
-        results = db.get_results(target, scan_id=scan_id)
+        # 6. Post-Scan Cleanup & Summarization
+        # Findings were deduplicated by the entity tables' unique indexes on insert
+        await writer.close()
         logger.info(f"[ENGINE] Scan completed successfully for {target}")
 
         # Tabulate findings for logs
-        counts = {}
-        subdomains = set()
-        for res in results:
-            r_type = res.get("type", "unknown")
-            counts[r_type] = counts.get(r_type, 0) + 1
-            if r_type == "subdomain":
-                data = res.get("data", [])
-                items = data if isinstance(data, list) else [data]
-                for item in items:
-                    if isinstance(item, dict) and item.get("subdomain"):
-                        subdomains.add(item.get("subdomain"))
+        counts = await asyncio.to_thread(db.get_result_counts, scan_id)
+        unique_subdomains = await asyncio.to_thread(
+            db.count_entities, "subdomains", target, scan_id
+        )
 
         logger.info(f"[ENGINE] Summary for Scan ID {scan_id}:")
         for r_type, count in counts.items():
             logger.info(f"  > {r_type.capitalize()}: {count}")
-        if subdomains:
-            logger.info(f"  > Unique Subdomains: {len(subdomains)}")
+        if unique_subdomains:
+            logger.info(f"  > Unique Subdomains: {unique_subdomains}")
+        throttled = limiter.global_limiter.stats()
+        logger.info(
+            f"  > Rate limiter: {throttled['acquired']} requests, {throttled['waits']} delayed "
+            f"(mean {throttled['mean_wait']:.3f}s, max {throttled['max_wait']:.3f}s)"
+        )
+
+        if response_cache:
+            logger.info(
+                f"  > Response cache: {response_cache.hits} hits, "
+                f"{response_cache.revalidated} revalidated, {response_cache.misses} fetched, "
+                f"{response_cache.shared} shared with a concurrent lookup"
+            )
 
         if scan_id:
-            db.update_scan_status(scan_id, "completed")
+            await asyncio.to_thread(db.update_scan_status, scan_id, "completed")
             if progress_callback:
                 await progress_callback(
                     {"type": "status", "status": "completed", "summary": counts}
@@ -229,10 +329,23 @@ async def run_scan(
 
         logger.error(f"[ENGINE CRITICAL] Scan failed: {e}")
         logger.debug(traceback.format_exc())
+        await writer.close()
         if scan_id:
-            db.update_scan_status(scan_id, "failed")
+            await asyncio.to_thread(db.update_scan_status, scan_id, "failed")
         if progress_callback:
             await progress_callback(
                 {"type": "error", "message": f"Global engine failure: {str(e)}"}
             )
         raise e
+    finally:
+        await writer.close()
+        await resolver.close()
+        if owns_http_client:
+            await http_client.close()
+        if owns_browser_pool:
+            await browser_pool.close()
+        if owns_proxy_manager:
+            await proxy_manager.close()
+        if response_cache:
+            response_cache.close()
+        db.close()
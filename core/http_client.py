@@ -0,0 +1,150 @@
+import logging
+import ssl
+from typing import Any, Dict, Optional
+
+import aiohttp
+
+logger = logging.getLogger(__name__)
+
+
+class HttpClient:
+    """Long-lived HTTP client shared by every module of a scan (or of the web process).
+
+    Holds one aiohttp session per connector-level proxy (direct connections and each
+    SOCKS endpoint get their own pool). Connections are kept alive between requests,
+    resolved addresses are cached by the connector, and every pool shares a single
+    SSL context instead of building one per session. HTTP proxies are applied per
+    request (see ProxyManager.get_proxy_url), so they reuse the direct pool.
+
+    With a proxy pool, every proxy gets its own connection pool capped at that
+    proxy's max_connections, and request hooks keep its load and failure count
+    current for the pool's selection and ejection logic.
+
+    Sessions are created lazily on first use, so the client may be constructed
+    outside the event loop that later uses it.
+
+    Attributes:
+        proxy: Optional ProxyManager deciding which pool a request goes through.
+        limit: Maximum open connections per pool.
+        limit_per_host: Maximum open connections to one host per pool.
+        dns_cache_ttl: Seconds a resolved address is reused by the connector.
+        keepalive_timeout: Seconds an idle connection is kept for reuse.
+        timeout: Default total timeout per request, in seconds.
+    """
+
+    def __init__(
+        self,
+        proxy_manager: Any = None,
+        limit: int = 200,
+        limit_per_host: int = 20,
+        dns_cache_ttl: int = 300,
+        keepalive_timeout: float = 30,
+        timeout: float = 30,
+    ):
+        """Initializes the client without opening any connection.
+
+        Args:
+            proxy_manager: Optional ProxyManager instance.
+            limit: Maximum open connections per pool (0 for no limit).
+            limit_per_host: Maximum open connections to one host per pool (0 for no limit).
+            dns_cache_ttl: Seconds a resolved address is reused by the connector.
+            keepalive_timeout: Seconds an idle connection is kept for reuse.
+            timeout: Default total timeout per request, in seconds.
+        """
+        self.proxy = proxy_manager
+        self.limit = limit
+        self.limit_per_host = limit_per_host
+        self.dns_cache_ttl = dns_cache_ttl
+        self.keepalive_timeout = keepalive_timeout
+        self.timeout = timeout
+        self._sessions: Dict[Optional[str], aiohttp.ClientSession] = {}
+        self._ssl_context: Optional[ssl.SSLContext] = None
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any], proxy_manager: Any = None) -> "HttpClient":
+        """Builds a client from the 'http_client' configuration section."""
+        return cls(
+            proxy_manager=proxy_manager,
+            limit=config.get("limit", 200),
+            limit_per_host=config.get("limit_per_host", 20),
+            dns_cache_ttl=config.get("dns_cache_ttl", 300),
+            keepalive_timeout=config.get("keepalive_timeout", 30),
+            timeout=config.get("timeout", 30),
+        )
+
+    def _connector(
+        self, proxy_url: Optional[str], limit: Optional[int] = None
+    ) -> aiohttp.BaseConnector:
+        """Creates the pooled connector for a direct or SOCKS route."""
+        if self._ssl_context is None:
+            self._ssl_context = ssl.create_default_context()
+        kwargs = {
+            "limit": self.limit if limit is None else limit,
+            "limit_per_host": self.limit_per_host,
+            "ttl_dns_cache": self.dns_cache_ttl,
+            "keepalive_timeout": self.keepalive_timeout,
+            "ssl": self._ssl_context,
+        }
+        if proxy_url:
+            from aiohttp_socks import ProxyConnector
+
+            logger.info(f"[HTTP] Opening SOCKS connection pool via {proxy_url}")
+            return ProxyConnector.from_url(proxy_url, **kwargs)
+        return aiohttp.TCPConnector(**kwargs)
+
+    def session(
+        self, proxy_url: Optional[str] = None, host: Optional[str] = None
+    ) -> aiohttp.ClientSession:
+        """Returns the shared session for a route, creating it on first use.
+
+        The session belongs to the client: callers must not close it.
+
+        Args:
+            proxy_url: SOCKS proxy the connection pool goes through. Defaults to the
+                ProxyManager's connector-level proxy, or a direct pool if there is none.
+            host: Destination hostname, which picks the proxy when a pool is configured.
+
+        Returns:
+            A pooled aiohttp.ClientSession.
+        """
+        pool = getattr(self.proxy, "pool", None)
+        if proxy_url is None and pool:
+            return self._pool_session(pool, pool.select(host))
+        if proxy_url is None and self.proxy:
+            proxy_url = self.proxy.get_connector_url(host)
+        session = self._sessions.get(proxy_url)
+        if session is None or session.closed:
+            session = aiohttp.ClientSession(
+                connector=self._connector(proxy_url),
+                timeout=aiohttp.ClientTimeout(total=self.timeout),
+            )
+            self._sessions[proxy_url] = session
+        return session
+
+    def _pool_session(self, pool: Any, endpoint: Any) -> aiohttp.ClientSession:
+        """Returns the session whose connections all go through one pool proxy."""
+        session = self._sessions.get(endpoint.url)
+        if session is None or session.closed:
+            session = aiohttp.ClientSession(
+                connector=self._connector(
+                    endpoint.url if endpoint.is_socks else None, limit=endpoint.max_connections
+                ),
+                timeout=aiohttp.ClientTimeout(total=self.timeout),
+                trace_configs=[pool.trace_config(endpoint)],
+            )
+            self._sessions[endpoint.url] = session
+        return session
+
+    async def close(self) -> None:
+        """Closes every pooled session and its connections."""
+        sessions, self._sessions = list(self._sessions.values()), {}
+        for session in sessions:
+            await session.close()
+
+    async def __aenter__(self) -> "HttpClient":
+        """Async context manager entry."""
+        return self
+
+    async def __aexit__(self, exc_type: Any, exc_val: Any, exc_tb: Any) -> None:
+        """Closes the client on exit."""
+        await self.close()
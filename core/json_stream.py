@@ -0,0 +1,82 @@
+import codecs
+import json
+import re
+from typing import List
+
+
+class JsonFieldExtractor:
+    """Pulls the values of one string field out of a JSON document as it streams in.
+
+    Large API responses (crt.sh returns hundreds of MB for big organisations)
+    are fed chunk by chunk; each call returns the complete values of `field`
+    seen so far, and only the unfinished tail of the text is kept. Memory stays
+    at roughly one chunk regardless of the document size, and nothing but the
+    wanted field is ever decoded.
+
+    The field is matched by name wherever it occurs, which suits flat arrays of
+    records such as crt.sh's. A quoted key can never match inside a string value,
+    because quotes there are escaped.
+
+    Attributes:
+        field: Name of the extracted field.
+        bytes_read: Bytes fed so far.
+        values_found: Values returned so far.
+    """
+
+    def __init__(self, field: str):
+        """Initializes the extractor for one field.
+
+        Args:
+            field: The JSON object key whose string values are extracted.
+        """
+        self.field = field
+        self.bytes_read = 0
+        self.values_found = 0
+        self._key = json.dumps(field)
+        self._pattern = re.compile(
+            re.escape(self._key) + r'\s*:\s*"([^"\\]*(?:\\.[^"\\]*)*)"', re.DOTALL
+        )
+        # What may follow the key while its string value is still incomplete
+        self._pending = re.compile(r'\s*(?::\s*(?:"(?:[^"\\]|\\.)*\\?)?)?\Z', re.DOTALL)
+        self._decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+        self._buffer = ""
+        self._checked = False
+
+    def feed(self, chunk: bytes) -> List[str]:
+        """Consumes the next chunk of the document.
+
+        Args:
+            chunk: Raw bytes, split anywhere (even inside a UTF-8 sequence).
+
+        Returns:
+            Values of the field completed by this chunk, in document order.
+
+        Raises:
+            ValueError: If the document does not start like JSON (e.g., an HTML error page).
+        """
+        self.bytes_read += len(chunk)
+        buffer = self._buffer + self._decoder.decode(chunk)
+        if not self._checked:
+            start = buffer.lstrip()
+            if start:
+                if start[0] not in "[{":
+                    raise ValueError(f"Response is not JSON: {start[:80]!r}")
+                self._checked = True
+
+        values = []
+        end = 0
+        for match in self._pattern.finditer(buffer):
+            raw = match.group(1)
+            values.append(json.loads(f'"{raw}"') if "\\" in raw else raw)
+            end = match.end()
+
+        # Keep only text that may still become a match: an unfinished key/value
+        # pair, or a key split across chunks
+        rest = buffer[end:]
+        pending = rest.rfind(self._key)
+        if pending >= 0 and self._pending.match(rest, pending + len(self._key)):
+            self._buffer = rest[pending:]
+        else:
+            self._buffer = rest[-(len(self._key) - 1):]
+        self.values_found += len(values)
+        return values
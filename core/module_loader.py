@@ -1,9 +1,13 @@
+import asyncio
 import importlib
 import inspect
 import logging
 from abc import ABC, abstractmethod
+from contextlib import asynccontextmanager
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Type
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple, Type
+
+from core.names import Scope
 
 logger = logging.getLogger(__name__)
 
@@ -20,8 +24,22 @@ class BaseModule(ABC):
         scan_id: UUID of the current scan session.
         limiter: Reference to the rate limiter instance.
         proxy: Reference to the proxy manager instance.
+        bus: Reference to the scan's FindingBus, if running under the engine.
+        writer: Reference to the scan's ResultWriter, if running under the engine.
+        resolver: Reference to the shared async DNS Resolver, if running under the engine.
+        http: Reference to the shared, pooled HttpClient, if running under the engine.
+        browsers: Reference to the shared BrowserPool, if running under the engine.
+        cache: Reference to the on-disk ResponseCache for API responses, if enabled.
+        consumes: Artifact kinds (see core.scheduler) this module reads from upstream modules.
+        produces: Artifact kinds this module makes available to downstream modules.
+        streams_input: True if the module iterates its inputs as they are published
+            and should therefore start immediately rather than after its producers.
     """
 
+    consumes: Tuple[str, ...] = ()
+    produces: Tuple[str, ...] = ()
+    streams_input: bool = False
+
     def __init__(
         self,
         config: Dict[str, Any],
@@ -29,6 +47,12 @@ class BaseModule(ABC):
         scan_id: Optional[str] = None,
         rate_limiter: Any = None,
         proxy_manager: Any = None,
+        bus: Any = None,
+        result_writer: Any = None,
+        resolver: Any = None,
+        http_client: Any = None,
+        response_cache: Any = None,
+        browser_pool: Any = None,
     ):
         """Initializes the base module with shared infrastructure.
 
@@ -38,33 +62,221 @@ class BaseModule(ABC):
             scan_id: Optional scan ID for session tracking.
             rate_limiter: Optional RateLimiter instance.
             proxy_manager: Optional ProxyManager instance.
+            bus: Optional FindingBus for streaming findings between modules.
+            result_writer: Optional ResultWriter for write-behind persistence.
+            resolver: Optional shared Resolver for cached, non-blocking DNS lookups.
+            http_client: Optional shared HttpClient with pooled keep-alive connections.
+            response_cache: Optional ResponseCache for passive API responses.
+            browser_pool: Optional shared BrowserPool with warm headless browsers.
         """
         self.config = config
         self.db = database
         self.scan_id = scan_id
         self.limiter = rate_limiter
         self.proxy = proxy_manager
+        self.bus = bus
+        self.writer = result_writer
+        self.resolver = resolver
+        self.http = http_client
+        self.cache = response_cache
+        self.browsers = browser_pool
+
+    @asynccontextmanager
+    async def http_session(self, host: Optional[str] = None) -> AsyncIterator[Any]:
+        """Provides an aiohttp session for the module's requests.
+
+        Under the engine this is the shared HttpClient's pooled session, which stays
+        open after the block so later requests reuse its connections. Standalone
+        modules get a private session that is closed on exit.
+
+        With a proxy pool, the session routes through the proxy assigned to `host`;
+        pass the same host to get_request_proxy() for each request.
+
+        Args:
+            host: Destination hostname of the requests made with the session.
+
+        Yields:
+            An aiohttp.ClientSession.
+        """
+        if self.http:
+            yield self.http.session(host=host)
+            return
+
+        import aiohttp
+
+        async with aiohttp.ClientSession(**self.get_session_kwargs(host)) as session:
+            yield session
+
+    async def cached(self, provider: str, key: str, fetch: Any) -> Any:
+        """Returns an API query's value through the response cache.
+
+        A fresh cached value is returned without calling `fetch`. Otherwise `fetch`
+        is awaited with the conditional headers (If-None-Match / If-Modified-Since)
+        to add to its request and must return (status, headers, value); on a 304
+        the cached value is reused. Without a cache `fetch` is simply called.
+
+        Args:
+            provider: The API provider (selects the TTL).
+            key: The query, usually the request URL.
+            fetch: Coroutine function performing the request (see core.response_cache.Fetch).
+
+        Returns:
+            The JSON-serializable value, or None if the request failed.
+        """
+        if self.cache is None:
+            _, _, value = await fetch({})
+            return value
+        return await self.cache.fetch(provider, key, fetch)
+
+    def scope(self, target: str) -> Scope:
+        """Builds the scope findings for a target are checked against.
+
+        The target and its subdomains are in scope, plus the roots listed in the
+        'scope.include' config; 'scope.exclude' carves names out.
+
+        Args:
+            target: The scan target; '*.example.com' leaves the target itself out.
+
+        Returns:
+            The target's Scope.
+        """
+        return Scope.for_target(target, self.config.get("scope"))
+
+    async def throttle(self, provider: Optional[str] = None, host: Optional[str] = None) -> None:
+        """Waits for permission to send one request.
+
+        With the engine's RateLimiterRegistry the request is charged to its host,
+        this module's type, its API provider and the global bucket. A plain
+        RateLimiter (standalone use) only has the global bucket.
+
+        Args:
+            provider: The API provider being called (e.g., 'crt.sh').
+            host: The destination hostname.
+        """
+        if not self.limiter:
+            return
+        from core.rate_limiter import RateLimiterRegistry
+
+        if isinstance(self.limiter, RateLimiterRegistry):
+            await self.limiter.acquire(provider=provider, host=host, module=self.module_type)
+        else:
+            await self.limiter.acquire()
+
+    async def rate_feedback(
+        self, provider: str, status: int, headers: Optional[Dict[str, Any]] = None
+    ) -> bool:
+        """Reports an API response so the provider's rate adapts to it.
 
-    def get_session_kwargs(self) -> Dict[str, Any]:
+        Throttling responses (429, 503, quota-exhausted 403) slow the provider's
+        adaptive bucket down and pause it for Retry-After / X-RateLimit-Reset; the
+        next throttle() call then waits accordingly. Without an adaptive bucket the
+        requested delay is slept here instead. Successes let the rate ramp back up.
+
+        Args:
+            provider: The API provider that answered.
+            status: HTTP status code.
+            headers: Response headers.
+
+        Returns:
+            True if the request was throttled and should be retried.
+        """
+        from core.rate_limiter import RateLimiterRegistry, is_throttled, retry_delay
+
+        handled = isinstance(self.limiter, RateLimiterRegistry) and self.limiter.feedback(
+            provider, status, headers
+        )
+        throttled = is_throttled(status, headers)
+        if throttled and not handled:
+            await asyncio.sleep(min(retry_delay(headers) or 1.0, 60))
+        return throttled
+
+    def get_session_kwargs(self, host: Optional[str] = None) -> Dict[str, Any]:
         """Provides keyword arguments for aiohttp.ClientSession initialization.
 
+        Args:
+            host: Destination hostname, which picks the proxy when a pool is configured.
+
         Returns:
             A dictionary containing session parameters like 'connector'.
         """
         kwargs = {}
         if self.proxy:
-            connector = self.proxy.get_connector()
+            connector = self.proxy.get_connector(host)
             if connector:
                 kwargs["connector"] = connector
         return kwargs
 
-    def get_request_proxy(self) -> Optional[str]:
+    def get_request_proxy(self, host: Optional[str] = None) -> Optional[str]:
         """Retrieves the current proxy URL for low-level request methods.
 
+        Args:
+            host: Destination hostname, which picks the proxy when a pool is configured.
+
         Returns:
             The proxy URL as a string (e.g., 'http://127.0.0.1:8080') or None.
         """
-        return self.proxy.get_proxy_url() if self.proxy else None
+        return self.proxy.get_proxy_url(host) if self.proxy else None
+
+    async def resolve_host(self, host: str) -> List[str]:
+        """Resolves a hostname to its IPv4 addresses.
+
+        Uses the shared Resolver when one is attached. Standalone modules fall back
+        to the operating system resolver in a worker thread.
+
+        Args:
+            host: The hostname or IP literal.
+
+        Returns:
+            The resolved addresses, or an empty list if resolution failed.
+        """
+        if self.resolver:
+            return await self.resolver.resolve(host)
+
+        import socket
+
+        try:
+            _, _, addresses = await asyncio.to_thread(socket.gethostbyname_ex, host)
+            return addresses
+        except OSError:
+            return []
+
+    def publish(self, kind: str, item: Dict[str, Any]) -> None:
+        """Publishes a single finding to downstream modules as soon as it is discovered.
+
+        Args:
+            kind: The artifact kind (see core.scheduler).
+            item: The finding dictionary.
+        """
+        if self.bus:
+            self.bus.publish(kind, item)
+
+    async def iter_findings(self, target: str, kind: str) -> AsyncIterator[Dict[str, Any]]:
+        """Iterates over upstream findings of a kind as they become available.
+
+        Reads from the scan's FindingBus when one is attached. Standalone modules
+        (no bus) fall back to the findings already persisted in the database.
+
+        Args:
+            target: The scan target.
+            kind: The artifact kind to consume.
+
+        Yields:
+            Finding dictionaries.
+        """
+        if self.bus:
+            async for item in self.bus.subscribe(kind):
+                yield item
+            return
+
+        from core.bus import DB_SOURCES
+
+        module, field = DB_SOURCES[kind]
+        for res in self.db.get_results(target, module=module):
+            data = res.get("data", [])
+            items = data if isinstance(data, list) else [data]
+            for item in items:
+                if isinstance(item, dict) and item.get(field) is not None:
+                    yield item
 
     @property
     @abstractmethod
@@ -122,7 +334,10 @@ class BaseModule(ABC):
             f"[MODULE] {self.module_type}/{self.name} storing {log_count} finding(s) | Scan: {self.scan_id}"
         )
 
-        self.db.store_result(
+        # Under the engine, persistence is handed to the write-behind queue so the
+        # event loop never waits on disk
+        store = self.writer.submit if self.writer else self.db.store_result
+        store(
             target=target,
             module=f"{self.module_type}/{self.name}",
             source=source,
@@ -154,6 +369,12 @@ class ModuleLoader:
         scan_id: Optional[str] = None,
         rate_limiter: Any = None,
         proxy_manager: Any = None,
+        bus: Any = None,
+        result_writer: Any = None,
+        resolver: Any = None,
+        http_client: Any = None,
+        response_cache: Any = None,
+        browser_pool: Any = None,
     ) -> List[BaseModule]:
         """Scans the module directory and loads classes enabled in the config.
 
@@ -163,6 +384,12 @@ class ModuleLoader:
             scan_id: Optional UUID of the scan session.
             rate_limiter: Reference to the shared RateLimiter.
             proxy_manager: Reference to the shared ProxyManager.
+            bus: Reference to the scan's FindingBus.
+            result_writer: Reference to the scan's ResultWriter.
+            resolver: Reference to the shared DNS Resolver.
+            http_client: Reference to the shared HttpClient.
+            response_cache: Reference to the shared ResponseCache, or None if disabled.
+            browser_pool: Reference to the shared BrowserPool.
 
         Returns:
             A list of instantiated module objects ready for execution.
@@ -194,6 +421,7 @@ class ModuleLoader:
                         # Prepare module-specific config overlay
                         module_cfg = config.get("modules", {}).get(m_type, {}).copy()
                         module_cfg["api_keys"] = config.get("api_keys", {})
+                        module_cfg["scope"] = config.get("scope", {})
 
                         instance = cls(
                             module_cfg,
@@ -201,6 +429,12 @@ class ModuleLoader:
                             scan_id=scan_id,
                             rate_limiter=rate_limiter,
                             proxy_manager=proxy_manager,
+                            bus=bus,
+                            result_writer=result_writer,
+                            resolver=resolver,
+                            http_client=http_client,
+                            response_cache=response_cache,
+                            browser_pool=browser_pool,
                         )
                         loaded_modules.append(instance)
                         logger.debug(
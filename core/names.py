@@ -0,0 +1,235 @@
+import re
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+# One DNS label: letters, digits, hyphens (not at the ends) and the underscores
+# of service names such as _dmarc
+_HOSTNAME = re.compile(
+    r"(?:[a-z0-9_](?:[a-z0-9_-]{0,61}[a-z0-9_])?\.)*[a-z0-9_](?:[a-z0-9_-]{0,61}[a-z0-9_])?"
+)
+
+# Hostname-looking runs in free text (API dumps, HTML, JS)
+_HOSTNAME_IN_TEXT = re.compile(
+    r"(?<![a-z0-9_.-])(?:[a-z0-9_](?:[a-z0-9_-]{0,61}[a-z0-9])?\.)+[a-z0-9-]{2,63}(?![a-z0-9_-])",
+    re.IGNORECASE,
+)
+
+# Key under which a trie node keeps its rule; no DNS label is empty
+_RULE = ""
+
+
+def normalize_name(name: str) -> Optional[str]:
+    """Brings a hostname to the canonical form used for scope checks and dedup.
+
+    Strips whitespace, a trailing root dot and a leading wildcard label,
+    lowercases, and converts internationalized labels to punycode (IDNA).
+
+    Args:
+        name: A hostname as found in a source (e.g., '*.Bücher.Example.COM.').
+
+    Returns:
+        The normalized name ('bücher' becomes 'xn--bcher-kva'), or None if it is
+        not a valid hostname.
+    """
+    name = name.strip().rstrip(".").lower()
+    if name.startswith("*."):
+        name = name[2:]
+    if not name.isascii():
+        try:
+            name = name.encode("idna").decode("ascii")
+        except UnicodeError:
+            return None
+    if len(name) > 253 or not _HOSTNAME.fullmatch(name):
+        return None
+    return name
+
+
+class Scope:
+    """Decides which hostnames belong to a scan, using a trie of reversed labels.
+
+    Patterns are 'example.com' (the name and everything below it) or
+    '*.example.com' (only names below it). Each pattern is stored at the trie
+    node reached by walking its labels right to left, so a lookup costs one dict
+    access per label of the name, however many roots and exclusions there are.
+    The most specific matching pattern decides: excluding 'dev.example.com' carves
+    it out of 'example.com', and including 'www.dev.example.com' puts that name
+    back.
+
+    Names passed to `__contains__` and `root_of` must already be normalized (see
+    normalize_name); `filter` normalizes them itself.
+
+    Attributes:
+        include: The in-scope patterns.
+        exclude: The out-of-scope patterns.
+    """
+
+    def __init__(self, include: Iterable[str], exclude: Iterable[str] = ()):
+        """Compiles the patterns into the trie.
+
+        Args:
+            include: In-scope patterns; normally the target plus any extra roots.
+            exclude: Out-of-scope patterns.
+
+        Raises:
+            ValueError: If a pattern is not a valid (optionally wildcarded) hostname.
+        """
+        self.include: List[str] = []
+        self.exclude: List[str] = []
+        self._trie: Dict[str, dict] = {}
+        for pattern in include:
+            self._add(pattern, True)
+        for pattern in exclude:
+            self._add(pattern, False)
+
+    @classmethod
+    def for_target(cls, target: str, config: Optional[Dict[str, Iterable[str]]] = None) -> "Scope":
+        """Builds the scope of a scan from its target and the 'scope' config section.
+
+        Args:
+            target: The scanned domain, in scope with its subdomains.
+            config: Optional {'include': [...], 'exclude': [...]} patterns.
+        """
+        config = config or {}
+        return cls([target, *config.get("include", [])], config.get("exclude", []))
+
+    def _add(self, pattern: str, included: bool) -> None:
+        """Stores one pattern's rule in the trie."""
+        wildcard = pattern.strip().startswith("*.")
+        name = normalize_name(pattern)
+        if name is None:
+            raise ValueError(f"Invalid scope pattern {pattern!r}")
+        (self.include if included else self.exclude).append(
+            f"*.{name}" if wildcard else name
+        )
+
+        node = self._trie
+        for label in reversed(name.split(".")):
+            node = node.setdefault(label, {})
+        # Rule: (applies to the name itself, applies below it, root the rule came from)
+        itself, below, _ = node.get(_RULE, (None, None, name))
+        if not wildcard:
+            itself = included
+        below = included
+        node[_RULE] = (itself, below, name)
+
+    def root_of(self, name: str) -> Optional[str]:
+        """Returns the pattern root that puts a normalized name in scope, or None.
+
+        Args:
+            name: A normalized hostname.
+        """
+        labels = name.split(".")
+        node = self._trie
+        root = None
+        i = len(labels)
+        while i:
+            i -= 1
+            node = node.get(labels[i])
+            if node is None:
+                break
+            rule = node.get(_RULE)
+            if rule is not None:
+                # Below this node if labels remain, otherwise the node itself
+                decision = rule[1] if i else rule[0]
+                if decision is not None:
+                    root = rule[2] if decision else None
+        return root
+
+    def __contains__(self, name: str) -> bool:
+        """True if a normalized name is in scope."""
+        return self.root_of(name) is not None
+
+    def filter(self, names: Iterable[str]) -> Iterator[str]:
+        """Normalizes raw names and yields the in-scope ones, each once.
+
+        Args:
+            names: Hostnames as found in a source.
+
+        Yields:
+            Normalized in-scope names, in first-seen order.
+        """
+        seen = NameSet(self)
+        for name in names:
+            name = seen.add(name)
+            if name is not None:
+                yield name
+
+
+class NameSet:
+    """A deduplicated set of in-scope hostnames.
+
+    Names are stored by the scope root that admitted them, keeping only the
+    labels in front of the root ('api' for 'api.example.com'), so large result
+    sets do not repeat the domain in every entry.
+
+    Attributes:
+        scope: The Scope names are checked against.
+    """
+
+    def __init__(self, scope: Scope, names: Iterable[str] = ()):
+        """Initializes the set, adding any given names.
+
+        Args:
+            scope: The Scope names are checked against.
+            names: Initial names, raw or normalized.
+        """
+        self.scope = scope
+        self._by_root: Dict[str, Set[str]] = {}
+        self._size = 0
+        for name in names:
+            self.add(name)
+
+    def _locate(self, name: str) -> Optional[Tuple[str, str]]:
+        """Returns (root, prefix) for a normalized in-scope name, or None."""
+        root = self.scope.root_of(name)
+        if root is None:
+            return None
+        return root, name[: -len(root) - 1] if len(name) > len(root) else ""
+
+    def add(self, name: str) -> Optional[str]:
+        """Adds a raw name if it is valid, in scope and not yet present.
+
+        Args:
+            name: A hostname as found in a source.
+
+        Returns:
+            The normalized name if it was added, otherwise None.
+        """
+        name = normalize_name(name)
+        if name is None:
+            return None
+        located = self._locate(name)
+        if located is None:
+            return None
+        root, prefix = located
+        prefixes = self._by_root.get(root)
+        if prefixes is None:
+            prefixes = self._by_root[root] = set()
+        elif prefix in prefixes:
+            return None
+        prefixes.add(prefix)
+        self._size += 1
+        return name
+
+    def __contains__(self, name: str) -> bool:
+        """True if a normalized name is in the set."""
+        located = self._locate(name)
+        return located is not None and located[1] in self._by_root.get(located[0], ())
+
+    def __len__(self) -> int:
+        """Number of names in the set."""
+        return self._size
+
+    def __iter__(self) -> Iterator[str]:
+        """Yields every name, in no particular order."""
+        for root, prefixes in self._by_root.items():
+            for prefix in prefixes:
+                yield f"{prefix}.{root}" if prefix else root
+
+
+def extract_hostnames(text: str) -> Iterator[str]:
+    """Yields every hostname-looking string in free text, as written.
+
+    Args:
+        text: Raw text (API output, HTML, JavaScript, ...).
+    """
+    return (match.group(0) for match in _HOSTNAME_IN_TEXT.finditer(text))
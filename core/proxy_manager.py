@@ -4,6 +4,8 @@ from typing import Any, Dict, Optional
 import aiohttp
 from aiohttp_socks import ProxyConnector
 
+from core.proxy_pool import ProxyPool
+
 logger = logging.getLogger(__name__)
 
 
@@ -13,35 +15,82 @@ class ProxyManager:
     This manager centralizes proxy logic for aiohttp sessions, ensuring that
     module-level requests correctly route through the configured gateway.
 
+    When 'pool.proxies' is configured it replaces the single proxy settings:
+    every lookup takes the destination host and returns the proxy the pool has
+    assigned to it (see ProxyPool).
+
     Attributes:
         http_proxy: URL for the HTTP proxy.
         https_proxy: URL for the HTTPS proxy.
         use_tor: Boolean flag to enable Tor routing.
         tor_proxy: The default Tor SOCKS5 endpoint.
+        pool: ProxyPool spreading requests over several proxies, or None.
     """
 
     def __init__(self, config: Dict[str, Any]):
         """Initializes the ProxyManager with settings from the configuration.
 
         Args:
-            config: A dictionary containing 'http', 'https', and 'use_tor' keys.
+            config: A dictionary containing 'http', 'https', 'use_tor' and 'pool' keys.
         """
         self.http_proxy = config.get("http")
         self.https_proxy = config.get("https")
         self.use_tor = config.get("use_tor", False)
         self.tor_proxy = "socks5://127.0.0.1:9050" if self.use_tor else None
+        pool_config = config.get("pool") or {}
+        self.pool = ProxyPool.from_config(pool_config) if pool_config.get("proxies") else None
+
+    def route(self, host: Optional[str] = None) -> Optional[str]:
+        """Returns the proxy a request to a host goes through.
+
+        Args:
+            host: Destination hostname (used for sticky pool assignment).
+
+        Returns:
+            The proxy URL, or None if requests connect directly.
+        """
+        if self.pool:
+            return self.pool.select(host).url
+        return self.tor_proxy or self.https_proxy or self.http_proxy
+
+    def start(self) -> None:
+        """Starts the pool's background health probes (call from a running loop)."""
+        if self.pool:
+            self.pool.start()
+
+    async def close(self) -> None:
+        """Stops the pool's background health probes."""
+        if self.pool:
+            await self.pool.close()
+
+    def get_connector_url(self, host: Optional[str] = None) -> Optional[str]:
+        """Retrieves the SOCKS proxy URL that must be handled by the connector.
 
-    def get_connector(self) -> Optional[aiohttp.BaseConnector]:
+        Args:
+            host: Destination hostname.
+
+        Returns:
+            The SOCKS proxy URL string or None if requests connect directly.
+        """
+        proxy_url = self.route(host)
+        if proxy_url and proxy_url.startswith("socks"):
+            return proxy_url
+        return None
+
+    def get_connector(self, host: Optional[str] = None) -> Optional[aiohttp.BaseConnector]:
         """Creates an aiohttp connector with proxy support.
 
         If a SOCKS proxy (like Tor) is configured, it returns a ProxyConnector.
         For standard HTTP proxies, it returns a standard TCPConnector (as HTTP
         proxies are typically handled at the request level).
 
+        Args:
+            host: Destination hostname.
+
         Returns:
             An aiohttp compatible connector or None if no proxy is configured.
         """
-        proxy_url = self.tor_proxy or self.https_proxy or self.http_proxy
+        proxy_url = self.route(host)
 
         if proxy_url:
             if proxy_url.startswith("socks"):
@@ -53,16 +102,19 @@ class ProxyManager:
 
         return None
 
-    def get_proxy_url(self) -> Optional[str]:
+    def get_proxy_url(self, host: Optional[str] = None) -> Optional[str]:
         """Retrieves the HTTP/HTTPS proxy URL for request-level routing.
 
         SOCKS proxies are excluded here as they must be handled by the connector
         to avoid redundant or conflicting proxy calls.
 
+        Args:
+            host: Destination hostname.
+
         Returns:
             The proxy URL string or None if not applicable.
         """
-        proxy_url = self.tor_proxy or self.https_proxy or self.http_proxy
+        proxy_url = self.route(host)
         if proxy_url and not proxy_url.startswith("socks"):
             return proxy_url
         return None
@@ -0,0 +1,316 @@
+import asyncio
+import itertools
+import logging
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, List, Optional, Union
+
+logger = logging.getLogger(__name__)
+
+
+class ProxyEndpoint:
+    """One proxy of a ProxyPool and its live accounting.
+
+    Attributes:
+        url: Proxy URL (http://, https://, socks4:// or socks5://).
+        max_connections: Connections in use at once through this proxy.
+        active: Requests currently awaiting a response through this proxy.
+        requests: Requests sent through this proxy so far.
+        failures: Consecutive failures to reach the proxy.
+        healthy: False once the proxy has been ejected from rotation.
+        latency: Duration of the last successful health probe, in seconds.
+    """
+
+    __slots__ = ("url", "max_connections", "active", "requests", "failures", "healthy", "latency")
+
+    def __init__(self, url: str, max_connections: int = 50):
+        """Initializes a healthy, idle endpoint."""
+        self.url = url
+        self.max_connections = max_connections
+        self.active = 0
+        self.requests = 0
+        self.failures = 0
+        self.healthy = True
+        self.latency: Optional[float] = None
+
+    @property
+    def is_socks(self) -> bool:
+        """True if the proxy must be handled by the connector rather than per request."""
+        return self.url.startswith("socks")
+
+    @property
+    def load(self) -> float:
+        """Fraction of the connection limit in use."""
+        return self.active / self.max_connections if self.max_connections else float(self.active)
+
+    def __repr__(self) -> str:
+        state = "up" if self.healthy else "down"
+        return f"ProxyEndpoint({self.url!r}, {state}, active={self.active})"
+
+
+def _is_proxy_error(exc: BaseException) -> bool:
+    """Tells whether a request failed because the proxy itself was unreachable.
+
+    Errors the proxy relays on behalf of the destination (a SOCKS 'host
+    unreachable' reply, an HTTP 502) do not count against the proxy.
+    """
+    import aiohttp
+
+    if isinstance(exc, aiohttp.ClientProxyConnectionError):
+        return True
+    try:
+        from aiohttp_socks import ProxyConnectionError, ProxyTimeoutError
+    except ImportError:
+        return False
+    return isinstance(exc, (ProxyConnectionError, ProxyTimeoutError))
+
+
+class ProxyPool:
+    """A set of HTTP/SOCKS proxies that scan traffic is spread across.
+
+    Each destination host is assigned a proxy on first use, by round robin or
+    by picking the least-loaded proxy, and keeps it while that proxy stays
+    healthy, so a target always sees the same egress address. Proxies that fail
+    `max_failures` times in a row, or fail a background health probe against
+    `health_url`, are ejected; their hosts move to other proxies, and a later
+    successful probe puts them back in rotation.
+
+    The per-proxy connection limit is enforced by the HttpClient, which opens
+    one connection pool per proxy (see HttpClient.session).
+
+    Attributes:
+        endpoints: All proxies, healthy or not.
+        strategy: 'round_robin' or 'least_loaded'.
+        health_url: URL fetched through each proxy by the health probe, or None.
+        health_interval: Seconds between health probes (0 disables them).
+        health_timeout: Total timeout of one health probe, in seconds.
+        max_failures: Consecutive request failures that eject a proxy.
+        max_hosts: Sticky host assignments kept (least recently used dropped first).
+    """
+
+    STRATEGIES = ("round_robin", "least_loaded")
+
+    def __init__(
+        self,
+        proxies: List[Union[str, Dict[str, Any]]],
+        strategy: str = "round_robin",
+        max_connections: int = 50,
+        health_url: Optional[str] = None,
+        health_interval: float = 60,
+        health_timeout: float = 10,
+        max_failures: int = 3,
+        max_hosts: int = 10000,
+    ):
+        """Initializes the pool with every proxy considered healthy.
+
+        Args:
+            proxies: Proxy URLs, or dicts with 'url' and an optional 'max_connections'.
+            strategy: How a new host is assigned a proxy.
+            max_connections: Default connections in use at once per proxy.
+            health_url: URL fetched through each proxy by the health probe.
+            health_interval: Seconds between health probes.
+            health_timeout: Total timeout of one health probe, in seconds.
+            max_failures: Consecutive request failures that eject a proxy.
+            max_hosts: Sticky host assignments kept at once.
+
+        Raises:
+            ValueError: If no proxy is given or the strategy is unknown.
+        """
+        if strategy not in self.STRATEGIES:
+            raise ValueError(f"Unknown proxy strategy {strategy!r}")
+        self.endpoints: List[ProxyEndpoint] = []
+        for entry in proxies:
+            if isinstance(entry, str):
+                entry = {"url": entry}
+            self.endpoints.append(
+                ProxyEndpoint(entry["url"], entry.get("max_connections", max_connections))
+            )
+        if not self.endpoints:
+            raise ValueError("A proxy pool needs at least one proxy")
+        self.strategy = strategy
+        self.health_url = health_url
+        self.health_interval = health_interval
+        self.health_timeout = health_timeout
+        self.max_failures = max_failures
+        self.max_hosts = max_hosts
+        self._assigned: "OrderedDict[Hashable, ProxyEndpoint]" = OrderedDict()
+        self._counter = itertools.count()
+        self._task: Optional[asyncio.Task] = None
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any]) -> "ProxyPool":
+        """Builds a pool from the 'proxy.pool' configuration section."""
+        return cls(
+            config.get("proxies", []),
+            strategy=config.get("strategy", "round_robin"),
+            max_connections=config.get("max_connections", 50),
+            health_url=config.get("health_url") or None,
+            health_interval=config.get("health_interval", 60),
+            health_timeout=config.get("health_timeout", 10),
+            max_failures=config.get("max_failures", 3),
+            max_hosts=config.get("max_hosts", 10000),
+        )
+
+    def __len__(self) -> int:
+        """Number of proxies in the pool."""
+        return len(self.endpoints)
+
+    @property
+    def healthy(self) -> List[ProxyEndpoint]:
+        """Proxies currently in rotation."""
+        return [e for e in self.endpoints if e.healthy]
+
+    def _next(self) -> ProxyEndpoint:
+        """Picks a proxy for a newly assigned host."""
+        # With every proxy down, keep using them rather than leaking traffic direct
+        candidates = self.healthy or self.endpoints
+        if self.strategy == "least_loaded":
+            return min(candidates, key=lambda e: (e.load, e.requests))
+        return candidates[next(self._counter) % len(candidates)]
+
+    def select(self, host: Optional[str] = None) -> ProxyEndpoint:
+        """Returns the proxy a request to a host goes through.
+
+        Args:
+            host: Destination hostname; requests without one share a single assignment.
+
+        Returns:
+            The assigned ProxyEndpoint.
+        """
+        endpoint = self._assigned.get(host)
+        if endpoint is not None and endpoint.healthy:
+            self._assigned.move_to_end(host)
+            return endpoint
+        endpoint = self._next()
+        self._assigned[host] = endpoint
+        self._assigned.move_to_end(host)
+        if len(self._assigned) > self.max_hosts:
+            self._assigned.popitem(last=False)
+        return endpoint
+
+    def record_success(self, endpoint: ProxyEndpoint) -> None:
+        """Resets an endpoint's failure streak after a request got through."""
+        endpoint.failures = 0
+
+    def record_failure(self, endpoint: ProxyEndpoint) -> None:
+        """Counts a failure to reach a proxy, ejecting it after too many in a row."""
+        endpoint.failures += 1
+        if endpoint.healthy and endpoint.failures >= self.max_failures:
+            self._eject(endpoint, f"{endpoint.failures} consecutive failures")
+
+    def _eject(self, endpoint: ProxyEndpoint, reason: str) -> None:
+        """Takes an endpoint out of rotation."""
+        endpoint.healthy = False
+        remaining = len(self.healthy)
+        logger.warning(
+            f"[PROXY] Ejected {endpoint.url} ({reason}); {remaining}/{len(self)} proxies left"
+        )
+
+    def _restore(self, endpoint: ProxyEndpoint) -> None:
+        """Puts an endpoint back in rotation."""
+        endpoint.healthy = True
+        endpoint.failures = 0
+        logger.info(f"[PROXY] {endpoint.url} is healthy again")
+
+    def trace_config(self, endpoint: ProxyEndpoint) -> Any:
+        """Builds aiohttp request hooks that keep an endpoint's accounting current.
+
+        Args:
+            endpoint: The proxy the traced session sends its requests through.
+
+        Returns:
+            An aiohttp.TraceConfig.
+        """
+        import aiohttp
+
+        async def on_start(session: Any, context: Any, params: Any) -> None:
+            endpoint.active += 1
+            endpoint.requests += 1
+
+        async def on_end(session: Any, context: Any, params: Any) -> None:
+            endpoint.active -= 1
+            self.record_success(endpoint)
+
+        async def on_exception(session: Any, context: Any, params: Any) -> None:
+            endpoint.active -= 1
+            if _is_proxy_error(params.exception):
+                self.record_failure(endpoint)
+
+        trace = aiohttp.TraceConfig()
+        trace.on_request_start.append(on_start)
+        trace.on_request_end.append(on_end)
+        trace.on_request_exception.append(on_exception)
+        return trace
+
+    async def check(self, endpoint: ProxyEndpoint) -> bool:
+        """Fetches the health URL through one proxy and updates its state.
+
+        A failed probe ejects the proxy at once; a successful one restores it.
+
+        Args:
+            endpoint: The proxy to probe.
+
+        Returns:
+            True if the proxy answered.
+        """
+        import aiohttp
+
+        connector, proxy = None, endpoint.url
+        if endpoint.is_socks:
+            from aiohttp_socks import ProxyConnector
+
+            connector, proxy = ProxyConnector.from_url(endpoint.url), None
+        start = time.monotonic()
+        try:
+            async with aiohttp.ClientSession(
+                connector=connector, timeout=aiohttp.ClientTimeout(total=self.health_timeout)
+            ) as session:
+                async with session.get(
+                    self.health_url, proxy=proxy, allow_redirects=False
+                ) as response:
+                    ok = response.status < 500
+                    reason = f"health probe returned HTTP {response.status}"
+        except Exception as e:
+            ok, reason = False, f"health probe failed: {type(e).__name__} {e}".strip()
+
+        if ok:
+            endpoint.latency = time.monotonic() - start
+            if endpoint.healthy:
+                endpoint.failures = 0
+            else:
+                self._restore(endpoint)
+        elif endpoint.healthy:
+            self._eject(endpoint, reason)
+        return ok
+
+    async def check_all(self) -> int:
+        """Probes every proxy concurrently.
+
+        Returns:
+            Number of healthy proxies afterwards.
+        """
+        await asyncio.gather(*(self.check(e) for e in self.endpoints))
+        return len(self.healthy)
+
+    async def _health_loop(self) -> None:
+        """Probes the pool every health_interval seconds until cancelled."""
+        while True:
+            await self.check_all()
+            await asyncio.sleep(self.health_interval)
+
+    def start(self) -> None:
+        """Starts background health probes on the running loop, if configured."""
+        if not self.health_url or self.health_interval <= 0:
+            return
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._health_loop())
+
+    async def close(self) -> None:
+        """Stops the background health probes."""
+        task, self._task = self._task, None
+        if task and not task.done():
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
@@ -1,11 +1,79 @@
-from typing import Any
 import asyncio
 import logging
 import time
-from typing import Optional
+from collections import OrderedDict
+from email.utils import parsedate_to_datetime
+from typing import Any, Dict, List, Mapping, Optional, Tuple
 
 logger = logging.getLogger(__name__)
 
+# Responses that mean "slow down" whatever their headers say
+THROTTLE_STATUSES = {429, 503}
+
+
+def _header(headers: Optional[Mapping[str, Any]], name: str) -> Optional[str]:
+    """Case-insensitive header lookup for aiohttp, requests and plain dict headers."""
+    if not headers:
+        return None
+    for key, value in headers.items():
+        if key.lower() == name:
+            return str(value).strip()
+    return None
+
+
+def retry_delay(
+    headers: Optional[Mapping[str, Any]], now: Optional[float] = None
+) -> Optional[float]:
+    """Extracts how long a server asked us to wait.
+
+    Understands Retry-After (seconds or HTTP date) and X-RateLimit-Reset /
+    RateLimit-Reset (epoch seconds or seconds from now).
+
+    Args:
+        headers: Response headers.
+        now: Current UNIX time; defaults to time.time().
+
+    Returns:
+        Seconds to wait, or None if the headers do not say.
+    """
+    now = time.time() if now is None else now
+    value = _header(headers, "retry-after")
+    if value:
+        try:
+            return max(0.0, float(value))
+        except ValueError:
+            try:
+                return max(0.0, parsedate_to_datetime(value).timestamp() - now)
+            except (TypeError, ValueError):
+                pass
+    for name in ("x-ratelimit-reset", "ratelimit-reset"):
+        value = _header(headers, name)
+        if not value:
+            continue
+        try:
+            reset = float(value)
+        except ValueError:
+            continue
+        # Large values are absolute epoch timestamps, small ones are deltas
+        return max(0.0, reset - now) if reset > 1e9 else max(0.0, reset)
+    return None
+
+
+def is_throttled(status: int, headers: Optional[Mapping[str, Any]] = None) -> bool:
+    """Tells whether a response is a rate-limit rejection.
+
+    429 and 503 always are. 403 is only treated as throttling when the rate-limit
+    headers say the quota is exhausted (as GitHub and SecurityTrails do).
+    """
+    if status in THROTTLE_STATUSES:
+        return True
+    if status == 403:
+        return (
+            _header(headers, "x-ratelimit-remaining") == "0"
+            or _header(headers, "retry-after") is not None
+        )
+    return False
+
 
 class RateLimiter:
     """A token-bucket based rate limiter for controlling request frequency.
@@ -13,50 +81,115 @@ class RateLimiter:
     Ensures that modules do not exceed API limits or overwhelm target servers
     by enforcing a maximum number of operations per second.
 
+    Tokens are reserved rather than waited for: an acquire that finds the bucket
+    short takes its tokens anyway (driving the balance negative) and sleeps until
+    the refill covers its reservation. No lock is held while sleeping, so waiters
+    do not queue behind one another and each acquire costs a few arithmetic ops.
+
     Attributes:
         rate: The number of tokens added per second.
-        capacity: The maximum number of tokens the bucket can hold.
-        tokens: The current number of available tokens.
+        capacity: The maximum number of tokens the bucket can hold (burst).
+        tokens: The current token balance; negative while reservations are pending.
         last_update: Timestamp of the last token replenishment.
-        lock: Asyncio lock to ensure thread-safe token acquisition.
+        acquired: Tokens handed out so far.
+        waits: Acquires that had to sleep.
+        total_wait: Seconds spent sleeping across all acquires.
+        max_wait: Longest single sleep in seconds.
+        waiting: Acquires currently sleeping.
     """
 
-    def __init__(self, rate_per_second: float):
+    def __init__(self, rate_per_second: float, burst: Optional[float] = None):
         """Initializes the limiter with a specific rate.
 
         Args:
             rate_per_second: Tokens (requests) permitted per second.
+            burst: Bucket capacity; defaults to one second's worth of tokens (at least 1).
         """
         self.rate = rate_per_second
-        self.capacity = rate_per_second
-        self.tokens = rate_per_second
+        self.capacity = burst if burst is not None else max(1.0, rate_per_second)
+        self.tokens = self.capacity
         self.last_update = time.monotonic()
-        self.lock = asyncio.Lock()
+        self.acquired = 0
+        self.waits = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+        self.waiting = 0
 
-    async def acquire(self) -> None:
-        """Acquires a single token, blocking until one is available.
+    def reserve(self, n: int = 1) -> float:
+        """Reserves tokens immediately and returns how long the caller must wait.
+
+        Args:
+            n: Number of tokens to reserve.
 
-        Uses the token bucket algorithm to replenish tokens based on elapsed
-        time since the last acquisition.
+        Returns:
+            Seconds until the reservation is covered (0 if tokens were available).
         """
+        now = time.monotonic()
+        # While paused, last_update lies in the future and refilling starts there
+        paused = max(0.0, self.last_update - now)
         if self.rate <= 0:
-            return
+            return paused
+        if not paused:
+            # Replenish tokens based on time passed, then take ours
+            self.tokens = min(self.capacity, self.tokens + (now - self.last_update) * self.rate)
+            self.last_update = now
+        self.tokens -= n
+        self.acquired += n
+        return paused + (-self.tokens / self.rate if self.tokens < 0 else 0.0)
 
-        async with self.lock:
-            while self.tokens < 1:
-                now = time.monotonic()
-                elapsed = now - self.last_update
-                # Replenish tokens based on time passed
-                self.tokens = min(self.capacity, self.tokens + elapsed * self.rate)
-                self.last_update = now
+    def pause(self, seconds: float) -> None:
+        """Empties the bucket and stops refilling it for a while (e.g., Retry-After).
 
-                if self.tokens < 1:
-                    # Calculate wait time for the next token to become available
-                    wait_time = (1 - self.tokens) / self.rate
-                    await asyncio.sleep(wait_time)
+        Args:
+            seconds: How long no tokens are handed out.
+        """
+        self.reserve(0)
+        self.tokens = min(self.tokens, 0.0)
+        self.last_update = max(self.last_update, time.monotonic() + seconds)
+
+    def set_rate(self, rate_per_second: float) -> None:
+        """Changes the refill rate, settling tokens earned at the old rate first."""
+        self.reserve(0)
+        self.rate = rate_per_second
 
-            self.tokens -= 1
-            logger.debug("[LIMITER] Token acquired successfully")
+    async def acquire(self, n: int = 1) -> None:
+        """Acquires n tokens, sleeping until the refill covers them.
+
+        Args:
+            n: Number of tokens, e.g. one per probe of a batch.
+        """
+        delay = self.reserve(n)
+        if delay <= 0:
+            return
+        self.waits += 1
+        self.waiting += 1
+        try:
+            await asyncio.sleep(delay)
+        except asyncio.CancelledError:
+            # Give the reservation back so later callers are not delayed by it
+            self.tokens += n
+            self.acquired -= n
+            raise
+        finally:
+            self.waiting -= 1
+        self.total_wait += delay
+        self.max_wait = max(self.max_wait, delay)
+
+    @property
+    def mean_wait(self) -> float:
+        """Average sleep of the acquires that had to wait, in seconds."""
+        return self.total_wait / self.waits if self.waits else 0.0
+
+    def stats(self) -> Dict[str, float]:
+        """Returns wait-time metrics for logging or the dashboard."""
+        return {
+            "acquired": self.acquired,
+            "waits": self.waits,
+            "waiting": self.waiting,
+            "mean_wait": self.mean_wait,
+            "max_wait": self.max_wait,
+            "total_wait": self.total_wait,
+        }
 
     async def __aenter__(self) -> "RateLimiter":
         """Async context manager entry."""
@@ -66,3 +199,259 @@ class RateLimiter:
     async def __aexit__(self, exc_type: Any, exc_val: Any, exc_tb: Any) -> None:
         """Async context manager exit."""
         pass
+
+
+class AdaptiveRateLimiter(RateLimiter):
+    """A token bucket that learns the rate an upstream actually allows (AIMD).
+
+    Each throttling response (429, 503, quota-exhausted 403) multiplies the rate
+    by `decrease` and pauses the bucket for as long as Retry-After or
+    X-RateLimit-Reset asks. Each successful response adds `increase` times the
+    configured rate back, so the bucket ramps up slowly until it reaches that
+    ceiling again or the next rejection.
+
+    Attributes:
+        max_rate: Configured rate, used as the ceiling.
+        min_rate: Floor the rate never drops below.
+        decrease: Multiplicative decrease factor on throttling.
+        increase: Fraction of max_rate added back per success.
+        max_pause: Upper bound on a single server-requested pause, in seconds.
+        throttled: Throttling responses seen so far.
+    """
+
+    def __init__(
+        self,
+        rate_per_second: float,
+        burst: Optional[float] = None,
+        min_rate: Optional[float] = None,
+        decrease: float = 0.5,
+        increase: float = 0.05,
+        max_pause: float = 900,
+    ):
+        """Initializes the limiter at its ceiling rate.
+
+        Args:
+            rate_per_second: Starting and maximum tokens per second.
+            burst: Bucket capacity.
+            min_rate: Lowest rate after repeated throttling; defaults to 1/20 of the ceiling.
+            decrease: Factor applied to the rate on each throttling response.
+            increase: Fraction of the ceiling added back per successful response.
+            max_pause: Upper bound on a single server-requested pause, in seconds.
+        """
+        super().__init__(rate_per_second, burst)
+        self.max_rate = rate_per_second
+        self.min_rate = min_rate if min_rate is not None else rate_per_second / 20
+        self.decrease = decrease
+        self.increase = increase
+        self.max_pause = max_pause
+        self.throttled = 0
+
+    def on_success(self) -> None:
+        """Additive increase after a response that was not throttled."""
+        if 0 < self.rate < self.max_rate:
+            self.set_rate(min(self.max_rate, self.rate + self.max_rate * self.increase))
+
+    def on_throttle(self, delay: Optional[float] = None) -> float:
+        """Multiplicative decrease after a throttling response.
+
+        Args:
+            delay: Seconds the server asked us to wait, if it said.
+
+        Returns:
+            The pause applied, in seconds.
+        """
+        self.throttled += 1
+        if self.rate > 0:
+            self.set_rate(max(self.min_rate, self.rate * self.decrease))
+        if delay is None:
+            delay = 1 / self.rate if self.rate > 0 else 1.0
+        delay = min(delay, self.max_pause)
+        self.pause(delay)
+        return delay
+
+
+class RateLimiterRegistry:
+    """Keyed token buckets for hierarchical rate limiting.
+
+    Every request passes through up to four buckets: its destination host, its
+    module, its API provider and finally the global bucket. Each bucket has its
+    own rate and burst, so a slow API only delays requests to that API, while the
+    global bucket still caps the scan as a whole. Narrow buckets are acquired
+    first, so a request waiting on its provider holds no global token.
+
+    Host buckets are created on demand from one default spec and evicted once idle
+    (least recently used first), so thousands of destinations cost bounded memory.
+
+    Attributes:
+        global_limiter: The bucket every request passes through.
+        providers: Rate/burst specs per API provider (e.g., 'crt.sh').
+        modules: Rate/burst specs per module type (e.g., 'http').
+        host_spec: Rate/burst spec applied to each destination host, or None.
+        max_keys: Maximum number of keyed buckets kept at once.
+        idle_ttl: Seconds after which an unused bucket may be evicted.
+    """
+
+    def __init__(
+        self,
+        global_rate: float,
+        global_burst: Optional[float] = None,
+        providers: Optional[Dict[str, Dict[str, float]]] = None,
+        modules: Optional[Dict[str, Dict[str, float]]] = None,
+        host_spec: Optional[Dict[str, float]] = None,
+        max_keys: int = 10000,
+        idle_ttl: float = 300,
+    ):
+        """Initializes the registry.
+
+        Args:
+            global_rate: Requests per second across the whole scan (0 disables).
+            global_burst: Capacity of the global bucket.
+            providers: Mapping of provider name to {'rate', 'burst'}.
+            modules: Mapping of module type to {'rate', 'burst'}.
+            host_spec: {'rate', 'burst'} for every destination host; None disables.
+            max_keys: Maximum number of keyed buckets kept at once.
+            idle_ttl: Seconds after which an unused bucket may be evicted.
+        """
+        self.global_limiter = RateLimiter(global_rate, global_burst)
+        self.providers = providers or {}
+        self.modules = modules or {}
+        self.host_spec = host_spec
+        self.max_keys = max_keys
+        self.idle_ttl = idle_ttl
+        self._buckets: "OrderedDict[Tuple[str, str], Tuple[RateLimiter, float]]" = OrderedDict()
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any]) -> "RateLimiterRegistry":
+        """Builds a registry from the root configuration.
+
+        Reads the 'rate_limits' section; the legacy top-level 'rate_limit' value
+        still sets the global rate when the section does not.
+        """
+        limits = config.get("rate_limits", {})
+        global_spec = limits.get("global", {})
+        return cls(
+            global_rate=global_spec.get("rate", config.get("rate_limit", 10)),
+            global_burst=global_spec.get("burst"),
+            providers=limits.get("providers"),
+            modules=limits.get("modules"),
+            host_spec=limits.get("hosts"),
+            max_keys=limits.get("max_keys", 10000),
+            idle_ttl=limits.get("idle_ttl", 300),
+        )
+
+    def __len__(self) -> int:
+        return len(self._buckets)
+
+    def _spec(self, scope: str, key: str) -> Optional[Dict[str, float]]:
+        if scope == "provider":
+            return self.providers.get(key)
+        if scope == "module":
+            return self.modules.get(key)
+        return self.host_spec
+
+    def bucket(self, scope: str, key: str) -> Optional[RateLimiter]:
+        """Returns the bucket for a key, creating it if its scope is configured.
+
+        Args:
+            scope: 'provider', 'module' or 'host'.
+            key: The provider name, module type or hostname.
+
+        Returns:
+            The bucket, or None if the key is not rate limited.
+        """
+        now = time.monotonic()
+        entry = self._buckets.get((scope, key))
+        if entry is not None:
+            limiter = entry[0]
+            self._buckets[(scope, key)] = (limiter, now)
+            self._buckets.move_to_end((scope, key))
+        else:
+            spec = self._spec(scope, key)
+            if not spec:
+                return None
+            if scope == "provider" and spec.get("adaptive", True):
+                limiter = AdaptiveRateLimiter(
+                    spec.get("rate", 0),
+                    spec.get("burst"),
+                    min_rate=spec.get("min_rate"),
+                    max_pause=spec.get("max_pause", 900),
+                )
+            else:
+                limiter = RateLimiter(spec.get("rate", 0), spec.get("burst"))
+            self._buckets[(scope, key)] = (limiter, now)
+        self._evict(now)
+        return limiter
+
+    def _evict(self, now: float) -> None:
+        """Drops idle buckets from the LRU end, and the oldest ones beyond max_keys."""
+        while self._buckets:
+            key, (limiter, last_used) = next(iter(self._buckets.items()))
+            idle = now - last_used > self.idle_ttl
+            if not idle and len(self._buckets) <= self.max_keys:
+                return
+            if limiter.waiting:
+                # Someone is waiting on this bucket; keep it and stop here
+                self._buckets.move_to_end(key)
+                return
+            del self._buckets[key]
+
+    async def acquire(
+        self,
+        provider: Optional[str] = None,
+        host: Optional[str] = None,
+        module: Optional[str] = None,
+        n: int = 1,
+    ) -> None:
+        """Acquires n tokens from every bucket that applies to a request.
+
+        Args:
+            provider: The API provider being called (e.g., 'virustotal').
+            host: The destination hostname.
+            module: The calling module's type (e.g., 'http').
+            n: Number of tokens, for batched requests.
+        """
+        chain: List[RateLimiter] = []
+        for scope, key in (("host", host), ("module", module), ("provider", provider)):
+            if key:
+                limiter = self.bucket(scope, key)
+                if limiter:
+                    chain.append(limiter)
+        for limiter in chain:
+            await limiter.acquire(n)
+        await self.global_limiter.acquire(n)
+
+    def feedback(
+        self, provider: str, status: int, headers: Optional[Mapping[str, Any]] = None
+    ) -> bool:
+        """Lets a provider's adaptive bucket learn from a response.
+
+        Args:
+            provider: The API provider that answered.
+            status: HTTP status code of the response.
+            headers: Response headers (Retry-After, X-RateLimit-Reset, ...).
+
+        Returns:
+            True if an adaptive bucket absorbed the response (and, if it was a
+            throttling response, is now paused); False if the provider has none.
+        """
+        limiter = self.bucket("provider", provider)
+        if not isinstance(limiter, AdaptiveRateLimiter):
+            return False
+        if is_throttled(status, headers):
+            paused = limiter.on_throttle(retry_delay(headers))
+            logger.warning(
+                f"[LIMITER] {provider} throttled us (HTTP {status}); "
+                f"rate now {limiter.rate:.3f}/s, pausing {paused:.1f}s"
+            )
+        elif status < 400:
+            limiter.on_success()
+        return True
+
+    async def __aenter__(self) -> "RateLimiterRegistry":
+        """Async context manager entry (global bucket only)."""
+        await self.acquire()
+        return self
+
+    async def __aexit__(self, exc_type: Any, exc_val: Any, exc_tb: Any) -> None:
+        """Async context manager exit."""
+        pass
@@ -0,0 +1,534 @@
+import asyncio
+import ipaddress
+import logging
+import random
+import struct
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+# DNS record types handled by the resolver
+RECORD_TYPES: Dict[str, int] = {"A": 1, "CNAME": 5, "SOA": 6, "AAAA": 28}
+_TYPE_NAMES = {code: name for name, code in RECORD_TYPES.items()}
+
+# Response codes
+NOERROR = 0
+SERVFAIL = 2
+NXDOMAIN = 3
+
+FALLBACK_NAMESERVERS = ["1.1.1.1", "8.8.8.8"]
+
+
+class DnsError(Exception):
+    """Raised when a DNS message cannot be built or parsed."""
+
+
+class DnsResult:
+    """Outcome of a single (name, record type) lookup.
+
+    Attributes:
+        name: The queried name.
+        rtype: The queried record type (e.g., 'A').
+        records: Answer values of the queried type (addresses or target names).
+        cnames: CNAME targets encountered while resolving, in chain order.
+        ttl: Seconds the result may be cached for.
+        rcode: DNS response code, or None if no nameserver answered.
+    """
+
+    __slots__ = ("name", "rtype", "records", "cnames", "ttl", "rcode")
+
+    def __init__(
+        self,
+        name: str,
+        rtype: str,
+        records: List[str],
+        cnames: List[str],
+        ttl: int,
+        rcode: Optional[int],
+    ):
+        self.name = name
+        self.rtype = rtype
+        self.records = records
+        self.cnames = cnames
+        self.ttl = ttl
+        self.rcode = rcode
+
+    @property
+    def exists(self) -> bool:
+        """True unless the nameserver reported NXDOMAIN."""
+        return self.rcode != NXDOMAIN
+
+    def __repr__(self) -> str:
+        return f"DnsResult({self.name!r}, {self.rtype!r}, records={self.records}, rcode={self.rcode})"
+
+
+def build_query(name: str, rtype: str, query_id: int) -> bytes:
+    """Encodes a recursive DNS query message.
+
+    Args:
+        name: The domain name to query.
+        rtype: Record type name (e.g., 'A').
+        query_id: 16-bit transaction identifier.
+
+    Returns:
+        The wire-format query.
+    """
+    qname = b""
+    for label in name.rstrip(".").split("."):
+        encoded = label.encode("idna") if label else b""
+        if not encoded or len(encoded) > 63:
+            raise DnsError(f"Invalid label in {name!r}")
+        qname += bytes([len(encoded)]) + encoded
+    header = struct.pack("!HHHHHH", query_id, 0x0100, 1, 0, 0, 0)
+    return header + qname + b"\x00" + struct.pack("!HH", RECORD_TYPES[rtype], 1)
+
+
+def _read_name(message: bytes, offset: int) -> Tuple[str, int]:
+    """Decodes a possibly compressed domain name.
+
+    Returns:
+        The dotted name and the offset just past it in the original position.
+    """
+    labels = []
+    end = None
+    jumps = 0
+    while True:
+        if offset >= len(message):
+            raise DnsError("Truncated name")
+        length = message[offset]
+        if length & 0xC0 == 0xC0:
+            if offset + 1 >= len(message):
+                raise DnsError("Truncated compression pointer")
+            if end is None:
+                end = offset + 2
+            offset = ((length & 0x3F) << 8) | message[offset + 1]
+            jumps += 1
+            if jumps > 32:
+                raise DnsError("Compression loop")
+            continue
+        offset += 1
+        if length == 0:
+            break
+        if offset + length > len(message):
+            raise DnsError("Truncated label")
+        labels.append(message[offset : offset + length].decode("ascii", "replace"))
+        offset += length
+    return ".".join(labels).lower(), end if end is not None else offset
+
+
+def parse_response(message: bytes) -> Dict[str, Any]:
+    """Decodes the parts of a DNS response the resolver needs.
+
+    Args:
+        message: The wire-format response.
+
+    Returns:
+        A dictionary with 'id', 'rcode', 'truncated', 'answers' (tuples of
+        owner, type name, ttl, value) and 'soa_minimum' (negative-caching TTL or None).
+
+    Raises:
+        DnsError: If the message is truncated or malformed.
+    """
+    try:
+        return _parse_response(message)
+    except (IndexError, ValueError, struct.error) as e:
+        # Bounds are checked while parsing; anything left is still a bad packet
+        raise DnsError(f"Malformed DNS response: {e}") from e
+
+
+def _parse_response(message: bytes) -> Dict[str, Any]:
+    if len(message) < 12:
+        raise DnsError("Short DNS header")
+    query_id, flags, qdcount, ancount, nscount, _ = struct.unpack("!HHHHHH", message[:12])
+    offset = 12
+    for _ in range(qdcount):
+        _, offset = _read_name(message, offset)
+        offset += 4
+
+    answers = []
+    soa_minimum = None
+    for section in range(ancount + nscount):
+        owner, offset = _read_name(message, offset)
+        if offset + 10 > len(message):
+            raise DnsError("Truncated resource record header")
+        rtype, _, ttl, rdlength = struct.unpack("!HHIH", message[offset : offset + 10])
+        offset += 10
+        rdata_offset = offset
+        offset += rdlength
+        if offset > len(message):
+            raise DnsError("Truncated resource record data")
+        if rtype == 1 and rdlength == 4:
+            value = str(ipaddress.IPv4Address(message[rdata_offset:offset]))
+        elif rtype == 28 and rdlength == 16:
+            value = str(ipaddress.IPv6Address(message[rdata_offset:offset]))
+        elif rtype == 5:
+            value, _ = _read_name(message, rdata_offset)
+        elif rtype == 6 and section >= ancount:
+            # SOA in the authority section: MNAME, RNAME, then five 32-bit fields
+            _, pos = _read_name(message, rdata_offset)
+            _, pos = _read_name(message, pos)
+            if pos + 20 > len(message):
+                raise DnsError("Truncated SOA record")
+            minimum = struct.unpack("!I", message[pos + 16 : pos + 20])[0]
+            soa_minimum = min(ttl, minimum)
+            continue
+        else:
+            continue
+        if section < ancount:
+            answers.append((owner, _TYPE_NAMES[rtype], ttl, value))
+
+    return {
+        "id": query_id,
+        "rcode": flags & 0x000F,
+        "truncated": bool(flags & 0x0200),
+        "answers": answers,
+        "soa_minimum": soa_minimum,
+    }
+
+
+def _parse_nameserver(entry: str) -> Tuple[str, int]:
+    """Splits 'host', 'host:port' or '[v6]:port' into an address tuple."""
+    entry = entry.strip()
+    if entry.startswith("["):
+        host, _, port = entry[1:].partition("]")
+        return host, int(port.lstrip(":") or 53)
+    if entry.count(":") == 1:
+        host, port = entry.split(":")
+        return host, int(port)
+    return entry, 53
+
+
+def system_nameservers(path: str = "/etc/resolv.conf") -> List[str]:
+    """Reads the nameservers configured for the operating system.
+
+    Args:
+        path: Location of resolv.conf.
+
+    Returns:
+        The nameserver addresses, or an empty list if none could be read.
+    """
+    try:
+        lines = Path(path).read_text().splitlines()
+    except OSError:
+        return []
+    servers = []
+    for line in lines:
+        parts = line.split()
+        if len(parts) >= 2 and parts[0] == "nameserver":
+            servers.append(parts[1])
+    return servers
+
+
+class _UdpChannel(asyncio.DatagramProtocol):
+    """One UDP socket per nameserver, multiplexing queries by transaction ID."""
+
+    def __init__(self):
+        self.transport: Optional[asyncio.DatagramTransport] = None
+        self.pending: Dict[int, asyncio.Future] = {}
+
+    def connection_made(self, transport: asyncio.BaseTransport) -> None:
+        self.transport = transport  # type: ignore[assignment]
+
+    def datagram_received(self, data: bytes, addr: Any) -> None:
+        if len(data) < 2:
+            return
+        future = self.pending.pop(struct.unpack("!H", data[:2])[0], None)
+        if future and not future.done():
+            future.set_result(data)
+
+    def error_received(self, exc: Exception) -> None:
+        logger.debug(f"[DNS] UDP error: {exc}")
+
+    def connection_lost(self, exc: Optional[Exception]) -> None:
+        for future in self.pending.values():
+            if not future.done():
+                future.set_exception(ConnectionError("DNS socket closed"))
+        self.pending.clear()
+
+    def next_id(self) -> int:
+        while True:
+            query_id = random.getrandbits(16)
+            if query_id not in self.pending:
+                return query_id
+
+
+class Resolver:
+    """Shared asynchronous DNS resolver with a TTL-aware LRU cache.
+
+    Queries are sent over non-blocking UDP sockets (one per nameserver, multiplexed
+    by transaction ID) and retried over TCP when the response is truncated, so bulk
+    resolution never occupies executor threads. Answers are cached for their TTL
+    (clamped to 'min_ttl'/'max_ttl'); NXDOMAIN and empty answers are cached for the
+    zone's SOA minimum, capped at 'negative_ttl'. Concurrent lookups of the same name
+    share one query.
+
+    Attributes:
+        nameservers: (host, port) tuples queried in rotation.
+        timeout: Seconds to wait for a single attempt.
+        attempts: Total attempts per query across the nameserver list.
+        cache_size: Maximum cached (name, type) entries.
+        stats: Counters for cache hits, misses, negative hits and wire queries.
+    """
+
+    def __init__(
+        self,
+        nameservers: Optional[Sequence[str]] = None,
+        timeout: float = 2.0,
+        attempts: int = 3,
+        concurrency: int = 500,
+        cache_size: int = 10000,
+        min_ttl: int = 0,
+        max_ttl: int = 3600,
+        negative_ttl: int = 300,
+    ):
+        """Initializes the resolver.
+
+        Args:
+            nameservers: Addresses as 'ip' or 'ip:port'. Defaults to the system
+                resolvers, or public resolvers if none are configured.
+            timeout: Per-attempt timeout in seconds. Defaults to 2.0.
+            attempts: Attempts per query, rotating nameservers. Defaults to 3.
+            concurrency: Maximum queries in flight. Defaults to 500.
+            cache_size: Maximum cache entries. Defaults to 10000.
+            min_ttl: Lower bound applied to positive TTLs. Defaults to 0.
+            max_ttl: Upper bound applied to positive TTLs. Defaults to 3600.
+            negative_ttl: Upper bound for caching NXDOMAIN/NODATA. Defaults to 300.
+        """
+        servers = list(nameservers or system_nameservers() or FALLBACK_NAMESERVERS)
+        self.nameservers = [_parse_nameserver(s) for s in servers]
+        self.timeout = timeout
+        self.attempts = max(1, attempts)
+        self.cache_size = cache_size
+        self.min_ttl = min_ttl
+        self.max_ttl = max_ttl
+        self.negative_ttl = negative_ttl
+        self.stats = {"hits": 0, "negative_hits": 0, "misses": 0, "queries": 0}
+        self._concurrency = concurrency
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._cache: "OrderedDict[Tuple[str, str], Tuple[float, DnsResult]]" = OrderedDict()
+        self._inflight: Dict[Tuple[str, str], asyncio.Future] = {}
+        self._channels: Dict[Tuple[str, int], _UdpChannel] = {}
+        self._next_server = 0
+
+    @classmethod
+    def from_config(cls, config: Optional[Dict[str, Any]]) -> "Resolver":
+        """Builds a resolver from the 'dns' configuration section.
+
+        Args:
+            config: Mapping with optional nameservers, timeout, attempts,
+                concurrency, cache_size, min_ttl, max_ttl and negative_ttl.
+
+        Returns:
+            A configured Resolver instance.
+        """
+        config = config or {}
+        keys = ("timeout", "attempts", "concurrency", "cache_size", "min_ttl", "max_ttl", "negative_ttl")
+        return cls(
+            nameservers=config.get("nameservers") or None,
+            **{k: config[k] for k in keys if k in config},
+        )
+
+    # ---- cache -------------------------------------------------------------
+
+    def _cache_get(self, key: Tuple[str, str]) -> Optional[DnsResult]:
+        entry = self._cache.get(key)
+        if entry is None:
+            return None
+        expires, result = entry
+        if expires <= time.monotonic():
+            del self._cache[key]
+            return None
+        self._cache.move_to_end(key)
+        return result
+
+    def _cache_put(self, key: Tuple[str, str], result: DnsResult) -> None:
+        if result.ttl <= 0 or self.cache_size <= 0:
+            return
+        self._cache[key] = (time.monotonic() + result.ttl, result)
+        self._cache.move_to_end(key)
+        while len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+
+    def clear_cache(self) -> None:
+        """Drops every cached answer."""
+        self._cache.clear()
+
+    # ---- lookups -----------------------------------------------------------
+
+    async def query(self, name: str, rtype: str = "A") -> DnsResult:
+        """Looks up one record type for a name, using the cache when possible.
+
+        Args:
+            name: The domain name.
+            rtype: 'A', 'AAAA' or 'CNAME'. Defaults to 'A'.
+
+        Returns:
+            The DnsResult. If no nameserver answered, 'rcode' is None and
+            'records' is empty; such failures are not cached.
+        """
+        name = name.strip().rstrip(".").lower()
+        key = (name, rtype)
+        cached = self._cache_get(key)
+        if cached is not None:
+            if cached.records:
+                self.stats["hits"] += 1
+            else:
+                self.stats["negative_hits"] += 1
+            return cached
+
+        # Coalesce concurrent lookups of the same name onto one query
+        pending = self._inflight.get(key)
+        if pending is not None:
+            return await asyncio.shield(pending)
+
+        self.stats["misses"] += 1
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            result = await self._lookup(name, rtype)
+            self._cache_put(key, result)
+            future.set_result(result)
+            return result
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            # Mark retrieved so an unobserved failure does not warn on garbage collection
+            future.exception()
+            raise
+        finally:
+            self._inflight.pop(key, None)
+
+    async def resolve(self, name: str, rtypes: Sequence[str] = ("A",)) -> List[str]:
+        """Resolves a name to its addresses.
+
+        IP literals are returned unchanged without a query.
+
+        Args:
+            name: The hostname.
+            rtypes: Record types to collect. Defaults to ('A',).
+
+        Returns:
+            A de-duplicated list of addresses (empty if the name does not resolve).
+        """
+        try:
+            return [str(ipaddress.ip_address(name))]
+        except ValueError:
+            pass
+        results = await asyncio.gather(*(self.query(name, t) for t in rtypes))
+        addresses: List[str] = []
+        for result in results:
+            addresses.extend(r for r in result.records if r not in addresses)
+        return addresses
+
+    async def resolve_many(
+        self, names: Iterable[str], rtypes: Sequence[str] = ("A",)
+    ) -> Dict[str, List[str]]:
+        """Resolves many names concurrently, bounded by the resolver's concurrency.
+
+        Args:
+            names: Hostnames to resolve.
+            rtypes: Record types to collect. Defaults to ('A',).
+
+        Returns:
+            A mapping of every unique name to its addresses.
+        """
+        unique = list(dict.fromkeys(names))
+        answers = await asyncio.gather(*(self.resolve(n, rtypes) for n in unique))
+        return dict(zip(unique, answers))
+
+    async def _lookup(self, name: str, rtype: str) -> DnsResult:
+        """Queries the nameservers in rotation until one answers."""
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self._concurrency)
+
+        async with self._semaphore:
+            for attempt in range(self.attempts):
+                server = self.nameservers[self._next_server % len(self.nameservers)]
+                self._next_server += 1
+                self.stats["queries"] += 1
+                try:
+                    response = await self._query_udp(server, name, rtype)
+                    if response["truncated"]:
+                        response = await self._query_tcp(server, name, rtype)
+                except (asyncio.TimeoutError, OSError, DnsError) as e:
+                    logger.debug(f"[DNS] {name}/{rtype} via {server[0]} failed (attempt {attempt + 1}): {e!r}")
+                    continue
+                if response["rcode"] == SERVFAIL:
+                    continue
+                return self._to_result(name, rtype, response)
+
+        logger.debug(f"[DNS] No nameserver answered for {name}/{rtype}")
+        return DnsResult(name, rtype, [], [], 0, None)
+
+    def _to_result(self, name: str, rtype: str, response: Dict[str, Any]) -> DnsResult:
+        """Follows the CNAME chain in an answer section and applies TTL policy."""
+        records, cnames, ttls = [], [], []
+        owner = name
+        by_owner: Dict[str, List[Tuple[str, int, str]]] = {}
+        for answer_owner, answer_type, ttl, value in response["answers"]:
+            by_owner.setdefault(answer_owner, []).append((answer_type, ttl, value))
+
+        for _ in range(16):
+            entries = by_owner.get(owner, [])
+            matches = [(ttl, value) for t, ttl, value in entries if t == rtype]
+            if matches:
+                ttls.extend(ttl for ttl, _ in matches)
+                records.extend(value for _, value in matches)
+                break
+            alias = next(((ttl, value) for t, ttl, value in entries if t == "CNAME"), None)
+            if alias is None:
+                break
+            ttls.append(alias[0])
+            cnames.append(alias[1])
+            owner = alias[1]
+
+        if records:
+            ttl = max(self.min_ttl, min(min(ttls), self.max_ttl))
+        else:
+            soa = response["soa_minimum"]
+            ttl = min(soa if soa is not None else self.negative_ttl, self.negative_ttl)
+        return DnsResult(name, rtype, records, cnames, ttl, response["rcode"])
+
+    async def _channel(self, server: Tuple[str, int]) -> _UdpChannel:
+        channel = self._channels.get(server)
+        if channel is None or channel.transport is None or channel.transport.is_closing():
+            loop = asyncio.get_running_loop()
+            _, channel = await loop.create_datagram_endpoint(_UdpChannel, remote_addr=server)
+            self._channels[server] = channel
+        return channel
+
+    async def _query_udp(self, server: Tuple[str, int], name: str, rtype: str) -> Dict[str, Any]:
+        channel = await self._channel(server)
+        query_id = channel.next_id()
+        future = asyncio.get_running_loop().create_future()
+        channel.pending[query_id] = future
+        try:
+            channel.transport.sendto(build_query(name, rtype, query_id))
+            data = await asyncio.wait_for(future, timeout=self.timeout)
+        finally:
+            channel.pending.pop(query_id, None)
+        return parse_response(data)
+
+    async def _query_tcp(self, server: Tuple[str, int], name: str, rtype: str) -> Dict[str, Any]:
+        query = build_query(name, rtype, random.getrandbits(16))
+        reader, writer = await asyncio.wait_for(asyncio.open_connection(*server), timeout=self.timeout)
+        try:
+            writer.write(struct.pack("!H", len(query)) + query)
+            await writer.drain()
+            length = struct.unpack("!H", await asyncio.wait_for(reader.readexactly(2), self.timeout))[0]
+            data = await asyncio.wait_for(reader.readexactly(length), timeout=self.timeout)
+        finally:
+            writer.close()
+        return parse_response(data)
+
+    async def close(self) -> None:
+        """Closes every nameserver socket."""
+        for channel in self._channels.values():
+            if channel.transport is not None:
+                channel.transport.close()
+        self._channels.clear()
@@ -0,0 +1,355 @@
+import asyncio
+import json
+import logging
+import sqlite3
+import threading
+import time
+import zlib
+from typing import Any, Awaitable, Callable, Dict, Mapping, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# A fetch callback gets the conditional request headers to send and returns
+# (HTTP status, response headers, value to cache); a None value is not cached.
+Fetch = Callable[[Dict[str, str]], Awaitable[Tuple[int, Optional[Mapping[str, Any]], Any]]]
+
+
+class CacheEntry:
+    """A cached value with its expiry and revalidation data.
+
+    Attributes:
+        value: The cached (JSON-serializable) value.
+        etag: ETag of the response the value came from, if any.
+        last_modified: Last-Modified of that response, if any.
+        expires_at: UNIX time after which the entry must be revalidated.
+    """
+
+    __slots__ = ("value", "etag", "last_modified", "expires_at")
+
+    def __init__(
+        self, value: Any, etag: Optional[str], last_modified: Optional[str], expires_at: float
+    ):
+        """Initializes the entry."""
+        self.value = value
+        self.etag = etag
+        self.last_modified = last_modified
+        self.expires_at = expires_at
+
+    @property
+    def fresh(self) -> bool:
+        """True until the entry's TTL runs out."""
+        return time.time() < self.expires_at
+
+    def validators(self) -> Dict[str, str]:
+        """Conditional request headers that let the server answer 304 Not Modified."""
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+
+def _header(headers: Optional[Mapping[str, Any]], name: str) -> Optional[str]:
+    """Case-insensitive header lookup."""
+    if not headers:
+        return None
+    for key, value in headers.items():
+        if key.lower() == name:
+            return str(value)
+    return None
+
+
+class ResponseCache:
+    """On-disk cache of API responses, keyed by provider and query.
+
+    Passive sources (crt.sh, OTX, VirusTotal, ...) return the same data for a
+    target for hours, and they are the slowest and most rate-limited calls of a
+    scan. Modules store the value they extracted from a response here, together
+    with its ETag / Last-Modified, for a per-provider TTL. Within the TTL the
+    value is served without a request; after it, the request is sent with
+    If-None-Match / If-Modified-Since, so a 304 refreshes the entry without a
+    body. Values are stored zlib-compressed in SQLite, and the least recently
+    used entries are evicted once the file exceeds `max_bytes`. Concurrent
+    lookups of the same query (e.g. two modules asking crt.sh about one target)
+    share a single request.
+
+    Attributes:
+        path: SQLite file backing the cache.
+        max_bytes: Upper bound on the total size of stored values.
+        default_ttl: Seconds an entry stays fresh unless its provider overrides it.
+        ttls: Per-provider TTLs in seconds.
+        refresh: If True, entries are never served fresh; every lookup revalidates.
+        hits: Lookups answered from a fresh entry.
+        revalidated: Requests answered 304 Not Modified.
+        misses: Lookups that needed a full response.
+        shared: Lookups that joined a request already in flight for the same query.
+    """
+
+    def __init__(
+        self,
+        path: str = "recon_cache.db",
+        max_bytes: int = 256 * 1024 * 1024,
+        default_ttl: float = 86400,
+        ttls: Optional[Dict[str, float]] = None,
+        refresh: bool = False,
+    ):
+        """Opens (or creates) the cache file.
+
+        Args:
+            path: SQLite file backing the cache.
+            max_bytes: Upper bound on the total size of stored values.
+            default_ttl: Seconds an entry stays fresh by default.
+            ttls: Per-provider TTLs in seconds.
+            refresh: Revalidate every entry instead of serving it while fresh.
+        """
+        self.path = path
+        self.max_bytes = max_bytes
+        self.default_ttl = default_ttl
+        self.ttls = dict(ttls or {})
+        self.refresh = refresh
+        self.hits = 0
+        self.revalidated = 0
+        self.misses = 0
+        self.shared = 0
+        self._in_flight: Dict[Tuple[str, str], "asyncio.Future[Any]"] = {}
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS responses (
+                provider TEXT NOT NULL,
+                key TEXT NOT NULL,
+                body BLOB NOT NULL,
+                size INTEGER NOT NULL,
+                etag TEXT,
+                last_modified TEXT,
+                expires_at REAL NOT NULL,
+                accessed_at REAL NOT NULL,
+                PRIMARY KEY (provider, key)
+            )
+            """
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_responses_accessed ON responses(accessed_at)"
+        )
+        self._conn.commit()
+        self._size = self._conn.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM responses"
+        ).fetchone()[0]
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any], refresh: bool = False) -> "ResponseCache":
+        """Builds a cache from the 'cache' configuration section."""
+        return cls(
+            path=config.get("path", "recon_cache.db"),
+            max_bytes=int(config.get("max_size_mb", 256) * 1024 * 1024),
+            default_ttl=config.get("default_ttl", 86400),
+            ttls=config.get("ttls", {}),
+            refresh=refresh,
+        )
+
+    def ttl_for(self, provider: str) -> float:
+        """Returns the TTL in seconds for a provider's entries."""
+        return self.ttls.get(provider, self.default_ttl)
+
+    def __len__(self) -> int:
+        """Number of stored entries."""
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+
+    @property
+    def size(self) -> int:
+        """Total size of the stored (compressed) values in bytes."""
+        return self._size
+
+    def get(self, provider: str, key: str) -> Optional[CacheEntry]:
+        """Returns the stored entry for a query, fresh or stale, or None.
+
+        Args:
+            provider: The API provider (e.g., 'crt.sh').
+            key: The query, usually the request URL.
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT body, etag, last_modified, expires_at FROM responses "
+                "WHERE provider = ? AND key = ?",
+                (provider, key),
+            ).fetchone()
+            if row is None:
+                return None
+            self._conn.execute(
+                "UPDATE responses SET accessed_at = ? WHERE provider = ? AND key = ?",
+                (time.time(), provider, key),
+            )
+            self._conn.commit()
+        body, etag, last_modified, expires_at = row
+        try:
+            value = json.loads(zlib.decompress(body))
+        except (zlib.error, ValueError):
+            logger.warning(f"[CACHE] Dropping corrupt entry for {provider} {key}")
+            self.delete(provider, key)
+            return None
+        return CacheEntry(value, etag, last_modified, expires_at)
+
+    def put(
+        self,
+        provider: str,
+        key: str,
+        value: Any,
+        headers: Optional[Mapping[str, Any]] = None,
+        ttl: Optional[float] = None,
+    ) -> None:
+        """Stores a value with the validators of the response it came from.
+
+        Args:
+            provider: The API provider.
+            key: The query, usually the request URL.
+            value: JSON-serializable value extracted from the response.
+            headers: Response headers (ETag, Last-Modified).
+            ttl: Seconds the entry stays fresh; defaults to the provider's TTL.
+        """
+        body = zlib.compress(json.dumps(value, separators=(",", ":")).encode())
+        now = time.time()
+        expires_at = now + (self.ttl_for(provider) if ttl is None else ttl)
+        with self._lock:
+            old = self._conn.execute(
+                "SELECT size FROM responses WHERE provider = ? AND key = ?", (provider, key)
+            ).fetchone()
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses "
+                "(provider, key, body, size, etag, last_modified, expires_at, accessed_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    provider,
+                    key,
+                    body,
+                    len(body),
+                    _header(headers, "etag"),
+                    _header(headers, "last-modified"),
+                    expires_at,
+                    now,
+                ),
+            )
+            self._size += len(body) - (old[0] if old else 0)
+            self._evict()
+            self._conn.commit()
+
+    def renew(self, provider: str, key: str, headers: Optional[Mapping[str, Any]] = None) -> None:
+        """Extends a revalidated entry's TTL after a 304 Not Modified.
+
+        Args:
+            provider: The API provider.
+            key: The query.
+            headers: Headers of the 304 response, which may carry a new ETag.
+        """
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "UPDATE responses SET expires_at = ?, accessed_at = ?, "
+                "etag = COALESCE(?, etag), last_modified = COALESCE(?, last_modified) "
+                "WHERE provider = ? AND key = ?",
+                (
+                    now + self.ttl_for(provider),
+                    now,
+                    _header(headers, "etag"),
+                    _header(headers, "last-modified"),
+                    provider,
+                    key,
+                ),
+            )
+            self._conn.commit()
+
+    def delete(self, provider: str, key: str) -> None:
+        """Removes one entry."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT size FROM responses WHERE provider = ? AND key = ?", (provider, key)
+            ).fetchone()
+            if row:
+                self._conn.execute(
+                    "DELETE FROM responses WHERE provider = ? AND key = ?", (provider, key)
+                )
+                self._size -= row[0]
+                self._conn.commit()
+
+    def clear(self, provider: Optional[str] = None) -> None:
+        """Removes every entry, or every entry of one provider."""
+        with self._lock:
+            if provider is None:
+                self._conn.execute("DELETE FROM responses")
+            else:
+                self._conn.execute("DELETE FROM responses WHERE provider = ?", (provider,))
+            self._conn.commit()
+            self._size = self._conn.execute(
+                "SELECT COALESCE(SUM(size), 0) FROM responses"
+            ).fetchone()[0]
+
+    def _evict(self) -> None:
+        """Drops least recently used entries until the cache fits (lock held)."""
+        if self._size <= self.max_bytes:
+            return
+        rows = self._conn.execute(
+            "SELECT provider, key, size FROM responses ORDER BY accessed_at"
+        ).fetchall()
+        evicted = 0
+        for provider, key, size in rows:
+            if self._size <= self.max_bytes:
+                break
+            self._conn.execute(
+                "DELETE FROM responses WHERE provider = ? AND key = ?", (provider, key)
+            )
+            self._size -= size
+            evicted += 1
+        logger.debug(f"[CACHE] Evicted {evicted} entries to stay under {self.max_bytes} bytes")
+
+    async def fetch(self, provider: str, key: str, fetch: Fetch) -> Any:
+        """Returns a query's value from the cache, revalidating or fetching as needed.
+
+        Args:
+            provider: The API provider.
+            key: The query, usually the request URL.
+            fetch: Performs the request with the given conditional headers and
+                returns (status, headers, value). Called only if no fresh entry exists
+                and no other lookup of the same query is in flight.
+
+        Returns:
+            The cached or freshly fetched value; None if the request failed.
+        """
+        query = (provider, key)
+        pending = self._in_flight.get(query)
+        if pending is not None:
+            self.shared += 1
+            logger.debug(f"[CACHE] Joining the request in flight for {provider} {key}")
+            return await asyncio.shield(pending)
+        task = asyncio.ensure_future(self._lookup(provider, key, fetch))
+        self._in_flight[query] = task
+        task.add_done_callback(lambda _: self._in_flight.pop(query, None))
+        # A cancelled caller must not cancel the request the others are waiting on
+        return await asyncio.shield(task)
+
+    async def _lookup(self, provider: str, key: str, fetch: Fetch) -> Any:
+        entry = await asyncio.to_thread(self.get, provider, key)
+        if entry is not None and entry.fresh and not self.refresh:
+            self.hits += 1
+            logger.debug(f"[CACHE] Hit for {provider} {key}")
+            return entry.value
+
+        status, headers, value = await fetch(entry.validators() if entry else {})
+        if status == 304 and entry is not None:
+            self.revalidated += 1
+            logger.debug(f"[CACHE] {provider} {key} not modified")
+            await asyncio.to_thread(self.renew, provider, key, headers)
+            return entry.value
+
+        self.misses += 1
+        if value is not None:
+            await asyncio.to_thread(self.put, provider, key, value, headers)
+        return value
+
+    def close(self) -> None:
+        """Closes the cache file."""
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,148 @@
+import asyncio
+import logging
+import queue
+import threading
+import time
+from typing import Any, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+_STOP = object()
+
+
+class _FlushRequest:
+    """Marker asking the writer thread to commit everything queued before it."""
+
+    def __init__(self, loop: asyncio.AbstractEventLoop, future: asyncio.Future):
+        self.loop = loop
+        self.future = future
+
+    def resolve(self) -> None:
+        self.loop.call_soon_threadsafe(_set_done, self.future)
+
+
+def _set_done(future: asyncio.Future) -> None:
+    if not future.done():
+        future.set_result(None)
+
+
+class ResultWriter:
+    """Write-behind queue that persists module findings off the event loop.
+
+    Modules hand findings to 'submit', which only enqueues them. A dedicated
+    thread drains the queue, serializes the payloads and commits them with
+    'executemany' in one transaction per batch. A batch is committed when it
+    reaches 'batch_size' rows or 'flush_interval' seconds after its first row,
+    whichever comes first, and on every explicit 'flush'. A batch that fails is
+    retried row by row, so one bad finding only loses itself.
+
+    Attributes:
+        db: The Database receiving the batches.
+        batch_size: Maximum rows committed per transaction.
+        flush_interval: Maximum seconds a queued row waits before being committed.
+    """
+
+    def __init__(self, db: Any, batch_size: int = 500, flush_interval: float = 0.5):
+        """Initializes the writer and starts its drain thread.
+
+        Args:
+            db: An initialized Database instance.
+            batch_size: Rows per transaction. Defaults to 500.
+            flush_interval: Seconds before a partial batch is committed. Defaults to 0.5.
+        """
+        self.db = db
+        self.batch_size = max(1, batch_size)
+        self.flush_interval = flush_interval
+        # A thread-safe queue is required because the consumer is a thread, not a coroutine
+        self._queue: "queue.Queue[Any]" = queue.Queue()
+        self._closed = False
+        self._thread = threading.Thread(target=self._drain, name="result-writer", daemon=True)
+        self._thread.start()
+
+    def submit(
+        self,
+        target: str,
+        module: str,
+        source: str,
+        result_type: str,
+        data: Any,
+        scan_id: Optional[str] = None,
+    ) -> None:
+        """Queues a finding for persistence without blocking.
+
+        Args:
+            target: The target domain or IP.
+            module: The name of the module that generated the result.
+            source: The specific source or tool within the module.
+            result_type: The category of the result.
+            data: The finding payload (serialized on the writer thread).
+            scan_id: Optional scan session identifier.
+        """
+        if self._closed:
+            raise RuntimeError("ResultWriter is closed")
+        self._queue.put((scan_id, target, module, source, result_type, data))
+
+    async def flush(self) -> None:
+        """Waits until every finding submitted so far has been committed."""
+        if self._closed:
+            return
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._queue.put(_FlushRequest(loop, future))
+        await future
+
+    async def close(self) -> None:
+        """Flushes pending findings and stops the drain thread."""
+        if self._closed:
+            return
+        await self.flush()
+        self._closed = True
+        self._queue.put(_STOP)
+        await asyncio.to_thread(self._thread.join)
+
+    def _store(self, rows: List[Tuple[Any, ...]]) -> bool:
+        """Commits rows in one transaction; never raises, so the drain thread survives."""
+        try:
+            return self.db.store_results_batch(rows) > 0
+        except Exception as e:
+            logger.error(f"[WRITER] Failed to store {len(rows)} results: {e}")
+            return False
+
+    def _commit(self, pending: List[Tuple[Any, ...]]) -> None:
+        if not pending:
+            return
+        if not self._store(pending) and len(pending) > 1:
+            # The transaction was rolled back; keep every row but the bad ones
+            logger.warning(f"[WRITER] Retrying a failed batch of {len(pending)} row by row")
+            lost = sum(not self._store([row]) for row in pending)
+            if lost:
+                logger.error(f"[WRITER] Dropped {lost} of {len(pending)} results")
+        pending.clear()
+
+    def _drain(self) -> None:
+        """Writer thread body: batches queued rows into transactions."""
+        pending: List[Tuple[Any, ...]] = []
+        deadline = 0.0
+        while True:
+            timeout = max(0.0, deadline - time.monotonic()) if pending else None
+            try:
+                item = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                self._commit(pending)
+                continue
+
+            if item is _STOP:
+                self._commit(pending)
+                return
+            if isinstance(item, _FlushRequest):
+                try:
+                    self._commit(pending)
+                finally:
+                    item.resolve()
+                continue
+
+            if not pending:
+                deadline = time.monotonic() + self.flush_interval
+            pending.append(item)
+            if len(pending) >= self.batch_size:
+                self._commit(pending)
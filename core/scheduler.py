@@ -0,0 +1,171 @@
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence, Set, TypeVar
+
+logger = logging.getLogger(__name__)
+
+# Artifact kinds exchanged between modules. Modules declare which of these they
+# consume and produce; the scheduler derives the execution order from them.
+SUBDOMAINS = "subdomains"
+IPS = "ips"
+OPEN_PORTS = "open_ports"
+HTTP_URLS = "http_urls"
+
+T = TypeVar("T")
+
+
+class DependencyCycleError(ValueError):
+    """Raised when module consume/produce declarations form a cycle."""
+
+
+async def run_with_timeout(
+    run: Awaitable[T], timeout: float, inputs_complete: Optional[Awaitable[None]] = None
+) -> T:
+    """Awaits a module's run, starting its timeout once its inputs are complete.
+
+    A streaming module runs alongside its producers, so the time it spends
+    waiting for them must not count against its own timeout.
+
+    Args:
+        run: The module's run coroutine.
+        timeout: Seconds the run may take after its inputs are complete.
+        inputs_complete: Awaitable resolving when every upstream producer has
+            finished; None starts the timeout immediately.
+
+    Returns:
+        The run's result.
+
+    Raises:
+        asyncio.TimeoutError: If the run outlived the timeout.
+    """
+    task = asyncio.ensure_future(run)
+    if inputs_complete is not None:
+        waiter = asyncio.ensure_future(inputs_complete)
+        try:
+            await asyncio.wait({task, waiter}, return_when=asyncio.FIRST_COMPLETED)
+        except BaseException:
+            task.cancel()
+            raise
+        finally:
+            waiter.cancel()
+    return await asyncio.wait_for(task, timeout)
+
+
+class DagScheduler:
+    """Runs modules as a dependency graph instead of fixed sequential phases.
+
+    Each module is launched as soon as every module producing an artifact it
+    consumes has finished, so independent branches of the pipeline (e.g. port
+    scanning and passive subdomain discovery) overlap and total wall-clock time
+    approaches the critical path rather than the sum of the slowest module per phase.
+    Modules that stream their inputs from the FindingBus ('streams_input') start
+    immediately and consume findings while their producers are still running;
+    runners should time them with run_with_timeout() and inputs_complete() so
+    that waiting for producers does not count against a module's timeout.
+
+    Attributes:
+        modules: The module instances to schedule.
+        runner: Coroutine function invoked to execute a single module.
+        dependencies: Maps each module index to the indexes of its upstream modules.
+    """
+
+    def __init__(
+        self,
+        modules: Sequence[Any],
+        runner: Callable[[Any], Awaitable[None]],
+    ):
+        """Initializes the scheduler and validates the dependency graph.
+
+        Args:
+            modules: Module instances exposing 'consumes' and 'produces' tuples.
+            runner: Async callable that executes one module and handles its errors.
+
+        Raises:
+            DependencyCycleError: If the declared dependencies contain a cycle.
+        """
+        self.modules = list(modules)
+        self.runner = runner
+        self.dependencies = self._build_graph()
+        self._check_acyclic()
+        self._finished = [asyncio.Event() for _ in self.modules]
+
+    def _build_graph(self) -> Dict[int, Set[int]]:
+        """Maps every module to the set of modules producing what it consumes.
+
+        Returns:
+            A dictionary of module index to upstream module indexes.
+        """
+        producers: Dict[str, List[int]] = {}
+        for idx, module in enumerate(self.modules):
+            for kind in getattr(module, "produces", ()):
+                producers.setdefault(kind, []).append(idx)
+
+        graph: Dict[int, Set[int]] = {}
+        for idx, module in enumerate(self.modules):
+            upstream: Set[int] = set()
+            for kind in getattr(module, "consumes", ()):
+                upstream.update(p for p in producers.get(kind, []) if p != idx)
+            graph[idx] = upstream
+        return graph
+
+    def _check_acyclic(self) -> None:
+        """Verifies the graph is a DAG using Kahn's algorithm.
+
+        Raises:
+            DependencyCycleError: If one or more modules can never become ready.
+        """
+        remaining = {idx: set(deps) for idx, deps in self.dependencies.items()}
+        ready = [idx for idx, deps in remaining.items() if not deps]
+        visited = 0
+        while ready:
+            current = ready.pop()
+            visited += 1
+            for idx, deps in remaining.items():
+                if current in deps:
+                    deps.discard(current)
+                    if not deps:
+                        ready.append(idx)
+
+        if visited != len(self.modules):
+            stuck = [
+                f"{self.modules[idx].module_type}/{self.modules[idx].name}"
+                for idx, deps in remaining.items()
+                if deps
+            ]
+            raise DependencyCycleError(f"Dependency cycle between modules: {', '.join(stuck)}")
+
+    def upstream_of(self, module: Any) -> List[Any]:
+        """Returns the modules that must finish before the given module starts.
+
+        Args:
+            module: A module instance managed by this scheduler.
+
+        Returns:
+            A list of upstream module instances.
+        """
+        idx = self.modules.index(module)
+        return [self.modules[d] for d in sorted(self.dependencies[idx])]
+
+    async def inputs_complete(self, module: Any) -> None:
+        """Waits until every upstream module of the given module has finished.
+
+        Args:
+            module: A module instance managed by this scheduler.
+        """
+        for dep in self.dependencies[self.modules.index(module)]:
+            await self._finished[dep].wait()
+
+    async def run(self) -> None:
+        """Executes every module, each one starting as soon as its inputs are available."""
+
+        async def launch(idx: int) -> None:
+            module = self.modules[idx]
+            if not getattr(module, "streams_input", False):
+                await self.inputs_complete(module)
+            try:
+                await self.runner(module)
+            finally:
+                # Downstream modules are released even if this one failed
+                self._finished[idx].set()
+
+        await asyncio.gather(*(launch(idx) for idx in range(len(self.modules))))
@@ -1,7 +1,10 @@
 import logging
 import re
+from functools import lru_cache
 from typing import Any, Dict, List, Set
 
+from core.names import NameSet, Scope, extract_hostnames
+
 logger = logging.getLogger(__name__)
 
 
@@ -50,7 +53,12 @@ def extract_subdomains(target: str, text: str) -> List[str]:
     Returns:
         A sorted list of unique subdomain strings discovered in the text.
     """
-    # Regex pattern for domains ending with the target domain
-    pattern = rf"([a-z0-9.-]+\.{re.escape(target)})"
-    matches = re.findall(pattern, text.lower())
-    return sorted(list(set(matches)))
+    # One precompiled hostname pattern for every target; the scope trie then
+    # rejects look-alikes such as 'evilexample.com'
+    return sorted(NameSet(_subdomain_scope(target), extract_hostnames(text)))
+
+
+@lru_cache(maxsize=64)
+def _subdomain_scope(target: str) -> Scope:
+    """Returns the (cached) scope holding only the subdomains of a target."""
+    return Scope([f"*.{target}"])
@@ -9,6 +9,12 @@ def main():
     parser.add_argument("target", nargs="?", help="Domain to scan (e.g., example.com)")
     parser.add_argument("--config", default="config/default.yaml", help="Path to config file")
     parser.add_argument("--web", action="store_true", help="Launch the web dashboard")
+    parser.add_argument(
+        "--no-cache", action="store_true", help="Query passive sources without the response cache"
+    )
+    parser.add_argument(
+        "--refresh", action="store_true", help="Revalidate cached passive-source responses"
+    )
     
     args = parser.parse_args()
 
@@ -23,7 +29,14 @@ def main():
         sys.exit(1)
 
     try:
-        asyncio.run(run_scan(args.target, args.config))
+        asyncio.run(
+            run_scan(
+                args.target,
+                args.config,
+                use_cache=not args.no_cache,
+                refresh_cache=args.refresh,
+            )
+        )
     except KeyboardInterrupt:
         print("\n[!] Scan interrupted by user.")
         sys.exit(0)
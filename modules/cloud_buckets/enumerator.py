@@ -1,8 +1,7 @@
 import asyncio
 import logging
 from typing import Any, Dict, List, Optional
-
-import aiohttp
+from urllib.parse import urlparse
 
 from core.module_loader import BaseModule
 
@@ -48,14 +47,13 @@ class CloudBucketEnumerator(BaseModule):
                 f"[CLOUD] Checking {len(bucket_names)} patterns across {len(providers)} providers..."
             )
 
-            async with aiohttp.ClientSession(**self.get_session_kwargs()) as session:
-                tasks = []
-                for name in bucket_names:
-                    for provider in providers:
-                        tasks.append(self.check_bucket(session, name, provider))
+            tasks = []
+            for name in bucket_names:
+                for provider in providers:
+                    tasks.append(self.check_bucket(name, provider))
 
-                results = await asyncio.gather(*tasks)
-                findings = [f for f in results if f is not None]
+            results = await asyncio.gather(*tasks)
+            findings = [f for f in results if f is not None]
 
             if findings:
                 self.store_results(
@@ -68,22 +66,16 @@ class CloudBucketEnumerator(BaseModule):
         except Exception as e:
             logger.error(f"[CLOUD] Enumeration failed: {e}")
 
-    async def check_bucket(
-        self, session: aiohttp.ClientSession, name: str, provider: str
-    ) -> Optional[Dict[str, Any]]:
+    async def check_bucket(self, name: str, provider: str) -> Optional[Dict[str, Any]]:
         """Probes a single bucket endpoint to determine existence and permissions.
 
         Args:
-            session: An active aiohttp session.
             name: The bucket name to check.
             provider: The cloud provider string ('aws', 'azure', or 'gcp').
 
         Returns:
             A dictionary containing bucket details if found, else None.
         """
-        if self.limiter:
-            await self.limiter.acquire()
-
         # Construct provider-specific URL
         url = ""
         if provider == "aws":
@@ -96,10 +88,12 @@ class CloudBucketEnumerator(BaseModule):
         if not url:
             return None
 
+        host = urlparse(url).hostname
+        await self.throttle(provider=provider, host=host)
         try:
             # Use HEAD request for efficiency (check status without downloading content)
-            async with session.head(
-                url, timeout=5, allow_redirects=True, proxy=self.get_request_proxy()
+            async with self.http_session(host) as session, session.head(
+                url, timeout=5, allow_redirects=True, proxy=self.get_request_proxy(host)
             ) as response:
                 if response.status in [200, 403]:
                     # 200 = Publicly accessible, 403 = Exists but access denied
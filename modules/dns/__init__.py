@@ -0,0 +1 @@
+# DNS Resolution
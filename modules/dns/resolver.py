@@ -0,0 +1,137 @@
+import asyncio
+import logging
+import secrets
+from typing import Any, Dict, List, Set
+
+from core.module_loader import BaseModule
+from core.names import NameSet
+from core.resolver import Resolver
+from core.scheduler import IPS, SUBDOMAINS
+
+logger = logging.getLogger(__name__)
+
+
+class MassResolver(BaseModule):
+    """Resolves every discovered subdomain and publishes the unique IPs behind them.
+
+    Subdomains are resolved concurrently as upstream modules publish them. Names
+    whose answers match a wildcard record of their parent zone are dropped, and the
+    surviving (host, ip) pairs are streamed to downstream modules so port scanning
+    can work on unique IPs rather than hostnames.
+    """
+
+    consumes = (SUBDOMAINS,)
+    produces = (IPS,)
+    streams_input = True
+
+    @property
+    def name(self) -> str:
+        """The module name."""
+        return "resolver"
+
+    @property
+    def module_type(self) -> str:
+        """The module category."""
+        return "dns"
+
+    async def run(self, target: str) -> None:
+        """Main execution logic for the mass resolution module.
+
+        Args:
+            target: The root domain whose subdomains are resolved.
+        """
+        # A dedicated resolver list (e.g. bulk public resolvers) overrides the shared one
+        own_resolver = None
+        if self.config.get("nameservers") or not self.resolver:
+            own_resolver = Resolver.from_config(self.config)
+        resolver = own_resolver or self.resolver
+        probes = self.config.get("wildcard_probes", 3)
+
+        wildcards: Dict[str, "asyncio.Task[Set[str]]"] = {}
+        ip_hosts: Dict[str, Set[str]] = {}
+        records: List[Dict[str, Any]] = []
+        stats = {"resolved": 0, "unresolved": 0, "wildcard": 0}
+        tasks: List[asyncio.Task] = []
+        # Normalizes, dedupes and applies scope exclusions before anything is resolved
+        seen = NameSet(self.scope(target))
+
+        async def detect_wildcard(zone: str) -> Set[str]:
+            """Returns the addresses random names under a zone resolve to (empty if none)."""
+            names = [f"{secrets.token_hex(8)}.{zone}" for _ in range(probes)]
+            answers = await resolver.resolve_many(names)
+            addresses = set().union(*answers.values()) if answers else set()
+            if addresses:
+                logger.info(f"[DNS] Wildcard DNS detected for *.{zone} -> {sorted(addresses)}")
+            return addresses
+
+        def wildcard_ips(zone: str) -> "asyncio.Task[Set[str]]":
+            if zone not in wildcards:
+                wildcards[zone] = asyncio.create_task(detect_wildcard(zone))
+            return wildcards[zone]
+
+        async def lookup(host: str) -> None:
+            addresses = await resolver.resolve(host)
+            if not addresses:
+                stats["unresolved"] += 1
+                return
+
+            # Compare against random names in the parent zone (e.g. *.dev.example.com)
+            zone = host.partition(".")[2] if host != target else ""
+            if zone == target or zone.endswith(f".{target}"):
+                if set(addresses) <= await wildcard_ips(zone):
+                    stats["wildcard"] += 1
+                    return
+
+            stats["resolved"] += 1
+            for ip in addresses:
+                records.append({"host": host, "ip": ip})
+                ip_hosts.setdefault(ip, set()).add(host)
+                self.publish(IPS, {"ip": ip, "host": host})
+
+        async def resolve(host: str) -> None:
+            # One failing lookup must not lose the records gathered for every other name
+            try:
+                await lookup(host)
+            except Exception as e:
+                stats["unresolved"] += 1
+                logger.debug(f"[DNS] Lookup of {host} failed: {e}")
+
+        def schedule(host: str) -> None:
+            host = seen.add(host)
+            if host is not None:
+                tasks.append(asyncio.create_task(resolve(host)))
+
+        try:
+            logger.info(f"[DNS] Resolving subdomains of {target} as they are discovered...")
+            schedule(target)
+            async for item in self.iter_findings(target, SUBDOMAINS):
+                if item.get("subdomain"):
+                    schedule(item["subdomain"])
+            await asyncio.gather(*tasks)
+
+            if records:
+                self.store_results(target, "mass_resolver", "dns", records)
+            detected = {
+                zone: sorted(t.result())
+                for zone, t in wildcards.items()
+                if t.done() and not t.cancelled() and t.exception() is None and t.result()
+            }
+            if detected:
+                self.store_results(
+                    target,
+                    "wildcard_detection",
+                    "dns_wildcard",
+                    [{"zone": zone, "ips": ips} for zone, ips in detected.items()],
+                )
+
+            logger.info(
+                f"[DNS] {len(seen)} names: {stats['resolved']} resolved to {len(ip_hosts)} unique IPs, "
+                f"{stats['wildcard']} wildcard, {stats['unresolved']} unresolved"
+            )
+        except Exception as e:
+            logger.error(f"[DNS] Module execution failed: {e}")
+        finally:
+            for task in tasks + list(wildcards.values()):
+                task.cancel()
+            if own_resolver:
+                await own_resolver.close()
@@ -43,46 +43,57 @@ class GithubDorker(BaseModule):
             )
 
             findings = []
+            forbidden = False
             logger.info(f"[GITHUB] Initiating search for {target}...")
 
             for template in dork_templates:
                 query = template.format(domain=target)
                 logger.info(f"[GITHUB] Executing dork: {query}")
 
-                if self.limiter:
-                    await self.limiter.acquire()
-
-                try:
-                    # PyGithub is synchronous/blocking; offload to a thread
-                    results = await asyncio.to_thread(g.search_code, query)
-
-                    # Limit to top 10 results per dork to avoid excessive noise/limits
-                    count = 0
-                    for file in results:
-                        if count >= 10:
-                            break
-
-                        findings.append(
-                            {
-                                "query": query,
-                                "url": file.html_url,
-                                "repository": file.repository.full_name,
-                                "path": file.path,
-                            }
-                        )
-                        count += 1
-
-                    logger.debug(f"[GITHUB] Found {count} results for: {query}")
-
-                except GithubException as e:
-                    if e.status == 403:
-                        logger.warning(
-                            "[GITHUB] Rate limit hit or search is forbidden for this account"
-                        )
-                        break
-                    logger.error(f"[GITHUB] API error for query '{query}': {e}")
-                except Exception as e:
-                    logger.error(f"[GITHUB] Unexpected dorking error: {e}")
+                for _ in range(self.config.get("max_retries", 2) + 1):
+                    await self.throttle(provider="github")
+
+                    try:
+                        # PyGithub is synchronous/blocking; offload to a thread
+                        results = await asyncio.to_thread(g.search_code, query)
+
+                        # Limit to top 10 results per dork to avoid excessive noise/limits
+                        count = 0
+                        for file in results:
+                            if count >= 10:
+                                break
+
+                            findings.append(
+                                {
+                                    "query": query,
+                                    "url": file.html_url,
+                                    "repository": file.repository.full_name,
+                                    "path": file.path,
+                                }
+                            )
+                            count += 1
+
+                        await self.rate_feedback("github", 200)
+                        logger.debug(f"[GITHUB] Found {count} results for: {query}")
+
+                    except GithubException as e:
+                        # Secondary rate limits come back as 403 with Retry-After
+                        if await self.rate_feedback("github", e.status, getattr(e, "headers", None)):
+                            logger.warning(f"[GITHUB] Rate limited on '{query}'; retrying")
+                            continue
+                        if e.status == 403:
+                            logger.warning("[GITHUB] Search is forbidden for this account")
+                            forbidden = True
+                        else:
+                            logger.error(f"[GITHUB] API error for query '{query}': {e}")
+                    except Exception as e:
+                        logger.error(f"[GITHUB] Unexpected dorking error: {e}")
+                    break
+                else:
+                    logger.error(f"[GITHUB] Still rate limited on '{query}'; giving up")
+
+                if forbidden:
+                    break
 
             if findings:
                 self.store_results(target, "github_dorker", "github", findings)
@@ -1,22 +1,69 @@
 import asyncio
 import logging
-from typing import Any, Dict, List, Set
+from typing import Any, Dict, List, Optional, Set, Tuple
 
 import aiohttp
-from bs4 import BeautifulSoup
+from yarl import URL
 
 from core.module_loader import BaseModule
+from core.scheduler import HTTP_URLS, OPEN_PORTS, SUBDOMAINS
+from modules.http.head import HeadExtractor
+from modules.http.planner import Candidate, ProbePlanner, sniff_scheme
+from modules.http.similarity import ServiceClusterer, body_features, favicon_hash, simhash
+from modules.http.tech import TechMatcher, get_matcher
 
 logger = logging.getLogger(__name__)
 
+# Icons larger than this are not favicons worth hashing
+FAVICON_MAX_BYTES = 1024 * 1024
+
+
+def analyze_body(
+    body: bytes,
+    charset: str,
+    matcher: Optional[TechMatcher],
+    cluster: bool,
+    headers: List[Tuple[str, str]],
+    cookies: Dict[str, str],
+    url: URL,
+) -> Tuple[List[Dict[str, Any]], Optional[int]]:
+    """Fingerprints a response's technologies and body; safe to run on a worker thread.
+
+    Args:
+        body: The first max_body_bytes of the body.
+        charset: The page's charset, as HeadExtractor found it.
+        matcher: The signature matcher, or None if technology detection is off.
+        cluster: Whether to compute the body SimHash.
+        headers: Response header (name, value) pairs.
+        cookies: Response cookies by name.
+        url: The final URL.
+
+    Returns:
+        (technologies, body SimHash or None).
+    """
+    text = body.decode(charset, errors="replace")
+    technologies = matcher.match(headers, cookies, text, str(url)) if matcher else []
+    fingerprint = simhash(body_features(text, url.host)) if cluster else None
+    return technologies, fingerprint
+
 
 class HttpDetector(BaseModule):
     """Detects and probes HTTP/HTTPS services on discovered subdomains.
 
-    Identifies active web servers, retrieves page titles, and extracts server headers.
-    Prioritizes subdomains that were found to have common web ports open.
+    Identifies active web servers, retrieves page titles and head metadata
+    (generator, canonical URL, meta refresh), and extracts server headers.
+    Every open port the port scanner reports is probed as a candidate web
+    service, on standard and non-standard ports alike. Each response is also
+    fingerprinted against a Wappalyzer-style signature database to name the
+    technologies behind the URL, and near-identical services (default pages,
+    parked domains, one login portal on many hosts) are clustered by body
+    SimHash and favicon hash.
     """
 
+    consumes = (SUBDOMAINS, OPEN_PORTS)
+    produces = (HTTP_URLS,)
+    streams_input = True
+
     @property
     def name(self) -> str:
         """The module name."""
@@ -30,116 +77,281 @@ class HttpDetector(BaseModule):
     async def run(self, target: str) -> None:
         """Main execution logic for the HTTP Detector module.
 
+        Open ports reported by the port scanner are probed as soon as they are
+        published, one request per service with the scheme taken from the
+        port's fingerprint. Hosts with no port information (no port scan in the
+        scan, or one that found nothing) are probed on ports 80 and 443, up to
+        'probing_limit' hosts.
+
         Args:
             target: The domain to probe for HTTP services.
         """
+        tasks: List[asyncio.Task] = []
         try:
-            # 1. Collect subdomains from the database (discovery results)
-            discovery_results = self.db.get_results(target, module="subdomain")
-            subdomains: Set[str] = set()
-            for res in discovery_results:
-                data = res.get("data", [])
-                items = data if isinstance(data, list) else [data]
-                for item in items:
-                    if isinstance(item, dict) and "subdomain" in item:
-                        subdomains.add(item["subdomain"])
-
-            # 2. Collect targets from portscan results that had HTTP-ready ports
-            port_results = self.db.get_results(target, module="portscan")
-            prioritized: Set[str] = set()
-            for res in port_results:
-                items = res.get("data", [])
-                if not isinstance(items, list):
-                    items = [items]
-                for item in items:
-                    if item.get("port") in [80, 443, 8000, 8080, 8443, 8888]:
-                        # If we have a 'host' or 'target' from the portscan, use it
-                        prioritized.add(item.get("host") or target)
-
-            # 3. Combine and limit targets to ensure stability
-            all_targets = list(prioritized) + [
-                s for s in subdomains if s not in prioritized
-            ]
-            if not all_targets:
-                all_targets = [target]
-
+            # 1. Probing configuration
             limit = self.config.get("probing_limit", 100)
-            if len(all_targets) > limit:
-                logger.info(
-                    f"[HTTP] Limiting probes to {limit} out of {len(all_targets)} targets"
-                )
-                all_targets = all_targets[:limit]
-
-            # 4. Probing configuration
             timeout = aiohttp.ClientTimeout(total=5, connect=3)
             concurrency = self.config.get("concurrency", 20)
+            max_bytes = self.config.get("max_head_bytes", 128 * 1024)
+            sniff_timeout = self.config.get("sniff_timeout", 3)
+            matcher = self._tech_matcher()
+            clusterer = (
+                ServiceClusterer(self.config.get("cluster_distance", 6))
+                if self.config.get("clustering", True)
+                else None
+            )
+            body_bytes = self.config.get("max_body_bytes", 128 * 1024)
+            favicons: Dict[str, asyncio.Task] = {}  # icon URL -> hash, fetched once
             semaphore = asyncio.Semaphore(concurrency)
+            planner = ProbePlanner()
+            final_urls: Set[str] = set()
+            stats = {"requests": 0, "duplicates": 0}
 
-            async def probe(host: str, session: aiohttp.ClientSession) -> List[Dict[str, Any]]:
-                """Probes both HTTP and HTTPS for a given host."""
-                async with semaphore:
-                    results = []
-                    for proto in ["http", "https"]:
-                        url = f"{proto}://{host}"
-                        if self.limiter:
-                            await self.limiter.acquire()
-                        try:
-                            async with session.get(
-                                url,
-                                timeout=timeout,
-                                allow_redirects=True,
-                                ssl=False,
-                                proxy=self.get_request_proxy(),
-                            ) as response:
-                                # Read limited content for title extraction
-                                body = await response.content.read(128 * 1024)
-                                html = body.decode("utf-8", errors="ignore")
-                                soup = BeautifulSoup(html, "lxml")
-                                title = (
-                                    soup.title.string.strip()
-                                    if soup.title and soup.title.string
-                                    else "No Title"
-                                )
+            async def fetch(
+                candidate: Candidate, scheme: str
+            ) -> Optional[Tuple[str, Dict[str, Any], Optional[int]]]:
+                """Requests one URL.
 
-                                results.append(
-                                    {
-                                        "url": str(response.url),
-                                        "status": response.status,
-                                        "server": response.headers.get("Server", "N/A"),
-                                        "title": title,
-                                        "x-powered-by": response.headers.get(
-                                            "X-Powered-By", "N/A"
-                                        ),
-                                    }
+                Returns:
+                    (final URL, finding, body SimHash), or None without an answer.
+                """
+                host = candidate.host
+                # Sessions are per host, so each host keeps its assigned proxy
+                async with semaphore, self.http_session(host) as session:
+                    await self.throttle(host=host)
+                    stats["requests"] += 1
+                    try:
+                        async with session.get(
+                            candidate.url(scheme),
+                            timeout=timeout,
+                            allow_redirects=True,
+                            ssl=False,
+                            proxy=self.get_request_proxy(host),
+                        ) as response:
+                            # Read only as far as the end of <head>, or further
+                            # into the body when it is fingerprinted or clustered
+                            head = HeadExtractor(response.charset, max_bytes)
+                            body = bytearray()
+                            wanted = body_bytes if matcher or clusterer else 0
+                            async for chunk in response.content.iter_any():
+                                if len(body) < wanted:
+                                    body += chunk[: wanted - len(body)]
+                                if head.feed(chunk) and len(body) >= wanted:
+                                    break
+                            page = head.result()
+                            # Spell out an empty path so 'http://h' and 'http://h/' compare equal
+                            final = response.url.with_fragment(None)
+                            final = final.with_path(final.path).with_query(final.query)
+
+                            finding = {
+                                "url": str(final),
+                                "status": response.status,
+                                "server": response.headers.get("Server", "N/A"),
+                                "title": page["title"] or "No Title",
+                                "x-powered-by": response.headers.get("X-Powered-By", "N/A"),
+                            }
+                            for key in ("generator", "canonical", "refresh", "icon"):
+                                if page[key]:
+                                    finding[key] = page[key]
+                            # Decoding, the signature scan and the SimHash are CPU-bound:
+                            # run them on a worker thread, off the event loop
+                            fingerprint = None
+                            if matcher is not None or clusterer is not None:
+                                technologies, fingerprint = await asyncio.to_thread(
+                                    analyze_body,
+                                    bytes(body),
+                                    page["charset"],
+                                    matcher,
+                                    clusterer is not None,
+                                    list(response.headers.items()),
+                                    {name: m.value for name, m in response.cookies.items()},
+                                    final,
                                 )
-                        except Exception:
-                            continue  # Silently skip connection failures
-                    return results
-
-            # 5. Execute probes
-            async with aiohttp.ClientSession(**self.get_session_kwargs()) as session:
-                tasks = [probe(sub, session) for sub in all_targets]
-                
-                raw_findings = []
-                total = len(tasks)
-                completed = 0
-                
-                logger.info(f"[HTTP] Starting discovery for {total} potential services...")
-                
-                for coro in asyncio.as_completed(tasks):
-                    res_list = await coro
-                    raw_findings.extend(res_list)
-                    completed += 1
-                    if completed % 10 == 0 or completed == total:
-                        logger.debug(f"[HTTP] Probing progress: {completed}/{total}")
-
-            # 6. Store aggregate results
+                                if matcher is not None:
+                                    finding["technologies"] = technologies
+                            return str(final), finding, fingerprint
+                    except Exception:
+                        return None  # Silently skip connection failures
+
+            async def probe(candidate: Candidate) -> List[Dict[str, Any]]:
+                """Probes one planned service, sniffing its scheme first if it is unknown."""
+                schemes = [candidate.scheme] if candidate.scheme else []
+                if not schemes and not self._proxied(candidate.host):
+                    sniffed = await sniff_scheme(
+                        candidate.ip or candidate.host, candidate.port, sniff_timeout
+                    )
+                    schemes = [sniffed] if sniffed else []
+                # Undecided (or behind a proxy, where a raw socket would leak our
+                # address): try both schemes at once
+                answers = await asyncio.gather(
+                    *(fetch(candidate, scheme) for scheme in schemes or ["https", "http"])
+                )
+
+                results = []
+                for answer in answers:
+                    if answer is None:
+                        continue
+                    # http://host and https://host often redirect to the same page
+                    final, finding, fingerprint = answer
+                    if final in final_urls:
+                        stats["duplicates"] += 1
+                        continue
+                    final_urls.add(final)
+                    if clusterer is not None:
+                        icon = await favicon(final, finding.get("icon"))
+                        if icon is not None:
+                            finding["favicon_hash"] = icon
+                        if fingerprint is not None:
+                            finding["simhash"] = f"{fingerprint:016x}"
+                        finding["cluster"] = clusterer.add(
+                            final, fingerprint, icon, finding["status"]
+                        )
+                    results.append(finding)
+                    self.publish(HTTP_URLS, finding)
+                return results
+
+            async def favicon(page_url: str, href: Optional[str]) -> Optional[int]:
+                """Hashes a page's favicon: its <link rel="icon">, or /favicon.ico."""
+                try:
+                    url = URL(page_url).join(URL(href or "/favicon.ico")).with_fragment(None)
+                except ValueError:
+                    return None
+                if url.scheme not in ("http", "https") or not url.host:
+                    return None
+                if str(url) not in favicons:
+                    favicons[str(url)] = asyncio.create_task(fetch_favicon(url))
+                return await favicons[str(url)]
+
+            async def fetch_favicon(url: URL) -> Optional[int]:
+                host = url.host
+                async with semaphore, self.http_session(host) as session:
+                    await self.throttle(host=host)
+                    stats["requests"] += 1
+                    try:
+                        async with session.get(
+                            url, timeout=timeout, ssl=False, proxy=self.get_request_proxy(host)
+                        ) as response:
+                            if response.status != 200:
+                                return None
+                            data = await response.content.read(FAVICON_MAX_BYTES)
+                    except Exception:
+                        return None
+                # Servers that answer every path with a page return HTML here
+                if not data or data.lstrip()[:1] == b"<":
+                    return None
+                return favicon_hash(data)
+
+            def schedule(candidate: Optional[Candidate]) -> None:
+                if candidate is not None:
+                    tasks.append(asyncio.create_task(probe(candidate)))
+
+            # 2. Plan probes as upstream modules publish ports and hosts
+            ported: Set[str] = set()
+            hosts: Dict[str, None] = {target: None}  # ordered set, the target first
+
+            async def follow_ports() -> None:
+                async for item in self.iter_findings(target, OPEN_PORTS):
+                    if item.get("port") is None:
+                        continue
+                    host = item.get("host") or target
+                    ported.add(host)
+                    schedule(
+                        planner.from_port(host, item["port"], item.get("service"), item.get("ip"))
+                    )
+
+            async def follow_subdomains() -> None:
+                async for item in self.iter_findings(target, SUBDOMAINS):
+                    if item.get("subdomain"):
+                        hosts[item["subdomain"]] = None
+                        # Without a port scan in this scan, probe hosts as they arrive
+                        if not expect_ports and len(hosts) <= limit:
+                            for candidate in planner.from_host(item["subdomain"]):
+                                schedule(candidate)
+
+            # With a live port scan, its results decide which hosts serve the web
+            expect_ports = self.bus is not None and not self.bus.is_closed(OPEN_PORTS)
+            if not expect_ports:
+                for candidate in planner.from_host(target):
+                    schedule(candidate)
+            logger.info(f"[HTTP] Waiting for services to probe for {target}...")
+            await asyncio.gather(follow_ports(), follow_subdomains())
+
+            # 3. Hosts without port information fall back to the default ports
+            if not ported:
+                blind = list(hosts)
+                for host in blind[:limit]:
+                    for candidate in planner.from_host(host):
+                        schedule(candidate)
+                if len(blind) > limit:
+                    logger.info(
+                        f"[HTTP] No port information; probed {limit} of {len(blind)} hosts "
+                        f"on ports 80/443 (raise 'probing_limit' for more)"
+                    )
+            else:
+                skipped = len(set(hosts) - ported)
+                if skipped:
+                    logger.debug(f"[HTTP] Skipped {skipped} hosts with no open web port")
+
+            # 4. Collect the remaining probes
+            raw_findings = []
+            for res_list in await asyncio.gather(*tasks):
+                raw_findings.extend(res_list)
+
+            # 5. Store aggregate results
+            if clusterer is not None:
+                for finding in raw_findings:
+                    if finding.get("cluster") == finding["url"]:
+                        finding["cluster_size"] = clusterer.size(finding["url"])
             if raw_findings:
                 self.store_results(target, "http_detector", "http", raw_findings)
-                logger.info(f"[HTTP] Successfully identified {len(raw_findings)} services")
+                # One row per (URL, technology), so technologies can be queried across URLs
+                technologies = [
+                    {
+                        "url": finding["url"],
+                        "technology": tech["name"],
+                        "version": tech["version"],
+                        "categories": tech["categories"],
+                    }
+                    for finding in raw_findings
+                    for tech in finding.get("technologies", ())
+                ]
+                if technologies:
+                    self.store_results(target, "tech_fingerprint", "tech", technologies)
+                logger.info(
+                    f"[HTTP] Successfully identified {len(raw_findings)} services with "
+                    f"{stats['requests']} requests over {len(planner)} planned host:ports "
+                    f"({stats['duplicates']} redirect duplicates dropped)"
+                )
+                if clusterer is not None:
+                    logger.info(
+                        f"[HTTP] {len(raw_findings)} services fall into {len(clusterer)} "
+                        f"clusters of near-identical pages"
+                    )
             else:
                 logger.info(f"[HTTP] No active HTTP services discovered for {target}")
 
         except Exception as e:
             logger.error(f"[HTTP] Module execution failed: {e}")
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    def _tech_matcher(self) -> Optional[TechMatcher]:
+        """Returns the compiled technology signatures, or None if fingerprinting is off.
+
+        The bundled signatures are used unless 'fingerprints' points to a
+        Wappalyzer technologies file or source directory. A database that cannot
+        be read disables fingerprinting for the scan instead of failing it.
+        """
+        if not self.config.get("tech_detection", True):
+            return None
+        path = self.config.get("fingerprints") or None
+        try:
+            return get_matcher(path)
+        except (OSError, ValueError) as e:
+            logger.error(f"[HTTP] Could not load technology signatures from {path}: {e}")
+            return None
 
+    def _proxied(self, host: str) -> bool:
+        """True if requests to a host go through a proxy."""
+        return self.proxy is not None and self.proxy.route(host) is not None
@@ -0,0 +1,193 @@
+import codecs
+import html
+import re
+from typing import Any, Dict, Optional
+
+# Tags that matter in a document head, plus constructs whose content must be skipped
+_TAG = re.compile(
+    rb"<(?:(!--)|(title|meta|link|script|style|body|/head)(?=[\s/>]))([^>]*)>?", re.IGNORECASE
+)
+_ATTR = re.compile(
+    rb"""([a-zA-Z_:][-a-zA-Z0-9_:.]*)(?:\s*=\s*(?:"([^"]*)"|'([^']*)'|([^\s"'>]+)))?"""
+)
+_CLOSE = {
+    b"title": re.compile(rb"</title\s*>", re.IGNORECASE),
+    b"script": re.compile(rb"</script\s*>", re.IGNORECASE),
+    b"style": re.compile(rb"</style\s*>", re.IGNORECASE),
+}
+_CHARSET = re.compile(r"charset\s*=\s*[\"']?([-\w.:]+)", re.IGNORECASE)
+_REFRESH_URL = re.compile(r"url\s*=\s*[\"']?([^\"';]+)", re.IGNORECASE)
+
+
+def _attributes(raw: bytes) -> Dict[bytes, bytes]:
+    """Parses the attribute text of a tag into a {lowercased name: value} dict."""
+    attrs = {}
+    for match in _ATTR.finditer(raw):
+        value = match.group(2) if match.group(2) is not None else match.group(3)
+        if value is None:
+            value = match.group(4) or b""
+        attrs.setdefault(match.group(1).lower(), value)
+    return attrs
+
+
+class HeadExtractor:
+    """Reads the metadata of an HTML page from its first bytes, without a DOM.
+
+    The body is fed chunk by chunk as it arrives. Only the tags that matter
+    in the head are matched, with one precompiled bytes pattern: <title>,
+    <meta> (generator, charset, http-equiv content-type and refresh) and
+    <link rel="canonical"> and rel="icon". Comments, scripts and styles are skipped. Parsing
+    ends at </head> or <body>, or once `max_bytes` have been read, so the
+    caller can stop reading the response there.
+
+    Values stay bytes until the end and are then decoded with the page's
+    charset: the <meta> charset wins over the Content-Type charset, and UTF-8
+    is the fallback.
+
+    Attributes:
+        max_bytes: Bytes read at most.
+        bytes_read: Bytes fed so far.
+        done: True once the head has ended or the byte budget is spent.
+    """
+
+    def __init__(self, charset: Optional[str] = None, max_bytes: int = 128 * 1024):
+        """Initializes the extractor.
+
+        Args:
+            charset: Charset from the Content-Type header, if any.
+            max_bytes: Bytes read at most.
+        """
+        self.max_bytes = max_bytes
+        self.bytes_read = 0
+        self.done = False
+        self._header_charset = charset
+        self._buffer = b""
+        self._fields: Dict[str, bytes] = {}
+
+    def feed(self, chunk: bytes) -> bool:
+        """Consumes the next chunk of the body.
+
+        Args:
+            chunk: Raw bytes, split anywhere.
+
+        Returns:
+            True once nothing more needs to be read.
+        """
+        if self.done:
+            return True
+        room = self.max_bytes - self.bytes_read
+        chunk = chunk[:room]
+        self.bytes_read += len(chunk)
+        buffer = self._buffer + chunk
+        pos = 0
+        while not self.done:
+            match = _TAG.search(buffer, pos)
+            if match is None:
+                # Keep a possible partial tag ('<tit') for the next chunk
+                pos = max(pos, len(buffer) - 16)
+                break
+            if not match.group(0).endswith(b">"):
+                pos = match.start()  # tag split across chunks
+                break
+            end = self._handle(buffer, match)
+            if end is None:
+                pos = match.start()  # waiting for a closing tag
+                break
+            pos = end
+        self._buffer = buffer[max(pos, 0):]
+        if self.bytes_read >= self.max_bytes:
+            self.done = True
+        return self.done
+
+    def _handle(self, buffer: bytes, match: "re.Match[bytes]") -> Optional[int]:
+        """Processes one matched tag; returns where scanning resumes, or None to wait."""
+        if match.group(1):  # <!-- comment -->
+            close = buffer.find(b"-->", match.start() + 4)
+            return None if close < 0 else close + 3
+
+        tag = match.group(2).lower()
+        if tag in (b"/head", b"body"):
+            self.done = True
+            return match.end()
+        if tag in _CLOSE:
+            close = _CLOSE[tag].search(buffer, match.end())
+            if close is None:
+                return None
+            if tag == b"title":
+                self._fields.setdefault("title", buffer[match.end():close.start()])
+            return close.end()
+
+        attrs = _attributes(match.group(3))
+        if tag == b"link":
+            rel = attrs.get(b"rel", b"").lower().split()
+            if b"href" in attrs:
+                if b"canonical" in rel:
+                    self._fields.setdefault("canonical", attrs[b"href"])
+                elif b"icon" in rel:  # 'icon' or 'shortcut icon'
+                    self._fields.setdefault("icon", attrs[b"href"])
+            return match.end()
+
+        # <meta>
+        if b"charset" in attrs:
+            self._fields.setdefault("charset", attrs[b"charset"])
+        name = attrs.get(b"name", b"").lower()
+        equiv = attrs.get(b"http-equiv", b"").lower()
+        content = attrs.get(b"content")
+        if content is not None:
+            if name == b"generator":
+                self._fields.setdefault("generator", content)
+            elif equiv == b"refresh":
+                self._fields.setdefault("refresh", content)
+            elif equiv == b"content-type":
+                found = _CHARSET.search(content.decode("latin-1"))
+                if found:
+                    self._fields.setdefault("charset", found.group(1).encode())
+        return match.end()
+
+    @property
+    def charset(self) -> str:
+        """The charset the page's text is decoded with."""
+        declared = self._fields.get("charset", b"").decode("latin-1")
+        for candidate in (declared, self._header_charset):
+            if candidate:
+                try:
+                    name = codecs.lookup(candidate.strip()).name
+                    b"a".decode(name, "ignore")  # rejects non-text codecs such as 'base64'
+                    return name
+                except LookupError:
+                    continue
+        return "utf-8"
+
+    def _text(self, field: str) -> Optional[str]:
+        """Decodes, unescapes and whitespace-normalizes one extracted value."""
+        raw = self._fields.get(field)
+        if raw is None:
+            return None
+        text = " ".join(html.unescape(raw.decode(self.charset, errors="replace")).split())
+        return text or None
+
+    @property
+    def title(self) -> Optional[str]:
+        """Text of the page's <title>, if any."""
+        return self._text("title")
+
+    @property
+    def refresh(self) -> Optional[str]:
+        """Target URL of a <meta http-equiv="refresh"> redirect, if any."""
+        content = self._text("refresh")
+        match = _REFRESH_URL.search(content) if content else None
+        return match.group(1).strip() if match else None
+
+    def result(self) -> Dict[str, Any]:
+        """Returns everything found: title, generator, charset, canonical, icon and refresh.
+
+        Missing values are None.
+        """
+        return {
+            "title": self.title,
+            "generator": self._text("generator"),
+            "charset": self.charset,
+            "canonical": self._text("canonical"),
+            "icon": self._text("icon"),
+            "refresh": self.refresh,
+        }
@@ -0,0 +1,158 @@
+import asyncio
+from typing import List, Optional, Set, Tuple
+
+from modules.portscan.fingerprint import HTTP_PORTS, PROBES, TLS_PORTS
+
+DEFAULT_PORTS = {"http": 80, "https": 443}
+
+# TLS services that are not HTTPS (mail, LDAPS, DNS over TLS, SIP)
+NON_WEB_TLS_PORTS = {465, 636, 853, 990, 992, 993, 994, 995, 5061}
+
+# Fingerprinted services that never speak HTTP
+NON_WEB_SERVICES = {"ssh", "ftp", "smtp", "pop3", "imap", "mysql", "redis", "vnc"}
+
+
+class Candidate:
+    """One web service to probe.
+
+    Attributes:
+        host: Hostname sent in the request.
+        port: TCP port.
+        scheme: 'http' or 'https', or None while it still has to be sniffed.
+        ip: Address the port scanner found the port on, if known.
+    """
+
+    __slots__ = ("host", "port", "scheme", "ip")
+
+    def __init__(
+        self, host: str, port: int, scheme: Optional[str] = None, ip: Optional[str] = None
+    ):
+        """Initializes the candidate."""
+        self.host = host
+        self.port = port
+        self.scheme = scheme
+        self.ip = ip
+
+    def url(self, scheme: Optional[str] = None) -> str:
+        """Returns the candidate's URL, leaving out the scheme's default port."""
+        scheme = scheme or self.scheme or "http"
+        if DEFAULT_PORTS[scheme] == self.port:
+            return f"{scheme}://{self.host}"
+        return f"{scheme}://{self.host}:{self.port}"
+
+    def __repr__(self) -> str:
+        return f"Candidate({self.host!r}, {self.port}, {self.scheme!r})"
+
+
+def infer_scheme(port: int, service: Optional[str] = None) -> Tuple[bool, Optional[str]]:
+    """Works out how to talk to an open port from its port scan fingerprint.
+
+    Args:
+        port: The open port.
+        service: Service identified by the port scanner ('http', 'tls', 'ssh', ...),
+            'unknown', or None if banners were not grabbed.
+
+    Returns:
+        (worth probing, scheme); the scheme is None when it must be sniffed.
+    """
+    if service == "http":
+        return True, "http"
+    if service in NON_WEB_SERVICES or port in NON_WEB_TLS_PORTS:
+        return False, None
+    if service == "tls":
+        return True, "https"
+    if port in TLS_PORTS:
+        return True, "https"
+    if port in HTTP_PORTS:
+        return True, "http"
+    return True, None
+
+
+class ProbePlanner:
+    """Turns port scan results and bare hostnames into a deduplicated probe plan.
+
+    An open port becomes a single candidate whose scheme comes from the port
+    scanner's fingerprint (or the port number), so a service costs one request
+    instead of an HTTP and an HTTPS attempt. Non-standard ports are included, and
+    ports running other protocols (SSH, SMTP, ...) are skipped. Hosts with no port
+    information get the default ports 80 and 443.
+    """
+
+    def __init__(self):
+        """Initializes an empty plan."""
+        self._planned: Set[Tuple[str, int]] = set()
+
+    def __len__(self) -> int:
+        """Number of (host, port) pairs planned so far."""
+        return len(self._planned)
+
+    def _add(
+        self, host: str, port: int, scheme: Optional[str], ip: Optional[str] = None
+    ) -> Optional[Candidate]:
+        key = (host.lower(), port)
+        if key in self._planned:
+            return None
+        self._planned.add(key)
+        return Candidate(key[0], port, scheme, ip)
+
+    def from_port(
+        self, host: str, port: int, service: Optional[str] = None, ip: Optional[str] = None
+    ) -> Optional[Candidate]:
+        """Plans an open port reported by the port scanner.
+
+        Args:
+            host: Hostname the port was found for.
+            port: The open port.
+            service: The port's fingerprinted service, if any.
+            ip: The address the port was found on.
+
+        Returns:
+            A new Candidate, or None if the port is not a web service or is already planned.
+        """
+        web, scheme = infer_scheme(port, service)
+        return self._add(host, port, scheme, ip) if web else None
+
+    def from_host(self, host: str) -> List[Candidate]:
+        """Plans a host without port information on the default HTTP and HTTPS ports.
+
+        Args:
+            host: The hostname.
+
+        Returns:
+            The new Candidates (ports planned earlier are left out).
+        """
+        planned = (self._add(host, port, scheme) for scheme, port in DEFAULT_PORTS.items())
+        return [c for c in planned if c is not None]
+
+
+async def sniff_scheme(host: str, port: int, timeout: float = 3.0) -> Optional[str]:
+    """Tells whether a port speaks TLS from the first byte it answers a ClientHello with.
+
+    TLS servers reply with a handshake (0x16) or alert (0x15) record, while plain
+    HTTP servers answer the unexpected bytes with an 'HTTP/1.x 400' response or
+    close the connection. Servers that keep waiting for a request line leave the
+    question open.
+
+    Args:
+        host: Hostname or IP to connect to.
+        port: The port.
+        timeout: Seconds allowed for connecting and for the reply.
+
+    Returns:
+        'https', 'http', or None if the port was unreachable or did not answer in time.
+    """
+    try:
+        reader, writer = await asyncio.wait_for(asyncio.open_connection(host, port), timeout)
+    except (OSError, asyncio.TimeoutError):
+        return None
+    try:
+        writer.write(PROBES["tls"])
+        await writer.drain()
+        first = await asyncio.wait_for(reader.read(1), timeout)
+    except (OSError, asyncio.TimeoutError):
+        return None
+    finally:
+        writer.close()
+    if first and first[0] in (0x15, 0x16):
+        return "https"
+    return "http"
@@ -0,0 +1,210 @@
+import base64
+import hashlib
+import re
+import struct
+from typing import Dict, List, Optional, Tuple
+
+try:
+    import mmh3
+except ImportError:
+    mmh3 = None
+
+# Tag names (attributes, which hold tokens and URLs, are skipped) and words
+_TOKEN = re.compile(r"<\s*(/?[a-z][a-z0-9]*)[^>]*>|([a-z]{2,})", re.IGNORECASE)
+# Content that differs between requests (inline code, comments) or is invisible
+_NOISE = re.compile(
+    r"<script\b.*?</script\s*>|<style\b.*?</style\s*>|<!--.*?-->", re.IGNORECASE | re.DOTALL
+)
+
+# Words per shingle: '<div> welcome to' tells more about a page than 'welcome'
+SHINGLE = 3
+SIMHASH_BITS = 64
+
+# For each bit of a byte, a table mapping every byte value to 1 if that bit is set
+_BIT_TABLES = [bytes((value >> bit) & 1 for value in range(256)) for bit in range(8)]
+
+
+def murmur3_32(data: bytes, seed: int = 0) -> int:
+    """MurmurHash3 (x86, 32-bit) as a signed integer, the value mmh3.hash() returns.
+
+    Uses the mmh3 package when it is installed; the pure-Python version is only
+    slower.
+    """
+    if mmh3 is not None:
+        return mmh3.hash(data, seed)
+    c1, c2, mask = 0xCC9E2D51, 0x1B873593, 0xFFFFFFFF
+    h = seed & mask
+    blocks = len(data) // 4 * 4
+    for (k,) in struct.iter_unpack("<I", data[:blocks]):
+        k = (k * c1) & mask
+        k = ((k << 15) | (k >> 17)) & mask
+        h ^= (k * c2) & mask
+        h = ((h << 13) | (h >> 19)) & mask
+        h = (h * 5 + 0xE6546B64) & mask
+    tail = data[blocks:]
+    if tail:
+        k = int.from_bytes(tail, "little")
+        k = (k * c1) & mask
+        k = ((k << 15) | (k >> 17)) & mask
+        h ^= (k * c2) & mask
+    h ^= len(data)
+    h ^= h >> 16
+    h = (h * 0x85EBCA6B) & mask
+    h ^= h >> 13
+    h = (h * 0xC2B2AE35) & mask
+    h ^= h >> 16
+    return h - 0x100000000 if h & 0x80000000 else h
+
+
+def favicon_hash(data: bytes) -> int:
+    """Hashes favicon bytes the way Shodan does, so results can be searched as http.favicon.hash.
+
+    Args:
+        data: The raw icon file.
+    """
+    return murmur3_32(base64.encodebytes(data))
+
+
+def body_features(html: str, host: Optional[str] = None) -> List[bytes]:
+    """Turns a page into the set of word shingles its fingerprint is built from.
+
+    Scripts, styles and comments are dropped, as are digits and the page's own
+    hostname, so pages that differ only in tokens, timestamps, counters or the
+    name they were served under yield the same features.
+
+    Args:
+        html: The decoded body.
+        host: The hostname the page was requested with.
+
+    Returns:
+        The distinct shingles, encoded.
+    """
+    text = _NOISE.sub(" ", html).lower()
+    if host:
+        text = text.replace(host.lower(), " ")
+    words = [tag or word for tag, word in _TOKEN.findall(text)]
+    if len(words) < SHINGLE:
+        return [" ".join(words).encode()] if words else []
+    return list(
+        {" ".join(words[i:i + SHINGLE]).encode() for i in range(len(words) - SHINGLE + 1)}
+    )
+
+
+def simhash(features: List[bytes]) -> Optional[int]:
+    """Computes the 64-bit SimHash of a feature set.
+
+    Each bit is set when it is set in the hashes of more than half of the
+    features, so similar pages get fingerprints a few bits apart. The bits are
+    counted column by column over the concatenated hashes with bytes.translate
+    and bytes.count, rather than bit by bit in Python.
+
+    Args:
+        features: Distinct features, such as body_features() returns.
+
+    Returns:
+        The fingerprint, or None if there are no features.
+    """
+    if not features:
+        return None
+    digests = b"".join(hashlib.blake2b(f, digest_size=8).digest() for f in features)
+    half = len(features) / 2
+    value = 0
+    for byte in range(8):
+        column = digests[byte::8]
+        for bit in range(8):
+            if column.translate(_BIT_TABLES[bit]).count(1) > half:
+                value |= 1 << (byte * 8 + bit)
+    return value
+
+
+class ServiceClusterer:
+    """Groups near-identical web services as they are discovered.
+
+    A service joins the first cluster whose representative (the cluster's first
+    member) has a body SimHash at most `max_distance` bits away, the same HTTP
+    status and not a different favicon; otherwise it starts a new cluster. Representatives
+    are indexed LSH-style by the bands of their fingerprints: with
+    `max_distance + 1` bands, two fingerprints within that distance agree on at
+    least one whole band, so only representatives sharing a band are compared.
+
+    Attributes:
+        max_distance: Largest Hamming distance between fingerprints in a cluster.
+    """
+
+    def __init__(self, max_distance: int = 6):
+        """Initializes an empty index.
+
+        Args:
+            max_distance: Largest Hamming distance (0-15) between similar fingerprints.
+                Copies of one page served under different names are 0-2 bits apart,
+                a page with a sentence changed about 6, unrelated pages around 32.
+        """
+        self.max_distance = max_distance
+        self._bands = max_distance + 1
+        self._width = SIMHASH_BITS // self._bands
+        self._index: List[Dict[int, List[int]]] = [{} for _ in range(self._bands)]
+        # (url, simhash, favicon, status)
+        self._leaders: List[Tuple[str, int, Optional[int], Optional[int]]] = []
+        self._sizes: List[int] = []
+        self._by_url: Dict[str, int] = {}
+
+    def _keys(self, fingerprint: int) -> List[int]:
+        mask = (1 << self._width) - 1
+        return [(fingerprint >> (band * self._width)) & mask for band in range(self._bands)]
+
+    def add(
+        self,
+        url: str,
+        fingerprint: Optional[int],
+        favicon: Optional[int] = None,
+        status: Optional[int] = None,
+    ) -> str:
+        """Assigns a service to a cluster.
+
+        Args:
+            url: The service's URL.
+            fingerprint: Its body SimHash, or None if the body was empty.
+            favicon: Its favicon hash, if it has one.
+            status: Its HTTP status code.
+
+        Returns:
+            The URL of the cluster's representative (the service's own URL if it
+            starts a new cluster).
+        """
+        if url in self._by_url:
+            return self._leaders[self._by_url[url]][0]
+        if fingerprint is not None:
+            keys = self._keys(fingerprint)
+            match = None
+            for band, key in enumerate(keys):
+                for cluster in self._index[band].get(key, ()):
+                    if match is not None and cluster >= match:
+                        continue
+                    _, other, icon, code = self._leaders[cluster]
+                    if code != status or (fingerprint ^ other).bit_count() > self.max_distance:
+                        continue
+                    if favicon is not None and icon is not None and favicon != icon:
+                        continue
+                    match = cluster
+            if match is not None:
+                self._sizes[match] += 1
+                self._by_url[url] = match
+                return self._leaders[match][0]
+            cluster = len(self._leaders)
+            for band, key in enumerate(keys):
+                self._index[band].setdefault(key, []).append(cluster)
+        else:
+            cluster = len(self._leaders)  # nothing to compare; always its own cluster
+        self._leaders.append((url, fingerprint or 0, favicon, status))
+        self._sizes.append(1)
+        self._by_url[url] = cluster
+        return url
+
+    def size(self, url: str) -> int:
+        """Number of services in the cluster a URL belongs to (0 if it was never added)."""
+        cluster = self._by_url.get(url)
+        return 0 if cluster is None else self._sizes[cluster]
+
+    def __len__(self) -> int:
+        """Number of clusters."""
+        return len(self._leaders)
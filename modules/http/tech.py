@@ -0,0 +1,572 @@
+import json
+import re
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Set, Tuple
+
+# Signatures shipped with the module: a Wappalyzer-format subset of common servers,
+# CDNs, frameworks and libraries
+BUNDLED_SIGNATURES = Path(__file__).with_name("technologies.json")
+
+# Shortest literal worth indexing; shorter ones would hit almost every page
+MIN_LITERAL = 3
+
+# <meta> and <script> tags, found in the same pass over the body
+_TAG = re.compile(r"<(meta|script)\b([^>]*)>", re.IGNORECASE)
+_ATTR = re.compile(
+    r"""([a-zA-Z_:][-a-zA-Z0-9_:.]*)\s*=\s*(?:"([^"]*)"|'([^']*)'|([^\s"'>]+))"""
+)
+_VERSION_REF = re.compile(r"\\(\d)")
+
+# Regex escapes that stand for one literal character
+_ESCAPED_LITERALS = set(r".^$*+?()[]{}|\/-:;=<>!\"'#&%@,~ ")
+
+
+class Pattern:
+    """One compiled signature pattern.
+
+    Attributes:
+        regex: The compiled (case-insensitive) expression.
+        version: Version template such as '\\1', or None.
+        confidence: Confidence (0-100) a match contributes.
+        literals: Lowercased texts of which every match contains one, used to
+            index the pattern in the combined scan, or None if there are none
+            worth indexing.
+    """
+
+    __slots__ = ("regex", "version", "confidence", "literals")
+
+    def __init__(self, source: str):
+        """Parses a Wappalyzer pattern ('regex\\;version:\\1\\;confidence:50').
+
+        Raises:
+            re.error: If the expression does not compile.
+        """
+        expression, *tags = source.split("\\;")
+        self.version: Optional[str] = None
+        self.confidence = 100
+        for tag in tags:
+            key, _, value = tag.partition(":")
+            if key == "version":
+                self.version = value
+            elif key == "confidence" and value.isdigit():
+                self.confidence = int(value)
+        self.regex = re.compile(expression, re.IGNORECASE)
+        self.literals = required_literals(expression)
+
+    def search(self, text: str) -> Optional[str]:
+        """Matches the pattern against text.
+
+        Returns:
+            None if it does not match; otherwise the version it yields, or '' if
+            it yields none.
+        """
+        match = self.regex.search(text)
+        if match is None:
+            return None
+        if not self.version:
+            return ""
+        groups = match.groups()
+
+        def group(ref: "re.Match[str]") -> str:
+            index = int(ref.group(1))
+            return (groups[index - 1] or "") if 0 < index <= len(groups) else ""
+
+        return _VERSION_REF.sub(group, self.version).strip()
+
+
+def required_literals(expression: str) -> Optional[List[str]]:
+    """Finds pieces of plain text of which every match of a regular expression contains one.
+
+    Each top-level alternative of the expression contributes either a literal
+    run at its own top level (character classes, escapes such as \\d and
+    optional characters end a run) or the literals of a group it requires, such
+    as '(?:a|b)' in '(?:a|b)[^>]+'; whichever is the most distinctive.
+
+    Args:
+        expression: A Python regular expression.
+
+    Returns:
+        The lowercased literals, or None if some alternative has none of at least
+        MIN_LITERAL characters (the expression then has to be run on every text).
+    """
+    literals: Set[str] = set()
+    for alternative in _split_alternatives(expression):
+        found = _alternative_literals(alternative)
+        if found is None:
+            return None
+        literals.update(found)
+    return sorted(literals)
+
+
+def _split_alternatives(expression: str) -> List[str]:
+    """Splits an expression at its top-level '|'."""
+    alternatives = []
+    depth, start, i = 0, 0, 0
+    while i < len(expression):
+        char = expression[i]
+        if char == "\\":
+            i += 2
+            continue
+        if char == "[":
+            i = _skip_class(expression, i)
+            continue
+        if char == "(":
+            depth += 1
+        elif char == ")":
+            depth -= 1
+        elif char == "|" and depth == 0:
+            alternatives.append(expression[start:i])
+            start = i + 1
+        i += 1
+    alternatives.append(expression[start:])
+    return alternatives
+
+
+def _alternative_literals(expression: str) -> Optional[List[str]]:
+    """Returns the literals of one alternative (an expression without a top-level '|')."""
+    runs: List[str] = []
+    run: List[str] = []
+    groups: List[str] = []  # contents of the groups every match goes through
+    i, n = 0, len(expression)
+
+    def end_run() -> None:
+        if run:
+            runs.append("".join(run))
+            run.clear()
+
+    while i < n:
+        char = expression[i]
+        if char == "\\" and i + 1 < n:
+            escaped = expression[i + 1]
+            if escaped in _ESCAPED_LITERALS:
+                run.append(escaped)
+                i += 2
+            else:
+                end_run()  # \\d, \\s, \\b, \\1, \\x3c, ...
+                i += _escape_length(expression, i)
+            continue
+        if char in "*?{":
+            if run:
+                run.pop()  # the character before may be absent
+            end_run()
+            if char == "{":
+                close = expression.find("}", i)
+                i = n if close < 0 else close + 1
+            else:
+                i += 1
+            continue
+        if char == "+":
+            end_run()  # the character before is required once, already in the run
+            i += 1
+            continue
+        if char == "[":
+            end_run()
+            i = _skip_class(expression, i)
+            continue
+        if char == "(":
+            end_run()
+            close = _group_end(expression, i)
+            optional = close < n and expression[close] in "*?{"
+            inner = _group_body(expression[i + 1:close - 1])
+            if inner is not None and not optional:
+                groups.append(inner)
+            i = close
+            continue
+        if char in ".^$":
+            end_run()
+            i += 1
+            continue
+        run.append(char)
+        i += 1
+    end_run()
+
+    # Of the runs and required groups, index the most distinctive: 'svelte-'
+    # rather than 'class="', which is on every page
+    options = [[run.lower()] for run in runs if len(run) >= MIN_LITERAL]
+    options.extend(filter(None, map(required_literals, groups)))
+    if not options:
+        return None
+    return max(options, key=lambda literals: min(map(_distinctiveness, literals)))
+
+
+def _escape_length(expression: str, i: int) -> int:
+    """Length of the escape sequence at expression[i], including its digits or name."""
+    escaped = expression[i + 1]
+    if escaped in "xuU":
+        length = {"x": 4, "u": 6, "U": 10}[escaped]
+    elif escaped == "N" and expression.startswith("{", i + 2):
+        close = expression.find("}", i)
+        length = len(expression) - i if close < 0 else close + 1 - i
+    elif escaped.isdigit():
+        # An octal escape or a group reference: up to three digits
+        length = 2
+        while length < 4 and expression[i + length : i + length + 1].isdigit():
+            length += 1
+    else:
+        length = 2
+    return min(length, len(expression) - i)
+
+
+def _distinctiveness(literal: str) -> Tuple[int, int]:
+    """Ranks literals by their letters and digits, then length; markup is common."""
+    return sum(char.isalnum() for char in literal), len(literal)
+
+
+def _group_body(group: str) -> Optional[str]:
+    """Returns the pattern inside a group, or None for lookarounds and inline flags."""
+    if not group.startswith("?"):
+        return group
+    if group.startswith("?:"):
+        return group[2:]
+    if group.startswith("?P<"):
+        close = group.find(">")
+        return group[close + 1:] if close > 0 else None
+    return None
+
+
+def _skip_class(expression: str, i: int) -> int:
+    """Returns the index just past the character class starting at i."""
+    i += 1
+    if i < len(expression) and expression[i] == "^":
+        i += 1
+    if i < len(expression) and expression[i] == "]":
+        i += 1  # a leading ']' is literal
+    while i < len(expression):
+        if expression[i] == "\\":
+            i += 2
+            continue
+        if expression[i] == "]":
+            return i + 1
+        i += 1
+    return i
+
+
+def _group_end(expression: str, i: int) -> int:
+    """Returns the index just past the group starting at i."""
+    depth = 0
+    while i < len(expression):
+        char = expression[i]
+        if char == "\\":
+            i += 2
+            continue
+        if char == "[":
+            i = _skip_class(expression, i)
+            continue
+        if char == "(":
+            depth += 1
+        elif char == ")":
+            depth -= 1
+            if depth == 0:
+                return i + 1
+        i += 1
+    return i
+
+
+def _trie_regex(literals: Iterable[str]) -> str:
+    """Builds one regex matching any of the literals, the longest one at each position.
+
+    The literals are merged into a character trie, so the regex engine follows
+    a single branch per character instead of trying every literal in turn.
+    """
+    trie: Dict[str, dict] = {}
+    for literal in literals:
+        node = trie
+        for char in literal:
+            node = node.setdefault(char, {})
+        node[""] = {}
+
+    def emit(node: Dict[str, dict]) -> str:
+        terminal = "" in node
+        branches = [re.escape(char) + emit(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        if terminal:
+            # Greedy optional: prefer the longer literal, fall back to this one
+            body = (body if len(branches) > 1 else f"(?:{body})") + "?"
+        return body
+
+    return emit(trie)
+
+
+class _Channel:
+    """The patterns matched against one kind of text (page body or script URLs)."""
+
+    def __init__(self, entries: List[Tuple[str, Pattern]]):
+        """Indexes patterns by their required literals and compiles the combined scan.
+
+        Args:
+            entries: (technology, pattern) pairs.
+        """
+        self.always: List[Tuple[str, Pattern]] = []
+        by_literal: Dict[str, List[Tuple[str, Pattern]]] = {}
+        for entry in entries:
+            if entry[1].literals is None:
+                self.always.append(entry)
+            for literal in entry[1].literals or ():
+                by_literal.setdefault(literal, []).append(entry)
+
+        # The scan reports non-overlapping matches, the longest literal at each
+        # position. A hit therefore stands for every literal inside it, and the
+        # literals that start inside it but end past it are checked separately.
+        starts: Dict[str, List[str]] = {}
+        for literal in by_literal:
+            for end in range(1, len(literal)):
+                starts.setdefault(literal[:end], []).append(literal)
+        self._hits: Dict[str, List[Tuple[str, Pattern]]] = {}
+        self._overlaps: Dict[str, List[str]] = {}
+        for literal in by_literal:
+            inside = {
+                literal[i:j]
+                for i in range(len(literal))
+                for j in range(i + MIN_LITERAL, len(literal) + 1)
+            }
+            self._hits[literal] = [
+                entry for other in inside if other in by_literal for entry in by_literal[other]
+            ]
+            overlaps = {
+                other for i in range(1, len(literal)) for other in starts.get(literal[i:], ())
+            }
+            if overlaps:
+                self._overlaps[literal] = sorted(overlaps)
+        # Text is lowercased before the scan: case-insensitive matching is several
+        # times slower in the re module
+        self._scan = re.compile(_trie_regex(by_literal)) if by_literal else None
+
+    def candidates(self, text: str) -> List[Tuple[str, Pattern]]:
+        """Scans text once and returns the patterns whose literal occurs in it."""
+        if self._scan is None or not text:
+            return list(self.always)
+        lowered = text.lower()
+        hits = set(self._scan.findall(lowered))
+        pending = [literal for literal in hits if literal in self._overlaps]
+        while pending:
+            for other in self._overlaps[pending.pop()]:
+                if other not in hits and other in lowered:
+                    hits.add(other)
+                    if other in self._overlaps:
+                        pending.append(other)
+
+        found: Dict[int, Tuple[str, Pattern]] = {}  # a pattern can be implied by several hits
+        for literal in hits:
+            for entry in self._hits[literal]:
+                found[id(entry[1])] = entry
+        return self.always + list(found.values())
+
+
+class TechMatcher:
+    """Identifies the technologies behind an HTTP response from a signature database.
+
+    Signatures use the Wappalyzer format: per technology, regular expressions
+    for response headers, cookies, <meta> tags, the HTML body, <script src>
+    URLs and the page URL, plus 'implies', 'excludes' and categories. Browser-only
+    fields (js, dom, css, xhr, ...) are ignored.
+
+    Everything is compiled once. Headers, cookies and meta tags are looked up by
+    name in dicts. For the body and script URLs, each pattern is indexed by a
+    literal that every match must contain, and all literals are merged into one
+    trie-shaped regex; a response is scanned once with it, and only the few
+    patterns whose literal occurred are then run. The cost per response
+    therefore barely grows with the number of signatures.
+
+    Attributes:
+        categories: {category id: name}.
+        technologies: {name: {'cats', 'implies', 'excludes'}}.
+    """
+
+    def __init__(self, database: Mapping[str, Any]):
+        """Compiles a signature database.
+
+        Args:
+            database: {'categories': {...}, 'technologies': {...}} in Wappalyzer format.
+        """
+        self.categories: Dict[str, str] = {
+            str(key): value["name"] if isinstance(value, dict) else str(value)
+            for key, value in database.get("categories", {}).items()
+        }
+        self.technologies: Dict[str, Dict[str, List]] = {}
+        self._headers: Dict[str, List[Tuple[str, Pattern]]] = {}
+        self._cookies: Dict[str, List[Tuple[str, Pattern]]] = {}
+        self._meta: Dict[str, List[Tuple[str, Pattern]]] = {}
+        self._url: List[Tuple[str, Pattern]] = []
+        html: List[Tuple[str, Pattern]] = []
+        scripts: List[Tuple[str, Pattern]] = []
+
+        for name, signature in database.get("technologies", {}).items():
+            self.technologies[name] = {
+                "cats": [str(cat) for cat in signature.get("cats", [])],
+                "implies": [item.split("\\;")[0] for item in _as_list(signature.get("implies"))],
+                "excludes": _as_list(signature.get("excludes")),
+            }
+            for field, index in (
+                ("headers", self._headers), ("cookies", self._cookies), ("meta", self._meta)
+            ):
+                for key, sources in (signature.get(field) or {}).items():
+                    for source in _as_list(sources):
+                        pattern = _compile(source)
+                        if pattern is not None:
+                            index.setdefault(key.lower(), []).append((name, pattern))
+            for field, target in (("html", html), ("scriptSrc", scripts), ("url", self._url)):
+                for source in _as_list(signature.get(field)):
+                    pattern = _compile(source)
+                    if pattern is not None:
+                        target.append((name, pattern))
+
+        self._html = _Channel(html)
+        self._scripts = _Channel(scripts)
+
+    def match(
+        self,
+        headers: Iterable[Tuple[str, str]] = (),
+        cookies: Optional[Mapping[str, str]] = None,
+        html: str = "",
+        url: str = "",
+    ) -> List[Dict[str, Any]]:
+        """Identifies the technologies in one response.
+
+        Args:
+            headers: Response header (name, value) pairs; repeated names are fine.
+            cookies: {name: value} of the cookies the response set.
+            html: The decoded body, or as much of it as was read.
+            url: The final URL of the response.
+
+        Returns:
+            [{'name', 'version', 'confidence', 'categories'}], sorted by name;
+            version is None when no signature revealed it.
+        """
+        detected: Dict[str, List] = {}  # name -> [version, confidence]
+
+        def hit(name: str, pattern: Pattern, text: str) -> None:
+            version = pattern.search(text)
+            if version is None:
+                return
+            entry = detected.setdefault(name, [None, 0])
+            entry[1] += pattern.confidence
+            if version and (entry[0] is None or len(version) > len(entry[0])):
+                entry[0] = version  # the most precise version wins
+
+        for key, value in headers:
+            for name, pattern in self._headers.get(key.lower(), ()):
+                hit(name, pattern, value)
+        for key, value in (cookies or {}).items():
+            for name, pattern in self._cookies.get(key.lower(), ()):
+                hit(name, pattern, value)
+        if url:
+            for name, pattern in self._url:
+                hit(name, pattern, url)
+
+        sources = []
+        for tag in _TAG.finditer(html):
+            attrs = _attributes(tag.group(2))
+            if tag.group(1).lower() == "script":
+                if "src" in attrs:
+                    sources.append(attrs["src"])
+                continue
+            key = attrs.get("name") or attrs.get("property")
+            if key and "content" in attrs:
+                for name, pattern in self._meta.get(key.lower(), ()):
+                    hit(name, pattern, attrs["content"])
+
+        for name, pattern in self._html.candidates(html):
+            hit(name, pattern, html)
+        if sources:
+            for name, pattern in self._scripts.candidates("\n".join(sources)):
+                for source in sources:
+                    if pattern.regex.search(source):
+                        hit(name, pattern, source)
+                        break
+
+        return self._resolve(detected)
+
+    def _resolve(self, detected: Dict[str, List]) -> List[Dict[str, Any]]:
+        """Adds implied technologies, drops excluded ones and formats the result."""
+        pending = list(detected)
+        while pending:
+            for implied in self.technologies.get(pending.pop(), {}).get("implies", ()):
+                if implied not in detected and implied in self.technologies:
+                    detected[implied] = [None, 100]
+                    pending.append(implied)
+        for name in list(detected):
+            for excluded in self.technologies.get(name, {}).get("excludes", ()):
+                detected.pop(excluded, None)
+
+        return [
+            {
+                "name": name,
+                "version": version,
+                "confidence": min(confidence, 100),
+                "categories": [
+                    self.categories.get(cat, cat) for cat in self.technologies[name]["cats"]
+                ],
+            }
+            for name, (version, confidence) in sorted(detected.items())
+        ]
+
+
+def _as_list(value: Any) -> List[str]:
+    """Wappalyzer fields hold a single string or a list of them."""
+    if value is None:
+        return []
+    return [value] if isinstance(value, str) else list(value)
+
+
+def _compile(source: str) -> Optional[Pattern]:
+    """Compiles a pattern, skipping the rare upstream regexes Python cannot parse."""
+    try:
+        return Pattern(source)
+    except re.error:
+        return None
+
+
+def _attributes(raw: str) -> Dict[str, str]:
+    """Parses the attribute text of a tag into a {lowercased name: value} dict."""
+    attrs = {}
+    for match in _ATTR.finditer(raw):
+        value = match.group(2) if match.group(2) is not None else match.group(3)
+        if value is None:
+            value = match.group(4)
+        attrs.setdefault(match.group(1).lower(), value)
+    return attrs
+
+
+def load_signatures(path: Optional[str] = None) -> Dict[str, Any]:
+    """Reads a signature database in Wappalyzer format.
+
+    Args:
+        path: A JSON file with 'categories' and 'technologies' (or just the
+            technologies), or a directory laid out like Wappalyzer's source tree:
+            categories.json next to per-letter technology files (a.json, ...,
+            _.json), possibly in a 'technologies' subdirectory. None loads the
+            bundled signatures.
+
+    Raises:
+        OSError: If the path cannot be read.
+        ValueError: If a file is not valid JSON.
+    """
+    location = Path(path) if path else BUNDLED_SIGNATURES
+    if location.is_file():
+        data = json.loads(location.read_text(encoding="utf-8"))
+        if "technologies" in data:
+            return data
+        return {"categories": {}, "technologies": data}
+
+    categories: Dict[str, Any] = {}
+    technologies: Dict[str, Any] = {}
+    for file in sorted(location.rglob("*.json")):
+        data = json.loads(file.read_text(encoding="utf-8"))
+        if file.name == "categories.json":
+            categories.update(data)
+        elif file.parent.name == "technologies" or len(file.stem) == 1:
+            technologies.update(data)
+    return {"categories": categories, "technologies": technologies}
+
+
+@lru_cache(maxsize=4)
+def get_matcher(path: Optional[str] = None) -> TechMatcher:
+    """Returns the compiled matcher for a signature database, compiling it once per process.
+
+    Args:
+        path: See load_signatures; None or '' uses the bundled signatures.
+    """
+    return TechMatcher(load_signatures(path or None))
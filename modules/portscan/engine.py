@@ -0,0 +1,417 @@
+import asyncio
+import errno
+import ipaddress
+import logging
+import random
+import socket
+import struct
+import time
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+from core.rate_limiter import RateLimiter
+from modules.portscan.fingerprint import grab_banner
+
+logger = logging.getLogger(__name__)
+
+# Probe outcomes
+OPEN = "open"
+CLOSED = "closed"
+FILTERED = "filtered"
+
+# Nmap's most frequently open TCP ports, in range notation
+_TOP_100 = (
+    "7,9,13,21-23,25-26,37,53,79-81,88,106,110-111,113,119,135,139,143-144,179,199,389,427,"
+    "443-445,465,513-515,543-544,548,554,587,631,646,873,990,993,995,1025-1029,1110,1433,1720,"
+    "1723,1755,1900,2000-2001,2049,2121,2717,3000,3128,3306,3389,3986,4899,5000,5009,5051,5060,"
+    "5101,5190,5357,5432,5631,5666,5800,5900,6000-6001,6646,7070,8000,8008-8009,8080-8081,8443,"
+    "8888,9100,9999-10000,32768,49152-49157"
+)
+_TOP_1000 = (
+    "1,3-4,6-7,9,13,17,19-26,30,32-33,37,42-43,49,53,70,79-85,88-90,99-100,106,109-111,113,119,"
+    "125,135,139,143-144,146,161,163,179,199,211-212,222,254-256,259,264,280,301,306,311,340,366,"
+    "389,406-407,416-417,425,427,443-445,458,464-465,481,497,500,512-515,524,541,543-545,548,"
+    "554-555,563,587,593,616-617,625,631,636,646,648,666-668,683,687,691,700,705,711,714,720,722,"
+    "726,749,765,777,783,787,800-801,808,843,873,880,888,898,900-903,911-912,981,987,990,992-993,"
+    "995,999-1002,1007,1009-1011,1021-1100,1102,1104-1108,1110-1114,1117,1119,1121-1124,1126,"
+    "1130-1132,1137-1138,1141,1145,1147-1149,1151-1152,1154,1163-1166,1169,1174-1175,1183,"
+    "1185-1187,1192,1198-1199,1201,1213,1216-1218,1233-1234,1236,1244,1247-1248,1259,1271-1272,"
+    "1277,1287,1296,1300-1301,1309-1311,1322,1328,1334,1352,1417,1433-1434,1443,1455,1461,1494,"
+    "1500-1501,1503,1521,1524,1533,1556,1580,1583,1594,1600,1641,1658,1666,1687-1688,1700,"
+    "1717-1721,1723,1755,1761,1782-1783,1801,1805,1812,1839-1840,1862-1864,1875,1900,1914,1935,"
+    "1947,1971-1972,1974,1984,1998-2010,2013,2020-2022,2030,2033-2035,2038,2040-2043,2045-2049,"
+    "2065,2068,2099-2100,2103,2105-2107,2111,2119,2121,2126,2135,2144,2160-2161,2170,2179,"
+    "2190-2191,2196,2200,2222,2251,2260,2288,2301,2323,2366,2381-2383,2393-2394,2399,2401,2492,"
+    "2500,2522,2525,2557,2601-2602,2604-2605,2607-2608,2638,2701-2702,2710,2717-2718,2725,2800,"
+    "2809,2811,2869,2875,2909-2910,2920,2967-2968,2998,3000-3001,3003,3005-3007,3011,3013,3017,"
+    "3030-3031,3052,3071,3077,3128,3168,3211,3221,3260-3261,3268-3269,3283,3300-3301,3306,"
+    "3322-3325,3333,3351,3367,3369-3372,3389-3390,3404,3476,3493,3517,3527,3546,3551,3580,3659,"
+    "3689-3690,3703,3737,3766,3784,3800-3801,3809,3814,3826-3828,3851,3869,3871,3878,3880,3889,"
+    "3905,3914,3918,3920,3945,3971,3986,3995,3998,4000-4006,4045,4111,4125-4126,4129,4224,4242,"
+    "4279,4321,4343,4443-4446,4449,4550,4567,4662,4848,4899-4900,4998,5000-5004,5009,5030,5033,"
+    "5050-5051,5054,5060-5061,5080,5087,5100-5102,5120,5190,5200,5214,5221-5222,5225-5226,5269,"
+    "5280,5298,5357,5405,5414,5431-5432,5440,5500,5510,5544,5550,5555,5560,5566,5631,5633,5666,"
+    "5678-5679,5718,5730,5800-5802,5810-5811,5815,5822,5825,5850,5859,5862,5877,5900-5904,"
+    "5906-5907,5910-5911,5915,5922,5925,5950,5952,5959-5963,5987-5989,5998-6007,6009,6025,6059,"
+    "6100-6101,6106,6112,6123,6129,6156,6346,6389,6502,6510,6543,6547,6565-6567,6580,6646,"
+    "6666-6669,6689,6692,6699,6779,6788-6789,6792,6839,6881,6901,6969,7000-7002,7004,7007,7019,"
+    "7025,7070,7100,7103,7106,7200-7201,7402,7435,7443,7496,7512,7625,7627,7676,7741,7777-7778,"
+    "7800,7911,7920-7921,7937-7938,7999-8002,8007-8011,8021-8022,8031,8042,8045,8080-8090,8093,"
+    "8099-8100,8180-8181,8192-8194,8200,8222,8254,8290-8292,8300,8333,8383,8400,8402,8443,8500,"
+    "8600,8649,8651-8652,8654,8701,8800,8873,8888,8899,8994,9000-9003,9009-9011,9040,9050,9071,"
+    "9080-9081,9090-9091,9099-9103,9110-9111,9200,9207,9220,9290,9415,9418,9485,9500,9502-9503,"
+    "9535,9575,9593-9595,9618,9666,9876-9878,9898,9900,9917,9929,9943-9944,9968,9998-10004,"
+    "10009-10010,10012,10024-10025,10082,10180,10215,10243,10566,10616-10617,10621,10626,"
+    "10628-10629,10778,11110-11111,11967,12000,12174,12265,12345,13456,13722,13782-13783,14000,"
+    "14238,14441-14442,15000,15002-15004,15660,15742,16000-16001,16012,16016,16018,16080,16113,"
+    "16992-16993,17877,17988,18040,18101,18988,19101,19283,19315,19350,19780,19801,19842,20000,"
+    "20005,20031,20221-20222,20828,21571,22939,23502,24444,24800,25734-25735,26214,27000,"
+    "27352-27353,27355-27356,27715,28201,30000,30718,30951,31038,31337,32768-32785,33354,33899,"
+    "34571-34573,35500,38292,40193,40911,41511,42510,44176,44442-44443,44501,45100,48080,"
+    "49152-49161,49163,49165,49167,49175-49176,49400,49999-50003,50006,50300,50389,50500,50636,"
+    "50800,51103,51493,52673,52822,52848,52869,54045,54328,55055-55056,55555,55600,56737-56738,"
+    "57294,57797,58080,60020,60443,61532,61900,62078,63331,64623,64680,65000,65129,65389"
+)
+PORT_SETS: Dict[str, str] = {"top100": _TOP_100, "top1000": _TOP_1000, "all": "1-65535"}
+
+# Local resource exhaustion while opening sockets; the probe is retried after a pause
+_TRANSIENT_ERRNOS = {errno.EMFILE, errno.ENFILE, errno.ENOBUFS, errno.EAGAIN, errno.EADDRNOTAVAIL}
+
+# SO_LINGER of zero closes with a RST, so high-rate scans do not pile up TIME_WAIT sockets
+_LINGER_RST = struct.pack("ii", 1, 0)
+
+PortSpec = Union[str, int, Iterable[Union[str, int]]]
+
+
+class RttEstimator:
+    """Smoothed round-trip time of one host, estimated as TCP does (RFC 6298).
+
+    Attributes:
+        srtt: Smoothed round-trip time in seconds, or None before the first sample.
+        rttvar: Round-trip time variation in seconds.
+        samples: Number of samples taken.
+        backoffs: Timeouts since the last sample; each one doubles the timeout.
+    """
+
+    __slots__ = ("srtt", "rttvar", "samples", "backoffs")
+
+    ALPHA = 1 / 8
+    BETA = 1 / 4
+    K = 4
+    MAX_BACKOFFS = 16
+
+    def __init__(self) -> None:
+        self.srtt: Optional[float] = None
+        self.rttvar = 0.0
+        self.samples = 0
+        self.backoffs = 0
+
+    def update(self, rtt: float) -> None:
+        """Folds one measured round-trip time into the estimate."""
+        if self.srtt is None:
+            self.srtt, self.rttvar = rtt, rtt / 2
+        else:
+            self.rttvar = (1 - self.BETA) * self.rttvar + self.BETA * abs(self.srtt - rtt)
+            self.srtt = (1 - self.ALPHA) * self.srtt + self.ALPHA * rtt
+        self.samples += 1
+        self.backoffs = 0
+
+    def backoff(self) -> None:
+        """Records a timeout: the next timeout is doubled until a sample is taken."""
+        self.backoffs = min(self.backoffs + 1, self.MAX_BACKOFFS)
+
+    def timeout(self, minimum: float, maximum: float) -> float:
+        """Returns SRTT + K * RTTVAR, clamped to [minimum, maximum] and doubled per backoff."""
+        if self.srtt is None:
+            return maximum
+        return min(maximum, max(minimum, self.srtt + self.K * self.rttvar) * 2 ** self.backoffs)
+
+
+def parse_ports(spec: PortSpec) -> List[int]:
+    """Expands a port specification into a sorted list of unique ports.
+
+    Accepts an int, a list of ints/strings, or a comma-separated string mixing
+    single ports ('22'), ranges ('8000-8100', '-1024', '60000-') and named sets
+    ('top100', 'top1000', 'all').
+
+    Args:
+        spec: The port specification.
+
+    Returns:
+        Sorted unique port numbers.
+
+    Raises:
+        ValueError: If a token is malformed or a port is out of range.
+    """
+    if isinstance(spec, int):
+        tokens: List[str] = [str(spec)]
+    elif isinstance(spec, str):
+        tokens = spec.split(",")
+    else:
+        tokens = [t for item in spec for t in str(item).split(",")]
+
+    ports = set()
+    for token in (t.strip().lower() for t in tokens):
+        if not token:
+            continue
+        if token in PORT_SETS:
+            ports.update(parse_ports(PORT_SETS[token]))
+            continue
+        try:
+            if "-" in token:
+                low, _, high = token.partition("-")
+                start, end = int(low or 1), int(high or 65535)
+            else:
+                start = end = int(token)
+        except ValueError:
+            raise ValueError(f"Invalid port specification: {token!r}") from None
+        if not 1 <= start <= end <= 65535:
+            raise ValueError(f"Port range out of bounds: {token!r}")
+        ports.update(range(start, end + 1))
+    return sorted(ports)
+
+
+class ConnectScanner:
+    """A TCP connect-scan engine built on raw non-blocking sockets.
+
+    Each probe is a single non-blocking socket driven by loop.sock_connect, with no
+    stream reader/writer objects. Probes are paced by a dedicated token bucket that
+    is independent of the API rate limiter, capped globally and per host, and issued
+    in randomized order so consecutive packets do not walk one host's port range.
+
+    Connect timeouts adapt to each host: refused and accepted connections are RTT
+    samples, and once a host has one its timeout becomes SRTT + 4 * RTTVAR within
+    [min_timeout, max_timeout]. Timed-out probes are retried `retries` times.
+
+    With `banners` enabled, each open socket is kept for a short banner exchange
+    before it is closed (see modules.portscan.fingerprint), so service detection
+    costs no second connection.
+
+    Attributes:
+        timeout: Connect timeout in seconds used until a host has an RTT sample.
+        min_timeout: Lower bound of the adaptive timeout.
+        max_timeout: Upper bound of the adaptive timeout.
+        retries: Retransmissions of a probe that timed out.
+        adaptive: Whether timeouts follow the measured RTT.
+        concurrency: Maximum probes in flight across all hosts.
+        per_host: Maximum probes in flight against a single host.
+        randomize: Whether port and host order are shuffled.
+        probes: Connect attempts completed so far, including retransmissions.
+        retransmits: Attempts repeated after a timeout.
+        services: Fingerprints of open ports keyed by (ip, port), when banners are enabled.
+    """
+
+    def __init__(
+        self,
+        rate: float = 0,
+        concurrency: int = 1000,
+        per_host: int = 100,
+        timeout: float = 2.0,
+        randomize: bool = True,
+        min_timeout: float = 0.25,
+        max_timeout: float = 10.0,
+        retries: int = 1,
+        adaptive: bool = True,
+        banners: bool = False,
+        banner_timeout: float = 1.0,
+    ):
+        """Initializes the engine.
+
+        Args:
+            rate: Probes per second across all hosts; 0 disables pacing.
+            concurrency: Maximum probes in flight across all hosts.
+            per_host: Maximum probes in flight against a single host.
+            timeout: Seconds to wait for a connect before the host has an RTT sample.
+            randomize: Shuffle port and host order.
+            min_timeout: Lower bound of the adaptive timeout.
+            max_timeout: Upper bound of the adaptive timeout.
+            retries: Retransmissions of a probe that timed out.
+            adaptive: Derive timeouts from measured RTT; False always uses `timeout`.
+            banners: Read a banner from each open port before closing it.
+            banner_timeout: Seconds allowed for each banner read phase.
+        """
+        self.timeout = timeout
+        self.min_timeout = min_timeout
+        self.max_timeout = max(max_timeout, min_timeout)
+        self.retries = max(0, retries)
+        self.adaptive = adaptive
+        self.banners = banners
+        self.banner_timeout = banner_timeout
+        self.concurrency = concurrency
+        self.per_host = max(1, per_host)
+        self.randomize = randomize
+        self.pacer = RateLimiter(rate)
+        self.probes = 0
+        self.retransmits = 0
+        self.services: Dict[Tuple[str, int], Dict[str, Any]] = {}
+        self._rtt: Dict[str, RttEstimator] = {}
+        self._first: Optional[float] = None
+        self._last = 0.0
+        self._slots = asyncio.Semaphore(concurrency)
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any]) -> "ConnectScanner":
+        """Builds an engine from the 'portscan' configuration section."""
+        return cls(
+            rate=config.get("rate", 0),
+            concurrency=config.get("concurrency", 1000),
+            per_host=config.get("per_host_concurrency", 100),
+            timeout=config.get("timeout", 2),
+            randomize=config.get("randomize", True),
+            min_timeout=config.get("min_timeout", 0.25),
+            max_timeout=config.get("max_timeout", 10),
+            retries=config.get("retries", 1),
+            adaptive=config.get("adaptive_timeout", True),
+            banners=config.get("banners", False),
+            banner_timeout=config.get("banner_timeout", 1.0),
+        )
+
+    @property
+    def elapsed(self) -> float:
+        """Seconds between the first probe starting and the latest one finishing."""
+        return self._last - self._first if self._first is not None else 0.0
+
+    @property
+    def rate(self) -> float:
+        """Probes per second achieved so far."""
+        return self.probes / self.elapsed if self.elapsed else 0.0
+
+    def timeout_for(self, ip: str) -> float:
+        """Returns the connect timeout currently used for a host."""
+        estimator = self._rtt.get(ip)
+        if not self.adaptive or estimator is None:
+            return self.timeout
+        if estimator.srtt is None:
+            return min(max(self.timeout, self.max_timeout), self.timeout * 2 ** estimator.backoffs)
+        return estimator.timeout(self.min_timeout, self.max_timeout)
+
+    async def probe(self, ip: str, port: int) -> str:
+        """Connects to a single port, retransmitting up to `retries` times on timeout.
+
+        Args:
+            ip: IPv4 or IPv6 address literal.
+            port: TCP port.
+
+        Returns:
+            OPEN if the handshake completed, CLOSED if it was refused and FILTERED
+            if every attempt timed out or the host was unreachable.
+        """
+        family = socket.AF_INET6 if ipaddress.ip_address(ip).version == 6 else socket.AF_INET
+        estimator = self._rtt.setdefault(ip, RttEstimator())
+        async with self._slots:
+            for attempt in range(self.retries + 1):
+                await self.pacer.acquire()
+                if self._first is None:
+                    self._first = time.perf_counter()
+                try:
+                    state, rtt = await self._connect(family, ip, port, self.timeout_for(ip))
+                except asyncio.TimeoutError:
+                    estimator.backoff()
+                    if attempt < self.retries:
+                        self.retransmits += 1
+                    continue
+                finally:
+                    self.probes += 1
+                    self._last = time.perf_counter()
+                if rtt is not None:
+                    estimator.update(rtt)
+                return state
+            return FILTERED
+
+    async def _connect(self, family: int, ip: str, port: int, timeout: float) -> Tuple[str, Optional[float]]:
+        """Performs one connect attempt.
+
+        Returns:
+            The probe state and the measured round-trip time, or None for the RTT when
+            the host was unreachable.
+
+        Raises:
+            asyncio.TimeoutError: If no answer arrived within the timeout.
+        """
+        loop = asyncio.get_running_loop()
+        while True:
+            try:
+                sock = socket.socket(family, socket.SOCK_STREAM)
+            except OSError as e:
+                if e.errno not in _TRANSIENT_ERRNOS:
+                    raise
+                await asyncio.sleep(0.05)
+                continue
+            try:
+                sock.setblocking(False)
+                sock.setsockopt(socket.SOL_SOCKET, socket.SO_LINGER, _LINGER_RST)
+                sent = time.perf_counter()
+                try:
+                    await asyncio.wait_for(loop.sock_connect(sock, (ip, port)), timeout)
+                    rtt = time.perf_counter() - sent
+                except ConnectionRefusedError:
+                    # A RST answers the SYN just as fast as a SYN/ACK, so it is an RTT sample too
+                    return CLOSED, time.perf_counter() - sent
+                if self.banners:
+                    service = await grab_banner(sock, port, self.banner_timeout)
+                    if service:
+                        self.services[(ip, port)] = service
+                return OPEN, rtt
+            except asyncio.TimeoutError:
+                # A subclass of OSError since Python 3.11; the caller retransmits on it
+                raise
+            except OSError as e:
+                if e.errno in _TRANSIENT_ERRNOS:
+                    await asyncio.sleep(0.05)
+                    continue
+                return FILTERED, None
+            finally:
+                sock.close()
+
+    async def scan_host(
+        self,
+        ip: str,
+        ports: Sequence[int],
+        on_open: Optional[Callable[[str, int], Any]] = None,
+    ) -> List[int]:
+        """Probes every port of one host, at most per_host at a time.
+
+        Args:
+            ip: The address to scan.
+            ports: Ports to probe.
+            on_open: Optional callback invoked with (ip, port) as each open port is found.
+
+        Returns:
+            The open ports, sorted.
+        """
+        order = list(ports)
+        if self.randomize:
+            random.shuffle(order)
+        pending = iter(order)
+        found: List[int] = []
+
+        async def worker() -> None:
+            for port in pending:
+                if await self.probe(ip, port) == OPEN:
+                    found.append(port)
+                    if on_open:
+                        on_open(ip, port)
+
+        await asyncio.gather(*(worker() for _ in range(min(self.per_host, len(order)))))
+        return sorted(found)
+
+    async def scan(
+        self,
+        ips: Iterable[str],
+        ports: Sequence[int],
+        on_open: Optional[Callable[[str, int], Any]] = None,
+    ) -> Dict[str, List[int]]:
+        """Probes every port of every host concurrently.
+
+        Args:
+            ips: The addresses to scan.
+            ports: Ports to probe on each address.
+            on_open: Optional callback invoked with (ip, port) for each open port.
+
+        Returns:
+            Open ports keyed by address.
+        """
+        hosts = list(dict.fromkeys(ips))
+        if self.randomize:
+            random.shuffle(hosts)
+        scans: List[Awaitable[List[int]]] = [self.scan_host(ip, ports, on_open) for ip in hosts]
+        return dict(zip(hosts, await asyncio.gather(*scans)))
@@ -0,0 +1,196 @@
+import asyncio
+import os
+import re
+import socket
+import struct
+import time
+from typing import Dict, List, Optional, Pattern, Tuple
+
+# Ports whose services wait for the client to speak first; anything else is given
+# a chance to send its greeting before the fallback HTTP probe goes out.
+TLS_PORTS = {443, 465, 636, 853, 990, 992, 993, 994, 995, 2376, 4443, 5061, 5986, 6443, 8443, 9443}
+HTTP_PORTS = {80, 81, 591, 2080, 3000, 5000, 8000, 8008, 8080, 8081, 8088, 8888, 9000, 9090}
+REDIS_PORTS = {6379, 6380}
+
+MAX_BANNER = 4096
+
+
+def _client_hello() -> bytes:
+    """Builds a TLS 1.2 ClientHello that any TLS server will answer or reject."""
+    ciphers = [0xC02F, 0xC030, 0xC02B, 0xC02C, 0xCCA8, 0xCCA9, 0xC013, 0xC014, 0x009C, 0x009D, 0x002F, 0x0035]
+    extensions = (
+        # supported_groups: x25519, secp256r1, secp384r1
+        struct.pack("!HHH3H", 0x000A, 8, 6, 0x001D, 0x0017, 0x0018)
+        # ec_point_formats: uncompressed
+        + struct.pack("!HHBB", 0x000B, 2, 1, 0)
+        # signature_algorithms: rsa_pss_rsae_sha256, ecdsa_secp256r1_sha256, rsa_pkcs1_sha256, rsa_pkcs1_sha384
+        + struct.pack("!HHH4H", 0x000D, 10, 8, 0x0804, 0x0403, 0x0401, 0x0501)
+    )
+    body = (
+        b"\x03\x03"
+        + os.urandom(32)
+        + b"\x00"  # empty session id
+        + struct.pack(f"!H{len(ciphers)}H", 2 * len(ciphers), *ciphers)
+        + b"\x01\x00"  # null compression only
+        + struct.pack("!H", len(extensions))
+        + extensions
+    )
+    handshake = b"\x01" + struct.pack("!I", len(body))[1:] + body
+    return b"\x16\x03\x01" + struct.pack("!H", len(handshake)) + handshake
+
+
+# Client-first probes, chosen by port
+PROBES: Dict[str, bytes] = {
+    "http": b"GET / HTTP/1.0\r\nUser-Agent: Mozilla/5.0 (ReconMaster)\r\nAccept: */*\r\n\r\n",
+    "tls": _client_hello(),
+    "redis": b"*1\r\n$4\r\nPING\r\n",
+}
+
+_TLS_VERSIONS = {b"\x03\x00": "SSLv3", b"\x03\x01": "1.0", b"\x03\x02": "1.1", b"\x03\x03": "1.2", b"\x03\x04": "1.3"}
+
+# (service, pattern, product group, version group); first match wins. Groups are
+# 1-based indexes into the match, or 0 when the signature does not capture them.
+_SIGNATURES: List[Tuple[str, bytes, int, int]] = [
+    ("ssh", rb"^SSH-([\d.]+)-([^\s\r\n]+)", 2, 1),
+    ("http", rb"^HTTP/(\d(?:\.\d)?) \d{3}", 0, 0),
+    ("tls", rb"^\x16\x03[\x00-\x04]..\x02...(\x03[\x00-\x04])", 0, 1),
+    ("tls", rb"^\x15\x03[\x00-\x04]\x00\x02", 0, 0),
+    ("mysql", rb"^...\x00\x0a(\d[^\x00]{0,40})\x00", 0, 1),
+    ("mysql", rb"^...[\x00\x01]\xff..[^\x00]*(?:MySQL|MariaDB|not allowed to connect)", 0, 0),
+    ("redis", rb"^(?:\+PONG|-NOAUTH|-ERR|-DENIED)", 0, 0),
+    ("ftp", rb"^220[ -][^\r\n]*?(?:FTP|FileZilla|vsftpd|Pure-FTPd)", 0, 0),
+    ("smtp", rb"^220[ -][^\r\n]*?(E?SMTP|Postfix|Exim|Sendmail|Microsoft)", 0, 0),
+    ("pop3", rb"^\+OK", 0, 0),
+    ("imap", rb"^\* (?:OK|PREAUTH)", 0, 0),
+    ("vnc", rb"^RFB (\d{3}\.\d{3})\n", 0, 1),
+    ("smtp", rb"^220[ -]", 0, 0),
+]
+SIGNATURES: List[Tuple[str, Pattern[bytes], int, int]] = [
+    (service, re.compile(pattern, re.DOTALL), product, version) for service, pattern, product, version in _SIGNATURES
+]
+
+# Product names recognisable in greeting lines and HTTP Server headers
+_PRODUCT = re.compile(
+    rb"(OpenSSH|Dropbear|Postfix|Exim|Sendmail|vsftpd|ProFTPD|Pure-FTPd|FileZilla|Microsoft[\w -]*|"
+    rb"Dovecot|nginx|Apache|lighttpd|IIS|MariaDB|MySQL)[/_ ]?v?([\d][\w.\-]*)?",
+    re.IGNORECASE,
+)
+_SERVER_HEADER = re.compile(rb"\r\nServer:[ \t]*([^\r\n]+)", re.IGNORECASE)
+
+
+def _text(data: bytes) -> str:
+    """Renders a banner as printable text for storage."""
+    return "".join(ch if ch.isprintable() or ch in "\r\n\t" else "." for ch in data.decode("latin-1")).strip()
+
+
+def identify(data: bytes) -> Optional[Dict[str, Optional[str]]]:
+    """Classifies a service from the first bytes it sent.
+
+    Args:
+        data: Bytes read from the socket (greeting or probe response).
+
+    Returns:
+        A dictionary with 'service', 'product' and 'version' (either of the last two
+        may be None), or None if no signature matched.
+    """
+    for service, pattern, product_group, version_group in SIGNATURES:
+        match = pattern.match(data)
+        if not match:
+            continue
+        product = match.group(product_group).decode("latin-1") if product_group else None
+        raw_version = match.group(version_group) if version_group else None
+        if service == "tls":
+            version = _TLS_VERSIONS.get(raw_version) if raw_version else None
+        else:
+            version = raw_version.decode("latin-1") if raw_version else None
+
+        if service == "ssh" and product:
+            # 'OpenSSH_9.6p1' -> product 'OpenSSH', version '9.6p1'
+            product, _, software_version = product.partition("_")
+            version = software_version or None
+        elif service == "mysql":
+            product = "MariaDB" if b"MariaDB" in data[:128] else "MySQL"
+        elif service != "tls":
+            # Greeting line, or the Server header of an HTTP response
+            server = _SERVER_HEADER.search(data) if service == "http" else None
+            head = server.group(1) if server else data.split(b"\n", 1)[0]
+            known = _PRODUCT.search(head) if service != "http" or server else None
+            if known:
+                product = known.group(1).decode("latin-1").strip()
+                version = known.group(2).decode("latin-1") if known.group(2) else None
+            elif server:
+                product, version = server.group(1).decode("latin-1").strip(), None
+            elif service == "http":
+                version = None
+        return {"service": service, "product": product, "version": version}
+    return None
+
+
+def probe_for(port: int) -> Optional[str]:
+    """Returns the client-first probe to send immediately on a port, if any."""
+    if port in TLS_PORTS:
+        return "tls"
+    if port in HTTP_PORTS:
+        return "http"
+    if port in REDIS_PORTS:
+        return "redis"
+    return None
+
+
+async def _read(sock: socket.socket, deadline: float) -> bytes:
+    """Reads until a signature matches, the peer closes, or the deadline passes."""
+    loop = asyncio.get_running_loop()
+    data = b""
+    while len(data) < MAX_BANNER:
+        remaining = deadline - time.perf_counter()
+        if remaining <= 0:
+            break
+        try:
+            chunk = await asyncio.wait_for(loop.sock_recv(sock, MAX_BANNER - len(data)), remaining)
+        except (asyncio.TimeoutError, OSError):
+            break
+        if not chunk:
+            break
+        data += chunk
+        found = identify(data)
+        # HTTP is only complete once the headers (and the Server line) have arrived
+        if found and (found["service"] != "http" or b"\r\n\r\n" in data):
+            break
+    return data
+
+
+async def grab_banner(sock: socket.socket, port: int, timeout: float) -> Optional[Dict[str, Optional[str]]]:
+    """Reads a greeting or probe response from an already-connected socket.
+
+    Server-first services (SSH, SMTP, FTP, MySQL, ...) are given `timeout` seconds
+    to greet. Known client-first ports get their protocol probe straight away, and
+    a silent service on any other port receives an HTTP request.
+
+    Args:
+        sock: A connected non-blocking socket.
+        port: The remote port, used to choose the probe.
+        timeout: Seconds allowed for each read phase.
+
+    Returns:
+        A dictionary with 'service', 'product', 'version' and 'banner' (the
+        printable response text), or None if the service stayed silent.
+    """
+    loop = asyncio.get_running_loop()
+    probe = probe_for(port)
+    data = b""
+    if probe is None:
+        data = await _read(sock, time.perf_counter() + timeout)
+        probe = None if data else "http"
+    if probe:
+        try:
+            await asyncio.wait_for(loop.sock_sendall(sock, PROBES[probe]), timeout)
+        except (asyncio.TimeoutError, OSError):
+            return None
+        data = await _read(sock, time.perf_counter() + timeout)
+    if not data:
+        return None
+
+    result = identify(data) or {"service": "unknown", "product": None, "version": None}
+    # TLS records are binary; keep only the classification for them
+    result["banner"] = "" if result["service"] == "tls" else _text(data[:512])
+    return result
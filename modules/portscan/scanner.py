@@ -1,9 +1,10 @@
 import asyncio
 import logging
-import socket
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Set
 
 from core.module_loader import BaseModule
+from core.scheduler import IPS, OPEN_PORTS
+from modules.portscan.engine import ConnectScanner, parse_ports
 
 logger = logging.getLogger(__name__)
 
@@ -11,10 +12,18 @@ logger = logging.getLogger(__name__)
 class PortScanner(BaseModule):
     """An asynchronous TCP port scanner for identifying active services.
 
-    Resolves the target domain to an IP address and probes a configurable list
-    of common ports. Uses semaphores to control concurrency.
+    Consumes the (host, ip) pairs published by the resolution stage and scans each
+    unique IP exactly once, however many hostnames point at it. Open ports are then
+    mapped back to every hostname of that IP. Probing is delegated to ConnectScanner,
+    which paces itself independently of the API rate limiter and, when 'banners' is
+    enabled, fingerprints each open port (service, product, version) on the same
+    connection.
     """
 
+    consumes = (IPS,)
+    produces = (OPEN_PORTS,)
+    streams_input = True
+
     @property
     def name(self) -> str:
         """The module name."""
@@ -29,55 +38,81 @@ class PortScanner(BaseModule):
         """Main execution logic for the Port Scanner module.
 
         Args:
-            target: The domain or IP to scan.
+            target: The root domain or IP of the scan.
         """
+        scans: Dict[str, asyncio.Task] = {}
         try:
-            # Resolve domain to IP (OS-level resolution)
-            try:
-                ip = await asyncio.to_thread(socket.gethostbyname, target)
-                logger.info(f"[PORTSCAN] Resolved {target} to {ip}. Initiating scan...")
-            except socket.gaierror:
-                logger.error(f"[PORTSCAN] Failed to resolve target: {target}")
-                return
-
             # Load scan parameters from configuration
-            ports = self.config.get(
-                "ports",
-                [
-                    21, 22, 23, 25, 53, 80, 110, 111, 135, 139, 143, 443, 445, 993, 
-                    995, 1723, 3306, 3389, 5900, 8080, 8443
-                ],
-            )
-            timeout = self.config.get("timeout", 2)
-            concurrency = self.config.get("concurrency", 100)
-
-            semaphore = asyncio.Semaphore(concurrency)
-
-            async def check_port(port: int) -> Optional[int]:
-                """Attempts to establish a TCP connection to a specific port."""
-                async with semaphore:
-                    if self.limiter:
-                        await self.limiter.acquire()
-                    try:
-                        conn = asyncio.open_connection(ip, port)
-                        _, writer = await asyncio.wait_for(conn, timeout=timeout)
-                        writer.close()
-                        await writer.wait_closed()
-                        return port
-                    except (asyncio.TimeoutError, ConnectionRefusedError, OSError):
-                        return None
-
-            tasks = [check_port(p) for p in ports]
-            results = await asyncio.gather(*tasks)
-
-            open_ports = [p for p in results if p is not None]
-
-            if open_ports:
-                findings = [{"ip": ip, "port": p, "state": "open"} for p in open_ports]
+            ports = parse_ports(self.config.get("ports", "top100"))
+            engine = ConnectScanner.from_config(self.config)
+            ip_hosts: Dict[str, Set[str]] = {}
+            open_ports: Dict[str, List[int]] = {}
+
+            def describe(ip: str, port: int) -> Dict[str, Any]:
+                """Builds the finding for an open port, with its fingerprint when one was taken."""
+                return {"ip": ip, "port": port, "state": "open", **engine.services.get((ip, port), {})}
+
+            def announce(ip: str, port: int, host: str) -> None:
+                """Streams an open port for one hostname to downstream consumers."""
+                self.publish(OPEN_PORTS, {**describe(ip, port), "host": host})
+
+            def on_open(ip: str, port: int) -> None:
+                open_ports[ip].append(port)
+                for host in sorted(ip_hosts[ip]):
+                    announce(ip, port, host)
+
+            def add(ip: str, host: str) -> None:
+                hosts = ip_hosts.setdefault(ip, set())
+                if ip not in scans:
+                    open_ports[ip] = []
+                    scans[ip] = asyncio.create_task(engine.scan_host(ip, ports, on_open))
+                if host not in hosts:
+                    hosts.add(host)
+                    # Ports already found on this IP apply to the new hostname too
+                    for port in open_ports[ip]:
+                        announce(ip, port, host)
+
+            # 1. Scan every unique IP as the resolution stage publishes it
+            async for entry in self.iter_findings(target, IPS):
+                if entry.get("ip"):
+                    add(entry["ip"], entry.get("host") or target)
+
+            if not scans:
+                # Without a resolution stage, fall back to the target itself
+                addresses = await self.resolve_host(target)
+                if not addresses:
+                    logger.error(f"[PORTSCAN] Failed to resolve target: {target}")
+                    return
+                logger.info(f"[PORTSCAN] Resolved {target} to {addresses[0]}. Initiating scan...")
+                add(addresses[0], target)
+
+            await asyncio.gather(*scans.values())
+
+            # 2. One finding per (ip, port), listing every hostname behind the IP
+            findings = [
+                {
+                    **describe(ip, port),
+                    "host": target if target in ip_hosts[ip] else min(ip_hosts[ip]),
+                    "hosts": sorted(ip_hosts[ip]),
+                }
+                for ip, found in open_ports.items()
+                for port in sorted(found)
+            ]
+            if findings:
                 self.store_results(target, "port_scanner", "port", findings)
-                logger.info(f"[PORTSCAN] Discovered {len(open_ports)} open ports")
+                logger.info(
+                    f"[PORTSCAN] Discovered {len(findings)} open ports across {len(scans)} unique IPs "
+                    f"({sum(len(h) for h in ip_hosts.values())} hostnames)"
+                )
             else:
-                logger.info(f"[PORTSCAN] No common ports found open for {target}")
+                logger.info(f"[PORTSCAN] No open ports found on {len(scans)} IPs for {target}")
+            logger.info(
+                f"[PORTSCAN] {engine.probes} probes at {engine.rate:.0f} probes/s "
+                f"({engine.retransmits} retransmitted after timeout)"
+            )
 
         except Exception as e:
             logger.error(f"[PORTSCAN] Module execution failed: {e}")
+        finally:
+            for task in scans.values():
+                task.cancel()
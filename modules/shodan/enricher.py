@@ -1,11 +1,11 @@
 import asyncio
 import logging
-import socket
-from typing import Any, Dict, List, Set
+from typing import Any, Dict, List, Optional, Set
 
 import shodan
 
 from core.module_loader import BaseModule
+from core.scheduler import IPS
 
 logger = logging.getLogger(__name__)
 
@@ -13,10 +13,13 @@ logger = logging.getLogger(__name__)
 class ShodanEnricher(BaseModule):
     """Enriches discoveries with metadata from the Shodan search engine.
 
-    Collects IP addresses discovered in previous phases (e.g., portscan) and
+    Consumes IP addresses streamed by upstream modules (e.g., portscan) and
     queries Shodan for organizational data, operating systems, and banners.
     """
 
+    consumes = (IPS,)
+    streams_input = True
+
     @property
     def name(self) -> str:
         """The module name."""
@@ -39,67 +42,34 @@ class ShodanEnricher(BaseModule):
                 logger.warning("[SHODAN] API key missing. Skipping enrichment.")
                 return
 
-            # 1. Retrieve IPs already discovered for this target from the database
-            results = self.db.get_results(target, module="portscan/scanner")
-            ips: Set[str] = set()
-            for res in results:
-                data = res.get("data")
-                entries = data if isinstance(data, list) else [data]
-                for entry in entries:
-                    if isinstance(entry, dict) and entry.get("ip"):
-                        ips.add(entry["ip"])
-
-            if not ips:
-                # If no IPs found in DB, attempt a direct resolution of the target domain
-                try:
-                    logger.debug(f"[SHODAN] Resolving {target} for enrichment...")
-                    ip = await asyncio.to_thread(socket.gethostbyname, target)
-                    ips.add(ip)
-                except Exception as e:
-                    logger.error(f"[SHODAN] Failed to resolve target {target}: {e}")
-                    return
-
-            logger.info(f"[SHODAN] Enriching {len(ips)} IP(s) via Shodan for {target}...")
-
-            # 2. Query Shodan for each identified IP
             api = shodan.Shodan(api_key)
             findings = []
+            ips: Set[str] = set()
 
-            for ip in ips:
-                if self.limiter:
-                    await self.limiter.acquire()
-
-                try:
-                    # Shodan library is blocking; offload to a thread
-                    host_info = await asyncio.to_thread(api.host, ip)
-
-                    enrichment = {
-                        "ip": ip,
-                        "org": host_info.get("org", "Unknown"),
-                        "os": host_info.get("os", "Unknown"),
-                        "ports": host_info.get("ports", []),
-                        "vulns": host_info.get("vulns", []),
-                        "hostnames": host_info.get("hostnames", []),
-                        "data": [],
-                    }
-
-                    for item in host_info.get("data", []):
-                        enrichment["data"].append(
-                            {
-                                "port": item.get("port"),
-                                "banner": item.get("data", "").strip()[:500],
-                                "service": item.get("product", "Unknown"),
-                            }
-                        )
-
+            # 1. Enrich IPs as upstream modules publish them
+            async for entry in self.iter_findings(target, IPS):
+                ip = entry.get("ip")
+                if not ip or ip in ips:
+                    continue
+                ips.add(ip)
+                enrichment = await self.enrich(api, ip)
+                if enrichment:
                     findings.append(enrichment)
-                    logger.debug(f"[SHODAN] Successfully enriched {ip}")
 
-                except shodan.APIError as e:
-                    logger.error(f"[SHODAN] API error for {ip}: {e}")
-                except Exception as e:
-                    logger.error(f"[SHODAN] Unexpected enrichment error for {ip}: {e}")
+            if not ips:
+                # If no IPs were discovered, attempt a direct resolution of the target domain
+                logger.debug(f"[SHODAN] Resolving {target} for enrichment...")
+                addresses = await self.resolve_host(target)
+                if not addresses:
+                    logger.error(f"[SHODAN] Failed to resolve target {target}")
+                    return
+                for ip in addresses:
+                    ips.add(ip)
+                    enrichment = await self.enrich(api, ip)
+                    if enrichment:
+                        findings.append(enrichment)
 
+            # 2. Persist the aggregate enrichment
             if findings:
                 self.store_results(target, "shodan", "enrichment", findings)
                 logger.info(f"[SHODAN] Successfully stored enrichment for {len(findings)} IPs")
@@ -108,3 +78,47 @@ class ShodanEnricher(BaseModule):
 
         except Exception as e:
             logger.error(f"[SHODAN] Module execution failed: {e}")
+
+    async def enrich(self, api: Any, ip: str) -> Optional[Dict[str, Any]]:
+        """Queries Shodan for a single IP address.
+
+        Args:
+            api: An initialized shodan.Shodan client.
+            ip: The IP address to look up.
+
+        Returns:
+            The enrichment dictionary, or None if the lookup failed.
+        """
+        await self.throttle(provider="shodan")
+
+        try:
+            # Shodan library is blocking; offload to a thread
+            host_info = await asyncio.to_thread(api.host, ip)
+
+            enrichment = {
+                "ip": ip,
+                "org": host_info.get("org", "Unknown"),
+                "os": host_info.get("os", "Unknown"),
+                "ports": host_info.get("ports", []),
+                "vulns": host_info.get("vulns", []),
+                "hostnames": host_info.get("hostnames", []),
+                "data": [],
+            }
+
+            for item in host_info.get("data", []):
+                enrichment["data"].append(
+                    {
+                        "port": item.get("port"),
+                        "banner": item.get("data", "").strip()[:500],
+                        "service": item.get("product", "Unknown"),
+                    }
+                )
+
+            logger.debug(f"[SHODAN] Successfully enriched {ip}")
+            return enrichment
+
+        except shodan.APIError as e:
+            logger.error(f"[SHODAN] API error for {ip}: {e}")
+        except Exception as e:
+            logger.error(f"[SHODAN] Unexpected enrichment error for {ip}: {e}")
+        return None
@@ -1,9 +1,10 @@
+import asyncio
 import logging
-from typing import Set
-
-import aiohttp
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
 
 from core.module_loader import BaseModule
+from core.names import NameSet
+from core.scheduler import SUBDOMAINS
 
 logger = logging.getLogger(__name__)
 
@@ -14,6 +15,8 @@ class AlienVault(BaseModule):
     Uses the passive DNS endpoint to discover historical subdomain records.
     """
 
+    produces = (SUBDOMAINS,)
+
     @property
     def name(self) -> str:
         """The module name."""
@@ -35,43 +38,150 @@ class AlienVault(BaseModule):
             return
 
         url = f"https://otx.alienvault.com/api/v1/indicators/domain/{target}/passive_dns"
+        limits = self.config.get("pagination", {}).get("alienvault", {})
         logger.info(f"[ALIENVAULT] Querying passive DNS records for {target}...")
 
-        try:
-            async with aiohttp.ClientSession(**self.get_session_kwargs()) as session:
-                if self.limiter:
-                    await self.limiter.acquire()
-
-                async with session.get(
-                    url, timeout=30, proxy=self.get_request_proxy()
-                ) as response:
-                    if response.status != 200:
-                        logger.warning(
-                            f"[ALIENVAULT] API returned non-200 status: {response.status}"
-                        )
-                        return
+        found = NameSet(self.scope(f"*.{target}"))
+        complete = True
 
-                    data = await response.json()
-                    subdomains: Set[str] = set()
+        def collect(hostnames: Iterable[str]) -> None:
+            for hostname in hostnames:
+                hostname = found.add(hostname)
+                if hostname is not None:
+                    self.publish(SUBDOMAINS, {"subdomain": hostname, "source": "alienvault"})
 
-                    for record in data.get("passive_dns", []):
-                        hostname = record.get("hostname", "").lower()
-                        if hostname.endswith(target) and hostname != target:
-                            subdomains.add(hostname)
+        try:
+            async with self.http_session("otx.alienvault.com") as session:
+
+                async def fetch(headers: Dict[str, str]) -> Tuple[int, Any, Optional[List[str]]]:
+                    nonlocal complete
+                    status, response_headers, data = await self._get(session, url, headers)
+                    if data is None:
+                        return status, response_headers, None
+                    collect(r.get("hostname", "") for r in data.get("passive_dns", []))
+
+                    # passive_dns is unpaged; the paged URL list adds hostnames seen in URLs
+                    if not await self._url_list(session, target, limits, collect):
+                        # Keep what was found, but don't cache an incomplete set
+                        complete = False
+                        return status, None, None
+                    return status, response_headers, sorted(found)
+
+                names = await self.cached("alienvault", url, fetch)
+                if names is None:
+                    if complete:
+                        return
+                    names = sorted(found)
 
-                    findings = [
-                        {"subdomain": sub, "source": "alienvault"}
-                        for sub in sorted(list(subdomains))
-                    ]
+                for hostname in names:
+                    if found.add(hostname) is not None:
+                        self.publish(SUBDOMAINS, {"subdomain": hostname, "source": "alienvault"})
+                findings = [{"subdomain": sub, "source": "alienvault"} for sub in names]
 
-                    if findings:
-                        self.store_results(target, "alienvault", findings)
-                        logger.info(
-                            f"[ALIENVAULT] Successfully discovered {len(findings)} subdomains"
-                        )
-                    else:
-                        logger.info(f"[ALIENVAULT] No records found for {target}")
+                if findings:
+                    self.store_results(target, "alienvault", findings)
+                    logger.info(
+                        f"[ALIENVAULT] Successfully discovered {len(findings)} subdomains"
+                    )
+                else:
+                    logger.info(f"[ALIENVAULT] No records found for {target}")
 
         except Exception as e:
             logger.error(f"[ALIENVAULT] Failed to query OTX API: {e}")
 
+    async def _get(
+        self, session: Any, url: str, headers: Dict[str, str]
+    ) -> Tuple[int, Any, Optional[Dict[str, Any]]]:
+        """Performs one OTX request, retrying while OTX throttles us.
+
+        Args:
+            session: The aiohttp session.
+            url: The API URL.
+            headers: Request headers (conditional validators, if any).
+
+        Returns:
+            (status, response headers, decoded JSON body or None if there is none).
+        """
+        for _ in range(self.config.get("max_retries", 3) + 1):
+            await self.throttle(provider="alienvault")
+            async with session.get(
+                url,
+                headers=headers,
+                timeout=30,
+                proxy=self.get_request_proxy("otx.alienvault.com"),
+            ) as response:
+                status, response_headers = response.status, response.headers
+                data = await response.json() if status == 200 else None
+
+            if await self.rate_feedback("alienvault", status, response_headers):
+                logger.warning(f"[ALIENVAULT] Rate limited (HTTP {status}); retrying")
+                continue
+            if status not in (200, 304):
+                logger.warning(f"[ALIENVAULT] API returned non-200 status: {status}")
+            return status, response_headers, data
+
+        logger.error("[ALIENVAULT] Still rate limited after retries; giving up")
+        return status, response_headers, None
+
+    async def _url_list(
+        self,
+        session: Any,
+        target: str,
+        limits: Dict[str, Any],
+        collect: Callable[[Iterable[str]], None],
+    ) -> bool:
+        """Pages through the URLs OTX has seen for the target, collecting their hostnames.
+
+        The first page gives the total size; the remaining pages, up to max_pages,
+        are fetched concurrently under the provider's rate budget.
+
+        Args:
+            session: The aiohttp session.
+            target: The domain.
+            limits: The 'pagination.alienvault' settings.
+            collect: Receives each page's hostnames.
+
+        Returns:
+            False if a page could not be read, so the collected set is incomplete.
+        """
+        max_pages = int(limits.get("max_pages", 5))
+        if max_pages <= 0:
+            return True
+        page_size = int(limits.get("page_size", 500))
+        url = (
+            f"https://otx.alienvault.com/api/v1/indicators/domain/{target}/url_list"
+            f"?limit={page_size}&page={{}}"
+        )
+
+        def hostnames(data: Dict[str, Any]) -> Iterable[str]:
+            return (r.get("hostname") or "" for r in data.get("url_list", []))
+
+        status, _, first = await self._get(session, url.format(1), {})
+        if first is None:
+            logger.warning(f"[ALIENVAULT] URL list unavailable (HTTP {status})")
+            return False
+        collect(hostnames(first))
+        if not first.get("has_next"):
+            return True
+
+        total = -(-int(first.get("full_size", 0)) // page_size)
+        last = min(max(total, 2), max_pages)
+        if total > max_pages:
+            logger.info(f"[ALIENVAULT] Reading {max_pages} of {total} URL list pages")
+        semaphore = asyncio.Semaphore(max(1, int(limits.get("concurrency", 4))))
+
+        async def page(number: int) -> Optional[Dict[str, Any]]:
+            async with semaphore:
+                _, _, data = await self._get(session, url.format(number), {})
+                return data
+
+        failed = 0
+        for done in asyncio.as_completed([page(n) for n in range(2, last + 1)]):
+            data = await done
+            if data is None:
+                failed += 1
+            else:
+                collect(hostnames(data))
+        if failed:
+            logger.warning(f"[ALIENVAULT] {failed} URL list pages could not be read")
+        return not failed
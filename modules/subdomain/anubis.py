@@ -1,9 +1,13 @@
+import asyncio
 import logging
-from typing import Any, List, Optional, Set
+from typing import Any, Dict, List, Optional, Tuple
 
 import aiohttp
 
 from core.module_loader import BaseModule
+from core.names import NameSet
+from core.scheduler import SUBDOMAINS
+from modules.subdomain.ct import read_crtsh_names
 
 logger = logging.getLogger(__name__)
 
@@ -14,6 +18,8 @@ class CertificateTransparency(BaseModule):
     CT logs are a highly effective way to find subdomains that have had SSL/TLS certificates issued.
     """
 
+    produces = (SUBDOMAINS,)
+
     @property
     def name(self) -> str:
         """The module name."""
@@ -37,52 +43,57 @@ class CertificateTransparency(BaseModule):
         url = f"https://crt.sh/?q=%.{target}&output=json"
         logger.info(f"[CT] Searching Certificate Transparency logs on crt.sh for {target}...")
 
+        timeout = aiohttp.ClientTimeout(
+            total=None, sock_connect=30, sock_read=self.config.get("crtsh_read_timeout", 60)
+        )
+        found = NameSet(self.scope(f"*.{target}"))
+
+        def on_name(domain: str) -> None:
+            self.publish(SUBDOMAINS, {"subdomain": domain, "source": "crt.sh"})
+
         try:
-            async with aiohttp.ClientSession(**self.get_session_kwargs()) as session:
-                if self.limiter:
-                    await self.limiter.acquire()
-
-                async with session.get(
-                    url, timeout=60, proxy=self.get_request_proxy()
-                ) as response:
-                    if response.status != 200:
-                        logger.warning(
-                            f"[CT] crt.sh returned non-200 status: {response.status}"
-                        )
-                        return
-
-                    try:
-                        data = await response.json()
-                    except aiohttp.ContentTypeError:
-                        # Sometimes crt.sh returns an error page (HTML) even with JSON output requested
-                        logger.error("[CT] Received invalid JSON response from crt.sh (likely a server-side error)")
-                        return
-
-                    subdomains: Set[str] = set()
-                    for entry in data:
-                        name_value = entry.get("name_value", "")
-                        # name_value can contain multiple domains separated by newline
-                        for domain in name_value.split("\n"):
-                            domain = domain.strip().lower()
-                            # Strip wildcards if present
-                            if domain.startswith("*."):
-                                domain = domain[2:]
-
-                            if domain.endswith(target) and domain != target:
-                                subdomains.add(domain)
-
-                    findings = [
-                        {"subdomain": sub, "source": "crt.sh"}
-                        for sub in sorted(list(subdomains))
-                    ]
-
-                    if findings:
-                        self.store_results(target, "crt.sh", "subdomain", findings)
-                        logger.info(
-                            f"[CT] Successfully discovered {len(findings)} subdomains"
-                        )
-                    else:
-                        logger.info(f"[CT] No certificates found for {target}")
+            async with self.http_session("crt.sh") as session:
+
+                async def fetch(headers: Dict[str, str]) -> Tuple[int, Any, Optional[List[str]]]:
+                    await self.throttle(provider="crt.sh", host="crt.sh")
+
+                    async with session.get(
+                        url, headers=headers, timeout=timeout, proxy=self.get_request_proxy("crt.sh")
+                    ) as response:
+                        if response.status == 304:
+                            return response.status, response.headers, None
+                        if response.status != 200:
+                            logger.warning(
+                                f"[CT] crt.sh returned non-200 status: {response.status}"
+                            )
+                            return response.status, response.headers, None
+
+                        try:
+                            # Publishes each subdomain as soon as its record is read
+                            await read_crtsh_names(response, found, on_name)
+                        except ValueError:
+                            # Sometimes crt.sh returns an error page (HTML) even with JSON output requested
+                            logger.error("[CT] Received invalid JSON response from crt.sh (likely a server-side error)")
+                            return response.status, response.headers, None
+                    return response.status, response.headers, sorted(found)
+
+                # Same query as the ct module, so the two share one cache entry
+                names = await self.cached("crt.sh", url, fetch)
+                if names is None:
+                    return
+
+                for domain in names:
+                    if found.add(domain) is not None:
+                        on_name(domain)
+                findings = [{"subdomain": sub, "source": "crt.sh"} for sub in names]
+
+                if findings:
+                    self.store_results(target, "crt.sh", "subdomain", findings)
+                    logger.info(
+                        f"[CT] Successfully discovered {len(findings)} subdomains"
+                    )
+                else:
+                    logger.info(f"[CT] No certificates found for {target}")
 
         except asyncio.TimeoutError:
             logger.error(f"[CT] Connection timed out while querying crt.sh for {target}")
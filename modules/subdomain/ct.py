@@ -1,13 +1,46 @@
 import aiohttp
 import asyncio
 import logging
-import json
-from typing import List, Dict, Any, Set
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from core.json_stream import JsonFieldExtractor
 from core.module_loader import BaseModule
+from core.names import NameSet
+from core.scheduler import SUBDOMAINS
 
 logger = logging.getLogger(__name__)
 
+
+async def read_crtsh_names(
+    response: aiohttp.ClientResponse, found: NameSet, on_name: Callable[[str], None]
+) -> None:
+    """Streams a crt.sh JSON response into a set of in-scope subdomains.
+
+    Only the 'name_value' fields are decoded, chunk by chunk, so memory stays
+    bounded however many certificates the response lists. Each new subdomain is
+    passed to `on_name` as soon as its record has arrived.
+
+    Args:
+        response: An open crt.sh response with status 200.
+        found: Receives the names; its scope decides which are kept.
+        on_name: Called once per newly seen subdomain.
+
+    Raises:
+        ValueError: If the body is not JSON (crt.sh error pages are HTML).
+    """
+    extractor = JsonFieldExtractor("name_value")
+    async for chunk in response.content.iter_chunked(64 * 1024):
+        for name_value in extractor.feed(chunk):
+            # name_value can contain multiple domains separated by newline;
+            # wildcards are stripped and out-of-scope names dropped
+            for domain in name_value.split("\n"):
+                domain = found.add(domain)
+                if domain is not None:
+                    on_name(domain)
+
+
 class CertificateTransparency(BaseModule):
+    produces = (SUBDOMAINS,)
+
     @property
     def name(self) -> str:
         return "ct"
@@ -28,44 +61,52 @@ class CertificateTransparency(BaseModule):
 
         url = f"https://crt.sh/?q=%.{target}&output=json"
         logger.info(f"Searching crt.sh for {target}...")
+        # crt.sh streams large bodies slowly: time out on silence, not on total duration
+        timeout = aiohttp.ClientTimeout(
+            total=None, sock_connect=30, sock_read=self.config.get("crtsh_read_timeout", 60)
+        )
+        found = NameSet(self.scope(f"*.{target}"))
+
+        def on_name(domain: str) -> None:
+            self.publish(SUBDOMAINS, {"subdomain": domain, "source": "crt.sh"})
+
         try:
-            async with aiohttp.ClientSession(**self.get_session_kwargs()) as session:
-                if self.limiter:
-                    await self.limiter.acquire()
-                
-                async with session.get(url, timeout=30, proxy=self.get_request_proxy()) as response:
-                    if response.status != 200:
-                        logger.error(f"crt.sh returned status {response.status}")
-                        return
-
-                    try:
-                        data = await response.json()
-                    except aiohttp.ContentTypeError:
-                        # Sometimes crt.sh returns text even if json is requested if it's an error page
-                        text = await response.text()
-                        logger.error(f"Failed to parse JSON from crt.sh. Response: {text[:200]}")
-                        return
-
-                    subdomains: Set[str] = set()
-                    for entry in data:
-                        name_value = entry.get("name_value", "")
-                        # name_value can contain multiple domains separated by newline
-                        for domain in name_value.split("\n"):
-                            domain = domain.strip().lower()
-                            # Clean wildcard and ensure it ends with our target
-                            if domain.startswith("*."):
-                                domain = domain[2:]
-                            
-                            if domain.endswith(target) and domain != target:
-                                subdomains.add(domain)
-
-                    findings = [{"subdomain": sub, "source": "crt.sh"} for sub in sorted(list(subdomains))]
-                    
-                    if findings:
-                        self.store_results(target, "crt.sh", "subdomain", findings)
-                        logger.info(f"Found {len(findings)} subdomains for {target} via crt.sh")
-                    else:
-                        logger.info(f"No subdomains found for {target} via crt.sh")
+            async with self.http_session("crt.sh") as session:
+
+                async def fetch(headers: Dict[str, str]) -> Tuple[int, Any, Optional[List[str]]]:
+                    await self.throttle(provider="crt.sh", host="crt.sh")
+                    async with session.get(
+                        url, headers=headers, timeout=timeout, proxy=self.get_request_proxy("crt.sh")
+                    ) as response:
+                        if response.status == 304:
+                            return response.status, response.headers, None
+                        if response.status != 200:
+                            logger.error(f"crt.sh returned status {response.status}")
+                            return response.status, response.headers, None
+
+                        try:
+                            await read_crtsh_names(response, found, on_name)
+                        except ValueError as e:
+                            # Sometimes crt.sh returns text even if json is requested if it's an error page
+                            logger.error(f"Failed to parse JSON from crt.sh: {e}")
+                            return response.status, response.headers, None
+                    return response.status, response.headers, sorted(found)
+
+                # Served from the response cache when crt.sh was queried recently
+                names = await self.cached("crt.sh", url, fetch)
+                if names is None:
+                    return
+
+                for domain in names:
+                    if found.add(domain) is not None:
+                        on_name(domain)
+                findings = [{"subdomain": sub, "source": "crt.sh"} for sub in names]
+
+                if findings:
+                    self.store_results(target, "crt.sh", "subdomain", findings)
+                    logger.info(f"Found {len(findings)} subdomains for {target} via crt.sh")
+                else:
+                    logger.info(f"No subdomains found for {target} via crt.sh")
 
         except asyncio.TimeoutError:
             logger.error(f"Timeout while query crt.sh for {target}")
@@ -1,7 +1,10 @@
-import aiohttp
+import asyncio
 import logging
-from typing import Set
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
 from core.module_loader import BaseModule
+from core.names import NameSet
+from core.scheduler import SUBDOMAINS
 
 logger = logging.getLogger(__name__)
 
@@ -12,6 +15,8 @@ class SecurityTrails(BaseModule):
     Requires an API key to be configured in 'api_keys.securitytrails'.
     """
 
+    produces = (SUBDOMAINS,)
+
     @property
     def name(self) -> str:
         """The module name."""
@@ -37,48 +42,169 @@ class SecurityTrails(BaseModule):
             logger.error(f"[SECURITYTRAILS] Invalid target format: {target}")
             return
 
-        url = f"https://api.securitytrails.com/v1/domain/{target}/subdomains"
+        limits = self.config.get("pagination", {}).get("securitytrails", {})
+        url = (
+            f"https://api.securitytrails.com/v1/domain/{target}/subdomains"
+            "?children_only=false&include_inactive=true"
+        )
         headers = {"APIKEY": api_key}
         logger.info(f"[SECURITYTRAILS] Searching SecurityTrails database for {target}...")
 
+        found = NameSet(self.scope(f"*.{target}"))
+        complete = True
+
+        def collect(hostnames: Iterable[str]) -> None:
+            for sub in hostnames:
+                sub = found.add(sub)
+                if sub is not None:
+                    self.publish(SUBDOMAINS, {"subdomain": sub, "source": "securitytrails"})
+
         try:
-            async with aiohttp.ClientSession(**self.get_session_kwargs()) as session:
-                if self.limiter:
-                    await self.limiter.acquire()
-
-                async with session.get(
-                    url, headers=headers, timeout=30, proxy=self.get_request_proxy()
-                ) as response:
-                    if response.status == 403:
-                        logger.error(
-                            "[SECURITYTRAILS] API key invalid or rate limit exceeded"
+            async with self.http_session("api.securitytrails.com") as session:
+
+                async def fetch(validators: Dict[str, str]) -> Tuple[int, Any, Optional[List[str]]]:
+                    nonlocal complete
+                    status, response_headers, data = await self._fetch(
+                        session, url, {**headers, **validators}
+                    )
+                    if data is None:
+                        return status, response_headers, None
+                    collect(f"{sub}.{target}" for sub in data.get("subdomains", []))
+
+                    # The subdomain list is capped on most plans; the paged search has the rest
+                    if data.get("meta", {}).get("limit_reached"):
+                        complete = await self._search_pages(
+                            session, target, headers, limits, collect
                         )
-                        return
-                    if response.status != 200:
-                        logger.warning(
-                            f"[SECURITYTRAILS] API returned status {response.status}"
-                        )
-                        return
+                        if not complete:
+                            return status, None, None
+                    return status, response_headers, sorted(found)
 
-                    data = await response.json()
-                    subdomains: Set[str] = set()
-
-                    for sub in data.get("subdomains", []):
-                        full_domain = f"{sub}.{target}".lower()
-                        subdomains.add(full_domain)
+                names = await self.cached("securitytrails", url, fetch)
+                if names is None:
+                    if complete:
+                        return
+                    names = sorted(found)
 
-                    findings = [
-                        {"subdomain": sub, "source": "securitytrails"}
-                        for sub in sorted(list(subdomains))
-                    ]
+                for sub in names:
+                    if found.add(sub) is not None:
+                        self.publish(SUBDOMAINS, {"subdomain": sub, "source": "securitytrails"})
+                findings = [{"subdomain": sub, "source": "securitytrails"} for sub in names]
 
-                    if findings:
-                        self.store_results(target, "securitytrails", findings)
-                        logger.info(
-                            f"[SECURITYTRAILS] Successfully discovered {len(findings)} subdomains"
-                        )
-                    else:
-                        logger.info(f"[SECURITYTRAILS] No records found for {target}")
+                if findings:
+                    self.store_results(target, "securitytrails", findings)
+                    logger.info(
+                        f"[SECURITYTRAILS] Successfully discovered {len(findings)} subdomains"
+                    )
+                else:
+                    logger.info(f"[SECURITYTRAILS] No records found for {target}")
 
         except Exception as e:
             logger.error(f"[SECURITYTRAILS] Failed to query SecurityTrails API: {e}")
+
+    async def _search_pages(
+        self,
+        session: Any,
+        target: str,
+        headers: Dict[str, str],
+        limits: Dict[str, Any],
+        collect: Callable[[Iterable[str]], None],
+    ) -> bool:
+        """Pages through the domain search for every hostname under the target.
+
+        The first page gives the page count; the rest are fetched concurrently
+        (under the provider's rate budget) and collected as they arrive.
+
+        Args:
+            session: The aiohttp session.
+            target: The apex domain.
+            headers: Request headers carrying the API key.
+            limits: The 'pagination.securitytrails' settings.
+            collect: Receives each page's hostnames.
+
+        Returns:
+            True if every page up to max_pages was read.
+        """
+        max_pages = int(limits.get("max_pages", 10))
+        if max_pages <= 0:
+            return True
+        url = "https://api.securitytrails.com/v1/domains/list?include_ips=false&page={}"
+        body = {"filter": {"apex_domain": target}}
+
+        async def page(number: int) -> Optional[Dict[str, Any]]:
+            status, _, data = await self._fetch(
+                session, url.format(number), headers, method="POST", json=body
+            )
+            if data is None:
+                logger.warning(f"[SECURITYTRAILS] Search page {number} failed (HTTP {status})")
+            return data
+
+        first = await page(1)
+        if first is None:
+            return False
+        collect(r.get("hostname", "") for r in first.get("records", []))
+
+        total = int(first.get("meta", {}).get("total_pages", 1))
+        last = min(total, max_pages)
+        if total > max_pages:
+            logger.info(f"[SECURITYTRAILS] Reading {max_pages} of {total} search pages")
+
+        semaphore = asyncio.Semaphore(max(1, int(limits.get("concurrency", 4))))
+
+        async def bounded(number: int) -> Optional[Dict[str, Any]]:
+            async with semaphore:
+                return await page(number)
+
+        complete = True
+        for done in asyncio.as_completed([bounded(n) for n in range(2, last + 1)]):
+            data = await done
+            if data is None:
+                complete = False
+                continue
+            collect(r.get("hostname", "") for r in data.get("records", []))
+        return complete
+
+    async def _fetch(
+        self,
+        session: Any,
+        url: str,
+        headers: Dict[str, str],
+        method: str = "GET",
+        json: Optional[Dict[str, Any]] = None,
+    ) -> Tuple[int, Any, Optional[Dict[str, Any]]]:
+        """Performs one API request, retrying while SecurityTrails throttles us.
+
+        Args:
+            session: The aiohttp session.
+            url: The API URL.
+            headers: Request headers carrying the API key.
+            method: HTTP method.
+            json: JSON request body, if any.
+
+        Returns:
+            (status, response headers, decoded JSON body or None if there is none).
+        """
+        for _ in range(self.config.get("max_retries", 3) + 1):
+            await self.throttle(provider="securitytrails")
+            async with session.request(
+                method,
+                url,
+                headers=headers,
+                json=json,
+                timeout=30,
+                proxy=self.get_request_proxy("api.securitytrails.com"),
+            ) as response:
+                status, response_headers = response.status, response.headers
+                data = await response.json() if status == 200 else None
+
+            if await self.rate_feedback("securitytrails", status, response_headers):
+                logger.warning(f"[SECURITYTRAILS] Rate limited (HTTP {status}); retrying")
+                continue
+            if status == 403:
+                logger.error("[SECURITYTRAILS] API key invalid or not permitted")
+            elif status not in (200, 304):
+                logger.warning(f"[SECURITYTRAILS] API returned status {status}")
+            return status, response_headers, data
+
+        logger.error("[SECURITYTRAILS] Still rate limited after retries; giving up")
+        return status, response_headers, None
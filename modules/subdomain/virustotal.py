@@ -1,9 +1,10 @@
 import logging
-from typing import Any, Dict, Set
-
-import aiohttp
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import quote
 
 from core.module_loader import BaseModule
+from core.names import NameSet
+from core.scheduler import SUBDOMAINS
 
 logger = logging.getLogger(__name__)
 
@@ -14,6 +15,8 @@ class VirusTotal(BaseModule):
     Requires an API key to be configured in 'api_keys.virustotal'.
     """
 
+    produces = (SUBDOMAINS,)
+
     @property
     def name(self) -> str:
         """The module name."""
@@ -39,47 +42,129 @@ class VirusTotal(BaseModule):
             logger.error(f"[VIRUSTOTAL] Invalid target format: {target}")
             return
 
-        url = f"https://www.virustotal.com/api/v3/domains/{target}/subdomains?limit=40"
+        limits = self.config.get("pagination", {}).get("virustotal", {})
+        # v3 relationship endpoints return at most 40 objects per page
+        page_size = max(1, min(int(limits.get("page_size", 40)), 40))
+        max_pages = int(limits.get("max_pages", 25))
+        url = f"https://www.virustotal.com/api/v3/domains/{target}/subdomains?limit={page_size}"
         headers = {"x-apikey": api_key}
         logger.info(f"[VIRUSTOTAL] Searching VirusTotal database for {target}...")
 
+        found = NameSet(self.scope(f"*.{target}"))
+        complete = True
+
         try:
-            async with aiohttp.ClientSession(**self.get_session_kwargs()) as session:
-                if self.limiter:
-                    await self.limiter.acquire()
-
-                async with session.get(
-                    url, headers=headers, timeout=30, proxy=self.get_request_proxy()
-                ) as response:
-                    if response.status == 401:
-                        logger.error("[VIRUSTOTAL] API key is invalid")
-                        return
-                    if response.status != 200:
-                        logger.warning(
-                            f"[VIRUSTOTAL] API returned status {response.status}"
-                        )
+            async with self.http_session("www.virustotal.com") as session:
+
+                async def fetch(validators: Dict[str, str]) -> Tuple[int, Any, Optional[List[str]]]:
+                    nonlocal complete
+                    # Only the first page can be revalidated; a 304 there reuses the cached set
+                    status, first_headers, data = await self._fetch(
+                        session, url, {**headers, **validators}
+                    )
+                    if data is None:
+                        return status, first_headers, None
+
+                    pages = 1
+                    while True:
+                        for item in data.get("data", []):
+                            sub = found.add(item.get("id", ""))
+                            if sub is not None:
+                                self.publish(
+                                    SUBDOMAINS, {"subdomain": sub, "source": "virustotal"}
+                                )
+
+                        # The cursor makes the pages strictly sequential
+                        next_url = self._next_page(url, data)
+                        if next_url is None:
+                            break
+                        if pages >= max_pages:
+                            logger.info(
+                                f"[VIRUSTOTAL] Stopping at {max_pages} pages; more results exist"
+                            )
+                            break
+                        page_status, _, data = await self._fetch(session, next_url, headers)
+                        if data is None:
+                            # Keep what was found, but don't cache an incomplete set
+                            logger.warning(
+                                f"[VIRUSTOTAL] Paging stopped after {pages} pages "
+                                f"(HTTP {page_status})"
+                            )
+                            complete = False
+                            return page_status, None, None
+                        pages += 1
+
+                    logger.debug(f"[VIRUSTOTAL] Read {pages} pages for {target}")
+                    return status, first_headers, sorted(found)
+
+                names = await self.cached("virustotal", url, fetch)
+                if names is None:
+                    if complete:
                         return
+                    names = sorted(found)
 
-                    data = await response.json()
-                    subdomains: Set[str] = set()
+                for sub in names:
+                    if found.add(sub) is not None:
+                        self.publish(SUBDOMAINS, {"subdomain": sub, "source": "virustotal"})
+                findings = [{"subdomain": sub, "source": "virustotal"} for sub in names]
 
-                    for item in data.get("data", []):
-                        sub = item.get("id", "").lower()
-                        if sub.endswith(target) and sub != target:
-                            subdomains.add(sub)
-
-                    findings = [
-                        {"subdomain": sub, "source": "virustotal"}
-                        for sub in sorted(list(subdomains))
-                    ]
-
-                    if findings:
-                        self.store_results(target, "virustotal", findings)
-                        logger.info(
-                            f"[VIRUSTOTAL] Successfully discovered {len(findings)} subdomains"
-                        )
-                    else:
-                        logger.info(f"[VIRUSTOTAL] No records found for {target}")
+                if findings:
+                    self.store_results(target, "virustotal", findings)
+                    logger.info(
+                        f"[VIRUSTOTAL] Successfully discovered {len(findings)} subdomains"
+                    )
+                else:
+                    logger.info(f"[VIRUSTOTAL] No records found for {target}")
 
         except Exception as e:
             logger.error(f"[VIRUSTOTAL] Failed to query VirusTotal API: {e}")
+
+    @staticmethod
+    def _next_page(url: str, data: Dict[str, Any]) -> Optional[str]:
+        """Returns the URL of the page after `data`, or None on the last page.
+
+        Args:
+            url: The first page's URL.
+            data: The decoded page.
+        """
+        next_url = data.get("links", {}).get("next")
+        if next_url:
+            return next_url
+        cursor = data.get("meta", {}).get("cursor")
+        return f"{url}&cursor={quote(cursor)}" if cursor else None
+
+    async def _fetch(
+        self, session: Any, url: str, headers: Dict[str, str]
+    ) -> Tuple[int, Any, Optional[Dict[str, Any]]]:
+        """Performs one API request, retrying while VirusTotal throttles us.
+
+        Args:
+            session: The aiohttp session.
+            url: The API URL.
+            headers: Request headers carrying the API key.
+
+        Returns:
+            (status, response headers, decoded JSON body or None if there is none).
+        """
+        for _ in range(self.config.get("max_retries", 3) + 1):
+            await self.throttle(provider="virustotal")
+            async with session.get(
+                url,
+                headers=headers,
+                timeout=30,
+                proxy=self.get_request_proxy("www.virustotal.com"),
+            ) as response:
+                status, response_headers = response.status, response.headers
+                data = await response.json() if status == 200 else None
+
+            if await self.rate_feedback("virustotal", status, response_headers):
+                logger.warning(f"[VIRUSTOTAL] Rate limited (HTTP {status}); retrying")
+                continue
+            if status == 401:
+                logger.error("[VIRUSTOTAL] API key is invalid")
+            elif status not in (200, 304):
+                logger.warning(f"[VIRUSTOTAL] API returned status {status}")
+            return status, response_headers, data
+
+        logger.error("[VIRUSTOTAL] Still rate limited after retries; giving up")
+        return status, response_headers, None
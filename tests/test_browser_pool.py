@@ -0,0 +1,186 @@
+import asyncio
+import os
+import signal
+import subprocess
+import sys
+import time
+import uuid
+from pathlib import Path
+
+import pytest
+
+from core.browser_pool import BrowserPool, process_tree_rss
+
+
+class FakePage:
+    def __init__(self, context):
+        self.context = context
+        self.url = "about:blank"
+        self.closed = False
+        self.probe_error = None
+
+    async def goto(self, url, **kwargs):
+        self.url = url
+
+    async def evaluate(self, script):
+        if self.probe_error and script == "1 + 1":
+            raise self.probe_error
+        return 2
+
+    async def close(self):
+        self.closed = True
+
+
+class FakeContext:
+    def __init__(self, browser):
+        self.browser = browser
+        self.pages = []
+        self.cookies = ["session"]
+        self.closed = False
+
+    async def new_page(self):
+        page = FakePage(self)
+        self.pages.append(page)
+        return page
+
+    async def clear_cookies(self):
+        self.cookies = []
+
+    async def clear_permissions(self):
+        pass
+
+    async def close(self):
+        self.closed = True
+
+
+class FakeBrowser:
+    def __init__(self, args):
+        self.args = args
+        self.contexts = []
+        self.connected = True
+        self.closed = False
+
+    def is_connected(self):
+        return self.connected
+
+    async def new_context(self, **options):
+        context = FakeContext(self)
+        self.contexts.append(context)
+        return context
+
+    async def close(self):
+        self.closed = True
+
+
+def fake_pool(**kwargs):
+    launched = []
+
+    async def launcher(args):
+        await asyncio.sleep(0)  # launches overlap, as real ones do
+        launched.append(FakeBrowser(args))
+        return launched[-1]
+
+    return BrowserPool(launcher=launcher, **kwargs), launched
+
+
+@pytest.mark.asyncio
+async def test_contexts_are_reset_and_reused():
+    pool, launched = fake_pool(browsers=1, max_memory_mb=0)
+    async with pool.page() as first:
+        await first.goto("http://a.test/")
+        await first.context.new_page()  # a popup
+    assert first.url == "about:blank" and first.context.cookies == []
+    assert first.context.pages[1].closed
+    async with pool.page() as second:
+        assert second is first
+    assert len(launched) == 1 and len(launched[0].contexts) == 1
+    assert pool.stats() == {"browsers": 1, "leased": 0, "warm": 1, "restarts": 0}
+    await pool.close()
+    assert launched[0].closed and first.context.closed
+
+
+@pytest.mark.asyncio
+async def test_leases_spread_over_browsers_up_to_capacity():
+    pool, launched = fake_pool(browsers=3, contexts_per_browser=2, max_memory_mb=0)
+    in_flight = peak = 0
+
+    async def lease():
+        nonlocal in_flight, peak
+        async with pool.page():
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0.01)
+            in_flight -= 1
+
+    await asyncio.gather(*(lease() for _ in range(20)))
+    assert len(launched) == 3
+    assert peak == pool.capacity == 6
+    # Each browser keeps one warm context per page it served at once
+    assert sorted(len(b.contexts) for b in launched) == [2, 2, 2]
+    await pool.close()
+
+
+@pytest.mark.asyncio
+async def test_browser_restarts_after_max_pages_once_its_pages_are_returned():
+    pool, launched = fake_pool(browsers=1, max_pages_per_browser=2, max_memory_mb=0)
+    async with pool.page():
+        pass
+    async with pool.page() as page:
+        assert not launched[0].closed
+    assert launched[0].closed and page.context.closed
+    async with pool.page():
+        pass
+    assert len(launched) == 2 and not launched[1].closed
+    assert pool.restarts == 1
+    await pool.close()
+
+
+@pytest.mark.asyncio
+async def test_failed_lease_discards_its_context():
+    pool, launched = fake_pool(browsers=1, max_memory_mb=0)
+    with pytest.raises(RuntimeError):
+        async with pool.page() as broken:
+            raise RuntimeError("navigation crashed the renderer")
+    assert broken.context.closed
+    async with pool.page() as page:
+        assert page is not broken
+    await pool.close()
+
+
+@pytest.mark.asyncio
+async def test_unhealthy_and_disconnected_browsers_are_replaced():
+    pool, launched = fake_pool(browsers=1, health_interval=0, max_memory_mb=0)
+    async with pool.page() as page:
+        page.probe_error = TimeoutError()
+    assert launched[0].closed and pool.restarts == 1
+
+    async with pool.page():
+        pass
+    launched[1].connected = False
+    async with pool.page():
+        pass
+    assert len(launched) == 3 and launched[1].closed and pool.restarts == 2
+    await pool.close()
+
+
+@pytest.mark.skipif(not Path("/proc/self/stat").exists(), reason="needs /proc")
+def test_process_tree_rss_sums_the_marked_process_and_its_children():
+    marker = f"--browser-pool-test-{uuid.uuid4().hex}"
+    code = (
+        "import subprocess, sys, time; "
+        "subprocess.Popen([sys.executable, '-c', 'import time; time.sleep(30)']); time.sleep(30)"
+    )
+    proc = subprocess.Popen([sys.executable, "-c", code, marker], start_new_session=True)
+    try:
+        for _ in range(100):
+            own = int(Path(f"/proc/{proc.pid}/statm").read_text().split()[1])
+            rss = process_tree_rss(marker)
+            if rss and rss > own * os.sysconf("SC_PAGE_SIZE"):
+                break  # the child is counted too
+            time.sleep(0.05)
+        else:
+            pytest.fail("the child process was not counted")
+    finally:
+        os.killpg(proc.pid, signal.SIGKILL)
+        proc.wait()
+    assert process_tree_rss(marker) is None
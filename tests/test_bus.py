@@ -0,0 +1,43 @@
+import asyncio
+
+import pytest
+
+from core.bus import FindingBus
+from core.scheduler import HTTP_URLS, SUBDOMAINS
+
+
+@pytest.mark.asyncio
+async def test_subscriber_receives_findings_while_producer_runs():
+    bus = FindingBus()
+    bus.register_producer(SUBDOMAINS)
+    bus.seal()
+    received = []
+
+    async def consume():
+        async for item in bus.subscribe(SUBDOMAINS):
+            received.append(item["subdomain"])
+
+    consumer = asyncio.create_task(consume())
+    assert bus.publish(SUBDOMAINS, {"subdomain": "a.example.com"})
+    await asyncio.sleep(0)
+    await asyncio.sleep(0)
+    assert received == ["a.example.com"]
+
+    # Duplicates from another source are dropped
+    assert not bus.publish(SUBDOMAINS, {"subdomain": "a.example.com", "source": "other"})
+    bus.publish(SUBDOMAINS, {"subdomain": "b.example.com"})
+    bus.producer_done(SUBDOMAINS)
+    await asyncio.wait_for(consumer, timeout=1)
+    assert received == ["a.example.com", "b.example.com"]
+
+    # Late subscribers replay the full history
+    late = [item async for item in bus.subscribe(SUBDOMAINS)]
+    assert len(late) == 2
+
+
+@pytest.mark.asyncio
+async def test_kind_without_producers_is_closed():
+    bus = FindingBus()
+    bus.seal()
+    items = [item async for item in bus.subscribe(HTTP_URLS)]
+    assert items == []
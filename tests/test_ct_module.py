@@ -1,5 +1,5 @@
 import pytest
-from unittest.mock import AsyncMock, patch
+from unittest.mock import AsyncMock, MagicMock, patch
 
 from modules.subdomain import ct
 from core.module_loader import BaseModule
@@ -9,7 +9,11 @@ from core.module_loader import BaseModule
 async def test_ct_module_fetch(mock_get):
     mock_resp = AsyncMock()
     mock_resp.status = 200
-    mock_resp.json = AsyncMock(return_value=[{"name_value": "a.example.com"}])
+    async def iter_chunked(size):
+        yield b'[{"name_value": "a.exa'
+        yield b'mple.com"}]'
+    mock_resp.content = MagicMock()
+    mock_resp.content.iter_chunked = iter_chunked
     mock_get.return_value.__aenter__.return_value = mock_resp
     # Mock dependencies for BaseModule
     class DummyDB:
@@ -18,3 +18,83 @@ def test_store_and_retrieve_results(tmp_path):
         if isinstance(d, dict) and d.get("subdomain") == "test.example.com":
             found = True
     assert found
+
+
+def test_pooled_connections_use_wal(tmp_path):
+    db = database.Database(str(tmp_path / "wal.db"), {"cache_size_kb": 1024})
+    with db._read() as conn:
+        assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+        assert conn.execute("PRAGMA cache_size").fetchone()[0] == -1024
+    db.create_scan("s1", "example.com", "running")
+    # Reader connection observes committed writes from the shared writer
+    assert db.get_scan("s1")["status"] == "running"
+    db.close()
+
+
+def test_from_config_accepts_path_string(tmp_path):
+    db = database.Database.from_config({"database": str(tmp_path / "plain.db")})
+    assert db.settings["journal_mode"] == "wal"
+    db.close()
+
+
+def test_entities_are_deduplicated_on_insert(tmp_path):
+    db = database.Database(str(tmp_path / "entities.db"))
+    db.store_result("example.com", "subdomain/ct", "crt.sh", "subdomain",
+                    [{"subdomain": "a.example.com", "source": "crt.sh"},
+                     {"subdomain": "b.example.com", "source": "crt.sh"}], scan_id="s1")
+    db.store_results_batch([
+        ("s1", "example.com", "subdomain/virustotal", "virustotal", "subdomain",
+         [{"subdomain": "a.example.com", "source": "virustotal"}]),
+        ("s1", "example.com", "portscan/scanner", "port_scanner", "port",
+         [{"ip": "10.0.0.1", "port": 80, "state": "open"}, {"ip": "10.0.0.1", "port": 80, "state": "open"}]),
+    ])
+    assert db.get_unique_subdomains("example.com") == ["a.example.com", "b.example.com"]
+    assert db.get_unique_results("example.com", "port") == [{"ip": "10.0.0.1", "port": 80, "state": "open"}]
+    assert db.count_entities("ips", "example.com") == 1
+    db.close()
+
+
+def test_legacy_results_are_migrated(tmp_path):
+    import json
+    import sqlite3
+
+    path = str(tmp_path / "legacy.db")
+    conn = sqlite3.connect(path)
+    conn.execute(
+        "CREATE TABLE results (id INTEGER PRIMARY KEY AUTOINCREMENT, scan_id TEXT, target TEXT NOT NULL,"
+        " module TEXT NOT NULL, source TEXT NOT NULL, type TEXT NOT NULL, data TEXT NOT NULL,"
+        " timestamp DATETIME DEFAULT CURRENT_TIMESTAMP)"
+    )
+    conn.execute(
+        "INSERT INTO results (scan_id, target, module, source, type, data) VALUES (?, ?, ?, ?, ?, ?)",
+        ("old", "example.com", "http/detector", "http_detector", "http", json.dumps([{"url": "http://example.com/"}])),
+    )
+    conn.commit()
+    conn.close()
+
+    db = database.Database(path)
+    assert db.get_unique_results("example.com", "http") == [{"url": "http://example.com/"}]
+    db.close()
+
+
+def test_entity_columns_added_after_creation_are_migrated(tmp_path):
+    import sqlite3
+
+    path = str(tmp_path / "old_ports.db")
+    conn = sqlite3.connect(path)
+    conn.execute(
+        "CREATE TABLE ports (id INTEGER PRIMARY KEY AUTOINCREMENT, target TEXT NOT NULL, ip TEXT NOT NULL,"
+        " port INTEGER NOT NULL, state TEXT, host TEXT, scan_id TEXT, data TEXT NOT NULL,"
+        " first_seen DATETIME DEFAULT CURRENT_TIMESTAMP, last_seen DATETIME DEFAULT CURRENT_TIMESTAMP,"
+        " UNIQUE(target, ip, port))"
+    )
+    conn.commit()
+    conn.close()
+
+    db = database.Database(path)
+    db.store_result("example.com", "portscan/scanner", "port_scanner", "port",
+                    [{"ip": "10.0.0.1", "port": 22, "state": "open", "service": "ssh", "product": "OpenSSH"}])
+    with db._read() as reader:
+        row = reader.execute("SELECT service, product FROM ports").fetchone()
+    assert tuple(row) == ("ssh", "OpenSSH")
+    db.close()
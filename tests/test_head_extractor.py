@@ -0,0 +1,66 @@
+import pytest
+
+from modules.http.head import HeadExtractor
+
+PAGE = (
+    "<!DOCTYPE html><html><head>\n"
+    "<!-- <title>commented out</title> -->\n"
+    '<meta http-equiv="Content-Type" content="text/html; charset=ISO-8859-1">\n'
+    '<script>document.write("<title>from script</title>")</script>\n'
+    "<TITLE>\n  Caf\xe9 &amp; Bar\n</TITLE>\n"
+    '<meta name="Generator" content="WordPress 6.4.2">\n'
+    "<link rel='alternate canonical' href=https://example.com/>\n"
+    '<link rel="shortcut icon" href="/static/fav.ico?v=2&amp;x=1">\n'
+    "<meta http-equiv=\"refresh\" content=\"0; URL='https://example.com/login'\">\n"
+    "</head><body><svg><title>icon</title></svg>"
+).encode("latin-1") + b"x" * 50000
+
+
+def extract(data: bytes, size: int, **kwargs) -> HeadExtractor:
+    head = HeadExtractor(**kwargs)
+    for i in range(0, len(data), size):
+        if head.feed(data[i:i + size]):
+            break
+    return head
+
+
+@pytest.mark.parametrize("size", [1, 2, 5, 64, 4096, 10**6])
+def test_head_fields_at_any_chunk_size(size):
+    head = extract(PAGE, size)
+    assert head.result() == {
+        "title": "Café & Bar",
+        "generator": "WordPress 6.4.2",
+        "charset": "iso8859-1",
+        "canonical": "https://example.com/",
+        "icon": "/static/fav.ico?v=2&x=1",
+        "refresh": "https://example.com/login",
+    }
+
+
+def test_reading_stops_at_end_of_head():
+    head = extract(PAGE, 64)
+    assert head.done
+    assert head.bytes_read < 1024
+
+
+def test_byte_budget_is_enforced():
+    head = extract(b"<html>" + b"<p>filler</p>" * 10000, 1000, max_bytes=4096)
+    assert head.done
+    assert head.bytes_read == 4096
+    assert head.title is None
+
+
+def test_header_charset_is_used_without_meta():
+    head = extract("<title>Grüße</title><body>".encode("cp1252"), 3, charset="windows-1252")
+    assert head.title == "Grüße"
+    assert extract("<title>Grüße</title>".encode(), 3).charset == "utf-8"
+
+
+def test_unknown_or_non_text_charset_falls_back_to_utf8():
+    head = extract(b'<meta charset="base64"><title>ok</title></head>', 7, charset="bogus")
+    assert head.charset == "utf-8"
+    assert head.title == "ok"
+
+
+def test_empty_title_is_none():
+    assert extract(b"<head><title>  </title></head>", 4).title is None
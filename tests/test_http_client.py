@@ -0,0 +1,64 @@
+import pytest
+
+from core.http_client import HttpClient
+from core.module_loader import BaseModule
+from core.proxy_manager import ProxyManager
+
+
+class DummyModule(BaseModule):
+    @property
+    def name(self):
+        return "dummy"
+
+    @property
+    def module_type(self):
+        return "test"
+
+    async def run(self, target):
+        pass
+
+
+@pytest.mark.asyncio
+async def test_sessions_are_pooled_per_route_and_closed_together():
+    client = HttpClient(limit=50, limit_per_host=5, dns_cache_ttl=60)
+    direct = client.session()
+    assert client.session() is direct
+    assert direct.connector.limit == 50
+    assert direct.connector.limit_per_host == 5
+
+    socks = client.session("socks5://127.0.0.1:9050")
+    assert socks is not direct
+
+    await client.close()
+    assert direct.closed and socks.closed
+    # A closed client reopens lazily
+    assert not client.session().closed
+    await client.close()
+
+
+@pytest.mark.asyncio
+async def test_socks_proxy_manager_selects_its_own_pool():
+    client = HttpClient(proxy_manager=ProxyManager({"use_tor": True}))
+    try:
+        assert client.session() is client.session("socks5://127.0.0.1:9050")
+    finally:
+        await client.close()
+
+
+@pytest.mark.asyncio
+async def test_modules_share_the_engine_session():
+    client = HttpClient()
+    first, second = DummyModule({}, None, http_client=client), DummyModule({}, None, http_client=client)
+    try:
+        async with first.http_session() as a:
+            pass
+        async with second.http_session() as b:
+            pass
+        # The shared session outlives each module's block
+        assert a is b and not a.closed
+    finally:
+        await client.close()
+
+    async with DummyModule({}, None).http_session() as private:
+        assert private is not a
+    assert private.closed
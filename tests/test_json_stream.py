@@ -0,0 +1,54 @@
+import json
+
+import pytest
+
+from core.json_stream import JsonFieldExtractor
+
+
+def chunks(data: bytes, size: int):
+    return [data[i:i + size] for i in range(0, len(data), size)]
+
+
+def extract(data: bytes, size: int, field: str = "name_value"):
+    extractor = JsonFieldExtractor(field)
+    values = []
+    for chunk in chunks(data, size):
+        values.extend(extractor.feed(chunk))
+    return values
+
+
+RECORDS = [
+    {"issuer_name": "C=US, O=Let's Encrypt", "name_value": "a.example.com\nwww.example.com", "id": 1},
+    {"issuer_name": 'say "name_value": "x"', "name_value": "*.b.example.com", "id": 2},
+    {"name_value": None, "common_name": "c.example.com"},
+    {"name_value": "ünï.example.com", "id": 3},
+    {"name_value": "quote\\\"d.example.com"},
+]
+
+
+@pytest.mark.parametrize("size", [1, 2, 3, 7, 64, 10**6])
+def test_values_match_full_parse_at_any_chunk_size(size):
+    data = json.dumps(RECORDS, indent=1).encode()
+    expected = [r["name_value"] for r in RECORDS if isinstance(r.get("name_value"), str)]
+    assert extract(data, size) == expected
+
+
+def test_buffer_stays_small():
+    record = {"id": 1, "issuer_name": "x" * 500, "name_value": "a.example.com"}
+    data = json.dumps([record] * 2000).encode()
+    extractor = JsonFieldExtractor("name_value")
+    found = 0
+    for chunk in chunks(data, 4096):
+        found += len(extractor.feed(chunk))
+        assert len(extractor._buffer) < 4096 + 64
+    assert found == extractor.values_found == 2000
+    assert extractor.bytes_read == len(data)
+
+
+def test_html_error_page_is_rejected():
+    with pytest.raises(ValueError):
+        extract(b"  <html><body>502 Bad Gateway</body></html>", 5)
+
+
+def test_empty_array_yields_nothing():
+    assert extract(b"[]", 1) == []
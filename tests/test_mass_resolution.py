@@ -0,0 +1,125 @@
+import asyncio
+
+import pytest
+
+from core.bus import FindingBus
+from core.database import Database
+from core.scheduler import IPS, OPEN_PORTS, SUBDOMAINS, DagScheduler
+from modules.dns.resolver import MassResolver
+from modules.portscan.scanner import PortScanner
+
+
+class ZoneResolver:
+    """In-memory stand-in for core.resolver.Resolver with a wildcard zone."""
+
+    RECORDS = {
+        "example.com": ["127.0.0.1"],
+        "a.example.com": ["127.0.0.1"],
+        "b.example.com": ["127.0.0.1"],
+        "real.wild.example.com": ["127.0.0.1"],
+    }
+
+    def __init__(self):
+        self.lookups = []
+
+    async def resolve(self, name, rtypes=("A",)):
+        self.lookups.append(name)
+        if name in self.RECORDS:
+            return list(self.RECORDS[name])
+        if name.endswith(".wild.example.com"):
+            return ["127.0.0.9"]
+        return []
+
+    async def resolve_many(self, names, rtypes=("A",)):
+        return {n: await self.resolve(n, rtypes) for n in names}
+
+
+@pytest.mark.asyncio
+async def test_hosts_collapse_to_unique_ips_and_wildcards_are_dropped(tmp_path):
+    connections = []
+
+    async def accept(reader, writer):
+        connections.append(1)
+        writer.close()
+
+    server = await asyncio.start_server(accept, "127.0.0.1", 0)
+    port = server.sockets[0].getsockname()[1]
+
+    db = Database(str(tmp_path / "mass.db"))
+    bus = FindingBus()
+    resolver = ZoneResolver()
+    dns = MassResolver({}, db, scan_id="s1", bus=bus, resolver=resolver)
+    scanner = PortScanner({"ports": [port], "timeout": 1}, db, scan_id="s1", bus=bus, resolver=resolver)
+    for kind in (SUBDOMAINS, IPS, OPEN_PORTS):
+        bus.register_producer(kind)
+    bus.seal()
+
+    async def subdomains():
+        names = ["a.example.com", "b.example.com", "x.wild.example.com", "real.wild.example.com", "gone.example.com"]
+        for name in names:
+            bus.publish(SUBDOMAINS, {"subdomain": name})
+            await asyncio.sleep(0)
+        bus.producer_done(SUBDOMAINS)
+
+    async def runner(module):
+        try:
+            await module.run("example.com")
+        finally:
+            for kind in module.produces:
+                bus.producer_done(kind)
+
+    try:
+        await asyncio.wait_for(
+            asyncio.gather(subdomains(), DagScheduler([dns, scanner], runner).run()), timeout=5
+        )
+    finally:
+        server.close()
+        await server.wait_closed()
+
+    # x.wild.example.com only matches the wildcard answer and never reaches the scanner
+    hosts = {item["host"] for item in bus.snapshot(IPS)}
+    assert hosts == {"example.com", "a.example.com", "b.example.com", "real.wild.example.com"}
+    # The single unique IP was scanned exactly once
+    assert len(connections) == 1
+    announced = {(item["host"], item["port"]) for item in bus.snapshot(OPEN_PORTS)}
+    assert announced == {(h, port) for h in hosts}
+
+    ports = db.get_results("example.com", module="portscan")[0]["data"]
+    assert ports == [
+        {
+            "ip": "127.0.0.1",
+            "port": port,
+            "state": "open",
+            "host": "example.com",
+            "hosts": ["a.example.com", "b.example.com", "example.com", "real.wild.example.com"],
+        }
+    ]
+    wildcards = db.get_results("example.com", module="dns")
+    assert any(r["type"] == "dns_wildcard" and r["data"][0]["zone"] == "wild.example.com" for r in wildcards)
+    db.close()
+
+
+@pytest.mark.asyncio
+async def test_a_failing_lookup_does_not_lose_the_other_records(tmp_path):
+    class FlakyResolver(ZoneResolver):
+        async def resolve(self, name, rtypes=("A",)):
+            if name == "b.example.com":
+                raise RuntimeError("malformed reply")
+            return await super().resolve(name, rtypes)
+
+    db = Database(str(tmp_path / "flaky.db"))
+    bus = FindingBus()
+    dns = MassResolver({}, db, scan_id="s1", bus=bus, resolver=FlakyResolver())
+    for kind in (SUBDOMAINS, IPS):
+        bus.register_producer(kind)
+    bus.seal()
+    for name in ("a.example.com", "b.example.com"):
+        bus.publish(SUBDOMAINS, {"subdomain": name})
+    bus.producer_done(SUBDOMAINS)
+
+    await asyncio.wait_for(dns.run("example.com"), timeout=5)
+
+    stored = db.get_results("example.com", module="dns")
+    hosts = {r["host"] for result in stored if result["type"] == "dns" for r in result["data"]}
+    assert hosts == {"example.com", "a.example.com"}
+    db.close()
@@ -0,0 +1,128 @@
+import logging
+
+import pytest
+import yaml
+
+from core import engine
+from core.module_loader import ModuleLoader
+from core.names import NameSet, Scope, extract_hostnames, normalize_name
+from core.utils import extract_subdomains
+
+
+@pytest.mark.parametrize(
+    "raw, expected",
+    [
+        ("API.Example.COM.", "api.example.com"),
+        ("  *.example.com\n", "example.com"),
+        ("bücher.example.com", "xn--bcher-kva.example.com"),
+        ("_dmarc.example.com", "_dmarc.example.com"),
+        ("bad name.example.com", None),
+        ("-lead.example.com", None),
+        ("a..example.com", None),
+        ("", None),
+    ],
+)
+def test_normalize_name(raw, expected):
+    assert normalize_name(raw) == expected
+
+
+def test_suffix_match_is_label_aligned():
+    scope = Scope(["example.com"])
+    assert "example.com" in scope
+    assert "a.b.example.com" in scope
+    assert "evilexample.com" not in scope
+    assert "example.com.evil.net" not in scope
+    assert "com" not in scope
+
+
+def test_wildcard_scope_excludes_the_root():
+    scope = Scope(["*.example.com"])
+    assert "example.com" not in scope
+    assert "www.example.com" in scope
+
+
+def test_most_specific_pattern_wins():
+    scope = Scope(
+        ["example.com", "www.dev.example.com"],
+        ["dev.example.com", "*.corp.example.com"],
+    )
+    assert "dev.example.com" not in scope
+    assert "x.dev.example.com" not in scope
+    assert "www.dev.example.com" in scope
+    assert "corp.example.com" in scope
+    assert "vpn.corp.example.com" not in scope
+
+
+def test_multiple_roots():
+    scope = Scope.for_target("example.com", {"include": ["example.net", "*.example.org"]})
+    assert scope.root_of("a.example.net") == "example.net"
+    assert scope.root_of("a.example.org") == "example.org"
+    assert "example.org" not in scope
+
+
+def test_invalid_pattern_is_rejected():
+    with pytest.raises(ValueError):
+        Scope(["not a domain"])
+
+
+def test_name_set_normalizes_and_dedupes():
+    names = NameSet(Scope(["*.example.com"]))
+    assert names.add("WWW.example.com.") == "www.example.com"
+    assert names.add("www.example.com") is None
+    assert names.add("*.www.example.com") is None
+    assert names.add("evilexample.com") is None
+    assert names.add("example.com") is None
+    names.add("api.example.com")
+    assert len(names) == 2
+    assert sorted(names) == ["api.example.com", "www.example.com"]
+    assert "api.example.com" in names and "mail.example.com" not in names
+
+
+def test_scope_filter_yields_each_name_once():
+    scope = Scope(["example.com"], ["*.dev.example.com"])
+    raw = ["a.example.com", "A.example.com", "x.dev.example.com", "b.example.com", "other.io"]
+    assert list(scope.filter(raw)) == ["a.example.com", "b.example.com"]
+
+
+def test_extract_subdomains_rejects_lookalikes():
+    text = (
+        "https://API.example.com/v1 foo.evilexample.com mail@corp.example.com "
+        "cdn.example.com.attacker.net example.com v1.2.3"
+    )
+    assert list(extract_hostnames("go to www.example.com.")) == ["www.example.com"]
+    assert extract_subdomains("example.com", text) == ["api.example.com", "corp.example.com"]
+
+
+@pytest.mark.asyncio
+async def test_engine_passes_scope_config_to_modules(tmp_path, monkeypatch):
+    config = {
+        "modules": {"enabled": {"subdomain": ["ct"]}},
+        "scope": {"include": ["example.net"], "exclude": ["*.dev.example.com"]},
+        "database": str(tmp_path / "recon.db"),
+        "logging": {"level": "INFO", "file": str(tmp_path / "recon.log")},
+        "cache": {"enabled": False},
+    }
+    config_path = tmp_path / "config.yaml"
+    config_path.write_text(yaml.safe_dump(config))
+
+    loaded = []
+    load = ModuleLoader.load_enabled_modules
+
+    async def load_without_running(self, *args, **kwargs):
+        loaded.extend(await load(self, *args, **kwargs))
+        return []
+
+    monkeypatch.setattr(ModuleLoader, "load_enabled_modules", load_without_running)
+    handlers = logging.getLogger().handlers[:]
+    try:
+        await engine.run_scan("example.com", config_path=str(config_path))
+    finally:
+        # run_scan replaces the root logger's handlers with its own
+        for handler in logging.getLogger().handlers:
+            if handler not in handlers:
+                handler.close()
+        logging.getLogger().handlers[:] = handlers
+
+    scope = loaded[0].scope("example.com")
+    assert "api.example.com" in scope and "www.example.net" in scope
+    assert "x.dev.example.com" not in scope
@@ -0,0 +1,80 @@
+import asyncio
+
+import pytest
+
+from modules.portscan.engine import OPEN, ConnectScanner
+from modules.portscan.fingerprint import PROBES, identify
+
+
+@pytest.mark.parametrize(
+    "data, expected",
+    [
+        (b"SSH-2.0-OpenSSH_9.6p1 Ubuntu-3ubuntu13\r\n", ("ssh", "OpenSSH", "9.6p1")),
+        (b"220 mail.example.com ESMTP Postfix (Ubuntu)\r\n", ("smtp", "Postfix", None)),
+        (b"220 mx.example.com ESMTP Exim 4.96 Mon, 12 Oct 2026\r\n", ("smtp", "Exim", "4.96")),
+        (b"220 (vsFTPd 3.0.3)\r\n", ("ftp", "vsFTPd", "3.0.3")),
+        (b"HTTP/1.1 301 Moved\r\nServer: nginx/1.24.0\r\n\r\n", ("http", "nginx", "1.24.0")),
+        (b"HTTP/1.0 404 Not Found\r\nServer: Caddy\r\n\r\n", ("http", "Caddy", None)),
+        (b"J\x00\x00\x00\x0a8.0.36\x00\x08\x00\x00\x00", ("mysql", "MySQL", "8.0.36")),
+        (b"-NOAUTH Authentication required.\r\n", ("redis", None, None)),
+        (b"\x16\x03\x03\x00\x5a\x02\x00\x00\x56\x03\x03" + bytes(32), ("tls", None, "1.2")),
+        (b"\x15\x03\x01\x00\x02\x02\x28", ("tls", None, None)),
+        (b"* OK [CAPABILITY IMAP4rev1] Dovecot ready.\r\n", ("imap", "Dovecot", None)),
+    ],
+)
+def test_identify_classifies_common_greetings(data, expected):
+    result = identify(data)
+    assert (result["service"], result["product"], result["version"]) == expected
+
+
+def test_identify_ignores_unknown_bytes():
+    assert identify(b"\x00\x01garbage") is None
+
+
+def test_tls_probe_is_a_well_formed_client_hello():
+    hello = PROBES["tls"]
+    assert hello[:3] == b"\x16\x03\x01"
+    assert int.from_bytes(hello[3:5], "big") == len(hello) - 5
+    assert hello[5] == 1
+    assert int.from_bytes(hello[6:9], "big") == len(hello) - 9
+
+
+async def _serve(handler):
+    server = await asyncio.start_server(handler, "127.0.0.1", 0)
+    return server, server.sockets[0].getsockname()[1]
+
+
+@pytest.mark.asyncio
+async def test_banners_are_read_on_the_probe_connection():
+    connections = []
+
+    async def ssh(reader, writer):
+        connections.append("ssh")
+        writer.write(b"SSH-2.0-OpenSSH_9.6\r\n")
+        await writer.drain()
+        writer.close()
+
+    async def http(reader, writer):
+        # Client-first: stays silent until the fallback HTTP probe arrives
+        connections.append("http")
+        await reader.readuntil(b"\r\n\r\n")
+        writer.write(b"HTTP/1.1 200 OK\r\nServer: Apache/2.4.58 (Unix)\r\n\r\n")
+        await writer.drain()
+        writer.close()
+
+    (ssh_server, ssh_port), (http_server, http_port) = await _serve(ssh), await _serve(http)
+    engine = ConnectScanner(banners=True, banner_timeout=0.3, timeout=1)
+    try:
+        assert await engine.probe("127.0.0.1", ssh_port) == OPEN
+        assert await engine.probe("127.0.0.1", http_port) == OPEN
+    finally:
+        for server in (ssh_server, http_server):
+            server.close()
+            await server.wait_closed()
+
+    assert sorted(connections) == ["http", "ssh"]
+    ssh_info = engine.services[("127.0.0.1", ssh_port)]
+    assert (ssh_info["service"], ssh_info["product"], ssh_info["version"]) == ("ssh", "OpenSSH", "9.6")
+    assert ssh_info["banner"] == "SSH-2.0-OpenSSH_9.6"
+    http_info = engine.services[("127.0.0.1", http_port)]
+    assert (http_info["service"], http_info["product"], http_info["version"]) == ("http", "Apache", "2.4.58")
@@ -0,0 +1,144 @@
+import asyncio
+
+import pytest
+
+from modules.portscan.engine import CLOSED, FILTERED, OPEN, ConnectScanner, RttEstimator, parse_ports
+
+
+def test_parse_ports_expands_ranges_and_named_sets():
+    assert parse_ports("22, 80,8000-8002") == [22, 80, 8000, 8001, 8002]
+    assert parse_ports([443, "80", "1-2"]) == [1, 2, 80, 443]
+    assert parse_ports(8080) == [8080]
+    assert parse_ports("-3") == [1, 2, 3]
+    assert len(parse_ports("top100")) == 100
+    assert len(parse_ports("top1000")) == 1000
+    assert len(parse_ports("1-65535")) == 65535
+
+
+@pytest.mark.parametrize("spec", ["0", "70000", "10-5", "ssh", "1-x"])
+def test_parse_ports_rejects_invalid_specs(spec):
+    with pytest.raises(ValueError):
+        parse_ports(spec)
+
+
+async def _listeners(count):
+    async def accept(reader, writer):
+        writer.close()
+
+    servers = [await asyncio.start_server(accept, "127.0.0.1", 0) for _ in range(count)]
+    return servers, [s.sockets[0].getsockname()[1] for s in servers]
+
+
+async def _closed_port():
+    server = await asyncio.start_server(lambda r, w: None, "127.0.0.1", 0)
+    port = server.sockets[0].getsockname()[1]
+    server.close()
+    await server.wait_closed()
+    return port
+
+
+@pytest.mark.asyncio
+async def test_probe_distinguishes_open_and_closed_ports():
+    servers, (port,) = await _listeners(1)
+    closed = await _closed_port()
+    engine = ConnectScanner(timeout=1)
+    try:
+        assert await engine.probe("127.0.0.1", port) == OPEN
+        assert await engine.probe("127.0.0.1", closed) == CLOSED
+    finally:
+        for server in servers:
+            server.close()
+            await server.wait_closed()
+    assert engine.probes == 2
+
+
+@pytest.mark.asyncio
+async def test_scan_host_reports_open_ports_and_respects_per_host_cap():
+    servers, ports = await _listeners(5)
+    closed = [await _closed_port() for _ in range(20)]
+    engine = ConnectScanner(per_host=3, timeout=1)
+    in_flight = peak = 0
+    original = engine.probe
+
+    async def tracked(ip, port):
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        try:
+            return await original(ip, port)
+        finally:
+            in_flight -= 1
+
+    engine.probe = tracked
+    announced = []
+    try:
+        found = await engine.scan_host("127.0.0.1", ports + closed, lambda ip, p: announced.append(p))
+    finally:
+        for server in servers:
+            server.close()
+            await server.wait_closed()
+
+    assert found == sorted(ports)
+    assert sorted(announced) == sorted(ports)
+    assert peak <= 3
+
+
+@pytest.mark.asyncio
+async def test_pacing_budget_limits_probe_rate():
+    engine = ConnectScanner(rate=20, timeout=1)
+    closed = [await _closed_port() for _ in range(30)]
+    start = asyncio.get_event_loop().time()
+    await engine.scan(["127.0.0.1"], closed)
+    # The bucket starts full (20 tokens), so the remaining 10 take about half a second
+    assert asyncio.get_event_loop().time() - start >= 0.4
+
+
+def test_rtt_estimator_follows_rfc6298():
+    estimator = RttEstimator()
+    assert estimator.timeout(0.1, 5) == 5
+    estimator.update(0.2)
+    assert estimator.srtt == pytest.approx(0.2)
+    assert estimator.rttvar == pytest.approx(0.1)
+    assert estimator.timeout(0.1, 5) == pytest.approx(0.6)
+    estimator.update(0.2)
+    assert estimator.srtt == pytest.approx(0.2)
+    assert estimator.rttvar == pytest.approx(0.075)
+    assert estimator.timeout(0.5, 5) == pytest.approx(0.5)
+    estimator.backoff()
+    estimator.backoff()
+    assert estimator.timeout(0.5, 5) == pytest.approx(2)
+    estimator.update(0.2)
+    assert estimator.backoffs == 0
+
+
+@pytest.mark.asyncio
+async def test_timeout_adapts_to_measured_rtt():
+    servers, (port,) = await _listeners(1)
+    engine = ConnectScanner(timeout=3, min_timeout=0.05, max_timeout=5)
+    try:
+        assert engine.timeout_for("127.0.0.1") == 3
+        for _ in range(5):
+            assert await engine.probe("127.0.0.1", port) == OPEN
+    finally:
+        for server in servers:
+            server.close()
+            await server.wait_closed()
+    # Loopback answers in well under a millisecond, so the floor applies
+    assert engine.timeout_for("127.0.0.1") < 0.5
+
+
+@pytest.mark.asyncio
+async def test_timed_out_probe_is_retransmitted_and_backs_off(monkeypatch):
+    engine = ConnectScanner(timeout=0.05, max_timeout=1, retries=1)
+    attempts = []
+
+    async def blackholed(sock, address):
+        attempts.append(engine.timeout_for(address[0]))
+        await asyncio.sleep(60)
+
+    monkeypatch.setattr(asyncio.get_running_loop(), "sock_connect", blackholed)
+    assert await engine.probe("192.0.2.1", 80) == FILTERED
+    assert engine.probes == 2 and engine.retransmits == 1
+    # Each timeout doubles the next one, as TCP backs off its RTO
+    assert attempts == [pytest.approx(0.05), pytest.approx(0.1)]
+    assert engine.timeout_for("192.0.2.1") == pytest.approx(0.2)
@@ -0,0 +1,124 @@
+import asyncio
+
+import pytest
+from aiohttp import web
+
+from core.bus import FindingBus
+from core.scheduler import HTTP_URLS, OPEN_PORTS, SUBDOMAINS
+from modules.http.detector import HttpDetector
+from modules.http.planner import ProbePlanner, infer_scheme, sniff_scheme
+
+
+@pytest.mark.parametrize(
+    "port, service, expected",
+    [
+        (8081, "http", (True, "http")),
+        (4433, "tls", (True, "https")),
+        (993, "tls", (False, None)),
+        (22, "ssh", (False, None)),
+        (443, None, (True, "https")),
+        (8080, "unknown", (True, "http")),
+        (31337, None, (True, None)),
+    ],
+)
+def test_infer_scheme(port, service, expected):
+    assert infer_scheme(port, service) == expected
+
+
+def test_planner_dedupes_host_ports():
+    planner = ProbePlanner()
+    candidate = planner.from_port("A.example.com", 8443, "tls")
+    assert candidate.url() == "https://a.example.com:8443"
+    assert planner.from_port("a.example.com", 8443, "tls") is None
+    assert planner.from_port("a.example.com", 22, "ssh") is None
+    assert planner.from_port("a.example.com", 443, "tls").url() == "https://a.example.com"
+    # 443 is already planned from the port scan; only 80 is added
+    assert [c.url() for c in planner.from_host("a.example.com")] == ["http://a.example.com"]
+    assert len(planner) == 3
+
+
+async def serve_bytes(reply: bytes):
+    async def handle(reader, writer):
+        await reader.read(1)
+        writer.write(reply)
+        await writer.drain()
+        writer.close()
+
+    server = await asyncio.start_server(handle, "127.0.0.1", 0)
+    return server, server.sockets[0].getsockname()[1]
+
+
+@pytest.mark.asyncio
+async def test_sniff_scheme_reads_the_first_byte():
+    tls, tls_port = await serve_bytes(b"\x15\x03\x03\x00\x02\x02\x28")
+    plain, plain_port = await serve_bytes(b"HTTP/1.1 400 Bad Request\r\n\r\n")
+    try:
+        assert await sniff_scheme("127.0.0.1", tls_port) == "https"
+        assert await sniff_scheme("127.0.0.1", plain_port) == "http"
+    finally:
+        for server in (tls, plain):
+            server.close()
+            await server.wait_closed()
+    assert await sniff_scheme("127.0.0.1", tls_port, timeout=1) is None
+
+
+class Recorder:
+    def __init__(self):
+        self.stored = []
+
+    def store_result(self, **kwargs):
+        self.stored.append(kwargs)
+
+
+async def start_app(app):
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    return runner, site._server.sockets[0].getsockname()[1]
+
+
+@pytest.mark.asyncio
+async def test_detector_probes_open_ports_once_and_dedupes_redirects():
+    hits = {"page": 0, "redirect": 0}
+
+    async def page(request):
+        hits["page"] += 1
+        return web.Response(text="<html><head><title>Home</title></head></html>", content_type="text/html")
+
+    page_runner, page_port = await start_app(_app(page))
+
+    async def redirect(request):
+        hits["redirect"] += 1
+        raise web.HTTPFound(f"http://127.0.0.1:{page_port}/")
+
+    redirect_runner, redirect_port = await start_app(_app(redirect))
+
+    bus = FindingBus()
+    bus.register_producer(OPEN_PORTS)
+    bus.register_producer(SUBDOMAINS)
+    bus.seal()
+    for port, service in ((page_port, None), (redirect_port, "http"), (22, "ssh")):
+        bus.publish(OPEN_PORTS, {"ip": "127.0.0.1", "port": port, "host": "127.0.0.1", "service": service})
+    # Has no open port, so it is not probed blindly
+    bus.publish(SUBDOMAINS, {"subdomain": "nothing-here.invalid"})
+    bus.producer_done(OPEN_PORTS)
+    bus.producer_done(SUBDOMAINS)
+
+    db = Recorder()
+    try:
+        await HttpDetector({}, db, bus=bus).run("example.test")
+    finally:
+        await page_runner.cleanup()
+        await redirect_runner.cleanup()
+
+    urls = [f["url"] for f in bus.snapshot(HTTP_URLS)]
+    assert urls == [f"http://127.0.0.1:{page_port}/"]
+    assert db.stored[0]["data"][0]["title"] == "Home"
+    assert hits == {"page": 2, "redirect": 1}
+
+
+def _app(handler):
+    app = web.Application()
+    app.router.add_get("/", handler)
+    return app
@@ -0,0 +1,159 @@
+import asyncio
+
+import pytest
+
+from core.http_client import HttpClient
+from core.proxy_manager import ProxyManager
+from core.proxy_pool import ProxyPool
+
+HOST = "127.0.0.1"
+
+
+class StubProxy:
+    """Local stand-in for an HTTP proxy: answers every proxied request itself."""
+
+    def __init__(self, delay: float = 0.0):
+        self.delay = delay
+        self.requests = 0
+        self.active = 0  # requests being answered
+        self.peak = 0
+        self.server = None
+
+    async def start(self) -> "StubProxy":
+        self.server = await asyncio.start_server(self._handle, HOST, 0)
+        return self
+
+    @property
+    def url(self) -> str:
+        return f"http://{HOST}:{self.server.sockets[0].getsockname()[1]}"
+
+    async def close(self) -> None:
+        self.server.close()
+        await self.server.wait_closed()
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            while await reader.readuntil(b"\r\n\r\n"):
+                self.requests += 1
+                self.active += 1
+                self.peak = max(self.peak, self.active)
+                await asyncio.sleep(self.delay)
+                self.active -= 1
+                writer.write(b"HTTP/1.1 200 OK\r\nContent-Length: 2\r\n\r\nok")
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+
+def dead_url() -> str:
+    """Returns a proxy URL nothing listens on."""
+    import socket
+
+    with socket.socket() as sock:
+        sock.bind((HOST, 0))
+        return f"http://{HOST}:{sock.getsockname()[1]}"
+
+
+def test_hosts_stick_to_their_proxy_and_rotate_round_robin():
+    pool = ProxyPool(["http://a:1", "http://b:1", "http://c:1"])
+    first = [pool.select(h).url for h in ("x", "y", "z", "w")]
+    assert first == ["http://a:1", "http://b:1", "http://c:1", "http://a:1"]
+    assert [pool.select(h).url for h in ("x", "y", "z", "w")] == first
+
+
+def test_least_loaded_prefers_idle_proxy():
+    pool = ProxyPool(
+        [{"url": "http://a:1", "max_connections": 10}, "http://b:1"],
+        strategy="least_loaded",
+        max_connections=2,
+    )
+    pool.endpoints[0].active = 3  # 30% of its limit
+    pool.endpoints[1].active = 1  # 50% of its limit
+    assert pool.select("x").url == "http://a:1"
+
+
+def test_repeated_failures_eject_proxy_and_move_its_hosts():
+    pool = ProxyPool(["http://a:1", "http://b:1"], max_failures=2)
+    bad = pool.select("x")
+    pool.record_failure(bad)
+    assert bad.healthy
+    pool.record_failure(bad)
+    assert not bad.healthy
+    assert pool.select("x") is not bad
+    assert all(pool.select(h) is not bad for h in "abcdef")
+
+
+def test_unknown_strategy_and_empty_pool_are_rejected():
+    with pytest.raises(ValueError):
+        ProxyPool(["http://a:1"], strategy="random")
+    with pytest.raises(ValueError):
+        ProxyPool([])
+
+
+def test_manager_routes_through_pool():
+    manager = ProxyManager(
+        {"http": "http://single:8080", "pool": {"proxies": ["http://a:1", "socks5://b:1"]}}
+    )
+    assert manager.get_proxy_url("x") == "http://a:1"
+    assert manager.get_connector_url("x") is None
+    assert manager.get_connector_url("y") == "socks5://b:1"
+    assert manager.get_proxy_url("y") is None
+
+
+@pytest.mark.asyncio
+async def test_health_probe_ejects_dead_proxy_and_restores_it():
+    live = await StubProxy().start()
+    pool = ProxyPool([live.url, dead_url()], health_url="http://health.invalid/", health_timeout=2)
+    try:
+        assert await pool.check_all() == 1
+        assert pool.endpoints[0].healthy and pool.endpoints[0].latency is not None
+        assert not pool.endpoints[1].healthy
+
+        pool.endpoints[1].url = live.url
+        await pool.check(pool.endpoints[1])
+        assert pool.endpoints[1].healthy
+    finally:
+        await live.close()
+
+
+@pytest.mark.asyncio
+async def test_pooled_client_spreads_hosts_and_caps_connections_per_proxy():
+    proxies = [await StubProxy(delay=0.02).start() for _ in range(2)]
+    manager = ProxyManager(
+        {"pool": {"proxies": [p.url for p in proxies], "max_connections": 3, "health_url": ""}}
+    )
+    client = HttpClient(proxy_manager=manager)
+
+    async def fetch(host: str) -> int:
+        session = client.session(host=host)
+        async with session.get(f"http://{host}/", proxy=manager.get_proxy_url(host)) as response:
+            await response.read()
+            return response.status
+
+    try:
+        statuses = await asyncio.gather(*(fetch(f"h{i % 8}.test") for i in range(40)))
+        assert statuses == [200] * 40
+        assert [p.requests for p in proxies] == [20, 20]
+        assert [p.peak for p in proxies] == [3, 3]
+        assert all(e.active == 0 for e in manager.pool.endpoints)
+    finally:
+        await client.close()
+        for p in proxies:
+            await p.close()
+
+
+@pytest.mark.asyncio
+async def test_connection_failures_through_proxy_count_against_it():
+    manager = ProxyManager({"pool": {"proxies": [dead_url()], "max_failures": 2}})
+    client = HttpClient(proxy_manager=manager)
+    endpoint = manager.pool.endpoints[0]
+    try:
+        for _ in range(2):
+            with pytest.raises(Exception):
+                await client.session(host="x").get("http://x/", proxy=endpoint.url)
+        assert endpoint.failures == 2
+        assert not endpoint.healthy
+    finally:
+        await client.close()
@@ -1,6 +1,12 @@
 import pytest
 import asyncio
-from core.rate_limiter import RateLimiter
+from core.rate_limiter import (
+    AdaptiveRateLimiter,
+    RateLimiter,
+    RateLimiterRegistry,
+    is_throttled,
+    retry_delay,
+)
 
 @pytest.mark.asyncio
 async def test_rate_limiter_allows_limited_rate():
@@ -12,3 +18,161 @@ async def test_rate_limiter_allows_limited_rate():
     # The first token is available immediately, so 3 tokens at 2/sec = at least 1.5s
     # Allow for timing inaccuracy in CI/local runs
     assert elapsed >= 0.9
+
+
+@pytest.mark.asyncio
+async def test_slow_provider_does_not_delay_other_keys():
+    registry = RateLimiterRegistry(
+        global_rate=0,
+        providers={"slow": {"rate": 1, "burst": 1}},
+        host_spec={"rate": 100, "burst": 100},
+    )
+    loop = asyncio.get_event_loop()
+    await registry.acquire(provider="slow")
+    waiting = asyncio.create_task(registry.acquire(provider="slow"))
+    await asyncio.sleep(0)
+
+    start = loop.time()
+    for _ in range(20):
+        await registry.acquire(host="target.example.com")
+    assert loop.time() - start < 0.2
+    assert not waiting.done()
+    await waiting
+
+
+@pytest.mark.asyncio
+async def test_global_bucket_caps_every_key():
+    registry = RateLimiterRegistry(global_rate=5, global_burst=1, host_spec={"rate": 100, "burst": 100})
+    loop = asyncio.get_event_loop()
+    start = loop.time()
+    for i in range(4):
+        await registry.acquire(host=f"h{i}.example.com")
+    # One burst token, then three more at 5/s
+    assert loop.time() - start >= 0.5
+
+
+@pytest.mark.asyncio
+async def test_unconfigured_keys_get_no_bucket():
+    registry = RateLimiterRegistry(global_rate=0, providers={"crt.sh": {"rate": 1}})
+    await registry.acquire(provider="unknown", module="http", host="a.example.com")
+    assert len(registry) == 0
+    assert registry.bucket("provider", "crt.sh") is not None
+
+
+def test_idle_and_excess_buckets_are_evicted(monkeypatch):
+    registry = RateLimiterRegistry(global_rate=0, host_spec={"rate": 10}, max_keys=3, idle_ttl=60)
+    now = [1000.0]
+    monkeypatch.setattr("core.rate_limiter.time.monotonic", lambda: now[0])
+    for name in "abcd":
+        registry.bucket("host", name)
+    # Least recently used host is dropped beyond max_keys
+    assert len(registry) == 3
+    assert ("host", "a") not in registry._buckets
+
+    registry.bucket("host", "b")
+    now[0] += 120
+    registry.bucket("host", "e")
+    assert list(registry._buckets) == [("host", "e")]
+
+
+def test_registry_reads_legacy_rate_limit():
+    registry = RateLimiterRegistry.from_config({"rate_limit": 7})
+    assert registry.global_limiter.rate == 7
+    registry = RateLimiterRegistry.from_config(
+        {"rate_limit": 7, "rate_limits": {"global": {"rate": 50, "burst": 10}, "hosts": {"rate": 2}}}
+    )
+    assert (registry.global_limiter.rate, registry.global_limiter.capacity) == (50, 10)
+    assert registry.bucket("host", "x.example.com").rate == 2
+
+
+@pytest.mark.asyncio
+async def test_batch_acquire_reserves_all_tokens_at_once():
+    limiter = RateLimiter(rate_per_second=10, burst=5)
+    loop = asyncio.get_event_loop()
+    start = loop.time()
+    await limiter.acquire(5)
+    assert loop.time() - start < 0.05
+    await limiter.acquire(3)
+    # Three tokens at 10/s after the burst was spent
+    assert loop.time() - start >= 0.25
+    assert limiter.acquired == 8
+    assert limiter.waits == 1
+
+
+@pytest.mark.asyncio
+async def test_concurrent_waiters_sleep_in_parallel_and_report_metrics():
+    limiter = RateLimiter(rate_per_second=20, burst=1)
+    loop = asyncio.get_event_loop()
+    start = loop.time()
+    await asyncio.gather(*(limiter.acquire() for _ in range(5)))
+    elapsed = loop.time() - start
+    # Four reservations behind the burst token, covered at 20/s
+    assert 0.15 <= elapsed < 0.5
+    stats = limiter.stats()
+    assert stats["waits"] == 4 and stats["waiting"] == 0
+    assert stats["max_wait"] == pytest.approx(0.2, abs=0.02)
+    assert stats["mean_wait"] == pytest.approx(0.125, abs=0.02)
+
+
+@pytest.mark.asyncio
+async def test_cancelled_waiter_returns_its_reservation():
+    limiter = RateLimiter(rate_per_second=1, burst=1)
+    await limiter.acquire()
+    waiter = asyncio.create_task(limiter.acquire(3))
+    await asyncio.sleep(0.01)
+    assert limiter.waiting == 1
+    waiter.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await waiter
+    assert limiter.waiting == 0
+    assert limiter.tokens > -1
+
+
+def test_retry_delay_parses_retry_after_and_reset_headers():
+    now = 1_700_000_000.0
+    assert retry_delay({"Retry-After": "7"}, now=now) == 7.0
+    assert retry_delay({"retry-after": "Tue, 14 Nov 2023 22:13:40 GMT"}, now=now) == 20.0
+    assert retry_delay({"X-RateLimit-Reset": str(now + 30)}, now=now) == 30.0
+    assert retry_delay({"RateLimit-Reset": "12"}, now=now) == 12.0
+    assert retry_delay({"Retry-After": "soon"}, now=now) is None
+    assert retry_delay(None) is None
+
+
+def test_is_throttled_only_counts_exhausted_403():
+    assert is_throttled(429)
+    assert is_throttled(503)
+    assert not is_throttled(403)
+    assert is_throttled(403, {"X-RateLimit-Remaining": "0"})
+    assert is_throttled(403, {"Retry-After": "60"})
+    assert not is_throttled(200, {"Retry-After": "60"})
+
+
+def test_adaptive_limiter_backs_off_and_recovers():
+    limiter = AdaptiveRateLimiter(10, burst=10, min_rate=1)
+    limiter.on_throttle(0)
+    limiter.on_throttle(0)
+    assert limiter.rate == 2.5
+    for _ in range(5):
+        limiter.on_throttle(0)
+    assert limiter.rate == 1  # never below the floor
+    for _ in range(100):
+        limiter.on_success()
+    assert limiter.rate == 10  # never above the configured rate
+    assert limiter.throttled == 7
+
+
+@pytest.mark.asyncio
+async def test_registry_feedback_pauses_provider_for_retry_after():
+    registry = RateLimiterRegistry(
+        global_rate=0,
+        providers={"api": {"rate": 100, "burst": 100}, "fixed": {"rate": 5, "adaptive": False}},
+    )
+    assert not registry.feedback("fixed", 429, {"Retry-After": "1"})
+    assert registry.feedback("api", 429, {"Retry-After": "0.3"})
+    assert registry.bucket("provider", "api").rate == 50
+
+    loop = asyncio.get_event_loop()
+    start = loop.time()
+    await registry.acquire(provider="api")
+    assert loop.time() - start >= 0.25
+
@@ -0,0 +1,223 @@
+import asyncio
+import socket
+import struct
+
+import pytest
+import pytest_asyncio
+
+from core.resolver import NXDOMAIN, RECORD_TYPES, DnsError, Resolver, _read_name, parse_response
+
+TYPE_CODES = {code: name for name, code in RECORD_TYPES.items()}
+
+# name -> list of (type, ttl, value)
+ZONE = {
+    "www.example.com": [("A", 60, "192.0.2.10"), ("A", 30, "192.0.2.11")],
+    "v6.example.com": [("AAAA", 60, "2001:db8::1")],
+    "alias.example.com": [("CNAME", 120, "www.example.com")],
+    "short.example.com": [("A", 0, "192.0.2.20")],
+    "big.example.com": [("A", 60, f"198.51.100.{i}") for i in range(1, 41)],
+}
+
+
+def _encode_name(name):
+    return b"".join(bytes([len(p)]) + p.encode() for p in name.split(".")) + b"\x00"
+
+
+def _answer(query, tcp=False):
+    """Builds an authoritative response for the stub zone."""
+    query_id = struct.unpack("!H", query[:2])[0]
+    qname, offset = _read_name(query, 12)
+    qtype = TYPE_CODES[struct.unpack("!H", query[offset : offset + 2])[0]]
+    question = query[12 : offset + 4]
+
+    records = []
+    owner = qname
+    while owner in ZONE:
+        entries = ZONE[owner]
+        matches = [e for e in entries if e[0] == qtype]
+        records += [(owner, e) for e in (matches or [e for e in entries if e[0] == "CNAME"])]
+        if matches or not records or records[-1][1][0] != "CNAME":
+            break
+        owner = records[-1][1][2]
+
+    rcode = 0 if qname in ZONE else NXDOMAIN
+    truncated = not tcp and len(records) > 20
+    if truncated:
+        records = []
+
+    body = b""
+    for rr_owner, (rtype, ttl, value) in records:
+        if rtype == "A":
+            rdata = socket.inet_aton(value)
+        elif rtype == "AAAA":
+            rdata = socket.inet_pton(socket.AF_INET6, value)
+        else:
+            rdata = _encode_name(value)
+        body += _encode_name(rr_owner) + struct.pack("!HHIH", RECORD_TYPES[rtype], 1, ttl, len(rdata)) + rdata
+
+    authority = b""
+    if not records and not truncated:
+        soa = _encode_name("ns.example.com") + _encode_name("admin.example.com") + struct.pack("!IIIII", 1, 60, 60, 60, 45)
+        authority = _encode_name("example.com") + struct.pack("!HHIH", 6, 1, 900, len(soa)) + soa
+
+    flags = 0x8180 | rcode | (0x0200 if truncated else 0)
+    header = struct.pack("!HHHHHH", query_id, flags, 1, len(records), 1 if authority else 0, 0)
+    return header + question + body + authority
+
+
+class StubDns(asyncio.DatagramProtocol):
+    def __init__(self):
+        self.queries = []
+
+    def connection_made(self, transport):
+        self.transport = transport
+
+    def datagram_received(self, data, addr):
+        self.queries.append(_read_name(data, 12)[0])
+        self.transport.sendto(_answer(data), addr)
+
+
+@pytest_asyncio.fixture
+async def stub_dns():
+    loop = asyncio.get_running_loop()
+
+    async def handle_tcp(reader, writer):
+        length = struct.unpack("!H", await reader.readexactly(2))[0]
+        response = _answer(await reader.readexactly(length), tcp=True)
+        writer.write(struct.pack("!H", len(response)) + response)
+        await writer.drain()
+        writer.close()
+
+    tcp_server = await asyncio.start_server(handle_tcp, "127.0.0.1", 0)
+    port = tcp_server.sockets[0].getsockname()[1]
+    transport, protocol = await loop.create_datagram_endpoint(StubDns, local_addr=("127.0.0.1", port))
+    yield f"127.0.0.1:{port}", protocol
+    transport.close()
+    tcp_server.close()
+    await tcp_server.wait_closed()
+
+
+@pytest.mark.asyncio
+async def test_resolves_and_caches_a_records(stub_dns):
+    server, stub = stub_dns
+    resolver = Resolver(nameservers=[server], timeout=1)
+    try:
+        assert await resolver.resolve("www.example.com") == ["192.0.2.10", "192.0.2.11"]
+        assert await resolver.resolve("WWW.example.com.") == ["192.0.2.10", "192.0.2.11"]
+        assert stub.queries == ["www.example.com"]
+        result = await resolver.query("www.example.com")
+        assert result.ttl == 30
+        assert resolver.stats["hits"] == 2
+    finally:
+        await resolver.close()
+
+
+@pytest.mark.asyncio
+async def test_cname_chain_and_aaaa(stub_dns):
+    server, _ = stub_dns
+    resolver = Resolver(nameservers=[server], timeout=1)
+    try:
+        result = await resolver.query("alias.example.com")
+        assert result.cnames == ["www.example.com"]
+        assert result.records == ["192.0.2.10", "192.0.2.11"]
+        assert await resolver.resolve("v6.example.com", rtypes=("A", "AAAA")) == ["2001:db8::1"]
+        assert await resolver.resolve("192.0.2.99") == ["192.0.2.99"]
+    finally:
+        await resolver.close()
+
+
+@pytest.mark.asyncio
+async def test_nxdomain_is_negatively_cached(stub_dns):
+    server, stub = stub_dns
+    resolver = Resolver(nameservers=[server], timeout=1, negative_ttl=30)
+    try:
+        first = await resolver.query("missing.example.com")
+        assert not first.exists and first.records == []
+        # TTL comes from the SOA minimum, capped by negative_ttl
+        assert first.ttl == 30
+        await resolver.query("missing.example.com")
+        assert stub.queries.count("missing.example.com") == 1
+        assert resolver.stats["negative_hits"] == 1
+    finally:
+        await resolver.close()
+
+
+@pytest.mark.asyncio
+async def test_zero_ttl_and_lru_eviction(stub_dns):
+    server, stub = stub_dns
+    resolver = Resolver(nameservers=[server], timeout=1, cache_size=1)
+    try:
+        await resolver.resolve("short.example.com")
+        await resolver.resolve("short.example.com")
+        assert stub.queries.count("short.example.com") == 2
+
+        await resolver.resolve("www.example.com")
+        await resolver.resolve("v6.example.com")
+        await resolver.resolve("www.example.com")
+        assert stub.queries.count("www.example.com") == 2
+    finally:
+        await resolver.close()
+
+
+@pytest.mark.asyncio
+async def test_truncated_answer_retries_over_tcp(stub_dns):
+    server, _ = stub_dns
+    resolver = Resolver(nameservers=[server], timeout=1)
+    try:
+        addresses = await resolver.resolve("big.example.com")
+        assert len(addresses) == 40
+    finally:
+        await resolver.close()
+
+
+@pytest.mark.asyncio
+async def test_bulk_resolution_coalesces_duplicates(stub_dns):
+    server, stub = stub_dns
+    resolver = Resolver(nameservers=[server], timeout=1, concurrency=4)
+    try:
+        names = ["www.example.com", "alias.example.com", "nope.example.com"] * 20
+        results = await resolver.resolve_many(names)
+        assert results["nope.example.com"] == []
+        assert results["alias.example.com"] == ["192.0.2.10", "192.0.2.11"]
+        assert sorted(stub.queries) == ["alias.example.com", "nope.example.com", "www.example.com"]
+    finally:
+        await resolver.close()
+
+
+@pytest.mark.asyncio
+async def test_unreachable_nameserver_is_not_cached():
+    # Reserve a port with nothing listening on it
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    sock.bind(("127.0.0.1", 0))
+    port = sock.getsockname()[1]
+    sock.close()
+
+    resolver = Resolver(nameservers=[f"127.0.0.1:{port}"], timeout=0.1, attempts=2)
+    try:
+        result = await resolver.query("www.example.com")
+        assert result.rcode is None and result.records == []
+        assert resolver.stats["queries"] == 2
+        await resolver.query("www.example.com")
+        assert resolver.stats["queries"] == 4
+    finally:
+        await resolver.close()
+
+
+def test_truncated_or_malformed_responses_raise_dns_error():
+    header = struct.pack("!HHHHHH", 1, 0x8180, 1, 1, 0, 0)
+    question = _encode_name("www.example.com") + struct.pack("!HH", 1, 1)
+    record = b"\xc0\x0c" + struct.pack("!HHIH", 1, 1, 60, 4) + socket.inet_aton("192.0.2.10")
+    whole = header + question + record
+    assert parse_response(whole)["answers"] == [("www.example.com", "A", 60, "192.0.2.10")]
+    broken = [
+        header + b"\xc0",  # pointer cut in half
+        header + b"\x10abc",  # label longer than the message
+        header + question + b"\xc0\x0c" + b"\x00\x01",  # record header cut short
+        whole[:-2],  # record data cut short
+        # An authority-section SOA whose names leave no room for its fields
+        struct.pack("!HHHHHH", 1, 0x8183, 1, 0, 1, 0) + question + b"\xc0\x0c"
+        + struct.pack("!HHIH", 6, 1, 60, 2) + b"\x00\x00",
+    ]
+    for message in broken:
+        with pytest.raises(DnsError):
+            parse_response(message)
@@ -0,0 +1,138 @@
+import asyncio
+import os
+
+import pytest
+
+from core.response_cache import ResponseCache
+
+
+@pytest.fixture
+def cache(tmp_path):
+    cache = ResponseCache(str(tmp_path / "cache.db"), default_ttl=60, ttls={"slow": 3600})
+    yield cache
+    cache.close()
+
+
+class FakeSource:
+    """Records each fetch and answers with a configurable status."""
+
+    def __init__(self, value, status=200, etag='"v1"'):
+        self.value = value
+        self.status = status
+        self.etag = etag
+        self.calls = []
+
+    async def __call__(self, headers):
+        self.calls.append(headers)
+        if self.status == 304:
+            return 304, {"ETag": self.etag}, None
+        return self.status, {"ETag": self.etag}, self.value if self.status == 200 else None
+
+
+def test_entries_round_trip_with_validators(cache):
+    cache.put("crt.sh", "q1", ["a.example.com"], {"ETag": '"abc"', "Last-Modified": "Mon"})
+    entry = cache.get("crt.sh", "q1")
+    assert entry.value == ["a.example.com"]
+    assert entry.fresh
+    assert entry.validators() == {"If-None-Match": '"abc"', "If-Modified-Since": "Mon"}
+    assert cache.get("crt.sh", "q2") is None
+    assert cache.get("other", "q1") is None
+
+
+def test_ttl_is_per_provider(cache):
+    assert cache.ttl_for("slow") == 3600
+    assert cache.ttl_for("anything") == 60
+
+
+def test_entries_survive_reopening(tmp_path):
+    path = str(tmp_path / "cache.db")
+    first = ResponseCache(path)
+    first.put("crt.sh", "q", ["x"])
+    first.close()
+    second = ResponseCache(path)
+    assert second.get("crt.sh", "q").value == ["x"]
+    assert second.size > 0
+    second.close()
+
+
+@pytest.mark.asyncio
+async def test_fresh_entry_skips_the_request(cache):
+    source = FakeSource(["a", "b"])
+    assert await cache.fetch("crt.sh", "q", source) == ["a", "b"]
+    assert await cache.fetch("crt.sh", "q", source) == ["a", "b"]
+    assert len(source.calls) == 1
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+@pytest.mark.asyncio
+async def test_stale_entry_is_revalidated_and_reused_on_304(cache):
+    cache.put("crt.sh", "q", ["old"], {"ETag": '"v1"'}, ttl=-1)
+    source = FakeSource(None, status=304, etag='"v1"')
+    assert await cache.fetch("crt.sh", "q", source) == ["old"]
+    assert source.calls == [{"If-None-Match": '"v1"'}]
+    assert cache.get("crt.sh", "q").fresh
+    assert cache.revalidated == 1
+
+
+@pytest.mark.asyncio
+async def test_changed_response_replaces_entry(cache):
+    cache.put("crt.sh", "q", ["old"], {"ETag": '"v1"'}, ttl=-1)
+    source = FakeSource(["new"], etag='"v2"')
+    assert await cache.fetch("crt.sh", "q", source) == ["new"]
+    assert cache.get("crt.sh", "q").etag == '"v2"'
+
+
+@pytest.mark.asyncio
+async def test_failures_are_not_cached(cache):
+    source = FakeSource(["x"], status=500)
+    assert await cache.fetch("crt.sh", "q", source) is None
+    assert cache.get("crt.sh", "q") is None
+
+
+@pytest.mark.asyncio
+async def test_refresh_revalidates_fresh_entries(cache):
+    cache.put("crt.sh", "q", ["old"], {"ETag": '"v1"'})
+    cache.refresh = True
+    source = FakeSource(None, status=304)
+    assert await cache.fetch("crt.sh", "q", source) == ["old"]
+    assert len(source.calls) == 1
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path):
+    cache = ResponseCache(str(tmp_path / "cache.db"))
+    payloads = {k: [os.urandom(8).hex() for _ in range(60)] for k in "abcd"}
+    cache.put("p", "a", payloads["a"])
+    cache.max_bytes = cache.size * 3 + cache.size // 2  # room for three entries
+    cache.put("p", "b", payloads["b"])
+    cache.put("p", "c", payloads["c"])
+    cache.get("p", "a")  # 'b' is now the least recently used
+    cache.put("p", "d", payloads["d"])
+    assert cache.size <= cache.max_bytes
+    assert len(cache) == 3
+    assert cache.get("p", "b") is None
+    assert cache.get("p", "a") is not None
+    cache.close()
+
+
+@pytest.mark.asyncio
+async def test_concurrent_lookups_share_one_request(cache):
+    release = asyncio.Event()
+
+    class SlowSource(FakeSource):
+        async def __call__(self, headers):
+            await release.wait()
+            return await super().__call__(headers)
+
+    first, second = SlowSource(["a.example.com"]), SlowSource(["b.example.com"])
+    lookups = [
+        asyncio.ensure_future(cache.fetch("crt.sh", "q", first)),
+        asyncio.ensure_future(cache.fetch("crt.sh", "q", second)),
+    ]
+    await asyncio.sleep(0.05)
+    release.set()
+    assert await asyncio.gather(*lookups) == [["a.example.com"], ["a.example.com"]]
+    assert len(first.calls) == 1 and second.calls == []
+    assert cache.misses == 1 and cache.shared == 1
+    # Once the request is done, later lookups use the cache as usual
+    assert await cache.fetch("crt.sh", "q", second) == ["a.example.com"]
+    assert cache.hits == 1
@@ -0,0 +1,57 @@
+import pytest
+
+from core.database import Database
+from core.result_writer import ResultWriter
+
+
+@pytest.mark.asyncio
+async def test_writer_batches_and_flushes(tmp_path):
+    db = Database(str(tmp_path / "writer.db"))
+    batches = []
+    original = db.store_results_batch
+
+    def recording_batch(rows):
+        batches.append(len(rows))
+        return original(rows)
+
+    db.store_results_batch = recording_batch
+    writer = ResultWriter(db, batch_size=10, flush_interval=60)
+    for i in range(25):
+        writer.submit("example.com", "subdomain/ct", "crt.sh", "subdomain", [{"subdomain": f"h{i}.example.com"}], scan_id="s1")
+
+    await writer.flush()
+    assert sum(batches) == 25
+    assert max(batches) <= 10
+    assert len(db.get_results("example.com", scan_id="s1")) == 25
+
+    await writer.close()
+    with pytest.raises(RuntimeError):
+        writer.submit("example.com", "subdomain/ct", "crt.sh", "subdomain", [])
+    db.close()
+
+
+@pytest.mark.asyncio
+async def test_failed_batch_is_retried_row_by_row_and_writer_survives(tmp_path):
+    db = Database(str(tmp_path / "writer.db"))
+    original = db.store_results_batch
+
+    def failing_batch(rows):
+        # An error the database layer does not catch, such as binding a huge integer
+        if any(row[5] == "bad" for row in rows):
+            raise OverflowError("Python int too large to convert to SQLite INTEGER")
+        return original(rows)
+
+    db.store_results_batch = failing_batch
+    writer = ResultWriter(db, batch_size=100, flush_interval=60)
+    for i in range(5):
+        writer.submit("example.com", "subdomain/ct", "crt.sh", "subdomain", f"h{i}", scan_id="s1")
+    writer.submit("example.com", "subdomain/ct", "crt.sh", "subdomain", "bad", scan_id="s1")
+
+    await writer.flush()
+    assert len(db.get_results("example.com", scan_id="s1")) == 5
+
+    # The drain thread is still alive: later findings are written and flush returns
+    writer.submit("example.com", "subdomain/ct", "crt.sh", "subdomain", "h5", scan_id="s1")
+    await writer.close()
+    assert len(db.get_results("example.com", scan_id="s1")) == 6
+    db.close()
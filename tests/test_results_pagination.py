@@ -0,0 +1,38 @@
+import json
+
+from fastapi.testclient import TestClient
+
+from web.app import app
+from web.db import AsyncDatabase
+
+
+def _client_with_db(tmp_path, monkeypatch):
+    manager = app.state.scan_manager
+    monkeypatch.setattr(manager, "db", AsyncDatabase(str(tmp_path / "pages.db")))
+    db = manager.db.db
+    db.create_scan("s1", "example.com", "completed")
+    for i in range(5):
+        db.store_result("example.com", "subdomain/ct", "crt.sh", "subdomain",
+                        [{"subdomain": f"h{i}.example.com"}], scan_id="s1")
+    db.store_result("example.com", "portscan/scanner", "port_scanner", "port",
+                    [{"ip": "10.0.0.1", "port": 80}], scan_id="s1")
+    return TestClient(app)
+
+
+def test_keyset_pages_cover_all_rows(tmp_path, monkeypatch):
+    client = _client_with_db(tmp_path, monkeypatch)
+    seen, after_id = [], 0
+    while after_id is not None:
+        page = client.get(f"/api/scans/s1/results?limit=2&after_id={after_id}").json()
+        seen.extend(row["id"] for row in page["results"])
+        after_id = page["next_after_id"]
+    assert len(seen) == 6 and seen == sorted(seen)
+
+
+def test_ndjson_stream_with_type_filter(tmp_path, monkeypatch):
+    client = _client_with_db(tmp_path, monkeypatch)
+    response = client.get("/api/targets/example.com/results?format=ndjson&type=subdomain&limit=2")
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    assert len(rows) == 5
+    assert all(row["type"] == "subdomain" for row in rows)
@@ -0,0 +1,84 @@
+import asyncio
+
+import pytest
+
+from core.scheduler import (
+    DagScheduler,
+    DependencyCycleError,
+    OPEN_PORTS,
+    SUBDOMAINS,
+    run_with_timeout,
+)
+
+
+class FakeModule:
+    def __init__(self, name, consumes=(), produces=(), delay=0.0, streams_input=False):
+        self.name = name
+        self.module_type = "fake"
+        self.consumes = consumes
+        self.produces = produces
+        self.delay = delay
+        self.streams_input = streams_input
+
+
+@pytest.mark.asyncio
+async def test_downstream_starts_after_its_producers_only():
+    slow_source = FakeModule("slow", produces=(SUBDOMAINS,), delay=0.3)
+    scanner = FakeModule("scanner", produces=(OPEN_PORTS,), delay=0.05)
+    prober = FakeModule("prober", consumes=(OPEN_PORTS,))
+    events = []
+
+    async def runner(m):
+        events.append(("start", m.name))
+        await asyncio.sleep(m.delay)
+        events.append(("end", m.name))
+
+    await DagScheduler([slow_source, scanner, prober], runner).run()
+
+    # The prober must not wait for the unrelated slow subdomain source
+    assert events.index(("start", "prober")) > events.index(("end", "scanner"))
+    assert events.index(("start", "prober")) < events.index(("end", "slow"))
+
+
+async def _run_streaming_pipeline(consumer_tail, timeout):
+    """Runs a slow producer and a streaming consumer that finishes `consumer_tail`
+    seconds after its input closes; returns the consumer's outcome."""
+    producer = FakeModule("producer", produces=(SUBDOMAINS,), delay=0.3)
+    consumer = FakeModule("consumer", consumes=(SUBDOMAINS,), streams_input=True)
+    outcome = {}
+
+    async def consume():
+        await scheduler.inputs_complete(consumer)
+        await asyncio.sleep(consumer_tail)
+
+    async def runner(m):
+        if m is producer:
+            await asyncio.sleep(m.delay)
+            return
+        try:
+            await run_with_timeout(consume(), timeout, scheduler.inputs_complete(m))
+            outcome["consumer"] = "completed"
+        except asyncio.TimeoutError:
+            outcome["consumer"] = "timed out"
+
+    scheduler = DagScheduler([producer, consumer], runner)
+    await scheduler.run()
+    return outcome["consumer"]
+
+
+@pytest.mark.asyncio
+async def test_streaming_module_timeout_starts_when_its_inputs_close():
+    # The producer alone outlives the timeout; the consumer's own work does not
+    assert await _run_streaming_pipeline(consumer_tail=0.05, timeout=0.15) == "completed"
+    assert await _run_streaming_pipeline(consumer_tail=0.5, timeout=0.15) == "timed out"
+
+
+def test_cycle_is_rejected():
+    a = FakeModule("a", consumes=(SUBDOMAINS,), produces=(OPEN_PORTS,))
+    b = FakeModule("b", consumes=(OPEN_PORTS,), produces=(SUBDOMAINS,))
+
+    async def runner(m):
+        pass
+
+    with pytest.raises(DependencyCycleError):
+        DagScheduler([a, b], runner)
@@ -0,0 +1,145 @@
+import random
+
+import pytest
+from aiohttp import web
+
+from core.bus import FindingBus
+from core.scheduler import HTTP_URLS, OPEN_PORTS
+from modules.http import similarity
+from modules.http.detector import HttpDetector
+from modules.http.similarity import (
+    ServiceClusterer,
+    body_features,
+    favicon_hash,
+    murmur3_32,
+    simhash,
+)
+
+ICON = bytes(range(256)) * 4
+
+
+def login_page(host: str, token: str) -> str:
+    return (
+        f"<html><head><title>Acme SSO</title><script>var t='{token}';</script></head>"
+        f"<body><h2>Sign in to {host}</h2><form action='/auth'>"
+        f"<input type=hidden name=csrf value='{token}'><label>Username</label><input name=user>"
+        "<label>Password</label><input name=pass type=password><button>Sign in</button></form>"
+        "<p>Forgot your password? Contact the helpdesk at extension 1234.</p>"
+        "<footer>Copyright 2024 Acme Corporation. All rights reserved.</footer></body></html>"
+    )
+
+
+OTHER_PAGE = (
+    "<html><body><h1>Welcome to nginx!</h1><p>If you see this page, the nginx web server "
+    "is successfully installed and working. Further configuration is required.</p>"
+    "<p><em>Thank you for using nginx.</em></p></body></html>"
+)
+
+
+@pytest.mark.parametrize(
+    "data, seed, expected",
+    [
+        (b"", 0, 0),
+        (b"foo", 0, -156908512),
+        (b"Hello, world!", 0, -1070186941),
+        (b"abcde", 42, -1361433616),
+    ],
+)
+def test_murmur3_matches_mmh3(monkeypatch, data, seed, expected):
+    monkeypatch.setattr(similarity, "mmh3", None)  # the pure-Python fallback
+    assert murmur3_32(data, seed) == expected
+
+
+def test_copies_of_a_page_get_the_same_fingerprint():
+    first = simhash(body_features(login_page("a.acme.com", "x9Fq2"), "a.acme.com"))
+    second = simhash(body_features(login_page("vpn.acme.com", "Zk81pQ"), "vpn.acme.com"))
+    other = simhash(body_features(OTHER_PAGE))
+    assert first == second
+    assert (first ^ other).bit_count() > 16
+    assert simhash(body_features("")) is None
+
+
+def test_band_index_finds_every_close_fingerprint():
+    rng = random.Random(7)
+    clusterer = ServiceClusterer(max_distance=4)
+    leaders = []  # (url, fingerprint), compared by brute force
+    for i in range(500):
+        if leaders and rng.random() < 0.5:
+            fingerprint = rng.choice(leaders)[1]
+            for bit in rng.sample(range(64), rng.randrange(7)):
+                fingerprint ^= 1 << bit
+        else:
+            fingerprint = rng.getrandbits(64)
+        url = f"http://h{i}"
+        expected = next(
+            (lead for lead, other in leaders if (other ^ fingerprint).bit_count() <= 4), url
+        )
+        assert clusterer.add(url, fingerprint) == expected
+        if expected == url:
+            leaders.append((url, fingerprint))
+    assert len(clusterer) == len(leaders)
+
+
+def test_different_favicon_or_status_keeps_services_apart():
+    clusterer = ServiceClusterer()
+    assert clusterer.add("http://a", 0xABC, favicon=1, status=200) == "http://a"
+    assert clusterer.add("http://b", 0xABD, favicon=2, status=200) == "http://b"
+    assert clusterer.add("http://c", 0xABC, favicon=1, status=404) == "http://c"
+    assert clusterer.add("http://d", 0xABC, favicon=None, status=200) == "http://a"
+    assert clusterer.size("http://a") == 2 and len(clusterer) == 3
+
+
+@pytest.mark.asyncio
+async def test_detector_clusters_copies_and_hashes_favicons():
+    def app(body: str) -> web.Application:
+        async def page(request):
+            return web.Response(text=body, content_type="text/html")
+
+        async def icon(request):
+            return web.Response(body=ICON, content_type="image/x-icon")
+
+        application = web.Application()
+        application.router.add_get("/", page)
+        application.router.add_get("/favicon.ico", icon)
+        return application
+
+    runners, ports = [], []
+    for body in (login_page("one", "t1"), login_page("two", "t2"), OTHER_PAGE):
+        runner = web.AppRunner(app(body))
+        await runner.setup()
+        site = web.TCPSite(runner, "127.0.0.1", 0)
+        await site.start()
+        runners.append(runner)
+        ports.append(site._server.sockets[0].getsockname()[1])
+
+    bus = FindingBus()
+    bus.register_producer(OPEN_PORTS)
+    bus.seal()
+    for port in ports:
+        bus.publish(
+            OPEN_PORTS, {"ip": "127.0.0.1", "port": port, "host": "127.0.0.1", "service": "http"}
+        )
+    bus.producer_done(OPEN_PORTS)
+
+    class Recorder:
+        stored = []
+
+        def store_result(self, **kwargs):
+            self.stored.append(kwargs)
+
+    try:
+        await HttpDetector({}, Recorder(), bus=bus).run("example.test")
+    finally:
+        for runner in runners:
+            await runner.cleanup()
+
+    findings = {f["url"]: f for f in bus.snapshot(HTTP_URLS)}
+    login, copy, other = (f"http://127.0.0.1:{port}/" for port in ports)
+    # Whichever copy was found first represents the cluster
+    leader = findings[login]["cluster"]
+    assert leader in (login, copy) and findings[copy]["cluster"] == leader
+    assert findings[other]["cluster"] == other
+    assert findings[login]["favicon_hash"] == favicon_hash(ICON)
+    stored = {f["url"]: f for f in Recorder.stored[0]["data"]}
+    assert stored[leader]["cluster_size"] == 2
+    assert "cluster_size" not in stored[copy if leader == login else login]
@@ -0,0 +1,197 @@
+import asyncio
+
+import pytest
+
+from core.response_cache import ResponseCache
+from modules.subdomain.alienvault import AlienVault
+from modules.subdomain.securitytrails import SecurityTrails
+from modules.subdomain.virustotal import VirusTotal
+
+
+class FakeResponse:
+    def __init__(self, status, data):
+        self.status = status
+        self.headers = {}
+        self._data = data
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def json(self):
+        return self._data
+
+
+class FakeSession:
+    """Answers requests from a url -> (status, body) map, tracking concurrency."""
+
+    def __init__(self, routes, delay=0.0):
+        self.routes = routes
+        self.delay = delay
+        self.urls = []
+        self.active = 0
+        self.peak = 0
+
+    def request(self, method, url, **kwargs):
+        return self._respond(url)
+
+    def get(self, url, **kwargs):
+        return self._respond(url)
+
+    def _respond(self, url):
+        session = self
+
+        class Pending(FakeResponse):
+            async def __aenter__(self):
+                session.urls.append(url)
+                session.active += 1
+                session.peak = max(session.peak, session.active)
+                await asyncio.sleep(session.delay)
+                session.active -= 1
+                return self
+
+        status, data = self.routes.get(url, (404, None))
+        return Pending(status, data)
+
+
+class FakeHttpClient:
+    def __init__(self, session):
+        self._session = session
+
+    def session(self, host=None, proxy_url=None):
+        return self._session
+
+
+class Recorder:
+    def __init__(self):
+        self.stored = []
+
+    def store_result(self, **kwargs):
+        self.stored.append(kwargs)
+
+
+def make(cls, session, pagination):
+    db = Recorder()
+    config = {"api_keys": {cls.__name__.lower(): "key"}, "pagination": pagination}
+    module = cls(config, db, http_client=FakeHttpClient(session))
+    return module, db
+
+
+def found(db):
+    return sorted(f["subdomain"] for f in db.stored[0]["data"])
+
+
+VT = "https://www.virustotal.com/api/v3/domains/example.com/subdomains?limit=40"
+
+
+def vt_page(names, cursor=None):
+    data = {"data": [{"id": f"{n}.example.com"} for n in names]}
+    if cursor:
+        data["meta"] = {"cursor": cursor}
+    return 200, data
+
+
+@pytest.mark.asyncio
+async def test_virustotal_follows_cursor():
+    session = FakeSession({
+        VT: vt_page(["a", "b"], "c1"),
+        f"{VT}&cursor=c1": vt_page(["c"], "c2"),
+        f"{VT}&cursor=c2": vt_page(["d"]),
+    })
+    module, db = make(VirusTotal, session, {})
+    await module.run("example.com")
+    assert found(db) == ["a.example.com", "b.example.com", "c.example.com", "d.example.com"]
+    assert len(session.urls) == 3
+
+
+@pytest.mark.asyncio
+async def test_virustotal_stops_at_max_pages():
+    session = FakeSession({
+        VT: vt_page(["a"], "c1"),
+        f"{VT}&cursor=c1": vt_page(["b"], "c2"),
+        f"{VT}&cursor=c2": vt_page(["c"]),
+    })
+    module, db = make(VirusTotal, session, {"virustotal": {"max_pages": 2}})
+    await module.run("example.com")
+    assert found(db) == ["a.example.com", "b.example.com"]
+
+
+@pytest.mark.asyncio
+async def test_virustotal_keeps_pages_read_before_a_failure():
+    session = FakeSession({VT: vt_page(["a"], "c1"), f"{VT}&cursor=c1": (500, None)})
+    module, db = make(VirusTotal, session, {})
+    await module.run("example.com")
+    assert found(db) == ["a.example.com"]
+
+
+ST = (
+    "https://api.securitytrails.com/v1/domain/example.com/subdomains"
+    "?children_only=false&include_inactive=true"
+)
+SEARCH = "https://api.securitytrails.com/v1/domains/list?include_ips=false&page={}"
+
+
+def st_routes(pages):
+    routes = {ST: (200, {"subdomains": ["a"], "meta": {"limit_reached": True}})}
+    for n in range(1, pages + 1):
+        routes[SEARCH.format(n)] = (
+            200,
+            {"records": [{"hostname": f"p{n}.example.com"}], "meta": {"total_pages": pages}},
+        )
+    return routes
+
+
+@pytest.mark.asyncio
+async def test_securitytrails_reads_search_pages_concurrently():
+    session = FakeSession(st_routes(9), delay=0.01)
+    module, db = make(SecurityTrails, session, {"securitytrails": {"concurrency": 3}})
+    await module.run("example.com")
+    assert found(db) == ["a.example.com"] + [f"p{n}.example.com" for n in range(1, 10)]
+    assert session.peak == 3
+
+
+@pytest.mark.asyncio
+async def test_securitytrails_respects_max_pages():
+    session = FakeSession(st_routes(9))
+    module, db = make(SecurityTrails, session, {"securitytrails": {"max_pages": 4}})
+    await module.run("example.com")
+    assert len(found(db)) == 5
+    assert SEARCH.format(5) not in session.urls
+
+
+@pytest.mark.asyncio
+async def test_securitytrails_skips_search_below_the_cap():
+    session = FakeSession({ST: (200, {"subdomains": ["a", "b"], "meta": {"limit_reached": False}})})
+    module, db = make(SecurityTrails, session, {})
+    await module.run("example.com")
+    assert found(db) == ["a.example.com", "b.example.com"]
+    assert session.urls == [ST]
+
+
+OTX = "https://otx.alienvault.com/api/v1/indicators/domain/example.com/"
+URL_LIST = OTX + "url_list?limit=500&page={}"
+
+
+@pytest.mark.asyncio
+async def test_alienvault_does_not_cache_a_set_with_missing_pages(tmp_path):
+    session = FakeSession({
+        OTX + "passive_dns": (200, {"passive_dns": [{"hostname": "a.example.com"}]}),
+        URL_LIST.format(1): (
+            200,
+            {"url_list": [{"hostname": "b.example.com"}], "has_next": True, "full_size": 1500},
+        ),
+        URL_LIST.format(2): (200, {"url_list": [{"hostname": "c.example.com"}]}),
+        URL_LIST.format(3): (500, None),
+    })
+    cache = ResponseCache(str(tmp_path / "cache.db"))
+    module, db = make(AlienVault, session, {})
+    module.cache = cache
+    try:
+        await module.run("example.com")
+        # What was read is kept, but the next scan asks OTX again
+        assert found(db) == ["a.example.com", "b.example.com", "c.example.com"]
+        assert cache.get("alienvault", OTX + "passive_dns") is None
+    finally:
+        cache.close()
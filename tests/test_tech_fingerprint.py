@@ -0,0 +1,156 @@
+import json
+
+import pytest
+from aiohttp import web
+
+from core.bus import FindingBus
+from core.database import Database
+from core.scheduler import OPEN_PORTS
+from modules.http.detector import HttpDetector
+from modules.http.tech import TechMatcher, get_matcher, load_signatures, required_literals
+
+PAGE = (
+    "<html><head>"
+    '<meta name="generator" content="WordPress 6.4.2">'
+    "<script src='/wp-includes/js/jquery/jquery-3.7.1.min.js'></script>"
+    '<script src="https://unpkg.com/vue@3.3.4/dist/vue.global.js"></script>'
+    "</head><body><div id=\"__nuxt\"></div></body></html>"
+)
+
+
+@pytest.mark.parametrize(
+    "expression, literals",
+    [
+        (r"cdn\.shopify\.com", ["cdn.shopify.com"]),
+        (r"nginx(?:/([\d.]+))?", ["nginx"]),
+        (r"<[^>]+data-React", ["data-react"]),
+        (r"jquery-?ui", ["jquery"]),
+        (r"^Caddy$", ["caddy"]),
+        (r"(?:foo|bar)baz", ["baz"]),
+        (r"(?:<div[^>]+id=\"wrapper\"|<script[^>]+/components/)", ["/components/", 'id="wrapper"']),
+        (r"<div[^>]+class=\"[^\"]*svelte-", ["svelte-"]),
+        (r"(?:foo|ba)\d", None),
+        (r"\x3cscript id=", ["script id="]),
+        (r"\u003cdiv\N{SPACE}data-app", ["data-app"]),
+        (r"abc|de", None),
+        (r"[a-z]+\d", None),
+    ],
+)
+def test_required_literals(expression, literals):
+    assert required_literals(expression) == literals
+
+
+def test_bundled_signatures_detect_page_headers_and_cookies():
+    found = get_matcher().match(
+        [("Server", "nginx/1.25.3"), ("X-Powered-By", "PHP/8.2.1")],
+        {"PHPSESSID": "abc"},
+        PAGE,
+    )
+    versions = {tech["name"]: tech["version"] for tech in found}
+    assert versions["Nginx"] == "1.25.3"
+    assert versions["PHP"] == "8.2.1"
+    assert versions["WordPress"] == "6.4.2"
+    assert versions["jQuery"] == "3.7.1"
+    assert versions["Vue.js"] == "3.3.4"
+    # Implied by Nuxt.js and WordPress
+    assert versions["Node.js"] is None and "MySQL" in versions
+    nginx = next(tech for tech in found if tech["name"] == "Nginx")
+    assert nginx["categories"] == ["Web servers", "Reverse proxies"]
+
+
+def test_matcher_agrees_with_running_every_pattern():
+    matcher = TechMatcher(
+        {
+            "categories": {"1": "Test"},
+            "technologies": {
+                "Prefix": {"cats": [1], "html": "jquery"},
+                "Longer": {"cats": [1], "html": r"jquery-ui-([\d.]*\d)\;version:\1"},
+                "NoLiteral": {"cats": [1], "html": r"<x-\w+"},
+                "Absent": {"cats": [1], "html": "angular", "excludes": "Prefix"},
+                "Excluder": {"cats": [1], "scriptSrc": r"\.min\.js", "excludes": "NoLiteral"},
+            },
+        }
+    )
+    found = matcher.match(html="<x-app></x-app><script src='/JQUERY-UI-1.13.2.min.js'></script>")
+    assert [(t["name"], t["version"]) for t in found] == [
+        ("Excluder", None),
+        ("Longer", "1.13.2"),
+        ("Prefix", None),
+    ]
+
+
+def test_confidence_adds_up_to_100():
+    matcher = TechMatcher(
+        {
+            "technologies": {
+                "Guess": {
+                    "headers": {"X-A": r"a\;confidence:40"},
+                    "cookies": {"b": r"\;confidence:30"},
+                },
+            }
+        }
+    )
+    assert matcher.match([("x-a", "a")])[0]["confidence"] == 40
+    assert matcher.match([("X-A", "a")], {"b": "1"})[0]["confidence"] == 70
+
+
+def test_load_signatures_reads_a_wappalyzer_source_tree(tmp_path):
+    (tmp_path / "technologies").mkdir()
+    (tmp_path / "categories.json").write_text(json.dumps({"5": {"name": "Widgets"}}))
+    (tmp_path / "technologies" / "a.json").write_text(
+        json.dumps({"Acme": {"cats": [5], "headers": {"X-Acme": ""}}})
+    )
+    matcher = TechMatcher(load_signatures(str(tmp_path)))
+    assert matcher.match([("X-Acme", "1")]) == [
+        {"name": "Acme", "version": None, "confidence": 100, "categories": ["Widgets"]}
+    ]
+
+
+@pytest.mark.asyncio
+async def test_detector_stores_technologies_per_url(tmp_path):
+    async def page(request):
+        response = web.Response(text=PAGE, content_type="text/html")
+        response.headers["Server"] = "nginx/1.25.3"
+        response.set_cookie("PHPSESSID", "abc")
+        return response
+
+    app = web.Application()
+    app.router.add_get("/", page)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+
+    bus = FindingBus()
+    bus.register_producer(OPEN_PORTS)
+    bus.seal()
+    bus.publish(OPEN_PORTS, {"ip": "127.0.0.1", "port": port, "host": "127.0.0.1", "service": "http"})
+    bus.producer_done(OPEN_PORTS)
+
+    db = Database(str(tmp_path / "recon.db"))
+    try:
+        await HttpDetector({}, db, bus=bus).run("example.test")
+    finally:
+        await runner.cleanup()
+
+    url = f"http://127.0.0.1:{port}/"
+    with db._read() as conn:
+        rows = dict(
+            conn.execute("SELECT name, version FROM technologies WHERE url = ?", (url,)).fetchall()
+        )
+    assert rows["Nginx"] == "1.25.3"
+    assert rows["WordPress"] == "6.4.2"
+    assert "PHP" in rows
+
+
+def test_overlapping_literals_are_all_found():
+    matcher = TechMatcher(
+        {"technologies": {"Left": {"html": "abcd"}, "Right": {"html": "cdef"}, "Inner": {"html": "bcd"}}}
+    )
+    assert [t["name"] for t in matcher.match(html="xxABCDEFxx")] == ["Inner", "Left", "Right"]
+
+
+def test_escaped_characters_are_not_indexed_as_text():
+    matcher = TechMatcher({"technologies": {"Escaped": {"html": r"\x3cscript id=.xfoo"}}})
+    assert [t["name"] for t in matcher.match(html='<script id="xfoo"></script>')] == ["Escaped"]
@@ -1,7 +1,7 @@
-from fastapi import APIRouter, HTTPException, status, Request, BackgroundTasks, Depends
-from fastapi.responses import JSONResponse
+from fastapi import APIRouter, HTTPException, status, Request, BackgroundTasks, Depends, Query
+from fastapi.responses import JSONResponse, StreamingResponse
 from pydantic import BaseModel, Field, validator
-from typing import List, Optional, Any
+from typing import List, Literal, Optional, Any
 import re
 import sys
 from .scan_manager import ScanManager
@@ -39,6 +39,53 @@ class ScanResponse(BaseModel):
     scan_id: str
     status: str
 
+class ResultFilters:
+    """Common query parameters for the results endpoints.
+
+    Without 'limit' or 'format', the full result list is returned as before.
+    With 'limit', one keyset page is returned along with the cursor for the next
+    page. With format=ndjson, every matching row is streamed one JSON object per line.
+    """
+    def __init__(
+        self,
+        limit: Optional[int] = Query(None, ge=1, le=5000, description="Page size"),
+        after_id: int = Query(0, ge=0, description="Return rows with an id greater than this cursor"),
+        type: Optional[str] = Query(None, description="Result type filter, e.g. 'subdomain'"),
+        module: Optional[str] = Query(None, description="Module filter, e.g. 'subdomain' or 'subdomain/ct'"),
+        source: Optional[str] = Query(None, description="Source filter, e.g. 'crt.sh'"),
+        format: Literal["json", "ndjson"] = Query("json", description="'ndjson' streams rows"),
+    ):
+        self.limit = limit
+        self.after_id = after_id
+        self.type = type
+        self.module = module
+        self.source = source
+        self.format = format
+
+    @property
+    def paginated(self) -> bool:
+        return self.format == "ndjson" or self.limit is not None or any(
+            [self.after_id, self.type, self.module, self.source]
+        )
+
+async def _results_response(manager: ScanManager, filters: ResultFilters, **scope: Any):
+    query = {
+        "after_id": filters.after_id,
+        "result_type": filters.type,
+        "module": filters.module,
+        "source": filters.source,
+        **scope,
+    }
+    if filters.format == "ndjson":
+        return StreamingResponse(
+            manager.stream_results(page_size=filters.limit or 500, **query),
+            media_type="application/x-ndjson",
+        )
+    limit = filters.limit or 500
+    page = await manager.get_results_page(limit=limit, **query)
+    next_after_id = page[-1]["id"] if len(page) == limit else None
+    return {"results": page, "next_after_id": next_after_id}
+
 @api_router.post("/scans", response_model=ScanResponse, status_code=201)
 async def start_scan(scan: ScanRequest, manager: ScanManager = Depends(get_scan_manager)):
     try:
@@ -61,7 +108,13 @@ async def get_scan(scan_id: str, manager: ScanManager = Depends(get_scan_manager
     return scan
 
 @api_router.get("/scans/{scan_id}/results")
-async def get_scan_results(scan_id: str, manager: ScanManager = Depends(get_scan_manager)):
+async def get_scan_results(
+    scan_id: str,
+    filters: ResultFilters = Depends(),
+    manager: ScanManager = Depends(get_scan_manager),
+):
+    if filters.paginated:
+        return await _results_response(manager, filters, scan_id=scan_id)
     results = await manager.get_scan_results(scan_id)
     return results
 
@@ -78,7 +131,13 @@ async def get_diagnostic(request: Request):
     }
 
 @api_router.get("/targets/{target}/results")
-async def get_target_results(target: str, manager: ScanManager = Depends(get_scan_manager)):
+async def get_target_results(
+    target: str,
+    filters: ResultFilters = Depends(),
+    manager: ScanManager = Depends(get_scan_manager),
+):
+    if filters.paginated:
+        return await _results_response(manager, filters, target=target)
     results = await manager.get_target_results(target)
     return results
 
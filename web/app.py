@@ -70,6 +70,12 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+
+@app.on_event("shutdown")
+async def close_http_client():
+    # Scans share one pooled HTTP client and browser pool for the lifetime of the process
+    await scan_manager.close()
+
 # --- View Routes ---
 
 @app.get("/")
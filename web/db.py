@@ -1,3 +1,4 @@
+from core.config import load_config
 from core.database import Database
 import asyncio
 from typing import List, Dict, Any, Optional
@@ -7,8 +8,12 @@ class AsyncDatabase:
     Async wrapper around the synchronous core.database.Database class.
     Uses asyncio.to_thread to run blocking SQLite operations in a separate thread.
     """
-    def __init__(self, db_path: str = "recon.db"):
-        self.db = Database(db_path)
+    def __init__(self, db_path: Optional[str] = None, config_path: str = "config/default.yaml"):
+        # Share the scan engine's pooled connection settings (WAL, cache, mmap)
+        if db_path:
+            self.db = Database(db_path)
+        else:
+            self.db = Database.from_config(load_config(config_path))
 
     async def get_scans(self, limit: int = 50) -> List[Dict[str, Any]]:
         return await asyncio.to_thread(self.db.get_scans, limit)
@@ -19,6 +24,9 @@ class AsyncDatabase:
     async def get_results(self, target: str, module: Optional[str] = None, scan_id: Optional[str] = None) -> List[Dict[str, Any]]:
         return await asyncio.to_thread(self.db.get_results, target, module, scan_id)
 
+    async def get_results_page(self, **filters: Any) -> List[Dict[str, Any]]:
+        return await asyncio.to_thread(lambda: self.db.get_results_page(**filters))
+
     async def get_unique_results(self, target: str, result_type: str) -> List[Dict[str, Any]]:
         return await asyncio.to_thread(self.db.get_unique_results, target, result_type)
 
@@ -2,10 +2,15 @@ import asyncio
 import uuid
 import logging
 import traceback
-from typing import Dict, Any, List
+import json
+from typing import Dict, Any, AsyncIterator, List, Optional
 from .websocket_manager import WebSocketManager
 from .db import AsyncDatabase
+from core.config import load_config
 from core.engine import run_scan as core_run_scan
+from core.browser_pool import BrowserPool
+from core.http_client import HttpClient
+from core.proxy_manager import ProxyManager
 
 logger = logging.getLogger(__name__)
 
@@ -16,6 +21,34 @@ class ScanManager:
         # Keep track of running tasks if needed (optional)
         self.active_scans: Dict[str, asyncio.Task] = {}
         self.scan_logs: Dict[str, List[dict]] = {}
+        # One pooled HTTP client for the whole process, so connections outlive single scans
+        self.http_client: Optional[HttpClient] = None
+        # Warm headless browsers shared by every scan's screenshots
+        self.browser_pool: Optional[BrowserPool] = None
+
+    def get_http_client(self) -> HttpClient:
+        if self.http_client is None:
+            config = load_config("config/default.yaml")
+            proxy_manager = ProxyManager(config.get("proxy", {}))
+            # Proxy health probes run for the life of the process, like the pools
+            proxy_manager.start()
+            self.http_client = HttpClient.from_config(config.get("http_client", {}), proxy_manager)
+        return self.http_client
+
+    def get_browser_pool(self) -> BrowserPool:
+        if self.browser_pool is None:
+            config = load_config("config/default.yaml")
+            self.browser_pool = BrowserPool.from_config(config.get("browser_pool", {}))
+        return self.browser_pool
+
+    async def close(self) -> None:
+        if self.http_client:
+            await self.http_client.close()
+            await self.http_client.proxy.close()
+            self.http_client = None
+        if self.browser_pool:
+            await self.browser_pool.close()
+            self.browser_pool = None
 
     async def start_scan(self, target: str, config: dict = None) -> str:
         scan_id = str(uuid.uuid4())
@@ -51,7 +84,13 @@ class ScanManager:
             # But we should probably ensure it exists before starting, or let the engine do it.
             # Engine does: db.create_scan(scan_id, target, "running")
             
-            await core_run_scan(target, scan_id=scan_id, progress_callback=callback)
+            await core_run_scan(
+                target,
+                scan_id=scan_id,
+                progress_callback=callback,
+                http_client=self.get_http_client(),
+                browser_pool=self.get_browser_pool(),
+            )
             
         except Exception as e:
             logger.error(f"Error in background scan {scan_id}: {traceback.format_exc()}")
@@ -74,6 +113,25 @@ class ScanManager:
     
     async def get_target_results(self, target: str) -> List[Dict[str, Any]]:
         return await self.db.get_results(target)
+
+    async def get_results_page(self, **filters: Any) -> List[Dict[str, Any]]:
+        """Returns one keyset-paginated page of results (see Database.get_results_page)."""
+        return await self.db.get_results_page(**filters)
+
+    async def stream_results(self, page_size: int = 500, **filters: Any) -> AsyncIterator[str]:
+        """Yields matching results as NDJSON lines, fetching one page at a time.
+
+        Only a single page is held in memory, however large the result set is.
+        """
+        after_id = filters.pop("after_id", 0)
+        while True:
+            page = await self.db.get_results_page(after_id=after_id, limit=page_size, **filters)
+            for row in page:
+                yield json.dumps(row) + "\n"
+            if len(page) < page_size:
+                return
+            after_id = page[-1]["id"]
+
     async def clear_history(self):
         await self.db.clear_history()
         self.scan_logs.clear()
@@ -28,10 +28,17 @@ async function fetchResults() {
             url = `/api/targets/${target}/results`;
         }
 
-        const response = await fetch(url);
-        if (!response.ok) throw new Error("Failed to fetch results");
-
-        const results = await response.json();
+        // Page through results with the keyset cursor to keep each response small
+        const results = [];
+        let afterId = 0;
+        while (afterId !== null) {
+            const response = await fetch(`${url}?limit=500&after_id=${afterId}`);
+            if (!response.ok) throw new Error("Failed to fetch results");
+
+            const page = await response.json();
+            results.push(...page.results);
+            afterId = page.next_after_id;
+        }
         console.log(`[DEBUG] Received ${results.length} results`);
         processResults(results);
     } catch (e) {